@@ -12,12 +12,17 @@ This file is intended to be cached and reused across all agent invocations.
 from __future__ import annotations
 
 import json
+import sys
 import yaml
 from pathlib import Path
 from typing import List, Dict, Any
 
-
 REPO_ROOT = Path(__file__).parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.kb_core import kb_yaml
+
 KB_ROOT = REPO_ROOT / "kb"
 DESIGN_ROOT = REPO_ROOT / "design"
 OUT_DIR = REPO_ROOT / "out"
@@ -35,8 +40,7 @@ def read_file(path: Path) -> str:
 def load_yaml_file(path: Path) -> dict:
     """Load a YAML file and return as dict."""
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
+        return kb_yaml.load_file(path) or {}
     except Exception:
         return {}
 
@@ -19,11 +19,14 @@ from typing import Any, Dict, List
 
 from agents import function_tool
 
+from src.indexer import index_service
+
 
 # Repo root
 REPO_ROOT = Path(__file__).parent.parent
 KB_ROOT = REPO_ROOT / "kb"
 VENV_PYTHON = REPO_ROOT / ".venv" / "bin" / "python"
+INDEXER_SOCKET = REPO_ROOT / "out" / "indexer.sock"
 
 # Limits to prevent context overflow
 MAX_LINE_LENGTH = 500
@@ -311,17 +314,26 @@ def run_indexer() -> Dict[str, Any]:
             "gap_count": int,      # Total gaps in work queue
         }
     """
-    cmd = [str(VENV_PYTHON), "-m", "src.cli", "index"]
+    cmd = [str(VENV_PYTHON), "-m", "src.cli", "index", "--incremental"]
 
     try:
-        proc = subprocess.run(
-            cmd,
-            cwd=str(REPO_ROOT),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False,
+        # Resident index service if one is running, else a fresh indexer process
+        served = index_service.request(
+            "index", socket_path=INDEXER_SOCKET, timeout=index_service.INDEX_TIMEOUT_SEC
         )
+        if served is not None:
+            proc = subprocess.CompletedProcess(
+                cmd, served["returncode"], served["stdout"], served["stderr"]
+            )
+        else:
+            proc = subprocess.run(
+                cmd,
+                cwd=str(REPO_ROOT),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=False,
+            )
     except Exception as e:
         return {
             "success": False,
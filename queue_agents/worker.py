@@ -29,6 +29,7 @@ from dotenv import load_dotenv
 from agents import Agent, Runner, ItemHelpers
 
 from queue_agents import cost_tracker
+from src.indexer import index_service
 
 # Load environment variables from .env file
 load_dotenv()
@@ -60,6 +61,7 @@ def format_tool_output(output: Any) -> str:
 REPO_ROOT = Path(__file__).parent.parent
 CACHED_CONTEXT_FILE = Path(__file__).parent / "cached_context.md"
 VENV_PYTHON = REPO_ROOT / ".venv" / "bin" / "python"
+INDEXER_SOCKET = REPO_ROOT / "out" / "indexer.sock"
 WORK_QUEUE_FILE = REPO_ROOT / "out" / "work_queue.jsonl"
 
 
@@ -221,6 +223,12 @@ def execute_queue_complete(item_id: str, agent_name: str) -> Dict[str, Any]:
 
 def check_gap_resolved(item_id: str) -> bool:
     """Check if a gap is still present in the work queue."""
+    served = index_service.request(
+        "gap_resolved", socket_path=INDEXER_SOCKET, timeout=index_service.QUERY_TIMEOUT_SEC, id=item_id
+    )
+    if served is not None:
+        return served["resolved"]
+
     if not WORK_QUEUE_FILE.exists():
         return False
 
@@ -243,17 +251,26 @@ def check_gap_resolved(item_id: str) -> bool:
 
 def execute_run_indexer() -> Dict[str, Any]:
     """Execute the indexer (plain Python function, not a tool)."""
-    cmd = [str(VENV_PYTHON), "-m", "src.cli", "index"]
+    cmd = [str(VENV_PYTHON), "-m", "src.cli", "index", "--incremental"]
 
     try:
-        proc = subprocess.run(
-            cmd,
-            cwd=str(REPO_ROOT),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False,
+        # Resident index service if one is running, else a fresh indexer process
+        served = index_service.request(
+            "index", socket_path=INDEXER_SOCKET, timeout=index_service.INDEX_TIMEOUT_SEC
         )
+        if served is not None:
+            proc = subprocess.CompletedProcess(
+                cmd, served["returncode"], served["stdout"], served["stderr"]
+            )
+        else:
+            proc = subprocess.run(
+                cmd,
+                cwd=str(REPO_ROOT),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=False,
+            )
     except Exception as e:
         return {
             "success": False,
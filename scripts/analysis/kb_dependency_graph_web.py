@@ -3,15 +3,19 @@
 from __future__ import annotations
 
 import argparse
+import sys
 import json
 import random
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set
-
-import yaml
+from typing import Dict, List, Optional, Set
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.kb_core.kb_graph import EdgeType, KBGraph
+
 KB_DIR = REPO_ROOT / "kb"
 
 
@@ -30,116 +34,45 @@ class Edge:
     etype: str
 
 
-def _load_yaml(path: Path) -> Optional[dict]:
-    try:
-        with path.open() as f:
-            data = yaml.safe_load(f)
-        return data if isinstance(data, dict) else None
-    except Exception:
-        return None
-
-
 def _node_id(kind: str, item_id: str) -> str:
     return f"{kind}:{item_id}"
 
 
-def _collect_items() -> Dict[str, Node]:
-    nodes: Dict[str, Node] = {}
-    items_dir = KB_DIR / "items"
-    for path in items_dir.rglob("*.yaml"):
-        data = _load_yaml(path)
-        if not data:
-            continue
-        item_id = data.get("id")
-        kind = data.get("kind")
-        if not item_id or not kind:
-            continue
-        label = item_id
-        nid = _node_id("item", item_id)
-        nodes[nid] = Node(node_id=nid, label=label, ntype="item", subtype=kind)
-    return nodes
-
-
-def _collect_recipes() -> Dict[str, Node]:
-    nodes: Dict[str, Node] = {}
-    for path in (KB_DIR / "recipes").glob("*.yaml"):
-        data = _load_yaml(path)
-        if not data:
-            continue
-        if data.get("kind") not in (None, "recipe"):
-            continue
-        rid = data.get("id")
-        if not rid:
-            continue
-        nid = _node_id("recipe", rid)
-        nodes[nid] = Node(node_id=nid, label=rid, ntype="recipe")
-    return nodes
-
-
-def _collect_processes() -> Dict[str, Node]:
+def _collect_nodes(graph: KBGraph) -> Dict[str, Node]:
+    """Defined items (with a kind), recipes and processes."""
     nodes: Dict[str, Node] = {}
-    for path in (KB_DIR / "processes").glob("*.yaml"):
-        data = _load_yaml(path)
-        if not data:
-            continue
-        if data.get("kind") not in (None, "process"):
-            continue
-        pid = data.get("id")
-        if not pid:
+    for node in graph.nodes(defined_only=True):
+        kind = graph.kind(node)
+        entry_id = graph.entry_id(node)
+        subtype = graph.subtype(node) if kind == "item" else None
+        if kind == "item" and not subtype:
             continue
-        nid = _node_id("process", pid)
-        nodes[nid] = Node(node_id=nid, label=pid, ntype="process")
+        nid = _node_id(kind, entry_id)
+        nodes[nid] = Node(node_id=nid, label=entry_id, ntype=kind, subtype=subtype)
     return nodes
 
 
-def _iter_quantities(data: dict, key: str) -> Iterable[str]:
-    for entry in data.get(key, []) or []:
-        item_id = entry.get("item_id")
-        if item_id:
-            yield item_id
+# Input edges are drawn from the consumed item to its consumer
+DRAWN_EDGES = (
+    EdgeType.RECIPE_INPUT,
+    EdgeType.RECIPE_OUTPUT,
+    EdgeType.RECIPE_PROCESS,
+    EdgeType.PROCESS_INPUT,
+    EdgeType.PROCESS_OUTPUT,
+    EdgeType.PROCESS_MACHINE,
+)
+INPUT_EDGES = (EdgeType.RECIPE_INPUT, EdgeType.PROCESS_INPUT)
 
 
-def _collect_edges() -> Set[Edge]:
+def _collect_edges(graph: KBGraph) -> Set[Edge]:
     edges: Set[Edge] = set()
-
-    for path in (KB_DIR / "recipes").glob("*.yaml"):
-        data = _load_yaml(path)
-        if not data:
-            continue
-        rid = data.get("id")
-        if not rid:
-            continue
-        recipe_nid = _node_id("recipe", rid)
-
-        for item_id in _iter_quantities(data, "inputs"):
-            edges.add(Edge(_node_id("item", item_id), recipe_nid, "recipe_input"))
-        for item_id in _iter_quantities(data, "outputs"):
-            edges.add(Edge(recipe_nid, _node_id("item", item_id), "recipe_output"))
-
-        for step in data.get("steps", []) or []:
-            pid = step.get("process_id")
-            if pid:
-                edges.add(Edge(recipe_nid, _node_id("process", pid), "recipe_process"))
-
-    for path in (KB_DIR / "processes").glob("*.yaml"):
-        data = _load_yaml(path)
-        if not data:
-            continue
-        pid = data.get("id")
-        if not pid:
-            continue
-        process_nid = _node_id("process", pid)
-
-        for item_id in _iter_quantities(data, "inputs"):
-            edges.add(Edge(_node_id("item", item_id), process_nid, "process_input"))
-        for item_id in _iter_quantities(data, "outputs"):
-            edges.add(Edge(process_nid, _node_id("item", item_id), "process_output"))
-
-        for req in data.get("resource_requirements", []) or []:
-            machine_id = req.get("machine_id")
-            if machine_id:
-                edges.add(Edge(process_nid, _node_id("item", machine_id), "process_machine"))
-
+    for edge_id in graph.edges(DRAWN_EDGES):
+        edge = graph.edge(edge_id)
+        src = _node_id(graph.kind(edge.source), graph.entry_id(edge.source))
+        dst = _node_id(graph.kind(edge.target), graph.entry_id(edge.target))
+        if edge.type in INPUT_EDGES:
+            src, dst = dst, src
+        edges.add(Edge(src, dst, edge.type.name.lower()))
     return edges
 
 
@@ -226,12 +159,9 @@ def _edge_color(etype: str) -> str:
 
 
 def _build_graph() -> Dict[str, List[dict]]:
-    items = _collect_items()
-    recipes = _collect_recipes()
-    processes = _collect_processes()
-
-    nodes = {**items, **recipes, **processes}
-    edges = _collect_edges()
+    graph = KBGraph.load_or_build(KB_DIR)
+    nodes = _collect_nodes(graph)
+    edges = _collect_edges(graph)
     missing_nodes: Dict[str, Node] = {}
     for edge in edges:
         for node_id in (edge.src, edge.dst):
@@ -32,8 +32,9 @@ def _load_kb_machine_ids(kb_root: Path) -> Set[str]:
 
 
 def _load_snapshot(sim_dir: Path) -> Dict[str, object]:
-    snapshot_path = sim_dir / "snapshot.json"
-    return json.loads(snapshot_path.read_text(encoding="utf-8"))
+    from src.simulation.snapshot_journal import read_snapshot_data
+
+    return read_snapshot_data(sim_dir)
 
 
 def _load_events(sim_dir: Path) -> List[Dict[str, object]]:
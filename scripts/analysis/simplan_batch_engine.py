@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+In-process batch engine for the greedy SimPlan optimizer.
+
+Loads the KB once and optimizes machines in forked worker processes that
+share it, instead of starting a Python subprocess (and a KB load) per
+machine. Each machine runs in its own child so a per-machine timeout can
+stop it without affecting the others; results are yielded as machines
+finish.
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.analysis.simplan_optimizer_greedy import build_parser, optimize
+from src.kb_core.kb_loader import KBLoader
+
+
+@dataclass
+class MachineJob:
+    """One optimizer run: a machine id plus simplan_optimizer_greedy arguments."""
+
+    machine_id: str
+    args: List[str] = field(default_factory=list)
+
+
+def _run_job(job: MachineJob, kb: KBLoader) -> Dict[str, Any]:
+    """Run the optimizer for job, capturing its output like a subprocess would."""
+    output = io.StringIO()
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            code = optimize(build_parser().parse_args(job.args), kb=kb)
+    except SystemExit as exc:
+        # Report sys.exit() as a subprocess would: None is success, a message fails
+        if exc.code is None or isinstance(exc.code, int):
+            code = exc.code or 0
+        else:
+            output.write(f"{exc.code}\n")
+            code = 1
+    except Exception:
+        output.write(traceback.format_exc())
+        code = 1
+    return {
+        "machine_id": job.machine_id,
+        "returncode": code,
+        "output": output.getvalue(),
+        "elapsed_sec": time.monotonic() - started,
+    }
+
+
+def _child_main(job: MachineJob, kb: KBLoader, conn) -> None:
+    conn.send(_run_job(job, kb))
+    conn.close()
+
+
+def _timeout_result(job: MachineJob, timeout_sec: float) -> Dict[str, Any]:
+    return {
+        "machine_id": job.machine_id,
+        "returncode": None,
+        "output": "",
+        "error": "Timeout after {0}s while optimizing machine_id={1}".format(
+            timeout_sec, job.machine_id
+        ),
+        "elapsed_sec": timeout_sec,
+    }
+
+
+def _with_error(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach an error text (the captured output) to a failed result."""
+    if result["returncode"] == 0 or "error" in result:
+        return result
+    err_text = (result.get("output") or "").strip()
+    if not err_text:
+        err_text = "Optimizer failed with exit code {0} (no stderr/stdout)".format(
+            result["returncode"]
+        )
+    result["error"] = err_text
+    return result
+
+
+def run_batch(
+    jobs: Iterable[MachineJob],
+    kb: KBLoader,
+    workers: Optional[int] = None,
+    timeout_sec: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Optimize jobs with up to `workers` machines in flight; yield results as they finish.
+
+    Each result has machine_id, returncode (None on timeout), the captured
+    optimizer output, elapsed_sec and, for failures, error. Without fork
+    support jobs run sequentially in this process and timeouts are not
+    enforced.
+    """
+    workers = workers or os.cpu_count() or 1
+    if "fork" not in multiprocessing.get_all_start_methods():
+        for job in jobs:
+            yield _with_error(_run_job(job, kb))
+        return
+
+    ctx = multiprocessing.get_context("fork")
+    pending: Deque[MachineJob] = deque(jobs)
+    running: Dict[Any, Any] = {}  # result pipe -> (job, process, deadline)
+    while pending or running:
+        while pending and len(running) < workers:
+            job = pending.popleft()
+            recv_conn, send_conn = ctx.Pipe(duplex=False)
+            # Forked after the KB load, so children share it copy-on-write
+            proc = ctx.Process(target=_child_main, args=(job, kb, send_conn))
+            proc.start()
+            send_conn.close()
+            deadline = time.monotonic() + timeout_sec if timeout_sec else None
+            running[recv_conn] = (job, proc, deadline)
+
+        deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+        wait_sec = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        for conn in wait(list(running), timeout=wait_sec):
+            job, proc, _ = running.pop(conn)
+            try:
+                result = conn.recv()
+            except EOFError:
+                proc.join()
+                result = {
+                    "machine_id": job.machine_id,
+                    "returncode": proc.exitcode,
+                    "output": "",
+                    "elapsed_sec": None,
+                }
+            conn.close()
+            proc.join()
+            yield _with_error(result)
+
+        now = time.monotonic()
+        for conn, (job, proc, deadline) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                proc.kill()
+                proc.join()
+                conn.close()
+                del running[conn]
+                yield _timeout_result(job, timeout_sec)
@@ -2,23 +2,32 @@
 """
 Batch runner for SimPlan optimizer across a machine queue list.
 
-Reads machine IDs from a Markdown table and runs:
-  scripts/analysis/simplan_optimizer_greedy.py
+Reads machine IDs from a Markdown table and runs
+scripts/analysis/simplan_optimizer_greedy.py for each one, in parallel
+worker processes that share a single KB load (simplan_batch_engine).
 
-Captures failures to JSONL + Markdown summary and optionally enqueues gaps.
+Streams failures to JSONL + Markdown summary as machines finish, records
+every finished machine in a results JSONL so an interrupted batch can be
+resumed, and optionally enqueues gaps.
 """
 from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
 import subprocess
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.analysis.simplan_batch_engine import MachineJob, run_batch
+from src.kb_core.kb_loader import KBLoader
 
 
 def _parse_machine_ids(md_path: Path) -> List[str]:
@@ -82,18 +91,14 @@ def _extract_context(err: str) -> Optional[str]:
     return last_context
 
 
-def _run_optimizer(
-    python_exe: str,
+def _optimizer_job(
     machine_id: str,
     out_path: Optional[str],
     iterations: int,
     max_depth: int,
-    timeout_sec: int,
-    verbose: bool,
-) -> Optional[Dict[str, str]]:
-    cmd = [
-        python_exe,
-        "scripts/analysis/simplan_optimizer_greedy.py",
+    kb_root: str,
+) -> MachineJob:
+    args = [
         "--machine-id",
         machine_id,
         "--sim-id",
@@ -102,36 +107,28 @@ def _run_optimizer(
         str(iterations),
         "--max-depth",
         str(max_depth),
+        "--kb-root",
+        kb_root,
     ]
     if out_path:
-        cmd += ["--out", out_path]
-    if verbose:
-        print("Running optimizer for {0}".format(machine_id))
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=str(REPO_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=timeout_sec,
-        )
-    except subprocess.TimeoutExpired:
-        return {
-            "error": "Timeout after {0}s while optimizing machine_id={1}".format(
-                timeout_sec, machine_id
-            ),
-        }
+        args += ["--out", out_path]
+    return MachineJob(machine_id=machine_id, args=args)
 
-    if result.returncode == 0:
-        return None
 
-    err_text = (result.stderr or "") + ("\n" + result.stdout if result.stdout else "")
-    err_text = err_text.strip()
-    if not err_text:
-        err_text = "Optimizer failed with exit code {0} (no stderr/stdout)".format(
-            result.returncode
-        )
-    return {"error": err_text}
+def _load_results(path: Path) -> List[Dict[str, object]]:
+    if not path.exists():
+        return []
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            # Partial last line from an interrupted run
+            continue
+    return rows
 
 
 def _write_markdown_summary(path: Path, failures: List[Dict[str, str]]) -> None:
@@ -176,6 +173,29 @@ def _clear_file(path: Path) -> None:
     path.write_text("", encoding="utf-8")
 
 
+def _failure_row(machine_id: str, err_text: str) -> Dict[str, str]:
+    return {
+        "machine_id": machine_id,
+        "error": err_text,
+        "context": _extract_context(err_text),
+        "category": _classify_error(err_text),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _queue_row(item: Dict[str, str], gap_type: str) -> Dict[str, object]:
+    return {
+        "gap_type": gap_type,
+        "item_id": item["machine_id"],
+        "description": "SimPlan optimizer failed ({0})".format(item["category"]),
+        "context": {
+            "error": item["error"],
+            "context": item["context"],
+            "timestamp": item["timestamp"],
+        },
+    }
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Batch SimPlan optimizer runner.")
     parser.add_argument(
@@ -224,10 +244,17 @@ def main() -> int:
         action="store_true",
         help="Print progress for each machine.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Machines to optimize in parallel (default: CPU count).",
+    )
+    parser.add_argument("--kb-root", default=str(REPO_ROOT / "kb"), help="KB root.")
     parser.add_argument(
         "--python",
         default=str(REPO_ROOT / ".venv/bin/python"),
-        help="Python executable to run optimizer with.",
+        help="Python executable for the queue add command (--enqueue).",
     )
     parser.add_argument(
         "--out-jsonl",
@@ -244,6 +271,16 @@ def main() -> int:
         default="out/simplan_failures_queue.jsonl",
         help="Queue JSONL output for manual enqueue.",
     )
+    parser.add_argument(
+        "--out-results",
+        default="out/simplan_batch_results.jsonl",
+        help="Per-machine results JSONL, written as machines finish.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip machines already recorded in --out-results.",
+    )
     parser.add_argument(
         "--overwrite",
         action="store_true",
@@ -278,71 +315,72 @@ def main() -> int:
     out_jsonl = REPO_ROOT / args.out_jsonl
     out_md = REPO_ROOT / args.out_md
     out_queue = REPO_ROOT / args.out_queue
+    out_results = REPO_ROOT / args.out_results
 
     if args.overwrite:
         _clear_file(out_jsonl)
         _clear_file(out_queue)
 
+    failures: List[Dict[str, str]] = []
+    done: Set[str] = set()
+    if args.resume:
+        for row in _load_results(out_results):
+            done.add(row["machine_id"])
+            if row.get("status") != "ok":
+                failures.append(row["failure"])
+    else:
+        _clear_file(out_results)
+
     out_dir = (REPO_ROOT / args.out_dir).resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    failures: List[Dict[str, str]] = []
-    total = len(subset)
-    for offset, machine_id in enumerate(subset, start=1):
-        if args.verbose:
-            print(
-                "Starting {0}/{1}: {2}".format(start + offset, start + total, machine_id)
-            )
+    jobs: List[MachineJob] = []
+    for machine_id in subset:
         out_path = out_dir / f"{machine_id}_optimized.json"
+        if machine_id in done:
+            if args.verbose:
+                print("SKIP (resumed): {0}".format(machine_id))
+            continue
         if args.skip_existing and out_path.exists():
             if args.verbose:
                 print("SKIP (exists): {0}".format(machine_id))
             continue
-        result = _run_optimizer(
-            args.python,
-            machine_id,
-            str(out_path),
-            args.iterations,
-            args.max_depth,
-            args.timeout_sec,
-            args.verbose,
+        jobs.append(
+            _optimizer_job(
+                machine_id, str(out_path), args.iterations, args.max_depth, args.kb_root
+            )
         )
-        if result is None:
+
+    kb = KBLoader(Path(args.kb_root), use_validated_models=False)
+    kb.load_all()
+
+    total = len(jobs)
+    for finished, result in enumerate(
+        run_batch(jobs, kb, workers=args.workers, timeout_sec=args.timeout_sec), start=1
+    ):
+        machine_id = result["machine_id"]
+        row: Dict[str, object] = {
+            "machine_id": machine_id,
+            "status": "ok",
+            "elapsed_sec": result["elapsed_sec"],
+        }
+        if "error" in result:
+            failure = _failure_row(machine_id, result["error"])
+            failures.append(failure)
+            row["status"] = "failed"
+            row["failure"] = failure
+            _append_jsonl(out_jsonl, [failure])
+            _append_jsonl(out_queue, [_queue_row(failure, args.gap_type)])
+            _write_markdown_summary(out_md, failures)
             if args.verbose:
-                print("OK: {0}".format(machine_id))
-            continue
-        err_text = result["error"]
-        failures.append(
-            {
-                "machine_id": machine_id,
-                "error": err_text,
-                "context": _extract_context(err_text),
-                "category": _classify_error(err_text),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-        )
-        if args.verbose:
-            print("FAIL: {0} ({1})".format(machine_id, failures[-1]["category"]))
-
-    if failures:
-        _append_jsonl(out_jsonl, failures)
-        queue_rows = []
-        for item in failures:
-            queue_rows.append(
-                {
-                    "gap_type": args.gap_type,
-                    "item_id": item["machine_id"],
-                    "description": "SimPlan optimizer failed ({0})".format(
-                        item["category"]
-                    ),
-                    "context": {
-                        "error": item["error"],
-                        "context": item["context"],
-                        "timestamp": item["timestamp"],
-                    },
-                }
-            )
-        _append_jsonl(out_queue, queue_rows)
+                print(
+                    "FAIL {0}/{1}: {2} ({3})".format(
+                        finished, total, machine_id, failure["category"]
+                    )
+                )
+        elif args.verbose:
+            print("OK {0}/{1}: {2}".format(finished, total, machine_id))
+        _append_jsonl(out_results, [row])
 
     _write_markdown_summary(out_md, failures)
 
@@ -4,12 +4,14 @@ Build a combined SimPlan for a list of machines.
 
 Steps:
 - Parse machine IDs from a runbook queue markdown file or a plain list.
-- Run greedy optimizer per machine to generate optimized plans.
+- Run greedy optimizer per machine to generate optimized plans (in parallel,
+  sharing one KB load; see simplan_batch_engine).
 - Merge plans into a single combined plan.
 """
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 from pathlib import Path
 from typing import List, Optional
@@ -19,7 +21,7 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from scripts.analysis.simplan import SimPlan
-from scripts.analysis.simplan_optimizer_greedy import main as greedy_main
+from scripts.analysis.simplan_batch_engine import MachineJob, run_batch
 from src.kb_core.kb_loader import KBLoader
 from src.kb_core.unit_converter import UnitConverter
 
@@ -50,7 +52,7 @@ def _load_machine_list(list_path: Path) -> List[str]:
     return machines
 
 
-def _run_optimizer(
+def _optimizer_job(
     machine_id: str,
     sim_id: str,
     kb_root: Path,
@@ -59,7 +61,7 @@ def _run_optimizer(
     max_depth: int,
     out_path: Path,
     allow_bom: bool,
-) -> None:
+) -> MachineJob:
     args = [
         "--machine-id", machine_id,
         "--sim-id", sim_id,
@@ -71,16 +73,19 @@ def _run_optimizer(
     ]
     if allow_bom:
         args.append("--allow-bom")
+    return MachineJob(machine_id=machine_id, args=args)
+
 
-    sys.argv = ["simplan_optimizer_greedy.py"] + args
-    try:
-        greedy_main()
-    except SystemExit as exc:
-        code = exc.code if isinstance(exc.code, int) else 0
-        if code != 0:
-            raise RuntimeError(f"optimizer failed for {machine_id} (exit {code})")
-    if not out_path.exists():
-        raise RuntimeError(f"optimizer did not write plan for {machine_id}")
+def _run_optimizers(jobs: List[MachineJob], kb: KBLoader, workers: int) -> None:
+    failures = []
+    for result in run_batch(jobs, kb, workers=workers):
+        print(result["output"], end="")
+        if "error" in result:
+            failures.append(
+                f"optimizer failed for {result['machine_id']} (exit {result['returncode']})"
+            )
+    if failures:
+        raise RuntimeError("; ".join(failures))
 
 
 def _merge_import(
@@ -180,6 +185,12 @@ def main() -> int:
         action="store_true",
         help="Allow BOM fallback when no recipe is available",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Machines to optimize in parallel (default: CPU count)",
+    )
     parser.add_argument(
         "--reuse-plans",
         action="store_true",
@@ -204,7 +215,11 @@ def main() -> int:
     plans_dir = Path(args.plans_dir)
     plans_dir.mkdir(parents=True, exist_ok=True)
 
+    kb = KBLoader(kb_root, use_validated_models=False)
+    kb.load_all()
+
     plan_paths: List[Path] = []
+    jobs: List[MachineJob] = []
     for machine_id in machines:
         out_path = plans_dir / f"{machine_id}_optimized.json"
         plan_paths.append(out_path)
@@ -212,24 +227,27 @@ def main() -> int:
             continue
         sim_id = f"{args.sim_id}__{machine_id}"
         print(f"Optimizing {machine_id} -> {out_path}")
-        _run_optimizer(
-            machine_id=machine_id,
-            sim_id=sim_id,
-            kb_root=kb_root,
-            sim_root=sim_root,
-            iterations=args.iterations,
-            max_depth=args.max_depth,
-            out_path=out_path,
-            allow_bom=args.allow_bom,
+        jobs.append(
+            _optimizer_job(
+                machine_id=machine_id,
+                sim_id=sim_id,
+                kb_root=kb_root,
+                sim_root=sim_root,
+                iterations=args.iterations,
+                max_depth=args.max_depth,
+                out_path=out_path,
+                allow_bom=args.allow_bom,
+            )
         )
+    _run_optimizers(jobs, kb, args.workers)
+    for machine_id, path in zip(machines, plan_paths):
+        if not path.exists():
+            raise RuntimeError(f"optimizer did not write plan for {machine_id}")
 
     plans: List[SimPlan] = []
     for path in plan_paths:
         plans.append(SimPlan.load(path))
 
-    kb = KBLoader(kb_root, use_validated_models=False)
-    kb.load_all()
-
     merged = _merge_plans(plans, kb, sim_id=args.sim_id, allow_bom=args.allow_bom)
     metadata = {
         "machine_count": len(machines),
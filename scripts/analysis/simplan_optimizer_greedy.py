@@ -7,7 +7,10 @@ from __future__ import annotations
 import argparse
 import copy
 import math
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -410,7 +413,32 @@ def _build_import_only_plan(
     return plan
 
 
-def main() -> int:
+# KB shared with forked trial workers; set before the pool is created.
+_TRIAL_KB: Optional[KBLoader] = None
+
+
+def _run_trial(plan: SimPlan) -> Dict[str, Any]:
+    """Execute a trial plan in a scratch simulation against the shared KB."""
+    return execute_plan(plan, Path(), Path(), kb=_TRIAL_KB, persist=False)
+
+
+def _make_trial_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Worker pool for trial runs, or None to run trials in-process."""
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    # Forked workers inherit the loaded KB instead of reloading it
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+
+
+def _evaluate_trials(
+    pool: Optional[ProcessPoolExecutor], plans: List[SimPlan]
+) -> List[Dict[str, Any]]:
+    if pool is None or len(plans) == 1:
+        return [_run_trial(plan) for plan in plans]
+    return list(pool.map(_run_trial, plans))
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Greedy ISRU optimizer.")
     parser.add_argument("--machine-id", required=True, help="Target machine item id")
     parser.add_argument("--sim-id", required=True, help="Base simulation id")
@@ -420,24 +448,43 @@ def main() -> int:
     parser.add_argument("--max-depth", type=int, default=6, help="Max recursion depth")
     parser.add_argument("--out", help="Output plan path")
     parser.add_argument("--candidate", help="Force expansion of a specific import item")
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=1,
+        help="Import candidates to try per iteration; the best improvement is accepted",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes for evaluating trials (default: min(top-k, CPU count))",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose decision logs")
     parser.add_argument(
         "--allow-bom",
         action="store_true",
         help="Allow BOM fallback when no recipe is available (default: error).",
     )
-    args = parser.parse_args()
+    return parser
+
+
+def optimize(args: argparse.Namespace, kb: Optional[KBLoader] = None) -> int:
+    """Run the optimizer for parsed args; kb reuses an already-loaded KB."""
+    global _TRIAL_KB
 
     kb_root = Path(args.kb_root)
-    kb = KBLoader(kb_root, use_validated_models=False)
-    kb.load_all()
+    sim_root = Path(args.sim_root)
+    if kb is None:
+        kb = KBLoader(kb_root, use_validated_models=False)
+        kb.load_all()
     converter = UnitConverter(kb)
+    top_k = max(1, args.top_k)
 
     base_plan = _build_import_only_plan(
         args.machine_id, args.sim_id, kb, allow_bom=args.allow_bom
     )
     base_result = execute_plan(
-        base_plan, kb_root, Path(args.sim_root), reset=True, dry_run=False
+        base_plan, kb_root, sim_root, reset=True, dry_run=False, kb=kb
     )
     if not base_result.get("success"):
         print(f"Baseline plan failed: {base_result}", file=sys.stderr)
@@ -447,6 +494,10 @@ def main() -> int:
     best_isru = base_result.get("isru", {}).get("isru_percent", 0.0)
     print(f"Baseline ISRU: {best_isru:.1f}%")
 
+    _TRIAL_KB = kb
+    workers = args.workers or min(top_k, os.cpu_count() or 1)
+    pool: Optional[ProcessPoolExecutor] = None
+
     improvements = 0
     skipped: set[str] = set()
     rejected: set[str] = set()
@@ -476,13 +527,13 @@ def main() -> int:
 
         candidate_rows.sort(key=lambda row: row[1], reverse=True)
 
-        selected = None
+        selected: List[Tuple[str, float, str]] = []
         if args.candidate:
             cand = best_plan.imports.get(args.candidate)
             if not cand:
                 print(f"Candidate not in imports: {args.candidate}")
                 break
-            selected = (args.candidate, cand.qty, cand.unit)
+            selected.append((args.candidate, cand.qty, cand.unit))
         else:
             for item_id, mass_kg, qty, unit in candidate_rows:
                 if item_id in skipped or item_id in rejected:
@@ -492,65 +543,85 @@ def main() -> int:
                 if not _can_expand_item(item_id, kb, allow_machine_build=False):
                     skipped.add(item_id)
                     continue
-                selected = (item_id, qty, unit)
-                break
+                selected.append((item_id, qty, unit))
+                if len(selected) >= top_k:
+                    break
 
         if not selected:
             break
-
-        item_id, qty, unit = selected
-        if args.verbose:
-            print(f"Selected candidate: {item_id} {qty} {unit}")
         if improvements >= args.iterations:
             break
 
-        trial_plan = copy.deepcopy(best_plan)
-        expanded = _expand_item(
-            plan=trial_plan,
-            item_id=item_id,
-            qty=float(qty),
-            unit=unit,
-            kb=kb,
-            converter=converter,
-            visited=set(),
-            allow_machine_build=False,
-            depth=0,
-            max_depth=args.max_depth,
-        )
-        if not expanded:
+        trials: List[Tuple[str, SimPlan]] = []
+        for item_id, qty, unit in selected:
             if args.verbose:
-                print(f"Expand skipped for {item_id}")
-            skipped.add(item_id)
-            continue
-        _normalize_plan_quantities(trial_plan, kb, converter)
-
-        trial_plan.sim_id = f"{args.sim_id}_opt_{improvements+1}"
-        trial_path = REPO_ROOT / "out" / f"plan_{args.machine_id}_trial_{improvements+1}.json"
-        trial_plan.save(trial_path)
-        if args.verbose:
-            diff = _diff_plans(best_plan, trial_plan)
-            print("Plan diff:")
-            for key in ("added_imports", "removed_imports", "added_recipes", "removed_recipes"):
-                if diff[key]:
-                    print(f"  {key}: {', '.join(diff[key][:10])}")
-                    if len(diff[key]) > 10:
-                        print(f"    ... {len(diff[key]) - 10} more")
-        result = execute_plan(trial_plan, kb_root, Path(args.sim_root), reset=True, dry_run=False)
-        if not result.get("success"):
-            print(f"Trial failed for {item_id}: {result}")
-            rejected.add(item_id)
+                print(f"Selected candidate: {item_id} {qty} {unit}")
+            trial_plan = copy.deepcopy(best_plan)
+            expanded = _expand_item(
+                plan=trial_plan,
+                item_id=item_id,
+                qty=float(qty),
+                unit=unit,
+                kb=kb,
+                converter=converter,
+                visited=set(),
+                allow_machine_build=False,
+                depth=0,
+                max_depth=args.max_depth,
+            )
+            if not expanded:
+                if args.verbose:
+                    print(f"Expand skipped for {item_id}")
+                skipped.add(item_id)
+                continue
+            _normalize_plan_quantities(trial_plan, kb, converter)
+
+            trial_name = f"{improvements+1}" if top_k == 1 else f"{improvements+1}_{len(trials)+1}"
+            trial_plan.sim_id = f"{args.sim_id}_opt_{trial_name}"
+            trial_path = REPO_ROOT / "out" / f"plan_{args.machine_id}_trial_{trial_name}.json"
+            trial_plan.save(trial_path)
+            if args.verbose:
+                diff = _diff_plans(best_plan, trial_plan)
+                print("Plan diff:")
+                for key in ("added_imports", "removed_imports", "added_recipes", "removed_recipes"):
+                    if diff[key]:
+                        print(f"  {key}: {', '.join(diff[key][:10])}")
+                        if len(diff[key]) > 10:
+                            print(f"    ... {len(diff[key]) - 10} more")
+            trials.append((item_id, trial_plan))
+
+        if not trials:
             continue
-        isru_pct = result.get("isru", {}).get("isru_percent", 0.0)
-        print(f"Trial expand {item_id}: ISRU {isru_pct:.1f}%")
 
-        if isru_pct > best_isru:
-            best_isru = isru_pct
-            best_plan = trial_plan
+        if pool is None:
+            pool = _make_trial_pool(workers)
+        results = _evaluate_trials(pool, [trial_plan for _, trial_plan in trials])
+
+        accepted: Optional[Tuple[str, SimPlan, float]] = None
+        for (item_id, trial_plan), result in zip(trials, results):
+            if not result.get("success"):
+                print(f"Trial failed for {item_id}: {result}")
+                rejected.add(item_id)
+                continue
+            isru_pct = result.get("isru", {}).get("isru_percent", 0.0)
+            print(f"Trial expand {item_id}: ISRU {isru_pct:.1f}%")
+            if isru_pct <= best_isru:
+                print(f"Rejected {item_id} (no improvement)")
+                rejected.add(item_id)
+            elif accepted is None or isru_pct > accepted[2]:
+                accepted = (item_id, trial_plan, isru_pct)
+
+        # Improving trials that lost to a better one stay eligible for later iterations
+        if accepted:
+            item_id, best_plan, best_isru = accepted
             improvements += 1
             print(f"Accepted {item_id} -> ISRU {best_isru:.1f}%")
-        else:
-            print(f"Rejected {item_id} (no improvement)")
-            rejected.add(item_id)
+
+    if pool is not None:
+        pool.shutdown()
+    if improvements:
+        # Trials ran in scratch simulations; keep the accepted plan's sim for inspection
+        execute_plan(best_plan, kb_root, sim_root, reset=True, dry_run=False, kb=kb)
 
     out_path = Path(args.out) if args.out else (REPO_ROOT / "out" / f"plan_{args.machine_id}_optimized.json")
     best_plan.save(out_path)
@@ -559,5 +630,9 @@ def main() -> int:
     return 0
 
 
+def main(argv: Optional[List[str]] = None) -> int:
+    return optimize(build_parser().parse_args(argv))
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
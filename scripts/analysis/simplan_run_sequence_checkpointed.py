@@ -21,6 +21,7 @@ if str(REPO_ROOT) not in sys.path:
 
 from scripts.analysis.simplan import SimPlan
 from scripts.analysis.simplan_runner import execute_plan
+from src.simulation.snapshot_journal import DELTA_FILE
 
 
 def _load_machine_ids(runbook_path: Path) -> List[str]:
@@ -93,6 +94,9 @@ def _write_checkpoint(
     ckpt_path = checkpoint_dir / checkpoint_name
     ckpt_path.mkdir(parents=True, exist_ok=True)
     shutil.copy2(snapshot_path, ckpt_path / "snapshot.json")
+    delta_path = sim_dir / DELTA_FILE
+    if delta_path.exists():
+        shutil.copy2(delta_path, ckpt_path / DELTA_FILE)
     events_path = sim_dir / "events.jsonl"
     if events_path.exists():
         shutil.copy2(events_path, ckpt_path / "events.jsonl")
@@ -138,6 +142,11 @@ def _restore_checkpoint(checkpoint_dir: Path, sim_dir: Path, checkpoint_name: st
         raise FileNotFoundError(f"Checkpoint missing snapshot.json: {ckpt_path}")
     sim_dir.mkdir(parents=True, exist_ok=True)
     shutil.copy2(snapshot_path, sim_dir / "snapshot.json")
+    delta_path = ckpt_path / DELTA_FILE
+    if delta_path.exists():
+        shutil.copy2(delta_path, sim_dir / DELTA_FILE)
+    else:
+        (sim_dir / DELTA_FILE).unlink(missing_ok=True)
     events_path = ckpt_path / "events.jsonl"
     if events_path.exists():
         shutil.copy2(events_path, sim_dir / "events.jsonl")
@@ -7,6 +7,7 @@ from __future__ import annotations
 import argparse
 import shutil
 import sys
+import tempfile
 from pathlib import Path
 from typing import Any, Dict, List, Set, Optional
 
@@ -20,18 +21,10 @@ from src.simulation.engine import SimulationEngine
 
 
 def _advance_until_idle(engine: SimulationEngine) -> Optional[str]:
-    while engine.scheduler.event_queue:
-        next_event = engine.scheduler.event_queue.peek()
-        if not next_event:
-            break
-        delta = next_event.time - engine.scheduler.current_time
-        if delta <= 0:
-            # Guard against zero/negative jumps
-            delta = 0.0
-        try:
-            engine.advance_time(delta)
-        except Exception as exc:
-            return str(exc)
+    try:
+        engine.run_until_idle()
+    except Exception as exc:
+        return str(exc)
     return None
 
 
@@ -164,14 +157,38 @@ def execute_plan(
     reset: bool = False,
     dry_run: bool = False,
     trace: bool = False,
+    kb: Optional[KBLoader] = None,
+    persist: bool = True,
 ) -> Dict[str, Any]:
-    kb = KBLoader(kb_root, use_validated_models=False)
-    kb.load_all()
+    """
+    Execute plan in a simulation and report the target's ISRU.
+
+    kb reuses an already-loaded KB instead of loading kb_root. With
+    persist=False the plan runs in a fresh scratch simulation that is
+    discarded afterwards, leaving sim_root untouched.
+    """
+    if kb is None:
+        kb = KBLoader(kb_root, use_validated_models=False)
+        kb.load_all()
+
+    if not persist:
+        with tempfile.TemporaryDirectory(prefix="simplan_") as scratch_root:
+            return _execute_plan(plan, kb, Path(scratch_root) / plan.sim_id, dry_run, trace, persist)
 
     sim_dir = sim_root / plan.sim_id
     if reset and sim_dir.exists():
         shutil.rmtree(sim_dir)
+    return _execute_plan(plan, kb, sim_dir, dry_run, trace, persist)
+
 
+def _execute_plan(
+    plan: SimPlan,
+    kb: KBLoader,
+    sim_dir: Path,
+    dry_run: bool,
+    trace: bool,
+    persist: bool,
+) -> Dict[str, Any]:
     engine = SimulationEngine(plan.sim_id, kb, sim_dir)
     if sim_dir.exists() and (sim_dir / "snapshot.json").exists():
         engine.load()
@@ -291,7 +308,8 @@ def execute_plan(
             return {"success": False, "error": "missing_target_output", "detail": verify_error}
 
     if not dry_run:
-        engine.save()
+        if persist:
+            engine.save()
         isru = _get_item_isru(engine, plan.target_machine_id)
         return {"success": True, "isru": isru}
 
@@ -23,17 +23,10 @@ from src.simulation.engine import SimulationEngine
 
 
 def _advance_until_idle(engine: SimulationEngine) -> Optional[str]:
-    while engine.scheduler.event_queue:
-        next_event = engine.scheduler.event_queue.peek()
-        if not next_event:
-            break
-        delta = next_event.time - engine.scheduler.current_time
-        if delta <= 0:
-            delta = 0.0
-        try:
-            engine.advance_time(delta)
-        except Exception as exc:
-            return str(exc)
+    try:
+        engine.run_until_idle()
+    except Exception as exc:
+        return str(exc)
     return None
 
 
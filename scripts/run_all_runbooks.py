@@ -1,20 +1,30 @@
 #!/usr/bin/env python3
+import argparse
+import contextlib
+import io
+import multiprocessing
 import os
 import re
-import subprocess
+import shutil
 import sys
+import tempfile
+import time
 from pathlib import Path
 
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.kb_core.kb_loader import KBLoader
+from src.simulation import cli as sim_cli
+
 QUEUE_PATH = ROOT / "runbooks" / "machine_runbook_queue_sequential.md"
 RUNBOOKS_DIR = ROOT / "runbooks"
-RUNBOOK_CMD = [
-    str(ROOT / ".venv" / "bin" / "python"),
-    str(ROOT / "scripts" / "debug" / "run_runbook_debug.py"),
-    "sim",
-    "runbook",
-]
+SIMULATIONS_DIR = ROOT / "simulations"
+
+# Loaded once in the parent; forked workers inherit it
+_KB = None
 
 
 def load_queue_rows():
@@ -38,18 +48,57 @@ def load_queue_rows():
     return rows, runbook_map
 
 
-def run_runbook(runbook_path):
-    cmd = RUNBOOK_CMD + ["--file", str(RUNBOOKS_DIR / runbook_path)]
-    env = os.environ.copy()
-    env["PYTHONPATH"] = str(ROOT)
-    result = subprocess.run(cmd, cwd=str(ROOT), capture_output=True, text=True, env=env)
-    if result.returncode == 0:
-        return True, ""
-    combined = (result.stderr or "") + "\n" + (result.stdout or "")
-    lines = [ln.strip() for ln in combined.splitlines() if ln.strip()]
+def run_runbook(runbook_path, sim_root, defer_saves=False):
+    """Run one runbook in this process with its simulations under sim_root."""
+    sim_cli.SIMULATIONS_DIR = Path(sim_root)
+    cmd = ["sim", "runbook", "--file", str(RUNBOOKS_DIR / runbook_path)]
+    if defer_saves:
+        cmd.append("--defer-saves")
+    parser = argparse.ArgumentParser()
+    sim_cli.add_sim_subcommands(parser.add_subparsers(dest="command"))
+    args = parser.parse_args(cmd)
+
+    output = io.StringIO()
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            code = sim_cli.run_sim_command(args, _KB)
+    except SystemExit as e:
+        # cli handlers exit through sys.exit(); report it as the old
+        # per-runbook subprocess did instead of killing the pool worker
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            output.write(f"{e.code}\n")
+            code = 1
+    except Exception as e:
+        output.write(f"Error: {e}\n")
+        code = 1
+    elapsed = time.monotonic() - started
+    if code == 0:
+        return True, "", elapsed
+    lines = [ln.strip() for ln in output.getvalue().splitlines() if ln.strip()]
     last_line = lines[-1] if lines else "unknown error"
     last_line = re.sub(r"\s+", " ", last_line)
-    return False, last_line[:140]
+    return False, last_line[:140], elapsed
+
+
+def _run_job(job):
+    runbook_path, sim_root, defer_saves = job
+    return (runbook_path, *run_runbook(runbook_path, sim_root, defer_saves))
+
+
+def publish_sims(sim_root):
+    """Move a runbook's isolated simulations into simulations/."""
+    sim_root = Path(sim_root)
+    if not sim_root.exists():
+        return
+    SIMULATIONS_DIR.mkdir(parents=True, exist_ok=True)
+    for sim_dir in sim_root.iterdir():
+        target = SIMULATIONS_DIR / sim_dir.name
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.move(str(sim_dir), str(target))
 
 
 def update_queue(rows, runbook_map, failures):
@@ -68,22 +117,57 @@ def update_queue(rows, runbook_map, failures):
 
 
 def main():
+    global _KB
+
+    parser = argparse.ArgumentParser(description="Run every runbook in the machine queue.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Runbooks to run in parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--defer-saves",
+        action="store_true",
+        help="Pass --defer-saves to each runbook",
+    )
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
     rows, runbook_map = load_queue_rows()
     if not runbook_map:
         print("No runbooks found in queue.")
         return 1
+
+    print("Loading KB...", flush=True)
+    _KB = KBLoader(Path("kb"), use_validated_models=False, disk_cache=True)
+    _KB.preload()
+
     failures = {}
-    for runbook_path in sorted(runbook_map.keys()):
-        ok, err = run_runbook(runbook_path)
-        status = "ok" if ok else "failed"
-        print(f"{runbook_path}: {status}")
-        if not ok:
-            failures[runbook_path] = err
+    started = time.monotonic()
+    # Runbooks never share a sim directory: each writes under its own
+    # scratch root, published to simulations/ when it finishes
+    with tempfile.TemporaryDirectory(prefix="runbooks_", dir=ROOT) as scratch:
+        jobs = [
+            (runbook_path, Path(scratch) / str(n), args.defer_saves)
+            for n, runbook_path in enumerate(sorted(runbook_map.keys()))
+        ]
+        sim_roots = {runbook_path: sim_root for runbook_path, sim_root, _ in jobs}
+        # One fresh fork per runbook so cli module state never carries over
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(processes=max(1, args.workers), maxtasksperchild=1) as pool:
+            for runbook_path, ok, err, elapsed in pool.imap_unordered(_run_job, jobs):
+                publish_sims(sim_roots[runbook_path])
+                status = "ok" if ok else "failed"
+                print(f"{runbook_path}: {status} ({elapsed:.1f}s)", flush=True)
+                if not ok:
+                    failures[runbook_path] = err
     update_queue(rows, runbook_map, failures)
+    print(f"\nRan {len(runbook_map)} runbooks in {time.monotonic() - started:.1f}s")
     if failures:
         print("\nFailures:")
-        for runbook_path, err in failures.items():
-            print(f"- {runbook_path}: {err}")
+        for runbook_path in sorted(failures):
+            print(f"- {runbook_path}: {failures[runbook_path]}")
     return 0
 
 
@@ -9,6 +9,7 @@ Provides commands for:
 
 Usage:
     python -m src.cli index
+    python -m src.cli index --serve
     python -m src.cli auto-fix --dry-run
     python -m src.cli validate --id process:crushing_v0
     python -m src.cli queue lease --agent codex
@@ -65,6 +66,34 @@ def main():
         default=Path('out'),
         help='Output directory (default: out)'
     )
+    index_parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Parallel parse processes (default: 1; 0 = one per CPU core)'
+    )
+    index_parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Reuse results for unchanged KB files from the previous incremental run'
+    )
+    index_parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run as a resident index service for queue workers (see src/indexer/index_service.py)'
+    )
+    index_parser.add_argument(
+        '--socket',
+        type=Path,
+        default=Path('out/indexer.sock'),
+        help='Unix socket of the index service (default: out/indexer.sock)'
+    )
+    index_parser.add_argument(
+        '--poll-sec',
+        type=float,
+        default=1.0,
+        help='With --serve: re-index after kb/ changes, polling this often (default: 1.0; 0 = only on request)'
+    )
 
     # =========================================================================
     # AUTO-FIX command
@@ -206,6 +235,10 @@ def main():
     add_parser.add_argument('--context', help='JSON context string')
     add_parser.add_argument('--file', help='JSONL file with gap items to add (alternative to --gap-type)')
     queue_sub.add_parser('gap-types', help='List registered gap types')
+    import_parser = queue_sub.add_parser('import', help='Load a JSONL queue into the SQLite queue (WORK_QUEUE_BACKEND=sqlite)')
+    import_parser.add_argument('--file', default='out/work_queue.jsonl', help='JSONL queue file')
+    export_parser = queue_sub.add_parser('export', help='Write the SQLite queue to JSONL (WORK_QUEUE_BACKEND=sqlite)')
+    export_parser.add_argument('--file', default='out/work_queue.jsonl', help='JSONL queue file')
 
     # Parse arguments
     args = parser.parse_args()
@@ -217,8 +250,11 @@ def main():
     # Dispatch to appropriate command
     try:
         if args.command == 'index':
+            if args.serve:
+                from src.indexer.index_service import serve
+                return serve(args.socket, workers=args.workers, poll_sec=args.poll_sec)
             from src.indexer.indexer import main as index_main
-            return index_main()
+            return index_main(workers=args.workers, incremental=args.incremental)
 
         elif args.command == 'auto-fix':
             from src.indexer.auto_fix import main as autofix_main
@@ -250,9 +286,12 @@ def main():
             from src.simulation.cli import run_sim_command
             from src.kb_core.kb_loader import KBLoader
             print("Loading KB...", flush=True)
-            kb_loader = KBLoader(Path('kb'), use_validated_models=False)
+            kb_loader = KBLoader(Path('kb'), use_validated_models=False, disk_cache=True)
             print("KB loader ready.", flush=True)
-            return run_sim_command(args, kb_loader)
+            try:
+                return run_sim_command(args, kb_loader)
+            finally:
+                kb_loader.save_disk_cache()
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -399,32 +438,22 @@ def analyze_closure(args):
 
     # Load KB
     print("Loading knowledge base...", file=sys.stderr)
-    kb_loader = KBLoader(args.kb_root, use_validated_models=False)
+    kb_loader = KBLoader(args.kb_root, use_validated_models=False, disk_cache=True)
     kb_loader.load_all()
     print(f"Loaded {len(kb_loader.items)} items, {len(kb_loader.boms)} BOMs, "
           f"{len(kb_loader.recipes)} recipes", file=sys.stderr)
 
     analyzer = ClosureAnalyzer(kb_loader)
 
-    # Determine which machines to analyze
-    machines_to_analyze = []
-
+    # Determine which machines to analyze (all machines with BOMs for --all)
     if args.machine:
-        machines_to_analyze.append(args.machine)
-    elif args.all:
-        # Get all machines with BOMs
-        machines_to_analyze = [
-            item_id for item_id, item_model in kb_loader.items.items()
-            if hasattr(item_model, 'kind') and item_model.kind == 'machine'
-            and hasattr(item_model, 'bom') and item_model.bom
-        ]
+        machines_to_analyze = [args.machine]
+    else:
+        machines_to_analyze = analyzer.machine_ids()
 
     # Analyze machines
-    results = []
-    for machine_id in machines_to_analyze:
-        print(f"Analyzing {machine_id}...", file=sys.stderr)
-        result = analyzer.analyze_machine(machine_id)
-        results.append(result)
+    print(f"Analyzing {len(machines_to_analyze)} machine(s)...", file=sys.stderr)
+    results = list(analyzer.analyze_all(machines_to_analyze).values())
 
     # Format output
     output_lines = []
@@ -598,6 +627,22 @@ def run_queue_command(args):
                 print(f"  {gap_type:25s} - {desc} (used {usage} times)")
         return 0
 
+    if cmd == 'import':
+        try:
+            count = queue_manager.import_queue(Path(args.file))
+        except ValueError as e:
+            raise SystemExit(f"Error: {e}")
+        print(f"Imported {count} items from {args.file}")
+        return 0
+
+    if cmd == 'export':
+        try:
+            count = queue_manager.export_queue(Path(args.file))
+        except ValueError as e:
+            raise SystemExit(f"Error: {e}")
+        print(f"Exported {count} items to {args.file}")
+        return 0
+
     raise SystemExit("Unknown queue subcommand")
 
 
@@ -9,7 +9,7 @@ Ported to use src.kb_core infrastructure with Pydantic models.
 
 import sys
 from pathlib import Path
-from typing import Dict, Set, List, Tuple, Optional, Any
+from typing import Dict, Set, List, Tuple, Optional, Any, Iterable
 
 from src.kb_core.kb_loader import KBLoader
 
@@ -19,8 +19,35 @@ class ClosureAnalyzer:
 
     def __init__(self, kb_loader: KBLoader):
         self.kb = kb_loader
-        # Track what we've already expanded to avoid infinite loops
-        self.expansion_cache = {}
+        # Per-unit expansions keyed by (item_id, unit), shared across machines.
+        # Valid for the KB as loaded; create a new analyzer after KB changes.
+        self.expansion_cache: Dict[Tuple[str, str], Dict] = {}
+
+    def machine_ids(self) -> List[str]:
+        """IDs of all machines that reference a BOM, in KB order."""
+        return [
+            item_id for item_id, item_model in self.kb.items.items()
+            if getattr(item_model, 'kind', None) == 'machine'
+            and getattr(item_model, 'bom', None)
+        ]
+
+    def analyze_all(self, machine_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        Analyze closure for many machines in one pass.
+
+        Every (item, unit) expansion is solved once and shared by all machines,
+        so the pass is linear in the number of distinct items. Each result is
+        identical to analyze_machine() for that machine.
+
+        Args:
+            machine_ids: Machines to analyze (default: all machines with a BOM)
+
+        Returns:
+            Dict of machine_id -> analyze_machine() result
+        """
+        if machine_ids is None:
+            machine_ids = self.machine_ids()
+        return {machine_id: self.analyze_machine(machine_id) for machine_id in machine_ids}
 
     def analyze_machine(self, machine_id: str) -> Dict:
         """
@@ -42,9 +69,6 @@ class ClosureAnalyzer:
                 - unresolved_percent: float (0-100)
                 - errors: list of error messages
         """
-        # Clear cache for each machine analysis
-        self.expansion_cache = {}
-
         result = {
             'machine_id': machine_id,
             'machine_name': '',
@@ -117,6 +141,9 @@ class ClosureAnalyzer:
                 result['errors']
             )
 
+        # Shared subassemblies report the same errors once per occurrence
+        result['errors'] = list(dict.fromkeys(result['errors']))
+
         # Calculate totals
         result['isru_mass'] = sum(
             item['mass_kg'] for item in result['raw_materials'].values()
@@ -149,45 +176,74 @@ class ClosureAnalyzer:
         Args:
             expansion_path: Set of item_ids currently being expanded (for cycle detection)
         """
-        # Initialize expansion path for cycle detection
-        if expansion_path is None:
-            expansion_path = set()
+        expansion, _ = self._expand_unit(item_id, unit, expansion_path or set())
+        self._add_scaled(raw_materials, expansion['raw'], qty)
+        self._add_scaled(imported_items, expansion['imported'], qty)
+        self._add_scaled(unresolved_items, expansion['unresolved'], qty)
+        errors.extend(expansion['errors'])
+
+    def _expand_unit(self, item_id: str, unit: str,
+                     expansion_path: Set[str]) -> Tuple[Dict, bool]:
+        """
+        Expand one unit of an item.
 
+        Expansion is linear in quantity, so callers scale the result. Results
+        are cached by (item_id, unit) for the analyzer's lifetime unless the
+        expansion ran into a cycle: a cycle-free expansion cannot depend on
+        which items are already on the expansion path.
+
+        Returns:
+            (expansion, cyclic) where expansion has 'raw', 'imported' and
+            'unresolved' dicts {item_id: {qty, unit, mass_kg}} per unit and an
+            'errors' list; cyclic is True if a circular dependency was hit.
+        """
         # Check for circular dependency
         if item_id in expansion_path:
             # Circular dependency detected - treat second encounter as virtual import for bootstrap
+            expansion = self._new_expansion()
             item_model = self.kb.get_item(item_id)
             item = self._to_dict(item_model) if item_model else None
-            mass_kg = self._calculate_mass(item, qty, unit) if item else 0.0
-            self._accumulate(imported_items, item_id, qty, unit, mass_kg)
-            errors.append(f"Bootstrap import (circular): {item_id} (path: {' -> '.join(expansion_path)} -> {item_id})")
-            return
-
-        # Add to expansion path
-        expansion_path = expansion_path | {item_id}
+            mass_kg = self._calculate_mass(item, 1.0, unit) if item else 0.0
+            self._accumulate(expansion['imported'], item_id, 1.0, unit, mass_kg)
+            expansion['errors'].append(f"Bootstrap import (circular): {item_id} (path: {' -> '.join(expansion_path)} -> {item_id})")
+            return expansion, True
 
         # Check cache to avoid re-expanding the same item
-        cache_key = f"{item_id}:{qty}:{unit}"
-        if cache_key in self.expansion_cache:
-            # Add cached results
-            cached = self.expansion_cache[cache_key]
-            for material_id, data in cached.get('raw', {}).items():
-                self._accumulate(raw_materials, material_id, data['qty'],
-                               data['unit'], data['mass_kg'])
-            for import_id, data in cached.get('imported', {}).items():
-                self._accumulate(imported_items, import_id, data['qty'],
-                               data['unit'], data['mass_kg'])
-            for unres_id, data in cached.get('unresolved', {}).items():
-                self._accumulate(unresolved_items, unres_id, data['qty'],
-                               data['unit'], data['mass_kg'])
-            return
-
-        # Initialize cache entry
-        cache_entry = {
-            'raw': {},
-            'imported': {},
-            'unresolved': {}
-        }
+        cache_key = (item_id, unit)
+        cached = self.expansion_cache.get(cache_key)
+        if cached is not None:
+            return cached, False
+
+        expansion = self._new_expansion()
+        cyclic = self._expand_definition(item_id, unit, expansion_path | {item_id}, expansion)
+        expansion['errors'] = list(dict.fromkeys(expansion['errors']))
+        if not cyclic:
+            self.expansion_cache[cache_key] = expansion
+        return expansion, cyclic
+
+    def _expand_definition(self, item_id: str, unit: str,
+                           expansion_path: Set[str], expansion: Dict) -> bool:
+        """
+        Expand one unit of item_id into expansion via its definition.
+
+        Returns:
+            True if any input expansion hit a circular dependency
+        """
+        raw_materials = expansion['raw']
+        imported_items = expansion['imported']
+        unresolved_items = expansion['unresolved']
+        errors = expansion['errors']
+        qty = 1.0
+        cyclic = False
+
+        def expand_input(input_id: str, input_qty: float, input_unit: str) -> None:
+            nonlocal cyclic
+            sub_expansion, sub_cyclic = self._expand_unit(input_id, input_unit, expansion_path)
+            cyclic = cyclic or sub_cyclic
+            self._add_scaled(raw_materials, sub_expansion['raw'], input_qty)
+            self._add_scaled(imported_items, sub_expansion['imported'], input_qty)
+            self._add_scaled(unresolved_items, sub_expansion['unresolved'], input_qty)
+            errors.extend(sub_expansion['errors'])
 
         # Get item definition
         item_model = self.kb.get_item(item_id)
@@ -195,10 +251,8 @@ class ClosureAnalyzer:
             # Item not found - this is an unresolved item
             mass_kg = self._estimate_mass(item_id, qty, unit, None)
             self._accumulate(unresolved_items, item_id, qty, unit, mass_kg)
-            cache_entry['unresolved'][item_id] = {'qty': qty, 'unit': unit, 'mass_kg': mass_kg}
-            self.expansion_cache[cache_key] = cache_entry
             errors.append(f"Item '{item_id}' not found in KB")
-            return
+            return cyclic
 
         # Convert to dict for easier access
         item = self._to_dict(item_model)
@@ -207,14 +261,11 @@ class ClosureAnalyzer:
         if self._is_imported(item_id, item):
             mass_kg = self._calculate_mass(item, qty, unit)
             self._accumulate(imported_items, item_id, qty, unit, mass_kg)
-            cache_entry['imported'][item_id] = {'qty': qty, 'unit': unit, 'mass_kg': mass_kg}
-            self.expansion_cache[cache_key] = cache_entry
-            return
+            return cyclic
 
         # Scrap items are terminal for closure analysis (ignored for raw/import tracking)
         if self._is_scrap(item_id, item):
-            self.expansion_cache[cache_key] = cache_entry
-            return
+            return cyclic
 
         # Check if has recipe
         recipe_id = item.get('recipe')
@@ -224,16 +275,12 @@ class ClosureAnalyzer:
                 # Legitimate raw material
                 mass_kg = self._calculate_mass(item, qty, unit)
                 self._accumulate(raw_materials, item_id, qty, unit, mass_kg)
-                cache_entry['raw'][item_id] = {'qty': qty, 'unit': unit, 'mass_kg': mass_kg}
-                self.expansion_cache[cache_key] = cache_entry
             else:
                 # No recipe and not raw - UNRESOLVED
                 mass_kg = self._calculate_mass(item, qty, unit)
                 self._accumulate(unresolved_items, item_id, qty, unit, mass_kg)
-                cache_entry['unresolved'][item_id] = {'qty': qty, 'unit': unit, 'mass_kg': mass_kg}
-                self.expansion_cache[cache_key] = cache_entry
                 errors.append(f"Item '{item_id}' has no recipe and is not a raw material")
-            return
+            return cyclic
 
         # Get recipe
         recipe_model = self.kb.get_recipe(recipe_id)
@@ -241,10 +288,8 @@ class ClosureAnalyzer:
             # Recipe referenced but not found - unresolved
             mass_kg = self._calculate_mass(item, qty, unit)
             self._accumulate(unresolved_items, item_id, qty, unit, mass_kg)
-            cache_entry['unresolved'][item_id] = {'qty': qty, 'unit': unit, 'mass_kg': mass_kg}
-            self.expansion_cache[cache_key] = cache_entry
             errors.append(f"Recipe '{recipe_id}' not found for item '{item_id}'")
-            return
+            return cyclic
 
         # Convert recipe to dict
         recipe = self._to_dict(recipe_model)
@@ -286,12 +331,7 @@ class ClosureAnalyzer:
                                 scale_factor = qty / output_qty
                             break
 
-                scaled_qty = input_qty * scale_factor
-
-                # Recursively expand (results go directly into the dicts)
-                self._expand_item(input_id, scaled_qty, input_unit,
-                                raw_materials, imported_items, unresolved_items, errors,
-                                expansion_path)
+                expand_input(input_id, input_qty * scale_factor, input_unit)
 
         # SECOND: Check step-level and process-level inputs
         # (only if no recipe-level inputs were found)
@@ -314,12 +354,7 @@ class ClosureAnalyzer:
 
                         # Scale by how much output we need
                         # This assumes 1:1 ratio - in reality we'd need to look at outputs
-                        scaled_qty = input_qty * qty
-
-                        # Recursively expand (results go directly into the dicts)
-                        self._expand_item(input_id, scaled_qty, input_unit,
-                                        raw_materials, imported_items, unresolved_items, errors,
-                                        expansion_path)
+                        expand_input(input_id, input_qty * qty, input_unit)
 
                 # Check for process_id reference (inputs defined in the process)
                 process_id = step.get('process_id')
@@ -347,12 +382,7 @@ class ClosureAnalyzer:
                             # Scale by how much output we need
                             # This is a simplification - ideally we'd look at process outputs
                             # and calculate the scaling factor based on actual yield
-                            scaled_qty = input_qty * qty
-
-                            # Recursively expand (results go directly into the dicts)
-                            self._expand_item(input_id, scaled_qty, input_unit,
-                                            raw_materials, imported_items, unresolved_items, errors,
-                                            expansion_path)
+                            expand_input(input_id, input_qty * qty, input_unit)
                     else:
                         # Process referenced but not found
                         errors.append(f"Process '{process_id}' referenced in recipe '{recipe_id}' not found")
@@ -363,15 +393,23 @@ class ClosureAnalyzer:
                 # Legitimate raw material extraction recipe (mining/boundary)
                 mass_kg = self._calculate_mass(item, qty, unit)
                 self._accumulate(raw_materials, item_id, qty, unit, mass_kg)
-                cache_entry['raw'][item_id] = {'qty': qty, 'unit': unit, 'mass_kg': mass_kg}
             else:
                 # Recipe exists but broken (no inputs) - UNRESOLVED
                 mass_kg = self._calculate_mass(item, qty, unit)
                 self._accumulate(unresolved_items, item_id, qty, unit, mass_kg)
-                cache_entry['unresolved'][item_id] = {'qty': qty, 'unit': unit, 'mass_kg': mass_kg}
                 errors.append(f"Recipe '{recipe_id}' for '{item_id}' has no inputs")
 
-        self.expansion_cache[cache_key] = cache_entry
+        return cyclic
+
+    @staticmethod
+    def _new_expansion() -> Dict:
+        return {'raw': {}, 'imported': {}, 'unresolved': {}, 'errors': []}
+
+    def _add_scaled(self, target_dict: Dict, per_unit: Dict, qty: float):
+        """Accumulate qty times a per-unit expansion dict into target_dict."""
+        for item_id, data in per_unit.items():
+            self._accumulate(target_dict, item_id, data['qty'] * qty,
+                             data['unit'], data['mass_kg'] * qty)
 
     def _is_imported(self, item_id: str, item: Dict) -> bool:
         """
@@ -620,28 +658,18 @@ def main():
     analyzer = ClosureAnalyzer(kb_loader)
 
     # Determine which machines to analyze
-    machines_to_analyze = []
-
     if args.machine:
-        machines_to_analyze.append(args.machine)
+        machines_to_analyze = [args.machine]
     elif args.all:
-        # Get all machines
-        machines_to_analyze = [
-            item_id for item_id, item_model in kb_loader.items.items()
-            if hasattr(item_model, 'kind') and item_model.kind == 'machine'
-            and hasattr(item_model, 'bom') and item_model.bom
-        ]
+        machines_to_analyze = analyzer.machine_ids()
     else:
         parser.print_help()
         print("\nError: Must specify --machine <machine_id> or --all", file=sys.stderr)
         return 1
 
     # Analyze machines
-    results = []
-    for machine_id in machines_to_analyze:
-        print(f"Analyzing {machine_id}...", file=sys.stderr)
-        result = analyzer.analyze_machine(machine_id)
-        results.append(result)
+    print(f"Analyzing {len(machines_to_analyze)} machine(s)...", file=sys.stderr)
+    results = list(analyzer.analyze_all(machines_to_analyze).values())
 
     # Format output
     output_lines = []
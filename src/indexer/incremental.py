@@ -0,0 +1,471 @@
+"""
+Incremental Indexing - Reuse per-entity analysis results between index runs.
+
+The expensive indexer passes (ADR-017/020 validation per process, item and
+recipe, closure analysis per machine) are pure functions of the KB entries
+they look up. IndexState memoizes each result together with the KB lookups
+it performed, recorded through RecordingKB as (namespace, id, version) where
+version is the content hash of the file the entry came from. On the next run
+a result is reused only if every recorded lookup still resolves to the same
+version, so editing one file recomputes just the entities that depend on it.
+
+Results are dropped wholesale when the analysis code, the schema, or the
+global unit/material tables change (see _code_fingerprint).
+
+ResidentIndex carries this state (plus the parsed files and models) from one
+pass to the next inside a long-running process, for the index service.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.kb_core.kb_cache import DEFAULT_CACHE_DIR, KBCache, default_cache_path
+
+STATE_FORMAT_VERSION = 1
+DOCUMENTS_CACHE_PATH = DEFAULT_CACHE_DIR / "index_documents.pickle"
+RESULTS_CACHE_PATH = DEFAULT_CACHE_DIR / "index_results.pickle"
+
+# Modules whose logic determines the memoized results
+_ANALYSIS_MODULES = (
+    "src/indexer/closure_analysis.py",
+    "src/kb_core/validators.py",
+    "src/kb_core/unit_converter.py",
+    "src/kb_core/override_resolver.py",
+    "src/kb_core/calculations.py",
+    "src/kb_core/schema.py",
+    "src/simulation/adr020_validators.py",
+)
+
+# KB files consulted through loader methods other than get_* lookups
+_GLOBAL_KB_FILES = (
+    Path("units") / "units.yaml",
+    Path("materials") / "properties.yaml",
+)
+
+# Dependency signature: ((namespace, id, version), ...)
+Signature = Tuple[Tuple[str, str, Optional[str]], ...]
+
+
+def _code_fingerprint(kb_root: Path) -> str:
+    """Hash of the analysis code and the KB-wide tables it reads."""
+    repo_root = Path(__file__).resolve().parents[2]
+    h = hashlib.sha1()
+    for rel in _ANALYSIS_MODULES:
+        try:
+            h.update((repo_root / rel).read_bytes())
+        except OSError:
+            h.update(b"missing")
+    for rel in _GLOBAL_KB_FILES:
+        try:
+            h.update((kb_root / rel).read_bytes())
+        except OSError:
+            h.update(b"missing")
+    return h.hexdigest()
+
+
+class _RecordingMapping:
+    """Read-only view of a loader dict that records key lookups."""
+
+    def __init__(self, recorder: "RecordingKB", namespace: str, data: Dict[str, Any]):
+        self._recorder = recorder
+        self._namespace = namespace
+        self._data = data
+
+    def get(self, key, default=None):
+        self._recorder._record(self._namespace, key)
+        return self._data.get(key, default)
+
+    def __getitem__(self, key):
+        self._recorder._record(self._namespace, key)
+        return self._data[key]
+
+    def __contains__(self, key) -> bool:
+        self._recorder._record(self._namespace, key)
+        return key in self._data
+
+    def _scan(self):
+        self._recorder.cacheable = False
+        return self._data
+
+    def __iter__(self):
+        return iter(self._scan())
+
+    def __len__(self) -> int:
+        return len(self._scan())
+
+    def keys(self):
+        return self._scan().keys()
+
+    def values(self):
+        return self._scan().values()
+
+    def items(self):
+        return self._scan().items()
+
+
+class RecordingKB:
+    """
+    KBLoader proxy that records every entry a computation looks up.
+
+    get_process/get_recipe/get_item/get_bom and key lookups on the entry
+    dicts are recorded; iterating a whole dict marks the computation as not
+    cacheable. Everything else is delegated to the wrapped loader.
+    """
+
+    def __init__(self, kb_loader):
+        self._kb = kb_loader
+        self.cacheable = True
+        self.lookups: Set[Tuple[str, str]] = set()
+        self.processes = _RecordingMapping(self, "process", kb_loader.processes)
+        self.recipes = _RecordingMapping(self, "recipe", kb_loader.recipes)
+        self.items = _RecordingMapping(self, "item", kb_loader.items)
+        self.boms = _RecordingMapping(self, "bom", kb_loader.boms)
+
+    def _record(self, namespace: str, key) -> None:
+        if isinstance(key, str):
+            self.lookups.add((namespace, key))
+        else:
+            self.cacheable = False
+
+    def get_process(self, process_id: str):
+        self._record("process", process_id)
+        return self._kb.get_process(process_id)
+
+    def get_recipe(self, recipe_id: str):
+        self._record("recipe", recipe_id)
+        return self._kb.get_recipe(recipe_id)
+
+    def get_item(self, item_id: str):
+        self._record("item", item_id)
+        return self._kb.get_item(item_id)
+
+    def get_bom(self, machine_id: str):
+        self._record("bom", machine_id)
+        return self._kb.get_bom(machine_id)
+
+    def __getattr__(self, name: str):
+        return getattr(self._kb, name)
+
+
+class IndexState:
+    """
+    Persistent memo of per-entity index results.
+
+    Usage:
+        state = IndexState(kb_root, kb_loader, documents_cache)
+        errors = state.memoize("closure", machine_id, lambda kb: ...)
+        state.save()
+    """
+
+    def __init__(
+        self,
+        kb_root: Path,
+        kb_loader,
+        documents: Optional[KBCache] = None,
+        path: Path = RESULTS_CACHE_PATH,
+    ):
+        self.kb_root = Path(kb_root)
+        self.kb = kb_loader
+        self.documents = documents
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._fingerprint = _code_fingerprint(self.kb_root)
+        # (kind, key) -> (signature, value)
+        self._results: Dict[Tuple[str, str], Tuple[Signature, Any]] = {}
+        # Keys memoized during this run; the rest are pruned on save()
+        self._seen: Set[Tuple[str, str]] = set()
+        # (namespace, id) -> version, resolved at most once per run
+        self._versions: Dict[Tuple[str, str], Optional[str]] = {}
+        self._file_digests: Dict[str, Optional[str]] = {}
+        self._dirty = False
+        self._load()
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def memoize(
+        self,
+        kind: str,
+        key: str,
+        compute: Callable[[Any], Any],
+        depends_on: Iterable[Tuple[str, str]] = (),
+    ) -> Any:
+        """
+        Return compute(kb) for (kind, key), reusing the stored result when
+        none of its recorded lookups (plus depends_on) changed version.
+
+        compute receives a RecordingKB and must only reach the KB through it.
+        """
+        cache_key = (kind, key)
+        self._seen.add(cache_key)
+        stored = self._results.get(cache_key)
+        if stored is not None and self._is_current(stored[0]):
+            self.hits += 1
+            return pickle.loads(stored[1])
+
+        self.misses += 1
+        recorder = RecordingKB(self.kb)
+        value = compute(recorder)
+        if recorder.cacheable:
+            lookups = set(recorder.lookups)
+            lookups.update(depends_on)
+            signature = tuple(
+                (namespace, entry_id, self._version(namespace, entry_id))
+                for namespace, entry_id in sorted(lookups)
+            )
+            try:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                self._results.pop(cache_key, None)
+            else:
+                self._results[cache_key] = (signature, blob)
+            self._dirty = True
+        return value
+
+    def save(self) -> None:
+        """Write the results to disk (atomically), dropping unused entries."""
+        stale = set(self._results) - self._seen
+        if stale:
+            for cache_key in stale:
+                del self._results[cache_key]
+            self._dirty = True
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(
+                {"header": self._header(), "results": self._results},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def refresh(self, kb_loader, changed_ids: Set[str], changed_files: Set[str]) -> None:
+        """
+        Start another run on the same results with a reloaded kb_loader.
+
+        For long-running callers: versions resolved in earlier runs are kept,
+        except for the ids in changed_ids and entries defined in changed_files
+        (defined_in paths), so unchanged results are not re-verified from disk.
+        """
+        self.kb = kb_loader
+        self.hits = 0
+        self.misses = 0
+        self._seen = set()
+        fingerprint = _code_fingerprint(self.kb_root)
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._results = {}
+            self._versions = {}
+            self._file_digests = {}
+            self._dirty = True
+            return
+        for defined_in in changed_files:
+            self._file_digests.pop(defined_in, None)
+        prefixes = tuple(f"{defined_in}:" for defined_in in changed_files)
+        self._versions = {
+            key: version for key, version in self._versions.items()
+            if key[1] not in changed_ids and not (version and version.startswith(prefixes))
+        }
+
+    def clear(self) -> None:
+        """Drop all results and remove the state file."""
+        self._results = {}
+        self._dirty = False
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    # =========================================================================
+    # Internal Helpers
+    # =========================================================================
+
+    def _header(self) -> dict:
+        return {
+            "format": STATE_FORMAT_VERSION,
+            "fingerprint": self._fingerprint,
+            "kb_root": str(self.kb_root.resolve()),
+        }
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            # Corrupt or incompatible state: start over
+            return
+        if not isinstance(data, dict) or data.get("header") != self._header():
+            return
+        results = data.get("results")
+        if isinstance(results, dict):
+            self._results = results
+
+    def _is_current(self, signature: Signature) -> bool:
+        return all(
+            self._version(namespace, entry_id) == version
+            for namespace, entry_id, version in signature
+        )
+
+    def _version(self, namespace: str, entry_id: str) -> Optional[str]:
+        """Content hash identifying what a lookup resolves to (None = absent)."""
+        key = (namespace, entry_id)
+        if key not in self._versions:
+            value = self._lookup(namespace, entry_id)
+            if value is None:
+                version = None
+            elif getattr(value, "defined_in", None):
+                version = self._file_digest(value.defined_in)
+            else:
+                version = hashlib.sha1(
+                    pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                ).hexdigest()
+            self._versions[key] = version
+        return self._versions[key]
+
+    def _lookup(self, namespace: str, entry_id: str) -> Any:
+        if namespace == "process":
+            return self.kb.get_process(entry_id)
+        if namespace == "recipe":
+            return self.kb.get_recipe(entry_id)
+        if namespace == "item":
+            return self.kb.get_item(entry_id)
+        if namespace == "bom":
+            return self.kb.get_bom(entry_id)
+        raise ValueError(f"Unknown namespace: {namespace}")
+
+    def _file_digest(self, defined_in: str) -> Optional[str]:
+        """Digest of a file given its defined_in path (relative to the KB's parent)."""
+        if defined_in not in self._file_digests:
+            path = self.kb_root.parent / defined_in
+            digest = None
+            if self.documents is not None:
+                # Every KB file went through the documents cache this run
+                digest = self.documents.digest(path, "document")
+            if digest is None:
+                digest = KBCache._digest(path)
+            # Include the path so moving an entry between files invalidates it
+            self._file_digests[defined_in] = f"{defined_in}:{digest}"
+        return self._file_digests[defined_in]
+
+
+def _entry_ids(path: Path, data: dict) -> Set[str]:
+    """Ids a KB file can answer lookups for (declared id, filename, BOM owner)."""
+    ids = {path.stem}
+    for key in ("id", "owner_item_id"):
+        value = data.get(key)
+        if isinstance(value, str):
+            ids.add(value)
+            if key == "id" and value.startswith("bom_"):
+                ids.add(value[4:])
+    return ids
+
+
+def _dependency_key(data: dict) -> tuple:
+    """What a KB file contributes to item dependencies (see KBGraph.item_dependency_map)."""
+    def ids(entries: Any) -> list:
+        if not isinstance(entries, list):
+            return [entries]
+        return [entry.get("item_id") if isinstance(entry, dict) else entry for entry in entries]
+
+    steps = data.get("steps")
+    if isinstance(steps, list):
+        steps = [
+            (step.get("process_id"), ids(step.get("inputs"))) if isinstance(step, dict) else step
+            for step in steps
+        ]
+    return (data.get("id"), data.get("recipe"), steps, ids(data.get("inputs")))
+
+
+class ResidentIndex:
+    """
+    Index inputs kept in memory between passes of a long-running indexer.
+
+    Holds the parsed KB files and loader models (resident KBCaches, so
+    unchanged files are neither re-parsed nor unpickled), the IndexState
+    and the last circular dependency loops. Each pass reports which files
+    changed; only their entries' results are re-verified, and the loops
+    are reused unless a change touched item dependencies.
+
+    Usage:
+        resident = ResidentIndex(kb_root)
+        indexer._build_index(resident=resident)   # repeatedly
+        resident.save()                           # persist the caches
+    """
+
+    def __init__(self, kb_root: Path):
+        self.kb_root = Path(kb_root)
+        self.documents_cache = KBCache(
+            DOCUMENTS_CACHE_PATH, self.kb_root, namespace="index_documents", resident=True
+        )
+        self.loader_cache = KBCache(
+            default_cache_path(self.kb_root), self.kb_root, namespace="raw", resident=True
+        )
+        self.state: Optional[IndexState] = None
+        self._documents: Dict[Path, dict] = {}
+        self._loops: Optional[List[List[str]]] = None
+        # (ids, defined_in paths) of the files changed in the current pass
+        self._changed: Tuple[Set[str], Set[str]] = (set(), set())
+        # Output path -> value last written there
+        self._written: Dict[Path, Any] = {}
+
+    def begin(self, documents: Dict[Path, dict]) -> Set[Path]:
+        """Record this pass's documents; returns the files changed since the last pass."""
+        previous, self._documents = self._documents, documents
+        changed = {
+            path for path in previous.keys() | documents.keys()
+            if previous.get(path) is not documents.get(path)
+        }
+        if set(previous) != set(documents) or any(
+            _dependency_key(previous[path]) != _dependency_key(documents[path]) for path in changed
+        ):
+            self._loops = None
+        changed_ids: Set[str] = set()
+        for path in changed:
+            for data in (previous.get(path), documents.get(path)):
+                if data is not None:
+                    changed_ids |= _entry_ids(path, data)
+        self._changed = (changed_ids, {str(path.relative_to(self.kb_root.parent)) for path in changed})
+        return changed
+
+    def index_state(self, kb_loader) -> IndexState:
+        """IndexState for this pass, carried over from the last one."""
+        if self.state is None:
+            self.state = IndexState(self.kb_root, kb_loader, self.documents_cache)
+        else:
+            self.state.refresh(kb_loader, *self._changed)
+        return self.state
+
+    def circular_loops(self, compute: Callable[[], List[List[str]]]) -> List[List[str]]:
+        """Loops from the last pass if no item dependency changed, else compute()."""
+        if self._loops is None:
+            self._loops = compute()
+        return self._loops
+
+    def unchanged(self, path: Path, value: Any) -> bool:
+        """True if the last pass wrote value to path (still present); records value otherwise."""
+        if path in self._written and self._written[path] == value and path.exists():
+            return True
+        self._written[path] = value
+        return False
+
+    def save(self) -> None:
+        """Persist the caches for later indexer runs."""
+        self.documents_cache.save()
+        self.loader_cache.save()
+        if self.state is not None:
+            self.state.save()
+
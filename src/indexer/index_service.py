@@ -0,0 +1,302 @@
+"""
+Index Service - Resident indexer for queue workers.
+
+Queue workers validate every KB edit by running `python -m src.cli index
+--incremental` in a subprocess and then scanning out/work_queue.jsonl for
+their gap, paying interpreter startup, imports and a full index pass each
+time. IndexService keeps one indexer process alive behind a Unix socket
+(out/indexer.sock by default):
+
+- index: re-index incrementally if any KB file (or queue filter config)
+  changed since the last pass; otherwise only merge the last pass's gaps
+  into the current work queue. The response carries the indexer's exit code
+  and output, as the subprocess would have produced them. Parsed files,
+  models and per-entity results stay in memory between passes (see
+  incremental.ResidentIndex), so a pass after an edit re-parses only the
+  changed files and recomputes only the results that depend on them.
+- gap_resolved: answered from an in-memory set of work queue ids. Each
+  index request refreshes the set from the queue it just wrote; the queue
+  file is only re-read when someone else rewrote it since.
+
+A watcher thread polls kb/ and re-indexes in the background once changes
+settle, so the next index request usually finds the work already done.
+Changes are detected by a stat scan (mtime and size of every file), which
+needs no extra dependencies. The service runs the code it was started with:
+restart it after changing indexer code.
+
+Start it with `python -m src.cli index --serve`. Clients use request(),
+which returns None when no service is listening (or it does not answer
+within the timeout) so callers can fall back to running the indexer
+themselves.
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+from src.indexer.incremental import ResidentIndex
+
+DEFAULT_SOCKET = Path("out") / "indexer.sock"
+WORK_QUEUE = Path("out") / "work_queue.jsonl"
+
+# Client timeouts: a full re-index can take minutes, a gap query should not
+INDEX_TIMEOUT_SEC = 300.0
+QUERY_TIMEOUT_SEC = 10.0
+
+# Files outside kb/ that change the gap list (see QueueFilterConfig)
+_CONFIG_FILES = (Path("config") / "queue_filters.yaml", Path(".kbconfig.yaml"))
+
+# Snapshot of watched files: path -> (mtime_ns, size)
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def _snapshot(kb_root: Path) -> Snapshot:
+    snapshot: Snapshot = {}
+    for dirpath, _, filenames in os.walk(kb_root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+    for path in _CONFIG_FILES:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[str(path)] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def _queue_key() -> Optional[Tuple[int, int, int]]:
+    try:
+        st = WORK_QUEUE.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class IndexService:
+    """
+    In-process indexer state shared by all clients of one service.
+
+    Usage:
+        service = IndexService()
+        result = service.index()   # {"returncode", "stdout", "stderr", ...}
+        service.gap_resolved("no_recipe:foo")
+    """
+
+    def __init__(self, kb_root: Path = Path("kb"), workers: Optional[int] = 1):
+        self.kb_root = Path(kb_root)
+        self.workers = workers
+        # Snapshot and gaps of the last successful index pass
+        self._indexed: Optional[Snapshot] = None
+        self._gap_items = None
+        self._last_output = ("", "")
+        # Snapshot of the last index pass, successful or not
+        self._attempted: Optional[Snapshot] = None
+        self._index_lock = threading.Lock()
+        self._resident = ResidentIndex(self.kb_root)
+        # Ids in the work queue file, keyed by the file's stat
+        self._queue_key = None
+        self._queue_ids: Optional[Set[str]] = None
+        self._queue_lock = threading.Lock()
+
+    def index(self) -> Dict[str, Any]:
+        """Bring the index and work queue up to date with kb/."""
+        from src.indexer import indexer
+
+        with self._index_lock:
+            started = time.monotonic()
+            snapshot = _snapshot(self.kb_root)
+            output = io.StringIO()
+            errors = io.StringIO()
+            reindexed = snapshot != self._indexed or self._gap_items is None
+            gap_items = queue_items = None
+            returncode = 0
+            try:
+                with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+                    if reindexed:
+                        entries, gap_items, queue_items = indexer._build_index(
+                            self.workers, incremental=True, resident=self._resident
+                        )
+                        print(f"Indexed {len(entries)} entries into {indexer.OUT_DIR / 'index.json'}")
+                    else:
+                        # KB unchanged: only queue state (leases, done gaps) can differ
+                        queue_items = indexer._merge_work_queue(self._gap_items)
+            except SystemExit as exc:
+                returncode = exc.code if isinstance(exc.code, int) else 1
+            except Exception:
+                errors.write(traceback.format_exc())
+                returncode = 1
+
+            if queue_items is not None:
+                # The queue file is the one just written: no need to re-read it
+                with self._queue_lock:
+                    self._queue_key = _queue_key()
+                    self._queue_ids = {obj.get("id") for obj in queue_items}
+
+            if reindexed:
+                self._attempted = snapshot
+                self._last_output = (output.getvalue(), errors.getvalue())
+                if returncode == 0:
+                    self._indexed, self._gap_items = snapshot, gap_items
+                else:
+                    self._indexed, self._gap_items = None, None
+                    # A pass that stopped halfway may leave the resident state inconsistent
+                    self._resident = ResidentIndex(self.kb_root)
+                stdout, stderr = self._last_output
+            else:
+                stdout = self._last_output[0]
+                stderr = self._last_output[1] + errors.getvalue()
+            return {
+                "returncode": returncode,
+                "stdout": stdout,
+                "stderr": stderr,
+                "reindexed": reindexed,
+                "elapsed_sec": time.monotonic() - started,
+            }
+
+    def save(self) -> None:
+        """Write the in-memory caches to disk for indexer runs outside the service."""
+        with self._index_lock:
+            try:
+                self._resident.save()
+            except OSError as exc:
+                print(f"Warning: failed to save incremental index state ({exc})")
+
+    def gap_resolved(self, gap_id: str) -> bool:
+        """Same answer as scanning the work queue file for gap_id."""
+        with self._queue_lock:
+            key = _queue_key()
+            if key is None:
+                return False
+            if key != self._queue_key:
+                # Rewritten outside index() (queue commands, agents, indexer runs)
+                ids: Set[str] = set()
+                with WORK_QUEUE.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            ids.add(json.loads(line).get("id"))
+                        except (json.JSONDecodeError, AttributeError):
+                            continue
+                self._queue_key, self._queue_ids = key, ids
+            return gap_id not in self._queue_ids
+
+    def watch(self, stop: threading.Event, poll_sec: float = 1.0) -> None:
+        """Re-index whenever kb/ changed and then stayed unchanged for poll_sec."""
+        previous = None
+        while not stop.wait(poll_sec):
+            snapshot = _snapshot(self.kb_root)
+            if snapshot != self._attempted and snapshot == previous:
+                self.index()
+            previous = snapshot
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One JSON request line in, one JSON response line out."""
+
+    def handle(self) -> None:
+        service: IndexService = self.server.service
+        try:
+            message = json.loads(self.rfile.readline())
+            op = message.get("op")
+            if op == "index":
+                response = service.index()
+            elif op == "gap_resolved":
+                response = {"resolved": service.gap_resolved(str(message.get("id")))}
+            elif op == "ping":
+                response = {"ok": True, "pid": os.getpid()}
+            elif op == "shutdown":
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                response = {"ok": True}
+            else:
+                response = {"error": f"Unknown op: {op}"}
+        except Exception as exc:
+            response = {"error": str(exc)}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(
+    socket_path: Path = DEFAULT_SOCKET,
+    workers: Optional[int] = 1,
+    poll_sec: float = 1.0,
+) -> int:
+    """
+    Run the index service until interrupted or sent a shutdown request.
+
+    poll_sec: interval of the kb/ watcher (0 = index only on request)
+    """
+    socket_path = Path(socket_path)
+    if request("ping", socket_path=socket_path, timeout=5) is not None:
+        print(f"Index service already running on {socket_path}")
+        return 1
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()  # stale socket of a service that died
+
+    service = IndexService(workers=workers)
+    print("Building initial index...", flush=True)
+    result = service.index()
+    print(f"Initial index done in {result['elapsed_sec']:.1f}s (exit code {result['returncode']})")
+    service.save()
+
+    stop = threading.Event()
+    if poll_sec > 0:
+        threading.Thread(target=service.watch, args=(stop, poll_sec), daemon=True).start()
+    with _Server(str(socket_path), _Handler) as server:
+        server.service = service
+        print(f"Index service listening on {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            with contextlib.suppress(FileNotFoundError):
+                socket_path.unlink()
+            service.save()
+    return 0
+
+
+def request(
+    op: str,
+    socket_path: Path = DEFAULT_SOCKET,
+    timeout: Optional[float] = None,
+    **fields: Any,
+) -> Optional[Dict[str, Any]]:
+    """
+    Send one request to the index service.
+
+    Returns the response, or None if no service is listening (or it went
+    away mid-request), so callers can fall back to running the indexer.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall((json.dumps({"op": op, **fields}) + "\n").encode("utf-8"))
+            with sock.makefile("r", encoding="utf-8") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    response = json.loads(line)
+    if "error" in response:
+        return None
+    return response
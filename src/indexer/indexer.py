@@ -17,6 +17,7 @@ from __future__ import annotations
 
 import json
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
@@ -25,9 +26,11 @@ try:
 except ImportError:  # pragma: no cover
     yaml = None
 
-from src.kb_core.queue_manager import _locked_queue
+from src.kb_core import kb_yaml
+from src.kb_core.kb_cache import KBCache, MISS
+from src.kb_core.queue_manager import rewrite_queue
 from src.kb_core.queue_filter_config import QueueFilterConfig
-from src.kb_core.kb_loader import KBLoader
+from src.kb_core.kb_loader import KBLoader, PARALLEL_MIN_FILES, resolve_workers
 from src.kb_core.validators import (
     validate_process,
     validate_recipe,
@@ -37,6 +40,7 @@ from src.kb_core.validators import (
 )
 from src.kb_core.unit_converter import UnitConverter
 from src.simulation.adr020_validators import validate_process_adr020, validate_recipe_adr020
+from src.indexer.incremental import DOCUMENTS_CACHE_PATH, IndexState, ResidentIndex
 
 KB_ROOT = Path("kb")
 OUT_DIR = Path("out")
@@ -207,8 +211,7 @@ def _collect_missing_fields(kind: str, data: dict) -> List[dict]:
 
 def _load_yaml(path: Path, warnings: List[str]) -> dict:
     try:
-        with path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        data = kb_yaml.load_file(path) or {}
         if not isinstance(data, dict):
             warnings.append(f"{path}: expected mapping at top level; got {type(data).__name__}")
             return {}
@@ -218,19 +221,66 @@ def _load_yaml(path: Path, warnings: List[str]) -> dict:
         return {}
 
 
-def _analyze_recipe_items(kb_files: List[Path], entries: Dict[str, dict], warnings: List[str]) -> List[dict]:
+def _load_document_task(path: Path) -> Tuple[dict, List[str]]:
+    """Pool worker: parse one file, returning its data and any warnings."""
+    file_warnings: List[str] = []
+    return _load_yaml(path, file_warnings), file_warnings
+
+
+def _load_documents(
+    kb_files: List[Path],
+    warnings: List[str],
+    workers: int = 1,
+    cache: Optional[KBCache] = None,
+) -> Dict[Path, dict]:
+    """
+    Parse every KB file exactly once.
+
+    Returns path -> top-level mapping ({} for unparseable files, with a warning
+    recorded). All indexer passes consume this table instead of re-reading files.
+    With workers > 1 files are parsed in a process pool; the table and warnings
+    keep kb_files order either way. With a cache, only files whose content
+    changed since the last run are parsed (files with warnings are never cached).
+    """
+    documents: Dict[Path, dict] = {}
+    pending: List[Path] = []
+    for path in kb_files:
+        if cache is not None:
+            cached = cache.get(path, "document")
+            if cached is not MISS:
+                documents[path] = cached
+                continue
+        pending.append(path)
+
+    def record(path: Path, data: dict, file_warnings: List[str]) -> None:
+        documents[path] = data
+        warnings.extend(file_warnings)
+        if cache is not None and not file_warnings:
+            cache.put(path, "document", data)
+
+    if workers <= 1 or len(pending) < PARALLEL_MIN_FILES:
+        for path in pending:
+            record(path, *_load_document_task(path))
+    else:
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, (data, file_warnings) in zip(
+                pending, pool.map(_load_document_task, pending, chunksize=chunksize)
+            ):
+                record(path, data, file_warnings)
+
+    return {path: documents[path] for path in kb_files}
+
+
+def _analyze_recipe_items(documents: Dict[Path, dict], entries: Dict[str, dict]) -> List[dict]:
     """
     Analyze all recipe items to find missing external inputs and intermediate parts.
     Returns list of missing recipe items with classification and usage context.
     """
-    if yaml is None:
-        return []
-
     # Track item usage across all recipes
     item_usage: Dict[str, dict] = {}  # item_id -> {as_input: [recipes], as_output: [recipes], as_target: [recipes]}
 
-    for path in kb_files:
-        data = _load_yaml(path, warnings)
+    for path, data in documents.items():
         kind = _infer_kind(path, data)
 
         if kind != "recipe":
@@ -322,18 +372,14 @@ def _analyze_recipe_items(kb_files: List[Path], entries: Dict[str, dict], warnin
     return missing_recipe_items
 
 
-def _validate_recipe_inputs(kb_files: List[Path], warnings: List[str]) -> List[dict]:
+def _validate_recipe_inputs(documents: Dict[Path, dict]) -> List[dict]:
     """
     Validate that recipes have inputs defined in their steps.
     Returns list of recipes where ALL steps have no inputs.
     """
-    if yaml is None:
-        return []
-
     recipes_no_inputs: List[dict] = []
 
-    for path in kb_files:
-        data = _load_yaml(path, warnings)
+    for path, data in documents.items():
         kind = _infer_kind(path, data)
 
         if kind != "recipe":
@@ -374,7 +420,32 @@ def _validate_recipe_inputs(kb_files: List[Path], warnings: List[str]) -> List[d
     return recipes_no_inputs
 
 
-def build_index() -> Dict[str, dict]:
+def build_index(workers: Optional[int] = 1, incremental: bool = False) -> Dict[str, dict]:
+    """
+    Index the KB and write all reports and the work queue.
+
+    Args:
+        workers: Processes used to parse KB files (1 = sequential,
+            None/0 = one per CPU core)
+        incremental: Reuse parsed files and per-entity validation/closure
+            results from the previous incremental run (see
+            src/indexer/incremental.py); outputs are identical to a full run
+    """
+    return _build_index(workers, incremental)[0]
+
+
+def _build_index(
+    workers: Optional[int] = 1,
+    incremental: bool = False,
+    resident: Optional[ResidentIndex] = None,
+) -> Tuple[Dict[str, dict], List[dict], List[dict]]:
+    """
+    build_index, also returning the gap items and the work queue they were merged into.
+
+    With resident (implies incremental), parsed files, models and results
+    come from and stay in memory instead of the on-disk caches, and
+    index.json is only rewritten when its entries changed.
+    """
     if yaml is None:
         raise SystemExit("PyYAML is required: pip install pyyaml")
     entries: Dict[str, dict] = {}
@@ -392,8 +463,18 @@ def build_index() -> Dict[str, dict]:
     item_metadata: Dict[str, dict] = {}  # item_id -> metadata from seed requires_ids
     kb_files = sorted(KB_ROOT.glob("**/*.yaml"))
 
-    for path in kb_files:
-        data = _load_yaml(path, warnings)
+    # Single parse of the whole KB, shared by every pass below (and the KBLoader)
+    workers = resolve_workers(workers)
+    documents_cache = None
+    if resident is not None:
+        documents_cache = resident.documents_cache
+    elif incremental:
+        documents_cache = KBCache(DOCUMENTS_CACHE_PATH, KB_ROOT, namespace="index_documents")
+    documents = _load_documents(kb_files, warnings, workers, documents_cache)
+    if resident is not None:
+        resident.begin(documents)
+
+    for path, data in documents.items():
         kind = _infer_kind(path, data)
         entry_id = data.get("id") or path.stem
         if not kind:
@@ -495,19 +576,13 @@ def build_index() -> Dict[str, dict]:
     items_without_recipes: List[dict] = []
     for entry in entries.values():
         if entry["kind"] in ("part", "material", "machine") and entry["id"] not in recipe_targets:
-            # Check if item is marked as import by reading the file
+            # Check if item is marked as import
             is_import = False
             is_scrap = False
             if entry.get("defined_in"):
-                try:
-                    file_path = Path(entry["defined_in"])
-                    if file_path.exists():
-                        with file_path.open("r", encoding="utf-8") as f:
-                            item_data = yaml.safe_load(f) or {}
-                            is_import = item_data.get("is_import", False)
-                            is_scrap = item_data.get("is_scrap", False)
-                except Exception:
-                    pass
+                item_data = documents.get(Path(entry["defined_in"])) or {}
+                is_import = item_data.get("is_import", False)
+                is_scrap = item_data.get("is_scrap", False)
 
             # Skip import or scrap items
             if is_import or is_scrap:
@@ -534,17 +609,18 @@ def build_index() -> Dict[str, dict]:
                 })
 
     # Analyze recipe items to find missing inputs and intermediate parts
-    missing_recipe_items = _analyze_recipe_items(kb_files, entries, warnings)
+    missing_recipe_items = _analyze_recipe_items(documents, entries)
 
     # Validate that recipes have inputs defined
     # DISABLED 2025-12-24: Validation moved to closure analyzer which properly
     # checks recipe-level inputs, step-level inputs, AND process-level inputs.
     # See ADR-006 addendum for details.
-    recipes_no_inputs = []  # _validate_recipe_inputs(kb_files, warnings)
+    recipes_no_inputs = []  # _validate_recipe_inputs(documents)
 
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    with (OUT_DIR / "index.json").open("w", encoding="utf-8") as f:
-        json.dump({"entries": entries}, f, indent=2, sort_keys=True)
+    if resident is None or not resident.unchanged(OUT_DIR / "index.json", entries):
+        with (OUT_DIR / "index.json").open("w", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f, indent=2, sort_keys=True)
 
     with (OUT_DIR / "unresolved_refs.jsonl").open("w", encoding="utf-8") as f:
         for ref in unresolved_refs:
@@ -582,30 +658,51 @@ def build_index() -> Dict[str, dict]:
         for rni in recipes_no_inputs:
             f.write(json.dumps(rni) + "\n")
 
-    # Load KB for circular dependency detection and closure analysis
-    kb_loader = KBLoader(KB_ROOT)
-    kb_loader.load_all()
+    # Load KB for circular dependency detection and closure analysis,
+    # building models from the documents parsed above
+    if resident is not None:
+        kb_loader = KBLoader(KB_ROOT, workers=workers, cache=resident.loader_cache)
+    else:
+        kb_loader = KBLoader(KB_ROOT, disk_cache=True, workers=workers)
+    kb_loader.use_documents({path: data for path, data in documents.items() if data})
+    kb_loader.load_all(save_cache=resident is None)
+
+    state = None
+    if resident is not None:
+        state = resident.index_state(kb_loader)
+    elif incremental:
+        state = IndexState(KB_ROOT, kb_loader, documents_cache)
 
     # Collect closure analysis errors from all machines
     print("Running closure analysis on all machines...")
-    closure_errors = _collect_closure_errors(entries, kb_loader)
+    closure_errors = _collect_closure_errors(entries, kb_loader, state)
     print(f"Found {len(closure_errors)} unique closure errors")
 
     # Collect validation issues (ADR-017)
-    validation_issues = _collect_validation_issues(entries, kb_loader)
-
-    filter_stats = _update_work_queue(
+    validation_issues = _collect_validation_issues(entries, kb_loader, state)
+
+    if state is not None:
+        if resident is None:
+            try:
+                documents_cache.save()
+                state.save()
+            except OSError as exc:
+                print(f"Warning: failed to save incremental index state ({exc})")
+        print(f"Incremental index: reused {state.hits} results, recomputed {state.misses}")
+
+    gap_items, filter_stats = _collect_gap_items(
         unresolved_refs, referenced_only, import_stubs,
         items_without_recipes, missing_fields, orphan_resources, invalid_recipes,
         missing_recipe_items, recipes_no_inputs, seed_references, item_metadata,
-        entries, kb_loader, closure_errors, validation_issues, null_values
+        entries, kb_loader, closure_errors, validation_issues, null_values, resident
     )
+    queue_items = _merge_work_queue(gap_items)
     _write_report(
         entries, warnings, null_values, missing_fields,
         items_without_recipes, orphan_resources, missing_recipe_items, recipes_no_inputs,
         filter_stats, validation_issues
     )
-    return entries
+    return entries, gap_items, queue_items
 
 
 # Added helper for missing recipes (backward-compatible stub to satisfy older indexer paths)
@@ -622,13 +719,18 @@ def _write_missing_recipes(missing_recipes: List[dict], file_path: Optional[Path
         pass
 
 
-def _detect_circular_dependencies(entries: Dict[str, dict], kb_loader) -> List[dict]:
+def _detect_circular_dependencies(
+    entries: Dict[str, dict],
+    kb_loader,
+    resident: Optional[ResidentIndex] = None,
+) -> List[dict]:
     """
     Detect circular dependencies and return queue items.
 
     Args:
         entries: Index entries dict (item_id -> entry data)
         kb_loader: KBLoader instance for dependency analysis
+        resident: Reuses the last pass's loops while item dependencies are unchanged
 
     Returns:
         List of queue items (one per unique normalized loop)
@@ -636,7 +738,10 @@ def _detect_circular_dependencies(entries: Dict[str, dict], kb_loader) -> List[d
     from src.kb_core.dependency_analyzer import CircularDependencyAnalyzer
 
     analyzer = CircularDependencyAnalyzer(kb_loader)
-    queue_items = analyzer.get_work_queue_items(entries)
+    loops = None
+    if resident is not None:
+        loops = resident.circular_loops(analyzer.find_all_circular_dependencies)
+    queue_items = analyzer.get_work_queue_items(entries, loops)
 
     # Write to output file
     circ_dep_path = OUT_DIR / "circular_dependencies.jsonl"
@@ -651,13 +756,25 @@ def _detect_circular_dependencies(entries: Dict[str, dict], kb_loader) -> List[d
     return queue_items
 
 
-def _collect_closure_errors(entries: Dict[str, dict], kb_loader) -> List[dict]:
+def _memoized(state: Optional[IndexState], kind: str, key: str, compute, kb_loader):
+    """Return compute(kb_loader), reusing the previous run's result when incremental."""
+    if state is None:
+        return compute(kb_loader)
+    return state.memoize(kind, key, compute)
+
+
+def _collect_closure_errors(
+    entries: Dict[str, dict],
+    kb_loader,
+    state: Optional[IndexState] = None,
+) -> List[dict]:
     """
     Run closure analysis on all machines and collect errors as queue items.
 
     Args:
         entries: Index entries dict (item_id -> entry data)
         kb_loader: KBLoader instance for closure analysis
+        state: Incremental index state; unchanged machines reuse their errors
 
     Returns:
         List of unique queue items from closure analysis errors
@@ -668,13 +785,17 @@ def _collect_closure_errors(entries: Dict[str, dict], kb_loader) -> List[dict]:
     analyzer = ClosureAnalyzer(kb_loader)
     error_map = {}  # Deduplicate by error signature
 
+    def machine_errors(machine_id: str) -> List[str]:
+        def compute(kb) -> List[str]:
+            machine_analyzer = analyzer if kb is kb_loader else ClosureAnalyzer(kb)
+            return machine_analyzer.analyze_machine(machine_id).get('errors', [])
+        return _memoized(state, "closure", machine_id, compute, kb_loader)
+
     # Get all machine IDs
     machine_ids = [eid for eid, entry in entries.items() if entry.get('kind') == 'machine']
 
     for machine_id in machine_ids:
-        result = analyzer.analyze_machine(machine_id)
-
-        for error in result.get('errors', []):
+        for error in machine_errors(machine_id):
             # Parse error to extract item_id, recipe_id, process_id
             # Create a signature for deduplication
 
@@ -755,43 +876,81 @@ def _collect_closure_errors(entries: Dict[str, dict], kb_loader) -> List[dict]:
     return queue_items
 
 
-def _collect_validation_issues(entries: Dict[str, dict], kb_loader) -> List[dict]:
+def _process_validation_issues(process_id: str, kb) -> list:
+    """ADR-017 and ADR-020 issues (ERROR/WARNING) for one process."""
+    process_data = kb.processes.get(process_id)
+    if not process_data:
+        return []
+    if hasattr(process_data, "model_dump"):
+        process_data = process_data.model_dump()
+
+    # Run ADR-017 validation
+    issues = validate_process(process_data, UnitConverter(kb))
+
+    # Run ADR-020 validation
+    adr020_issues = validate_process_adr020(process_data, kb.items)
+    issues.extend(adr020_issues)
+
+    # Filter to ERROR and WARNING only (skip INFO)
+    return [i for i in issues if i.level in (ValidationLevel.ERROR, ValidationLevel.WARNING)]
+
+
+def _item_validation_issues(item_id: str, kb) -> list:
+    """Item-level issues (ERROR/WARNING) for one item."""
+    item_data = kb.items.get(item_id)
+    if not item_data:
+        return []
+    issues = validate_item(item_data)
+    return [i for i in issues if i.level in (ValidationLevel.ERROR, ValidationLevel.WARNING)]
+
+
+def _recipe_validation_issues(recipe_id: str, kb) -> list:
+    """ADR-017/018 and ADR-020 issues (ERROR/WARNING) for one recipe."""
+    recipe_data = kb.recipes.get(recipe_id)
+    if not recipe_data:
+        return []
+    if hasattr(recipe_data, "model_dump"):
+        recipe_data = recipe_data.model_dump()
+
+    # Run ADR-017/018 validation (pass converter for inputs/outputs validation)
+    issues = validate_recipe(recipe_data, UnitConverter(kb))
+
+    # Run ADR-020 validation
+    adr020_issues = validate_recipe_adr020(recipe_data)
+    issues.extend(adr020_issues)
+
+    # Filter to ERROR and WARNING only (skip INFO)
+    return [i for i in issues if i.level in (ValidationLevel.ERROR, ValidationLevel.WARNING)]
+
+
+def _collect_validation_issues(
+    entries: Dict[str, dict],
+    kb_loader,
+    state: Optional[IndexState] = None,
+) -> List[dict]:
     """
     Run ADR-017 and ADR-020 validation on all processes and recipes.
 
     Args:
         entries: Index entries dict (item_id -> entry data)
         kb_loader: KBLoader instance with loaded KB data
+        state: Incremental index state; unchanged entities reuse their issues
 
     Returns:
         List of validation issue queue items (ERROR and WARNING levels only)
     """
     print("Running ADR-017 and ADR-020 validation on items, processes, and recipes...")
 
-    # Create UnitConverter for validation
-    converter = UnitConverter(kb_loader)
-
     all_issues = []
     issue_map = {}  # Deduplicate by signature
 
     # Validate all processes
     process_ids = [eid for eid, entry in entries.items() if entry.get('kind') == 'process']
     for process_id in process_ids:
-        process_data = kb_loader.processes.get(process_id)
-        if not process_data:
-            continue
-        if hasattr(process_data, "model_dump"):
-            process_data = process_data.model_dump()
-
-        # Run ADR-017 validation
-        issues = validate_process(process_data, converter)
-
-        # Run ADR-020 validation
-        adr020_issues = validate_process_adr020(process_data, kb_loader.items)
-        issues.extend(adr020_issues)
-
-        # Filter to ERROR and WARNING only (skip INFO)
-        issues = [i for i in issues if i.level in (ValidationLevel.ERROR, ValidationLevel.WARNING)]
+        issues = _memoized(
+            state, "process_issues", process_id,
+            lambda kb: _process_validation_issues(process_id, kb), kb_loader,
+        )
 
         for issue in issues:
             # Create unique signature for deduplication
@@ -848,12 +1007,10 @@ def _collect_validation_issues(entries: Dict[str, dict], kb_loader) -> List[dict
         if entry.get('kind') in {"material", "part", "machine"}
     ]
     for item_id in item_ids:
-        item_data = kb_loader.items.get(item_id)
-        if not item_data:
-            continue
-
-        issues = validate_item(item_data)
-        issues = [i for i in issues if i.level in (ValidationLevel.ERROR, ValidationLevel.WARNING)]
+        issues = _memoized(
+            state, "item_issues", item_id,
+            lambda kb: _item_validation_issues(item_id, kb), kb_loader,
+        )
 
         for issue in issues:
             signature = f"{issue.entity_type}:{issue.entity_id}:{issue.rule}:{issue.field_path or ''}"
@@ -938,21 +1095,10 @@ def _collect_validation_issues(entries: Dict[str, dict], kb_loader) -> List[dict
     # Validate all recipes
     recipe_ids = [eid for eid, entry in entries.items() if entry.get('kind') == 'recipe']
     for recipe_id in recipe_ids:
-        recipe_data = kb_loader.recipes.get(recipe_id)
-        if not recipe_data:
-            continue
-        if hasattr(recipe_data, "model_dump"):
-            recipe_data = recipe_data.model_dump()
-
-        # Run ADR-017/018 validation (pass converter for inputs/outputs validation)
-        issues = validate_recipe(recipe_data, converter)
-
-        # Run ADR-020 validation
-        adr020_issues = validate_recipe_adr020(recipe_data)
-        issues.extend(adr020_issues)
-
-        # Filter to ERROR and WARNING only (skip INFO)
-        issues = [i for i in issues if i.level in (ValidationLevel.ERROR, ValidationLevel.WARNING)]
+        issues = _memoized(
+            state, "recipe_issues", recipe_id,
+            lambda kb: _recipe_validation_issues(recipe_id, kb), kb_loader,
+        )
 
         for issue in issues:
             # Create unique signature for deduplication
@@ -1029,7 +1175,7 @@ def _collect_validation_issues(entries: Dict[str, dict], kb_loader) -> List[dict
     return queue_items
 
 
-def _update_work_queue(
+def _collect_gap_items(
     unresolved_refs: List[dict],
     referenced_only: Set[str],
     import_stubs: List[dict],
@@ -1046,9 +1192,12 @@ def _update_work_queue(
     closure_errors: List[dict] = None,
     validation_issues: List[dict] = None,
     null_values: List[dict] = None,
-) -> Dict[str, int]:
+    resident: Optional[ResidentIndex] = None,
+) -> Tuple[List[dict], Dict[str, int]]:
     """
-    Rebuild work queue from current gaps (replaces previous queue).
+    Collect work queue gaps from the index results, after queue filtering.
+
+    Returns (gap_items, filter_stats); _merge_work_queue writes the gaps.
     - unresolved_refs: free-text refs needing definition/resolution
     - referenced_only: ids referenced but not defined
     - import_stubs: recipes with empty steps/import variants needing real routes
@@ -1062,13 +1211,14 @@ def _update_work_queue(
     - item_metadata: item_id -> freeform metadata from seed requires_ids
     - validation_issues: ADR-017 validation errors and warnings
     - null_values: items with null/missing critical fields (mass, etc.)
+    - resident: in-memory state of a long-running indexer (circular loop reuse)
 
     Returns dict of filter statistics.
     """
     gap_items: List[dict] = []
 
     # Detect circular dependencies
-    circular_dependencies = _detect_circular_dependencies(entries, kb_loader)
+    circular_dependencies = _detect_circular_dependencies(entries, kb_loader, resident)
     gap_items.extend(circular_dependencies)
 
     # Add closure analysis errors
@@ -1253,16 +1403,22 @@ def _update_work_queue(
         "current_mode": config.current_mode,
     }
 
-    with _locked_queue():
+    return gap_items, filter_stats
+
+
+def _merge_work_queue(gap_items: List[dict]) -> List[dict]:
+    """
+    Replace the work queue with gap_items, keeping queue state of known gaps.
+    Returns the new queue.
+
+    Existing entries keep their status/lease (done gaps that reappear go back
+    to pending, expired leases are released), leased gaps that disappeared are
+    marked resolved, and manual/agent entries are preserved.
+    """
+    def merge(current: List[dict]) -> List[dict]:
         existing: Dict[str, dict] = {}
-        if WORK_QUEUE.exists():
-            with WORK_QUEUE.open("r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        obj = json.loads(line)
-                        existing[obj.get("id")] = obj
-                    except Exception:
-                        continue
+        for obj in current:
+            existing[obj.get("id")] = obj
 
         merged: List[dict] = []
         now = time.time()
@@ -1271,7 +1427,7 @@ def _update_work_queue(
             if eid in existing:
                 prev = existing[eid]
                 if prev.get("status") == "done":
-                    obj.update({"status": "pending"})
+                    obj = {**obj, "status": "pending"}
                 else:
                     if prev.get("status") == "leased" and prev.get("lease_expires_at", 0) < now:
                         prev["status"] = "pending"
@@ -1298,13 +1454,9 @@ def _update_work_queue(
                 # Only preserve if not already done/superseded
                 if prev.get("status") not in ("done", "superseded"):
                     merged.append(prev)
+        return merged
 
-        WORK_QUEUE.parent.mkdir(parents=True, exist_ok=True)
-        with WORK_QUEUE.open("w", encoding="utf-8") as wf:
-            for obj in merged:
-                wf.write(json.dumps(obj) + "\n")
-
-    return filter_stats
+    return rewrite_queue(merge)
 
 
 def _write_report(
@@ -1532,8 +1684,8 @@ def _write_report(
         f.write("\n".join(lines))
 
 
-def main() -> None:
-    entries = build_index()
+def main(workers: Optional[int] = 1, incremental: bool = False) -> None:
+    entries = build_index(workers=workers, incremental=incremental)
     print(f"Indexed {len(entries)} entries into {OUT_DIR/'index.json'}")
 
 
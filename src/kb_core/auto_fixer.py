@@ -19,6 +19,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 
+from . import kb_yaml
 from .validators import ValidationIssue, ValidationLevel
 
 
@@ -89,8 +90,7 @@ class AutoFixer:
 
         # Load YAML file
         try:
-            with file_path.open('r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = kb_yaml.load_file(file_path)
 
             if not isinstance(data, dict):
                 return FixResult(
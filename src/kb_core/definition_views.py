@@ -0,0 +1,112 @@
+"""
+Read-only definition views for KB models.
+
+The simulation engine reads process, recipe and item definitions as plain
+dicts. Dumping the pydantic model on every lookup rebuilds the whole tree
+each time; DefinitionViews dumps each model once and hands out a frozen
+dict/list tree that callers can read (and isinstance-check as dict/list)
+but not mutate.
+
+Callers that need a working copy take ``deepcopy(view)``, which returns
+ordinary mutable dicts and lists.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only; deepcopy() it to modify")
+
+
+class FrozenDict(dict):
+    """dict that rejects mutation. deepcopy() returns a mutable plain dict."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """list that rejects mutation. deepcopy() returns a mutable plain list."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+    __iadd__ = __imul__ = _readonly
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists to FrozenDict/FrozenList."""
+    if isinstance(value, dict):
+        if isinstance(value, FrozenDict):
+            return value
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        if isinstance(value, FrozenList):
+            return value
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively convert a (possibly frozen) dict/list tree to plain containers."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+class DefinitionViews:
+    """
+    Per-KB cache of frozen definition dicts.
+
+    Views are keyed by model identity, so a model the loader replaces
+    (reload, lazy re-parse) gets a fresh view on its next lookup. Plain dict
+    definitions are frozen on every call and not cached.
+    """
+
+    def __init__(self, kb_loader: Any):
+        self.kb = kb_loader
+        # id(model) -> (model, view); holding the model keeps its id unique
+        self._views: Dict[int, Tuple[Any, FrozenDict]] = {}
+
+    def of(self, defn: Any) -> Optional[FrozenDict]:
+        """View of a model or dict definition (None passes through)."""
+        if defn is None:
+            return None
+        if isinstance(defn, FrozenDict):
+            return defn
+        if hasattr(defn, "model_dump"):
+            entry = self._views.get(id(defn))
+            if entry is not None and entry[0] is defn:
+                return entry[1]
+            view = freeze(defn.model_dump())
+            self._views[id(defn)] = (defn, view)
+            return view
+        return freeze(dict(defn))
+
+    def process(self, process_id: str) -> Optional[FrozenDict]:
+        return self.of(self.kb.get_process(process_id))
+
+    def recipe(self, recipe_id: str) -> Optional[FrozenDict]:
+        return self.of(self.kb.get_recipe(recipe_id))
+
+    def item(self, item_id: str) -> Optional[FrozenDict]:
+        return self.of(self.kb.get_item(item_id))
@@ -10,11 +10,12 @@ Migrated from kbtool/circular_dependency_fixer.py to src/kb_core/dependency_anal
 import sys
 import hashlib
 from pathlib import Path
-from typing import Dict, Set, List, Tuple, Any
-from collections import defaultdict
+from typing import Dict, Set, List, Tuple, Any, Optional
+from collections import defaultdict, deque
 
 # Use src.kb_core.kb_loader for dict-based KB (dependency analysis expects dicts)
 from src.kb_core.kb_loader import KBLoader
+from src.kb_core.kb_graph import KBGraph
 
 # Invalid item IDs that indicate data errors
 INVALID_ITEM_IDS = {
@@ -22,14 +23,19 @@ INVALID_ITEM_IDS = {
     "placeholder", "temporary", "stub"
 }
 
+# Representative cycles reported per strongly connected component
+MAX_CYCLES_PER_SCC = 20
+
 
 class CircularDependencyAnalyzer:
     """Identifies and analyzes circular dependencies in the knowledge base."""
 
-    def __init__(self, kb_loader: KBLoader):
+    def __init__(self, kb_loader: KBLoader, graph: Optional[KBGraph] = None):
         self.kb = kb_loader
+        self.kb_graph = graph
         self.circular_loops = []
         self.import_candidates = set()
+        self._graph: Optional[Dict[str, List[str]]] = None
 
     @staticmethod
     def _normalize_loop(loop: List[str]) -> Tuple[str, ...]:
@@ -96,17 +102,20 @@ class CircularDependencyAnalyzer:
         else:
             return f"Multi-step dependency loop (length {len(loop)})"
 
-    def get_work_queue_items(self, entries: Dict[str, dict]) -> List[dict]:
+    def get_work_queue_items(self, entries: Dict[str, dict],
+                             loops: Optional[List[List[str]]] = None) -> List[dict]:
         """
         Generate queue items for all unique loops.
 
         Args:
             entries: Index entries dict from indexer (item_id -> entry data)
+            loops: Result of find_all_circular_dependencies() if already known
 
         Returns:
             List of queue items (one per unique normalized loop)
         """
-        loops = self.find_all_circular_dependencies()
+        if loops is None:
+            loops = self.find_all_circular_dependencies()
         seen_normalized = set()
         queue_items = []
 
@@ -137,94 +146,131 @@ class CircularDependencyAnalyzer:
 
         return queue_items
 
-    def find_all_circular_dependencies(self) -> List[List[str]]:
+    def find_all_circular_dependencies(self, max_cycles_per_scc: int = MAX_CYCLES_PER_SCC) -> List[List[str]]:
         """
-        Find all circular dependency loops in the knowledge base.
+        Find circular dependency loops in the knowledge base.
+
+        Every strongly connected component with a cycle contributes up to
+        max_cycles_per_scc representative elementary cycles: in component
+        order, the shortest cycle through each item not already on a
+        reported cycle. Loops are distinct up to rotation (see _normalize_loop).
 
         Returns:
             List of loops, where each loop is a list of item_ids
         """
+        graph = self.dependency_graph()
         loops = []
-        visited = set()
-        rec_stack = set()
-        path = []
-
-        def dfs(item_id: str, current_path: List[str]) -> None:
-            """DFS to detect cycles."""
-            if item_id in rec_stack:
-                # Found a cycle - extract the loop
-                loop_start = current_path.index(item_id)
-                loop = current_path[loop_start:]
-                if loop and loop not in loops:
-                    loops.append(loop)
-                return
-
-            if item_id in visited:
-                return
-
-            visited.add(item_id)
-            rec_stack.add(item_id)
-            current_path.append(item_id)
-
-            # Get dependencies for this item
-            dependencies = self._get_dependencies(item_id)
-            for dep_id in dependencies:
-                dfs(dep_id, current_path.copy())
-
-            rec_stack.remove(item_id)
-
-        # Start DFS from all items
-        for item_id in self.kb.items.keys():
-            if item_id not in visited:
-                dfs(item_id, [])
+        for component in self.find_strongly_connected_components():
+            loops.extend(self._representative_cycles(graph, component, max_cycles_per_scc))
 
         self.circular_loops = loops
         return loops
 
+    def find_strongly_connected_components(self) -> List[List[str]]:
+        """
+        Return the cyclic strongly connected components of the dependency graph.
+
+        Uses an iterative Tarjan traversal, so deep dependency chains do not
+        hit the recursion limit. Components with more than one item, or a
+        single item that depends on itself, are returned in discovery order.
+        """
+        graph = self.dependency_graph()
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+
+        for root in graph:
+            if root in index_of:
+                continue
+            index_of[root] = lowlink[root] = len(index_of)
+            stack.append(root)
+            on_stack.add(root)
+            # (node, iterator over its dependencies)
+            work = [(root, iter(graph[root]))]
+            while work:
+                node, deps = work[-1]
+                for dep in deps:
+                    if dep not in index_of:
+                        index_of[dep] = lowlink[dep] = len(index_of)
+                        stack.append(dep)
+                        on_stack.add(dep)
+                        work.append((dep, iter(graph.get(dep, ()))))
+                        break
+                    if dep in on_stack and index_of[dep] < lowlink[node]:
+                        lowlink[node] = index_of[dep]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if lowlink[node] < lowlink[parent]:
+                            lowlink[parent] = lowlink[node]
+                    if lowlink[node] == index_of[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        component.reverse()
+                        if len(component) > 1 or node in graph.get(node, ()):
+                            components.append(component)
+
+        return components
+
+    def dependency_graph(self) -> Dict[str, List[str]]:
+        """
+        Adjacency map item_id -> direct dependencies, built once per analyzer.
+
+        Keys are all KB items; dependencies outside the KB have no entry.
+        Dependencies are step-level and process inputs (see KBGraph).
+        """
+        if self._graph is None:
+            if self.kb_graph is None:
+                self.kb_graph = KBGraph.build(self.kb)
+            self._graph = self.kb_graph.item_dependency_map()
+        return self._graph
+
+    @staticmethod
+    def _representative_cycles(graph: Dict[str, List[str]], component: List[str],
+                               limit: int) -> List[List[str]]:
+        """Shortest cycle through each item of an SCC not yet on one, at most limit."""
+        members = set(component)
+        cycles = []
+        covered = set()
+        for start in component:
+            if len(cycles) >= limit:
+                break
+            if start in covered:
+                continue
+            # BFS from start's dependencies back to start, staying inside the SCC
+            parent = {start: None}
+            queue = deque([start])
+            cycle = None
+            while queue and cycle is None:
+                node = queue.popleft()
+                for dep in graph.get(node, ()):
+                    if dep == start:
+                        cycle = [node]
+                        while parent[cycle[-1]] is not None:
+                            cycle.append(parent[cycle[-1]])
+                        cycle.reverse()
+                        break
+                    if dep in members and dep not in parent:
+                        parent[dep] = node
+                        queue.append(dep)
+            if cycle is None:
+                continue
+            # start was not on any earlier cycle, so this one is new
+            covered.update(cycle)
+            cycles.append(cycle)
+        return cycles
+
     def _get_dependencies(self, item_id: str) -> Set[str]:
         """Get all direct dependencies for an item (items it requires to be built)."""
-        dependencies = set()
-
-        def _as_dict(entity):
-            if hasattr(entity, "model_dump"):
-                return entity.model_dump()
-            return entity
-
-        # Get item
-        item = _as_dict(self.kb.get_item(item_id))
-        if not item:
-            return dependencies
-
-        # Check if item has a recipe
-        recipe_id = item.get('recipe')
-        if not recipe_id:
-            return dependencies
-
-        # Get recipe
-        recipe = _as_dict(self.kb.get_recipe(recipe_id))
-        if not recipe:
-            return dependencies
-
-        # Get inputs from recipe steps
-        for step in recipe.get('steps', []):
-            # Check step-level inputs
-            for inp in step.get('inputs', []):
-                input_id = inp.get('item_id')
-                if input_id:
-                    dependencies.add(input_id)
-
-            # Check process inputs
-            process_id = step.get('process_id')
-            if process_id:
-                process = _as_dict(self.kb.get_process(process_id))
-                if process:
-                    for inp in process.get('inputs', []) or []:
-                        if isinstance(inp, dict):
-                            input_id = inp.get('item_id')
-                            if input_id:
-                                dependencies.add(input_id)
-
-        return dependencies
+        return set(self.dependency_graph().get(item_id, ()))
 
     def identify_import_candidates(self) -> Dict[str, List[str]]:
         """
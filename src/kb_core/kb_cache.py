@@ -0,0 +1,197 @@
+"""
+KB Cache - Persistent on-disk cache of parsed KB files
+
+Stores the parsed result of every KB file the loader touches, keyed by path
+relative to the KB root, together with a manifest of (mtime_ns, size, sha1).
+On the next run a file is only re-parsed when its stat signature changed AND
+its content hash differs, so an unchanged KB loads from a single pickle.
+
+The cache is invalidated wholesale when the cache format or the schema module
+changes, since pickled models are only valid for the schema that built them.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from . import schema as _schema
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path("out") / "kb_cache"
+
+# Sentinel returned by KBCache.get() for cache misses (None is a valid payload)
+MISS = object()
+
+
+def _schema_fingerprint() -> str:
+    """Hash of schema.py so cached models are dropped when models change."""
+    try:
+        return hashlib.sha1(Path(_schema.__file__).read_bytes()).hexdigest()
+    except OSError:
+        return "unknown"
+
+
+def default_cache_path(kb_root: Path, use_validated_models: bool = False) -> Path:
+    """Return the default cache file for a KB root and model mode."""
+    mode = "validated" if use_validated_models else "raw"
+    root_key = hashlib.sha1(str(Path(kb_root).resolve()).encode()).hexdigest()[:10]
+    return DEFAULT_CACHE_DIR / f"kb_{mode}_{root_key}.pickle"
+
+
+class KBCache:
+    """
+    Manifest-checked cache of parsed KB file payloads.
+
+    Entries are keyed by (relative path, variant); the variant distinguishes
+    different parses of the same file (e.g. raw dict vs. parsed model).
+    Payloads are stored pickled so callers can freely mutate what they get.
+    A resident cache (kept alive across runs in one process, such as the
+    index service's) also keeps the unpickled payloads and returns those
+    same objects while the file is unchanged; its callers must not mutate them.
+    """
+
+    def __init__(self, cache_path: Path, kb_root: Path, namespace: str = "", resident: bool = False):
+        self.cache_path = Path(cache_path)
+        self.kb_root = Path(kb_root)
+        self._root_prefix = self.kb_root.as_posix().rstrip("/") + "/"
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        # (rel_path, variant) -> (mtime_ns, size, sha1, pickled payload)
+        self._entries: Dict[Tuple[str, str], Tuple[int, int, str, bytes]] = {}
+        # (rel_path, variant) -> payload, for resident caches
+        self._objects: Optional[Dict[Tuple[str, str], Any]] = {} if resident else None
+        self._header = {
+            "format": CACHE_FORMAT_VERSION,
+            "schema": _schema_fingerprint(),
+            "namespace": namespace,
+        }
+        self._load()
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def get(self, path: Path, variant: str) -> Any:
+        """Return the cached payload for path, or MISS if absent or stale."""
+        key = (self._rel(path), variant)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISS
+        try:
+            st = path.stat()
+        except OSError:
+            self.misses += 1
+            return MISS
+
+        mtime_ns, size, digest, blob = entry
+        if st.st_mtime_ns != mtime_ns or st.st_size != size:
+            # Stat changed (touch, checkout); fall back to content hash
+            if st.st_size != size or self._digest(path) != digest:
+                self.misses += 1
+                return MISS
+            self._entries[key] = (st.st_mtime_ns, size, digest, blob)
+            self._dirty = True
+
+        self.hits += 1
+        if self._objects is None:
+            return pickle.loads(blob)
+        if key not in self._objects:
+            self._objects[key] = pickle.loads(blob)
+        return self._objects[key]
+
+    def digest(self, path: Path, variant: str) -> Optional[str]:
+        """Return the content hash recorded for path (valid after get/put)."""
+        entry = self._entries.get((self._rel(path), variant))
+        return entry[2] if entry is not None else None
+
+    def put(self, path: Path, variant: str, payload: Any, content: Optional[bytes] = None) -> None:
+        """Store payload for path; content is the file bytes if already read."""
+        try:
+            st = path.stat()
+            if content is None:
+                content = path.read_bytes()
+            blob = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Unpicklable payloads or vanished files are simply not cached
+            return
+        digest = hashlib.sha1(content).hexdigest()
+        key = (self._rel(path), variant)
+        self._entries[key] = (st.st_mtime_ns, st.st_size, digest, blob)
+        if self._objects is not None:
+            self._objects[key] = payload
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk (atomically) if anything changed."""
+        if not self._dirty:
+            return
+        # Drop entries for files deleted since they were cached
+        self._entries = {
+            key: entry for key, entry in self._entries.items()
+            if (self.kb_root / key[0]).exists()
+        }
+        if self._objects is not None:
+            self._objects = {key: obj for key, obj in self._objects.items() if key in self._entries}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(
+                {"header": self._header, "entries": self._entries},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def clear(self) -> None:
+        """Drop all entries and remove the cache file."""
+        self._entries = {}
+        if self._objects is not None:
+            self._objects = {}
+        self._dirty = False
+        try:
+            self.cache_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # =========================================================================
+    # Internal Helpers
+    # =========================================================================
+
+    def _load(self) -> None:
+        if not self.cache_path.exists():
+            return
+        try:
+            with self.cache_path.open("rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            # Corrupt or incompatible cache: start over
+            return
+        if not isinstance(data, dict) or data.get("header") != self._header:
+            return
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    def _rel(self, path: Path) -> str:
+        # String prefix check: Path.relative_to dominates warm-cache lookups
+        posix = path.as_posix()
+        if posix.startswith(self._root_prefix):
+            return posix[len(self._root_prefix):]
+        return posix
+
+    @staticmethod
+    def _digest(path: Path) -> Optional[str]:
+        try:
+            return hashlib.sha1(path.read_bytes()).hexdigest()
+        except OSError:
+            return None
@@ -0,0 +1,559 @@
+"""
+KB Graph - Prebuilt dependency graph of items, recipes and processes
+
+Builds one compact graph from a loaded KBLoader so dependency questions
+("what does this item need", "what uses this item", "what is reachable")
+do not each re-walk the YAML models:
+
+- Nodes are (kind, id) pairs with dense integer ids; kind is "item",
+  "recipe" or "process". Entries referenced but not defined get a node
+  flagged as undefined.
+- Edges are typed (EdgeType) and point from consumer to requirement
+  (item -> recipe -> process -> input item). Forward and reverse
+  adjacency are stored CSR-style in flat arrays, with per-edge qty, unit
+  and scale attributes.
+- load_or_build() caches the graph on disk, keyed by the stat signature
+  of every KB YAML file, so scripts can share it without re-parsing kb/.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import pickle
+from array import array
+from collections import deque
+from enum import IntEnum
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from . import schema as _schema
+from .kb_cache import DEFAULT_CACHE_DIR
+
+GRAPH_FORMAT_VERSION = 1
+
+NODE_KINDS = ("item", "recipe", "process")
+
+
+class EdgeType(IntEnum):
+    """Edge types; lowercased names match the graph scripts' edge labels."""
+    ITEM_RECIPE = 0      # item -> recipe that makes it
+    RECIPE_INPUT = 1     # recipe -> recipe-level input item
+    RECIPE_OUTPUT = 2    # recipe -> recipe-level output item
+    RECIPE_PROCESS = 3   # recipe -> process of one step (one edge per step)
+    STEP_INPUT = 4       # recipe -> step-level input item
+    PROCESS_INPUT = 5    # process -> input item
+    PROCESS_OUTPUT = 6   # process -> output item
+    PROCESS_MACHINE = 7  # process -> required machine (resource_requirements)
+
+
+# Edge types that make up an item's build dependencies (as used by
+# CircularDependencyAnalyzer): step-level inputs and process inputs.
+DEPENDENCY_EDGES: Tuple[EdgeType, ...] = (EdgeType.STEP_INPUT, EdgeType.PROCESS_INPUT)
+
+
+class Edge(NamedTuple):
+    """One graph edge; qty/unit are None when the KB entry omits them."""
+    source: int
+    target: int
+    type: EdgeType
+    qty: Optional[float]
+    unit: Optional[str]
+    scale: Optional[float]
+
+
+def _field(entity: Any, name: str) -> Any:
+    """Read a field from a model or dict without dumping the model."""
+    if isinstance(entity, dict):
+        return entity.get(name)
+    return getattr(entity, name, None)
+
+
+def _requirement_id(req: Any) -> Optional[str]:
+    """Machine id of a resource requirement (legacy resource_type accepted)."""
+    machine_id = _field(req, "machine_id") or _field(req, "resource_type")
+    if not machine_id and not isinstance(req, dict):
+        # Raw models alias machine_id to resource_type; a literal machine_id
+        # key then lands in the model's extra fields
+        machine_id = (getattr(req, "model_extra", None) or {}).get("machine_id")
+    return machine_id
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _code_fingerprint() -> str:
+    """Hash of this module and schema.py so cached graphs follow code changes."""
+    digest = hashlib.sha1()
+    for module_file in (__file__, _schema.__file__):
+        try:
+            digest.update(Path(module_file).read_bytes())
+        except OSError:
+            digest.update(b"unknown")
+    return digest.hexdigest()
+
+
+def kb_signature(kb_root: Path) -> str:
+    """Hash of (relative path, mtime_ns, size) over every KB YAML file."""
+    kb_root = Path(kb_root)
+    entries = []
+    for dirpath, _dirnames, filenames in os.walk(kb_root):
+        for name in filenames:
+            if not name.endswith(".yaml"):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append(f"{os.path.relpath(path, kb_root)}\0{st.st_mtime_ns}\0{st.st_size}")
+    entries.sort()
+    return hashlib.sha1("\n".join(entries).encode()).hexdigest()
+
+
+def default_graph_cache_path(kb_root: Path) -> Path:
+    """Return the default graph cache file for a KB root."""
+    root_key = hashlib.sha1(str(Path(kb_root).resolve()).encode()).hexdigest()[:10]
+    return DEFAULT_CACHE_DIR / f"kb_graph_{root_key}.pickle"
+
+
+class KBGraph:
+    """
+    Array-backed dependency graph of a knowledge base.
+
+    Build with KBGraph.build(kb_loader) or KBGraph.load_or_build(kb_root).
+    Node and edge ids are plain ints; use node()/kind()/entry_id() to map
+    between them and KB ids.
+    """
+
+    def __init__(self):
+        # Node tables
+        self._kinds = array("B")
+        self._ids: List[str] = []
+        self._subtypes: List[Optional[str]] = []
+        self._defined = bytearray()
+        self._index: Dict[Tuple[str, str], int] = {}
+        # Forward CSR: out edges of node n are _offsets[n]:_offsets[n + 1]
+        self._offsets = array("i", [0])
+        self._sources = array("i")
+        self._targets = array("i")
+        self._types = array("B")
+        self._qty = array("d")
+        self._scale = array("d")
+        self._unit = array("i")
+        self.units: List[str] = []
+        # Reverse CSR: in edges of node n are _rev_edges[_rev_offsets[n]:_rev_offsets[n + 1]]
+        self._rev_offsets = array("i", [0])
+        self._rev_edges = array("i")
+
+    # =========================================================================
+    # Construction
+    # =========================================================================
+
+    @classmethod
+    def build(cls, kb_loader) -> "KBGraph":
+        """Build the graph from an eagerly loaded KBLoader (or same-shaped object)."""
+        graph = cls()
+        items = kb_loader.items
+        recipes = kb_loader.recipes
+        processes = kb_loader.processes
+
+        # Defined nodes first so ids are stable for a given KB
+        for item_id, item in items.items():
+            graph._add_node("item", item_id, _field(item, "kind"), defined=True)
+        for recipe_id in recipes:
+            graph._add_node("recipe", recipe_id, None, defined=True)
+        for process_id, process in processes.items():
+            graph._add_node("process", process_id, _field(process, "process_type"), defined=True)
+
+        # (source, target, type, qty, unit, scale) in per-source order
+        edges: List[Tuple[int, int, int, float, Optional[str], float]] = []
+
+        def add(source: int, kind: str, entry_id: Any, etype: EdgeType,
+                qty: Any = None, unit: Any = None, scale: Optional[float] = None) -> None:
+            if not entry_id:
+                return
+            target = graph._add_node(kind, str(entry_id), None, defined=False)
+            qty = _as_float(qty)
+            edges.append((source, target, int(etype), qty,
+                          unit if isinstance(unit, str) else None,
+                          qty if scale is None else scale))
+
+        def add_quantities(source: int, entries: Any, etype: EdgeType, per_unit: float = 1.0) -> None:
+            for entry in entries or []:
+                qty = _field(entry, "qty")
+                add(source, "item", _field(entry, "item_id"), etype, qty, _field(entry, "unit"),
+                    _as_float(qty) / per_unit)
+
+        for item_id, item in items.items():
+            add(graph._index[("item", item_id)], "recipe", _field(item, "recipe"), EdgeType.ITEM_RECIPE)
+
+        for recipe_id, recipe in recipes.items():
+            source = graph._index[("recipe", recipe_id)]
+            outputs = _field(recipe, "outputs") or []
+            add_quantities(source, _field(recipe, "inputs"), EdgeType.RECIPE_INPUT,
+                           cls._target_output_qty(recipe, outputs))
+            add_quantities(source, outputs, EdgeType.RECIPE_OUTPUT)
+            for step in _field(recipe, "steps") or []:
+                add_quantities(source, _field(step, "inputs"), EdgeType.STEP_INPUT)
+                add(source, "process", _field(step, "process_id"), EdgeType.RECIPE_PROCESS)
+
+        for process_id, process in processes.items():
+            source = graph._index[("process", process_id)]
+            add_quantities(source, _field(process, "inputs"), EdgeType.PROCESS_INPUT)
+            add_quantities(source, _field(process, "outputs"), EdgeType.PROCESS_OUTPUT)
+            for req in _field(process, "resource_requirements") or []:
+                add(source, "item", _requirement_id(req), EdgeType.PROCESS_MACHINE,
+                    _field(req, "qty"), _field(req, "unit"))
+
+        graph._freeze(edges)
+        return graph
+
+    @classmethod
+    def build_resolved(cls, kb_loader) -> "KBGraph":
+        """
+        Build the graph over the definitions kb_loader's get_* lookups return.
+
+        load_all() resolves duplicate ids differently from on-demand
+        lookups, so callers that also query a lazy loader directly use this
+        instead of build()/load_or_build() to keep both views consistent.
+        """
+        kb_loader.preload()
+        return cls.build(SimpleNamespace(
+            items=kb_loader.resolved("item"),
+            recipes=kb_loader.resolved("recipe"),
+            processes=kb_loader.resolved("process"),
+        ))
+
+    @classmethod
+    def load_or_build(cls, kb_root: Path, kb_loader=None,
+                      cache_path: Optional[Path] = None) -> "KBGraph":
+        """
+        Return the graph for kb_root from the disk cache, rebuilding if stale.
+
+        The cache is valid while no KB YAML file was added, removed or
+        changed (by mtime/size). On a miss the graph is built from kb_loader,
+        or from a fresh disk-cached KBLoader when none is given; with an
+        explicit cache_path that loader's parse cache is kept next to it.
+        """
+        kb_root = Path(kb_root)
+        loader_cache_path = None
+        if cache_path:
+            cache_path = Path(cache_path)
+            loader_cache_path = cache_path.with_name(f"{cache_path.stem}_kb_raw.pickle")
+        else:
+            cache_path = default_graph_cache_path(kb_root)
+        header = {
+            "format": GRAPH_FORMAT_VERSION,
+            "code": _code_fingerprint(),
+            "signature": kb_signature(kb_root),
+        }
+
+        try:
+            with cache_path.open("rb") as f:
+                data = pickle.load(f)
+            if isinstance(data, dict) and data.get("header") == header:
+                return data["graph"]
+        except Exception:
+            # Missing, corrupt or incompatible cache: rebuild
+            pass
+
+        if kb_loader is None:
+            from .kb_loader import KBLoader
+            kb_loader = KBLoader(
+                kb_root, use_validated_models=False, disk_cache=True, cache_path=loader_cache_path
+            )
+            kb_loader.load_all()
+        graph = cls.build(kb_loader)
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with tmp_path.open("wb") as f:
+                pickle.dump({"header": header, "graph": graph}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Caching is best-effort
+            pass
+        return graph
+
+    # =========================================================================
+    # Nodes
+    # =========================================================================
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._targets)
+
+    def node(self, kind: str, entry_id: str) -> Optional[int]:
+        """Node id of (kind, entry_id), or None if it is not in the graph."""
+        return self._index.get((kind, entry_id))
+
+    def kind(self, node: int) -> str:
+        return NODE_KINDS[self._kinds[node]]
+
+    def entry_id(self, node: int) -> str:
+        return self._ids[node]
+
+    def subtype(self, node: int) -> Optional[str]:
+        """Item kind (part, machine, ...) or process_type; None for recipes."""
+        return self._subtypes[node]
+
+    def is_defined(self, node: int) -> bool:
+        """False for entries that are referenced but have no KB definition."""
+        return bool(self._defined[node])
+
+    def nodes(self, kind: Optional[str] = None, defined_only: bool = False) -> Iterator[int]:
+        """Node ids in id order, optionally restricted to a kind or to defined entries."""
+        kind_code = NODE_KINDS.index(kind) if kind is not None else None
+        for node in range(len(self._ids)):
+            if kind_code is not None and self._kinds[node] != kind_code:
+                continue
+            if defined_only and not self._defined[node]:
+                continue
+            yield node
+
+    # =========================================================================
+    # Edges
+    # =========================================================================
+
+    def edge(self, edge: int) -> Edge:
+        qty = self._qty[edge]
+        scale = self._scale[edge]
+        unit = self._unit[edge]
+        return Edge(
+            self._sources[edge],
+            self._targets[edge],
+            EdgeType(self._types[edge]),
+            None if math.isnan(qty) else qty,
+            self.units[unit] if unit >= 0 else None,
+            None if math.isnan(scale) else scale,
+        )
+
+    def edges(self, types: Optional[Iterable[EdgeType]] = None) -> Iterator[int]:
+        """All edge ids in source order, optionally restricted to some types."""
+        wanted = self._type_mask(types)
+        for edge in range(len(self._targets)):
+            if wanted is None or self._types[edge] in wanted:
+                yield edge
+
+    def out_edges(self, node: int, types: Optional[Iterable[EdgeType]] = None) -> Iterator[int]:
+        """Edge ids leaving node, in KB order."""
+        wanted = self._type_mask(types)
+        for edge in range(self._offsets[node], self._offsets[node + 1]):
+            if wanted is None or self._types[edge] in wanted:
+                yield edge
+
+    def in_edges(self, node: int, types: Optional[Iterable[EdgeType]] = None) -> Iterator[int]:
+        """Edge ids entering node."""
+        wanted = self._type_mask(types)
+        for i in range(self._rev_offsets[node], self._rev_offsets[node + 1]):
+            edge = self._rev_edges[i]
+            if wanted is None or self._types[edge] in wanted:
+                yield edge
+
+    def successors(self, node: int, types: Optional[Iterable[EdgeType]] = None) -> List[int]:
+        return [self._targets[e] for e in self.out_edges(node, types)]
+
+    def predecessors(self, node: int, types: Optional[Iterable[EdgeType]] = None) -> List[int]:
+        return [self._sources[e] for e in self.in_edges(node, types)]
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def reachable(self, starts: Iterable[int], types: Optional[Iterable[EdgeType]] = None,
+                  reverse: bool = False) -> Set[int]:
+        """Nodes reachable from starts (inclusive) over the given edge types."""
+        neighbours = self.predecessors if reverse else self.successors
+        seen = set(starts)
+        queue = deque(seen)
+        while queue:
+            for nxt in neighbours(queue.popleft(), types):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        return seen
+
+    def item_dependencies(self, item_id: str,
+                          types: Iterable[EdgeType] = DEPENDENCY_EDGES) -> List[str]:
+        """
+        Direct input item_ids of item_id's recipe, in KB order without repeats.
+
+        types selects which inputs count: recipe-level (RECIPE_INPUT),
+        step-level (STEP_INPUT) and/or process inputs of the recipe's steps
+        (PROCESS_INPUT). Machines (PROCESS_MACHINE) may be included too.
+        """
+        node = self.node("item", item_id)
+        if node is None:
+            return []
+        wanted = self._dependency_mask(types)
+        result: Dict[str, None] = {}
+        for recipe in self.successors(node, (EdgeType.ITEM_RECIPE,)):
+            for target in self._recipe_inputs(recipe, wanted):
+                result[self._ids[target]] = None
+        return list(result)
+
+    def item_dependency_map(self, types: Iterable[EdgeType] = DEPENDENCY_EDGES) -> Dict[str, List[str]]:
+        """item_dependencies for every defined item, in KB order."""
+        wanted = self._dependency_mask(types)
+        recipe_inputs: Dict[int, List[str]] = {}
+        result: Dict[str, List[str]] = {}
+        for node in self.nodes("item", defined_only=True):
+            deps: Dict[str, None] = {}
+            for recipe in self.successors(node, (EdgeType.ITEM_RECIPE,)):
+                if recipe not in recipe_inputs:
+                    recipe_inputs[recipe] = list(dict.fromkeys(
+                        self._ids[t] for t in self._recipe_inputs(recipe, wanted)
+                    ))
+                deps.update(dict.fromkeys(recipe_inputs[recipe]))
+            result[self._ids[node]] = list(deps)
+        return result
+
+    def dependents(self, item_id: str, types: Iterable[EdgeType] = DEPENDENCY_EDGES) -> List[str]:
+        """Items whose item_dependencies (for the same types) include item_id."""
+        node = self.node("item", item_id)
+        if node is None:
+            return []
+        wanted = self._dependency_mask(types)
+        recipes: Dict[int, None] = {}
+        for edge in self.in_edges(node):
+            etype = self._types[edge]
+            if etype not in wanted:
+                continue
+            source = self._sources[edge]
+            if etype in (EdgeType.PROCESS_INPUT, EdgeType.PROCESS_MACHINE):
+                recipes.update(dict.fromkeys(self.predecessors(source, (EdgeType.RECIPE_PROCESS,))))
+            else:
+                recipes[source] = None
+        result: Dict[str, None] = {}
+        for recipe in recipes:
+            for owner in self.predecessors(recipe, (EdgeType.ITEM_RECIPE,)):
+                if self._defined[owner]:
+                    result[self._ids[owner]] = None
+        return list(result)
+
+    def transitive_dependencies(self, item_id: str,
+                                types: Iterable[EdgeType] = DEPENDENCY_EDGES) -> Set[str]:
+        """All items item_id needs directly or indirectly (excluding itself unless cyclic)."""
+        return self._item_closure(item_id, lambda i: self.item_dependencies(i, types))
+
+    def transitive_dependents(self, item_id: str,
+                              types: Iterable[EdgeType] = DEPENDENCY_EDGES) -> Set[str]:
+        """All items that need item_id directly or indirectly."""
+        return self._item_closure(item_id, lambda i: self.dependents(i, types))
+
+    # =========================================================================
+    # Internal Helpers
+    # =========================================================================
+
+    def _add_node(self, kind: str, entry_id: str, subtype: Optional[str], defined: bool) -> int:
+        key = (kind, entry_id)
+        node = self._index.get(key)
+        if node is not None:
+            return node
+        node = len(self._ids)
+        self._index[key] = node
+        self._kinds.append(NODE_KINDS.index(kind))
+        self._ids.append(entry_id)
+        self._subtypes.append(subtype if isinstance(subtype, str) else None)
+        self._defined.append(1 if defined else 0)
+        return node
+
+    def _freeze(self, edges: List[Tuple[int, int, int, float, Optional[str], float]]) -> None:
+        """Lay edges out as forward and reverse CSR arrays."""
+        n = len(self._ids)
+        # Stable counting sort by source keeps per-source KB order
+        counts = [0] * (n + 1)
+        for edge in edges:
+            counts[edge[0] + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        self._offsets = array("i", counts)
+        order: List[Optional[tuple]] = [None] * len(edges)
+        cursor = counts[:-1]
+        for edge in edges:
+            order[cursor[edge[0]]] = edge
+            cursor[edge[0]] += 1
+
+        unit_index: Dict[str, int] = {}
+        for source, target, etype, qty, unit, scale in order:
+            self._sources.append(source)
+            self._targets.append(target)
+            self._types.append(etype)
+            self._qty.append(qty)
+            self._scale.append(scale)
+            if unit is None:
+                self._unit.append(-1)
+            else:
+                if unit not in unit_index:
+                    unit_index[unit] = len(self.units)
+                    self.units.append(unit)
+                self._unit.append(unit_index[unit])
+
+        rev_counts = [0] * (n + 1)
+        for target in self._targets:
+            rev_counts[target + 1] += 1
+        for i in range(n):
+            rev_counts[i + 1] += rev_counts[i]
+        self._rev_offsets = array("i", rev_counts)
+        rev_edges = [0] * len(self._targets)
+        cursor = rev_counts[:-1]
+        for edge, target in enumerate(self._targets):
+            rev_edges[cursor[target]] = edge
+            cursor[target] += 1
+        self._rev_edges = array("i", rev_edges)
+
+    def _recipe_inputs(self, recipe: int, wanted: frozenset) -> Iterator[int]:
+        """Input item nodes of a recipe: its own input edges, then its steps' process inputs."""
+        for edge in range(self._offsets[recipe], self._offsets[recipe + 1]):
+            etype = self._types[edge]
+            if etype == EdgeType.RECIPE_PROCESS:
+                process = self._targets[edge]
+                for p_edge in range(self._offsets[process], self._offsets[process + 1]):
+                    if self._types[p_edge] in wanted:
+                        yield self._targets[p_edge]
+            elif etype in wanted:
+                yield self._targets[edge]
+
+    @staticmethod
+    def _target_output_qty(recipe: Any, outputs: Iterable[Any]) -> float:
+        """Output qty of the recipe's target item (1.0 if absent or not positive)."""
+        target = _field(recipe, "target_item_id")
+        for out in outputs:
+            if _field(out, "item_id") == target:
+                qty = _as_float(_field(out, "qty"))
+                if qty > 0:
+                    return qty
+        return 1.0
+
+    @staticmethod
+    def _type_mask(types: Optional[Iterable[EdgeType]]) -> Optional[frozenset]:
+        return None if types is None else frozenset(int(t) for t in types)
+
+    @staticmethod
+    def _dependency_mask(types: Iterable[EdgeType]) -> frozenset:
+        """Input edge types usable as item dependencies (see item_dependencies)."""
+        allowed = (EdgeType.RECIPE_INPUT, EdgeType.STEP_INPUT,
+                   EdgeType.PROCESS_INPUT, EdgeType.PROCESS_MACHINE)
+        return frozenset(int(t) for t in types if t in allowed)
+
+    @staticmethod
+    def _item_closure(item_id: str, step) -> Set[str]:
+        seen: Set[str] = set()
+        queue = deque(step(item_id))
+        while queue:
+            current = queue.popleft()
+            if current in seen:
+                continue
+            seen.add(current)
+            queue.extend(step(current))
+        return seen
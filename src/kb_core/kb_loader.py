@@ -6,13 +6,20 @@ Consolidates loading logic from base_builder and kbtool with:
 - Eager loading (for indexer)
 - Raw model parsing (permissive)
 - Optional validated model conversion (strict)
+- Optional persistent disk cache of parsed files (see kb_cache)
+- Optional process-pool parsing for eager loads (workers > 1)
 """
 from __future__ import annotations
 
-import yaml
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Literal
+from typing import Dict, List, Optional, Any, Literal, Set, Tuple
 
+from . import kb_yaml
+from .kb_cache import KBCache, MISS, default_cache_path
+from .definition_views import DefinitionViews
+from .unit_converter import UnitRegistry
 from .schema import (
     RAW_MODEL_MAP,
     VALIDATED_MODEL_MAP,
@@ -24,6 +31,60 @@ from .schema import (
     Item,
 )
 
+# Below this many uncached files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+# Directories searched by lazy get_* lookups, in priority order: (subdir, recursive)
+LOOKUP_DIRS: Dict[str, Tuple[Tuple[str, bool], ...]] = {
+    "process": (("processes", False),),
+    "recipe": (("recipes", False),),
+    "item": (
+        ("items/materials", False),
+        ("items/raw_materials", False),
+        ("items/parts", False),
+        ("items/machines", False),
+        ("imports", True),
+    ),
+}
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Normalize a worker count: None/0 means one worker per CPU core."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def _model_variant(kind: Optional[str], annotate: bool) -> str:
+    """Disk cache variant key for a parsed model file."""
+    return f"model:{kind or 'item'}:{'annotated' if annotate else 'plain'}"
+
+
+# Per-process loaders reused across tasks by pool workers
+_worker_loaders: Dict[Tuple[str, bool], "KBLoader"] = {}
+
+
+def _parse_file_task(task: tuple) -> Tuple[Optional[Tuple[str, Any]], Optional[str], List[str]]:
+    """
+    Pool worker: parse one KB file into (entry_id, model).
+
+    Returns (parsed, error, yaml_errors) so the parent can merge results and
+    load_errors in deterministic file order.
+    """
+    path, data, kind, kb_root, use_validated_models = task
+    key = (str(kb_root), use_validated_models)
+    loader = _worker_loaders.get(key)
+    if loader is None:
+        loader = KBLoader(kb_root, use_validated_models=use_validated_models, cache_enabled=False)
+        _worker_loaders[key] = loader
+    loader.load_errors = []
+    loader._documents = {path: data} if data is not None else None
+    try:
+        parsed = loader._parse_model_file(path, kind, annotate=True)
+    except Exception as e:
+        return None, str(e), loader.load_errors
+    return parsed, None, loader.load_errors
+
 
 class KBLoader:
     """
@@ -42,7 +103,11 @@ class KBLoader:
         self,
         kb_root: Path,
         use_validated_models: bool = False,
-        cache_enabled: bool = True
+        cache_enabled: bool = True,
+        disk_cache: bool = False,
+        cache_path: Optional[Path] = None,
+        workers: Optional[int] = 1,
+        cache: Optional[KBCache] = None,
     ):
         """
         Initialize KB loader.
@@ -51,16 +116,38 @@ class KBLoader:
             kb_root: Path to KB root directory (containing processes/, recipes/, etc.)
             use_validated_models: If True, parse and validate using strict models
             cache_enabled: If True, cache loaded items (recommended)
+            disk_cache: If True, persist parsed files to an on-disk cache and
+                only re-parse files whose content changed since the last run
+            cache_path: Cache file location (default: out/kb_cache/...)
+            workers: Processes used to parse files during eager loading
+                (1 = sequential, None/0 = one per CPU core)
+            cache: Already open parse cache to use instead of disk_cache/
+                cache_path (e.g. a resident cache shared across loaders)
         """
         self.kb_root = kb_root
         self.use_validated_models = use_validated_models
         self.cache_enabled = cache_enabled
+        self.workers = resolve_workers(workers)
+
+        # Persistent parse cache (optional)
+        self._disk_cache: Optional[KBCache] = cache
+        if cache is None and (disk_cache or cache_path is not None):
+            self._disk_cache = KBCache(
+                cache_path or default_cache_path(kb_root, use_validated_models),
+                kb_root,
+                namespace="validated" if use_validated_models else "raw",
+            )
 
         # Lazy-loaded caches (populated on-demand)
         self._processes: Optional[Dict[str, Any]] = {} if cache_enabled else None
         self._recipes: Optional[Dict[str, Any]] = {} if cache_enabled else None
         self._items: Optional[Dict[str, Any]] = {} if cache_enabled else None
-        self._recipe_index: Optional[Dict[str, Path]] = None
+
+        # Lazy lookup indexes, built on first use (see _lookup_path)
+        self._stem_index: Dict[str, Dict[str, Path]] = {}
+        self._id_index: Dict[str, Dict[str, Path]] = {}
+        self._missing_ids: Dict[str, Set[str]] = {kind: set() for kind in LOOKUP_DIRS}
+        self._eager_loaded: Set[str] = set()
 
         # Eager-loaded indexes (populated by load_all())
         self.processes: Dict[str, Any] = {}
@@ -72,20 +159,40 @@ class KBLoader:
         self._boms_loaded = False
         self._units_loaded = False
         self._materials_loaded = False
+        # Compiled conversions, rebuilt when self.units is replaced (see unit_registry)
+        self._unit_registry: Optional[UnitRegistry] = None
+        self._unit_registry_source: Optional[Dict[str, Any]] = None
+        # Read-only definition dicts shared by simulation engines (see definition_views)
+        self._definition_views: Optional[DefinitionViews] = None
+
+        # Pre-parsed YAML documents (path -> data), see use_documents()
+        self._documents: Optional[Dict[Path, Any]] = None
 
         # Error tracking
         self.load_errors: List[str] = []
 
+    def use_documents(self, documents: Dict[Path, Any]) -> None:
+        """
+        Serve file reads from already-parsed YAML documents.
+
+        Lets callers that have parsed the KB themselves (e.g. the indexer)
+        share that work instead of having the loader parse every file again.
+        Paths must match the loader's own (kb_root / <dir> / <file>.yaml);
+        files missing from the table are still read from disk.
+        """
+        self._documents = documents
+
     # =========================================================================
     # Eager Loading (for indexer)
     # =========================================================================
 
-    def load_all(self) -> None:
+    def load_all(self, save_cache: bool = True) -> None:
         """
         Load all KB data eagerly and build indexes.
 
         Used by indexer for complete KB scan.
         Populates: processes, recipes, items, boms, units, materials
+        save_cache: persist the disk cache afterwards (see save_disk_cache)
         """
         self.load_processes()
         self.load_recipes()
@@ -93,6 +200,17 @@ class KBLoader:
         self.load_boms()
         self.load_units()
         self.load_material_properties()
+        if save_cache:
+            self.save_disk_cache()
+
+    def save_disk_cache(self) -> None:
+        """Persist the disk cache (no-op when disk caching is disabled)."""
+        if self._disk_cache is None:
+            return
+        try:
+            self._disk_cache.save()
+        except OSError as e:
+            self.load_errors.append(f"Failed to save KB cache: {e}")
 
     def load_processes(self) -> None:
         """Load all processes from kb/processes/*.yaml"""
@@ -101,16 +219,10 @@ class KBLoader:
             self.load_errors.append(f"Processes directory not found: {processes_dir}")
             return
 
-        for process_file in processes_dir.glob("*.yaml"):
-            try:
-                data = self._load_yaml_file(process_file)
-                if data:
-                    # Add defined_in metadata
-                    data['defined_in'] = str(process_file.relative_to(self.kb_root.parent))
-                    process_id = data.get("id", process_file.stem)
-                    self.processes[process_id] = self._parse_model(data, "process")
-            except Exception as e:
-                self.load_errors.append(f"Failed to load process {process_file.name}: {e}")
+        files = list(processes_dir.glob("*.yaml"))
+        for process_id, model in self._load_model_files(files, "process", "process"):
+            self.processes[process_id] = model
+        self._eager_loaded.add("process")
 
     def load_recipes(self) -> None:
         """Load all recipes from kb/recipes/*.yaml"""
@@ -119,46 +231,29 @@ class KBLoader:
             self.load_errors.append(f"Recipes directory not found: {recipes_dir}")
             return
 
-        for recipe_file in recipes_dir.glob("*.yaml"):
-            try:
-                data = self._load_yaml_file(recipe_file)
-                if data:
-                    # Add defined_in metadata
-                    data['defined_in'] = str(recipe_file.relative_to(self.kb_root.parent))
-                    recipe_id = data.get("id", recipe_file.stem)
-                    self.recipes[recipe_id] = self._parse_model(data, "recipe")
-            except Exception as e:
-                self.load_errors.append(f"Failed to load recipe {recipe_file.name}: {e}")
+        files = list(recipes_dir.glob("*.yaml"))
+        for recipe_id, model in self._load_model_files(files, "recipe", "recipe"):
+            self.recipes[recipe_id] = model
+        self._eager_loaded.add("recipe")
 
     def load_items(self) -> None:
         """Load all items from kb/items/**/*.yaml and kb/imports/**/*.yaml"""
         # Load from kb/items/
         items_dir = self.kb_root / "items"
+        # (defined_in metadata is used for raw material detection)
         if items_dir.exists():
-            for item_file in items_dir.rglob("*.yaml"):
-                try:
-                    data = self._load_yaml_file(item_file)
-                    if data:
-                        # Add defined_in metadata for raw material detection
-                        data['defined_in'] = str(item_file.relative_to(self.kb_root.parent))
-                        item_id = data.get("id", item_file.stem)
-                        self.items[item_id] = self._parse_model(data, data.get("kind", "material"))
-                except Exception as e:
-                    self.load_errors.append(f"Failed to load item {item_file.name}: {e}")
+            files = list(items_dir.rglob("*.yaml"))
+            for item_id, model in self._load_model_files(files, None, "item"):
+                self.items[item_id] = model
 
         # Load from kb/imports/ (ADR-007 architecture)
+        # (defined_in metadata is used for import detection)
         imports_dir = self.kb_root / "imports"
         if imports_dir.exists():
-            for item_file in imports_dir.rglob("*.yaml"):
-                try:
-                    data = self._load_yaml_file(item_file)
-                    if data:
-                        # Add defined_in metadata for import detection
-                        data['defined_in'] = str(item_file.relative_to(self.kb_root.parent))
-                        item_id = data.get("id", item_file.stem)
-                        self.items[item_id] = self._parse_model(data, data.get("kind", "material"))
-                except Exception as e:
-                    self.load_errors.append(f"Failed to load import item {item_file.name}: {e}")
+            files = list(imports_dir.rglob("*.yaml"))
+            for item_id, model in self._load_model_files(files, None, "import item"):
+                self.items[item_id] = model
+        self._eager_loaded.add("item")
 
     def load_boms(self) -> None:
         """Load all BOMs from kb/boms/*.yaml"""
@@ -169,7 +264,7 @@ class KBLoader:
 
         for bom_file in boms_dir.glob("*.yaml"):
             try:
-                data = self._load_yaml_file(bom_file)
+                data = self._load_data_file(bom_file)
                 if data:
                     bom_id = data.get("id", bom_file.stem)
                     owner_item_id = data.get("owner_item_id")
@@ -220,7 +315,7 @@ class KBLoader:
             return
 
         try:
-            self.units = self._load_yaml_file(units_file) or {}
+            self.units = self._load_data_file(units_file) or {}
         except Exception as e:
             self.load_errors.append(f"Failed to load units: {e}")
             self.units = {}
@@ -242,7 +337,7 @@ class KBLoader:
             return
 
         try:
-            self.materials = self._load_yaml_file(props_file) or {}
+            self.materials = self._load_data_file(props_file) or {}
         except Exception as e:
             self.load_errors.append(f"Failed to load material properties: {e}")
             self.materials = {}
@@ -270,14 +365,14 @@ class KBLoader:
                 return self._processes[process_id]
 
         # Lazy load from file
-        process_file = self.kb_root / "processes" / f"{process_id}.yaml"
-        if not process_file.exists():
+        process_file = self._lookup_path("process", process_id)
+        if process_file is None:
             return None
 
         try:
-            data = self._load_yaml_file(process_file)
-            if data:
-                model = self._parse_model(data, "process")
+            parsed = self._load_model_file(process_file, "process")
+            if parsed:
+                model = parsed[1]
                 # Cache it
                 if self.cache_enabled and self._processes is not None:
                     self._processes[process_id] = model
@@ -304,16 +399,14 @@ class KBLoader:
                 return self._recipes[recipe_id]
 
         # Lazy load from file
-        recipe_file = self.kb_root / "recipes" / f"{recipe_id}.yaml"
-        if not recipe_file.exists():
-            recipe_file = self._find_recipe_file(recipe_id)
-            if recipe_file is None:
-                return None
+        recipe_file = self._lookup_path("recipe", recipe_id)
+        if recipe_file is None:
+            return None
 
         try:
-            data = self._load_yaml_file(recipe_file)
-            if data:
-                model = self._parse_model(data, "recipe")
+            parsed = self._load_model_file(recipe_file, "recipe")
+            if parsed:
+                model = parsed[1]
                 # Cache it
                 if self.cache_enabled and self._recipes is not None:
                     self._recipes[recipe_id] = model
@@ -322,27 +415,6 @@ class KBLoader:
             self.load_errors.append(f"Failed to lazy-load recipe {recipe_id}: {e}")
             return None
 
-    def _find_recipe_file(self, recipe_id: str) -> Optional[Path]:
-        """
-        Find recipe file by scanning recipe IDs (fallback for mismatched filenames).
-        """
-        if self._recipe_index is None:
-            self._recipe_index = {}
-            recipes_dir = self.kb_root / "recipes"
-            if not recipes_dir.exists():
-                return None
-            for recipe_file in recipes_dir.glob("*.yaml"):
-                try:
-                    data = self._load_yaml_file(recipe_file)
-                    if not data:
-                        continue
-                    rid = data.get("id", recipe_file.stem)
-                    if isinstance(rid, str):
-                        self._recipe_index[rid] = recipe_file
-                except Exception as e:
-                    self.load_errors.append(f"Failed to index recipe {recipe_file.name}: {e}")
-        return self._recipe_index.get(recipe_id)
-
     def get_item(self, item_id: str) -> Optional[Any]:
         """
         Get item definition (lazy-loaded with caching).
@@ -360,41 +432,22 @@ class KBLoader:
             if item_id in self._items:
                 return self._items[item_id]
 
-        # Lazy load from file (try multiple locations)
-        # Try kb/items/<kind>/<item_id>.yaml
-        for kind in ["materials", "raw_materials", "parts", "machines"]:
-            item_file = self.kb_root / "items" / kind / f"{item_id}.yaml"
-            if item_file.exists():
-                try:
-                    data = self._load_yaml_file(item_file)
-                    if data:
-                        parse_kind = data.get("kind", "material")
-                        model = self._parse_model(data, parse_kind)
-                        # Cache it
-                        if self.cache_enabled and self._items is not None:
-                            self._items[item_id] = model
-                        return model
-                except Exception as e:
-                    self.load_errors.append(f"Failed to lazy-load item {item_id}: {e}")
-                    return None
-
-        # Try kb/imports/**/<item_id>.yaml
-        imports_dir = self.kb_root / "imports"
-        if imports_dir.exists():
-            for item_file in imports_dir.rglob(f"{item_id}.yaml"):
-                try:
-                    data = self._load_yaml_file(item_file)
-                    if data:
-                        model = self._parse_model(data, data.get("kind", "material"))
-                        # Cache it
-                        if self.cache_enabled and self._items is not None:
-                            self._items[item_id] = model
-                        return model
-                except Exception as e:
-                    self.load_errors.append(f"Failed to lazy-load item {item_id}: {e}")
-                    return None
+        # Lazy load from file (kb/items/<kind>/ first, then kb/imports/**)
+        item_file = self._lookup_path("item", item_id)
+        if item_file is None:
+            return None
 
-        return None
+        try:
+            parsed = self._load_model_file(item_file)
+            if parsed:
+                model = parsed[1]
+                # Cache it
+                if self.cache_enabled and self._items is not None:
+                    self._items[item_id] = model
+                return model
+        except Exception as e:
+            self.load_errors.append(f"Failed to lazy-load item {item_id}: {e}")
+            return None
 
     def get_bom(self, machine_id: str) -> Optional[dict]:
         """Get BOM definition or None if not found."""
@@ -402,6 +455,42 @@ class KBLoader:
             self.load_boms()
         return self.boms.get(machine_id)
 
+    def preload(self) -> None:
+        """
+        Resolve every definition up front through the lazy get_* lookups.
+
+        Unlike load_all(), each id resolves to exactly what an on-demand
+        get_process/get_recipe/get_item call would return (filename matches
+        win over declared ids), so processes forked after preloading share
+        the parsed KB without changing which definition an id refers to.
+        """
+        getters = {"process": self.get_process, "recipe": self.get_recipe, "item": self.get_item}
+        for kind, get in getters.items():
+            ids = {path.stem for path in self._lookup_files(kind)}
+            if kind not in self._eager_loaded:
+                if kind not in self._id_index:
+                    self._id_index[kind] = self._build_id_index(kind)
+                ids.update(self._id_index[kind])
+            for entry_id in sorted(ids):
+                get(entry_id)
+        if not self._boms_loaded:
+            self.load_boms()
+        if not self._units_loaded:
+            self.load_units()
+        if not self._materials_loaded:
+            self.load_material_properties()
+        self.save_disk_cache()
+
+    def resolved(self, kind: str) -> Dict[str, Any]:
+        """
+        Definitions of kind ("process", "recipe" or "item") keyed by id,
+        exactly as get_* lookups return them: eager-loaded entries plus the
+        lazy cache. Call preload() first to cover the whole KB.
+        """
+        eager = {"process": self.processes, "recipe": self.recipes, "item": self.items}[kind]
+        cache = {"process": self._processes, "recipe": self._recipes, "item": self._items}[kind]
+        return {**(cache or {}), **eager}
+
     # =========================================================================
     # Unit Conversion Support (for UnitConverter)
     # =========================================================================
@@ -416,13 +505,22 @@ class KBLoader:
 
     def get_unit_conversion(self, from_unit: str, to_unit: str) -> Optional[float]:
         """Get conversion factor from_unit -> to_unit, or None if not found."""
+        return self.unit_registry().direct_factor(from_unit, to_unit)
+
+    def unit_registry(self) -> UnitRegistry:
+        """Compiled conversion table for the loaded units (built once)."""
         if not self._units_loaded:
             self.load_units()
-        conversions = self.units.get("conversions", [])
-        for conv in conversions:
-            if conv.get("from") == from_unit and conv.get("to") == to_unit:
-                return conv.get("factor")
-        return None
+        if self._unit_registry is None or self._unit_registry_source is not self.units:
+            self._unit_registry = UnitRegistry.from_conversions(self.units.get("conversions", []))
+            self._unit_registry_source = self.units
+        return self._unit_registry
+
+    def definition_views(self) -> DefinitionViews:
+        """Shared cache of frozen process/recipe/item dicts for this loader."""
+        if self._definition_views is None:
+            self._definition_views = DefinitionViews(self)
+        return self._definition_views
 
     # =========================================================================
     # Internal Helpers
@@ -430,9 +528,15 @@ class KBLoader:
 
     def _load_yaml_file(self, path: Path) -> Optional[dict]:
         """Load YAML file and return data."""
+        if self._documents is not None and path in self._documents:
+            data = self._documents[path]
+            if not isinstance(data, dict):
+                self.load_errors.append(f"{path}: expected dict, got {type(data).__name__}")
+                return None
+            # Shallow copy: callers add metadata such as defined_in
+            return dict(data)
         try:
-            with path.open("r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
+            data = kb_yaml.load_file(path)
             if not isinstance(data, dict):
                 self.load_errors.append(f"{path}: expected dict, got {type(data).__name__}")
                 return None
@@ -441,6 +545,185 @@ class KBLoader:
             self.load_errors.append(f"{path}: failed to parse - {e}")
             return None
 
+    def _lookup_path(self, kind: str, entry_id: str) -> Optional[Path]:
+        """
+        Resolve an entry id to its file using indexes built once per loader.
+
+        Files are matched by filename (<id>.yaml) first, in LOOKUP_DIRS order,
+        then by the id declared inside the file (for id/filename mismatches).
+        The by-id index is skipped once the kind was eagerly loaded, since
+        load_all() already keys entries by declared id. Ids that resolve to
+        nothing are remembered, so repeated misses are a set lookup.
+        """
+        missing = self._missing_ids[kind]
+        if entry_id in missing:
+            return None
+
+        stems = self._stem_index.get(kind)
+        if stems is None:
+            stems = self._stem_index[kind] = {}
+            for path in self._lookup_files(kind):
+                stems.setdefault(path.stem, path)
+        path = stems.get(entry_id)
+
+        if path is None and kind not in self._eager_loaded:
+            ids = self._id_index.get(kind)
+            if ids is None:
+                ids = self._id_index[kind] = self._build_id_index(kind)
+            path = ids.get(entry_id)
+
+        if path is None:
+            missing.add(entry_id)
+        return path
+
+    def _lookup_files(self, kind: str) -> List[Path]:
+        """Files searched by lazy lookups of kind, in priority order."""
+        files: List[Path] = []
+        for subdir, recursive in LOOKUP_DIRS[kind]:
+            directory = self.kb_root / subdir
+            if not directory.exists():
+                continue
+            pattern = directory.rglob("*.yaml") if recursive else directory.glob("*.yaml")
+            files.extend(sorted(pattern))
+        return files
+
+    def _build_id_index(self, kind: str) -> Dict[str, Path]:
+        """Map declared ids to files by reading every file of kind."""
+        index: Dict[str, Path] = {}
+        for path in self._lookup_files(kind):
+            try:
+                data = self._load_data_file(path)
+                if not data:
+                    continue
+                entry_id = data.get("id", path.stem)
+                if isinstance(entry_id, str):
+                    index.setdefault(entry_id, path)
+            except Exception as e:
+                self.load_errors.append(f"Failed to index {kind} {path.name}: {e}")
+        return index
+
+    def _load_model_files(
+        self,
+        files: List[Path],
+        kind: Optional[str],
+        label: str,
+    ) -> List[Tuple[str, Any]]:
+        """
+        Load and parse files with defined_in metadata, preserving file order.
+
+        When workers > 1, files not served by the disk cache are parsed in a
+        process pool. Results and load_errors come back in file order, so
+        parallel and sequential loads produce identical results.
+        """
+        variant = _model_variant(kind, True)
+        pending = files
+        cached_results: Dict[Path, Tuple[str, Any]] = {}
+        if self._disk_cache is not None:
+            pending = []
+            for path in files:
+                cached = self._disk_cache.get(path, variant)
+                if cached is MISS:
+                    pending.append(path)
+                elif cached:
+                    cached_results[path] = cached
+
+        parsed_results: Dict[Path, Tuple[str, Any]] = {}
+        if self.workers > 1 and len(pending) >= PARALLEL_MIN_FILES:
+            tasks = [
+                (
+                    path,
+                    self._documents.get(path) if self._documents is not None else None,
+                    kind,
+                    self.kb_root,
+                    self.use_validated_models,
+                )
+                for path in pending
+            ]
+            chunksize = max(1, len(tasks) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                outcomes = pool.map(_parse_file_task, tasks, chunksize=chunksize)
+                for path, (parsed, error, yaml_errors) in zip(pending, outcomes):
+                    self.load_errors.extend(yaml_errors)
+                    if error is not None:
+                        self.load_errors.append(f"Failed to load {label} {path.name}: {error}")
+                    elif parsed:
+                        parsed_results[path] = parsed
+        else:
+            for path in pending:
+                try:
+                    parsed = self._parse_model_file(path, kind, annotate=True)
+                except Exception as e:
+                    self.load_errors.append(f"Failed to load {label} {path.name}: {e}")
+                    continue
+                if parsed:
+                    parsed_results[path] = parsed
+
+        if self._disk_cache is not None:
+            for path, parsed in parsed_results.items():
+                self._disk_cache.put(path, variant, parsed)
+
+        results = []
+        for path in files:
+            parsed = cached_results.get(path) or parsed_results.get(path)
+            if parsed:
+                results.append(parsed)
+        return results
+
+    def _load_data_file(self, path: Path) -> Optional[dict]:
+        """Load YAML file data, served from the disk cache when unchanged."""
+        if self._disk_cache is not None:
+            cached = self._disk_cache.get(path, "data")
+            if cached is not MISS:
+                return cached
+        data = self._load_yaml_file(path)
+        if data is not None and self._disk_cache is not None:
+            self._disk_cache.put(path, "data", data)
+        return data
+
+    def _load_model_file(
+        self,
+        path: Path,
+        kind: Optional[str] = None,
+        annotate: bool = False,
+    ) -> Optional[Tuple[str, Any]]:
+        """
+        Load a KB file and parse it into a model, using the disk cache.
+
+        Args:
+            path: YAML file to load
+            kind: Model kind; None infers it from the data (items)
+            annotate: If True, add defined_in metadata before parsing
+
+        Returns:
+            (entry_id, model) tuple, or None if the file is empty/invalid
+        """
+        variant = _model_variant(kind, annotate)
+        if self._disk_cache is not None:
+            cached = self._disk_cache.get(path, variant)
+            if cached is not MISS:
+                return cached
+
+        parsed = self._parse_model_file(path, kind, annotate)
+        if parsed and self._disk_cache is not None:
+            self._disk_cache.put(path, variant, parsed)
+        return parsed
+
+    def _parse_model_file(
+        self,
+        path: Path,
+        kind: Optional[str],
+        annotate: bool,
+    ) -> Optional[Tuple[str, Any]]:
+        """Read and parse a KB file into (entry_id, model), bypassing the disk cache."""
+        data = self._load_yaml_file(path)
+        if not data:
+            return None
+        if annotate:
+            data['defined_in'] = str(path.relative_to(self.kb_root.parent))
+        entry_id = data.get("id", path.stem)
+        model = self._parse_model(data, kind or data.get("kind", "material"))
+        return (entry_id, model)
+
     def _parse_model(self, data: dict, kind: str) -> Any:
         """
         Parse data into raw or validated model.
@@ -0,0 +1,36 @@
+"""
+KB YAML - Shared YAML reader for KB files
+
+Single entry point for reading KB YAML so every consumer (loader, indexer,
+queue agents, analysis scripts) gets the libyaml-accelerated loader when
+PyYAML was built with it, and falls back to the pure-Python SafeLoader
+otherwise. Both loaders share the same safe constructor and resolver, so
+results are identical (see test/unit/test_kb_yaml.py for the parity check).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, IO, Union
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as FastSafeLoader
+    HAS_LIBYAML = True
+except ImportError:  # pragma: no cover - depends on PyYAML build
+    from yaml import SafeLoader as FastSafeLoader
+    HAS_LIBYAML = False
+
+# Pure-Python loader, kept for parity checks and debugging
+PureSafeLoader = yaml.SafeLoader
+
+
+def safe_load(stream: Union[str, bytes, IO]) -> Any:
+    """Drop-in replacement for yaml.safe_load using the fastest safe loader."""
+    return yaml.load(stream, Loader=FastSafeLoader)
+
+
+def load_file(path: Path) -> Any:
+    """Read and parse a YAML file; raises on I/O or parse errors."""
+    with Path(path).open("r", encoding="utf-8") as f:
+        return safe_load(f)
@@ -31,6 +31,14 @@ def _get_process_def(kb: Any, process_id: str) -> Optional[Any]:
     return None
 
 
+def _view(kb: Any, defn: Any) -> Any:
+    """Read-only dict view of defn from the KB's DefinitionViews, if it has them."""
+    views_fn = getattr(kb, "definition_views", None)
+    if defn is None or not callable(views_fn):
+        return defn
+    return views_fn().of(defn)
+
+
 def resolve_recipe_step(step_def: Dict[str, Any], process_def: Optional[Any]) -> Dict[str, Any]:
     """
     Resolve a recipe step against a process definition using ADR-013 rules.
@@ -44,7 +52,7 @@ def resolve_recipe_step(step_def: Dict[str, Any], process_def: Optional[Any]) ->
     """
     step = _normalize_def(step_def)
     if process_def is None:
-        return dict(step)
+        return deepcopy(step)
 
     base = _normalize_def(process_def)
     resolved = deepcopy(base)
@@ -80,9 +88,9 @@ def resolve_recipe_step(step_def: Dict[str, Any], process_def: Optional[Any]) ->
                             merged[key] = value
                 resolved["time_model"] = merged
             else:
-                resolved["time_model"] = step_time_model
+                resolved["time_model"] = deepcopy(step_time_model)
         else:
-            resolved["time_model"] = step_time_model
+            resolved["time_model"] = deepcopy(step_time_model)
 
     # Apply scale multiplier if present
     scale = step.get("scale", 1.0)
@@ -112,7 +120,7 @@ def resolve_recipe_step_with_kb(step_def: Dict[str, Any], kb: Any) -> Dict[str,
         return _normalize_def(step_def)
 
     process_id = step_def["process_id"]
-    process_def = _get_process_def(kb, process_id)
+    process_def = _view(kb, _get_process_def(kb, process_id))
     if not process_def:
         resolved = _normalize_def(step_def)
         resolved["_warning"] = f"Process '{process_id}' not found in KB"
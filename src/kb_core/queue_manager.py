@@ -6,6 +6,14 @@ so prune() is largely obsolete - gaps are automatically removed when fixed.
 The pop() function can still be used for manual task-by-task workflows,
 but popped items will reappear on next index if still unresolved.
 
+Storage backends (WORK_QUEUE_BACKEND environment variable):
+- jsonl (default): out/work_queue.jsonl, rewritten under a file lock by
+  every operation
+- sqlite: out/work_queue.sqlite (see queue_store), seeded from the JSONL
+  queue on first use; single-row transactions for lease/complete/release.
+  out/work_queue.jsonl is re-exported whenever the whole queue is
+  rewritten (e.g. by the indexer) and by `queue export`.
+
 Migrated from kbtool/queue_tool.py to src/kb_core/queue_manager.py
 """
 from __future__ import annotations
@@ -14,19 +22,43 @@ import json
 import os
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import hashlib
+import threading
 
 from contextlib import contextmanager
 from functools import wraps
 import fcntl
 
+from .queue_store import SQLiteQueue
+
 WORK_QUEUE = Path("out/work_queue.jsonl")
+WORK_QUEUE_DB = Path("out/work_queue.sqlite")
 INDEX_PATH = Path("out/index.json")
 
 LOCK_PATH = Path("out/work_queue.lock")
 
 
+# Open SQLite queues by database path and thread: sqlite3 connections only
+# work in the thread that opened them (the index service calls in from
+# handler and watcher threads). Thread ids are reused, so this stays small.
+_stores: Dict[Tuple[Path, int], SQLiteQueue] = {}
+
+
+def _sqlite_store() -> Optional[SQLiteQueue]:
+    """SQLite queue when WORK_QUEUE_BACKEND=sqlite, else None (JSONL queue)."""
+    backend = os.getenv("WORK_QUEUE_BACKEND", "jsonl")
+    if backend == "jsonl":
+        return None
+    if backend != "sqlite":
+        raise ValueError(f"Unknown WORK_QUEUE_BACKEND: {backend}")
+    key = (WORK_QUEUE_DB.resolve(), threading.get_ident())
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = SQLiteQueue(key[0], seed_from=WORK_QUEUE)
+    return store
+
+
 @contextmanager
 def _locked_queue() -> None:
     LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -58,6 +90,40 @@ def _save_queue(items: List[dict]) -> None:
             f.write(json.dumps(obj) + "\n")
 
 
+def rewrite_queue(update: Callable[[List[dict]], List[dict]]) -> List[dict]:
+    """
+    Atomically replace the queue with update(current items).
+
+    Used for whole-queue rebuilds (the indexer). With the SQLite backend the
+    JSONL queue file is re-exported afterwards for file-based readers.
+    """
+    store = _sqlite_store()
+    if store is not None:
+        items = store.rewrite(update)
+        store.export_jsonl(WORK_QUEUE)
+        return items
+    with _locked_queue():
+        items = update(_load_queue())
+        _save_queue(items)
+        return items
+
+
+def import_queue(file_path: Path) -> int:
+    """Replace the SQLite queue with the entries of a JSONL queue file."""
+    store = _sqlite_store()
+    if store is None:
+        raise ValueError("queue import requires WORK_QUEUE_BACKEND=sqlite")
+    return store.import_jsonl(file_path)
+
+
+def export_queue(file_path: Optional[Path] = None) -> int:
+    """Write the SQLite queue to a JSONL file (default: out/work_queue.jsonl)."""
+    store = _sqlite_store()
+    if store is None:
+        raise ValueError("queue export requires WORK_QUEUE_BACKEND=sqlite")
+    return store.export_jsonl(file_path or WORK_QUEUE)
+
+
 def _load_index_map() -> Dict[str, str]:
     if not INDEX_PATH.exists():
         return {}
@@ -92,6 +158,9 @@ def prune_queue() -> int:
     Prune only items explicitly marked resolved/superseded.
     Retain gaps even if the corresponding id is already defined (e.g., no_recipe, missing_field).
     """
+    store = _sqlite_store()
+    if store is not None:
+        return store.prune()
     with _locked_queue():
         items = _load_queue()
         if not items:
@@ -112,6 +181,9 @@ def pop_queue() -> Optional[dict]:
     """
     Pop and return the first item in the queue.
     """
+    store = _sqlite_store()
+    if store is not None:
+        return store.pop()
     with _locked_queue():
         items = _load_queue()
         if not items:
@@ -122,6 +194,9 @@ def pop_queue() -> Optional[dict]:
 
 
 def lease_next(agent: str, ttl: int = 900, priorities: Optional[List[str]] = None) -> Optional[dict]:
+    store = _sqlite_store()
+    if store is not None:
+        return store.lease_next(agent, ttl=ttl, priorities=priorities)
     now = time.time()
     expires = now + ttl
     with _locked_queue():
@@ -172,6 +247,9 @@ def lease_next(agent: str, ttl: int = 900, priorities: Optional[List[str]] = Non
 
 
 def complete(id_value: str, agent: str) -> bool:
+    store = _sqlite_store()
+    if store is not None:
+        return store.complete(id_value, agent)
     with _locked_queue():
         items = _load_queue()
         updated = False
@@ -191,6 +269,9 @@ def complete(id_value: str, agent: str) -> bool:
 
 
 def release(id_value: str, agent: str) -> bool:
+    store = _sqlite_store()
+    if store is not None:
+        return store.release(id_value, agent)
     with _locked_queue():
         items = _load_queue()
         updated = False
@@ -209,6 +290,9 @@ def release(id_value: str, agent: str) -> bool:
 
 
 def gc(expire_ttl: int = 0, prune_done_older_than: Optional[int] = None) -> int:
+    store = _sqlite_store()
+    if store is not None:
+        return store.gc(prune_done_older_than=prune_done_older_than)
     now = time.time()
     removed = 0
     with _locked_queue():
@@ -236,6 +320,9 @@ def gc(expire_ttl: int = 0, prune_done_older_than: Optional[int] = None) -> int:
 
 
 def list_queue() -> Dict[str, int]:
+    store = _sqlite_store()
+    if store is not None:
+        return store.counts()
     items = _load_queue()
     counts: Dict[str, int] = {}
     for obj in items:
@@ -248,6 +335,9 @@ def gap_ids_present(ids: List[str]) -> Set[str]:
     wanted = set(ids)
     if not wanted:
         return set()
+    store = _sqlite_store()
+    if store is not None:
+        return store.ids_present(ids)
     items = _load_queue()
     present: Set[str] = set()
     for obj in items:
@@ -262,6 +352,9 @@ def gap_ids_present(ids: List[str]) -> Set[str]:
 def gap_id_exists(id_value: str) -> bool:
     if not id_value:
         return False
+    store = _sqlite_store()
+    if store is not None:
+        return store.id_exists(id_value)
     items = _load_queue()
     for obj in items:
         if obj.get("id") == id_value:
@@ -376,10 +469,14 @@ def add_gap(
     }
 
     # Add to queue
-    with _locked_queue():
-        items = _load_queue()
-        items.append(item)
-        _save_queue(items)
+    store = _sqlite_store()
+    if store is not None:
+        store.add_items([item])
+    else:
+        with _locked_queue():
+            items = _load_queue()
+            items.append(item)
+            _save_queue(items)
 
     # Register gap type
     _register_gap_type(gap_type, source)
@@ -471,9 +568,13 @@ def add_from_file(file_path: Path) -> int:
         _register_gap_type(gap_type, item.get("source", "manual"))
 
     # Add all items to queue
-    with _locked_queue():
-        items = _load_queue()
-        items.extend(queue_items)
-        _save_queue(items)
+    store = _sqlite_store()
+    if store is not None:
+        store.add_items(queue_items)
+    else:
+        with _locked_queue():
+            items = _load_queue()
+            items.extend(queue_items)
+            _save_queue(items)
 
     return len(queue_items)
@@ -0,0 +1,380 @@
+"""
+SQLite storage backend for the work queue.
+
+The JSONL queue (out/work_queue.jsonl) is read, parsed and rewritten in
+full under a global file lock by every queue operation. SQLiteQueue keeps
+the same queue entries in a local SQLite database in WAL mode instead:
+each entry is a row holding its JSON object plus indexed copies of the
+fields queue operations filter on (id, item key, status, reason, lease
+expiry), so leasing, completing and releasing are single-row
+transactions and readers never block writers.
+
+Entries keep their queue order (seq) and behave as they do in the JSONL
+queue; queue_manager selects the backend (WORK_QUEUE_BACKEND) and
+import_jsonl/export_jsonl convert between the two formats. Triggers keep
+per-(status, reason) counts in queue_counts, so leasing never counts or
+scans the pending entries (see lease_next).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    seq INTEGER PRIMARY KEY,
+    id TEXT,
+    item_key TEXT,
+    reason TEXT,
+    status TEXT NOT NULL,
+    lease_id TEXT,
+    lease_expires_at REAL NOT NULL DEFAULT 0,
+    completed_at REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queue_status ON queue (status, seq);
+CREATE INDEX IF NOT EXISTS queue_status_reason ON queue (status, reason, seq);
+CREATE INDEX IF NOT EXISTS queue_id ON queue (id, seq);
+CREATE INDEX IF NOT EXISTS queue_item_key ON queue (item_key, status);
+CREATE INDEX IF NOT EXISTS queue_lease_expiry ON queue (status, lease_expires_at);
+CREATE TABLE IF NOT EXISTS queue_counts (
+    status TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (status, reason)
+);
+CREATE TABLE IF NOT EXISTS queue_meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TRIGGER IF NOT EXISTS queue_count_insert AFTER INSERT ON queue BEGIN
+    INSERT INTO queue_counts VALUES (NEW.status, COALESCE(NEW.reason, ''), 1)
+        ON CONFLICT (status, reason) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS queue_count_delete AFTER DELETE ON queue BEGIN
+    UPDATE queue_counts SET n = n - 1
+        WHERE status = OLD.status AND reason = COALESCE(OLD.reason, '');
+END;
+CREATE TRIGGER IF NOT EXISTS queue_count_update AFTER UPDATE OF status, reason ON queue
+WHEN OLD.status IS NOT NEW.status OR OLD.reason IS NOT NEW.reason BEGIN
+    UPDATE queue_counts SET n = n - 1
+        WHERE status = OLD.status AND reason = COALESCE(OLD.reason, '');
+    INSERT INTO queue_counts VALUES (NEW.status, COALESCE(NEW.reason, ''), 1)
+        ON CONFLICT (status, reason) DO UPDATE SET n = n + 1;
+END;
+"""
+
+# Entries no longer counted as open gaps (see gap_ids_present)
+_CLOSED_STATUSES = ("resolved", "done", "superseded")
+
+# A pending entry is leasable unless another entry for the same item is
+# leased; checked per candidate row through the item_key index
+_NOT_BLOCKED = (
+    "NOT EXISTS (SELECT 1 FROM queue AS l WHERE l.item_key = q.item_key AND l.status = 'leased')"
+)
+
+
+def _columns(obj: dict) -> tuple:
+    """Indexed column values for a queue entry."""
+    return (
+        obj.get("id"),
+        obj.get("item_id") or obj.get("id"),
+        obj.get("reason"),
+        obj.get("status") or "pending",
+        obj.get("lease_id"),
+        obj.get("lease_expires_at") or 0,
+        obj.get("completed_at") or 0,
+        json.dumps(obj),
+    )
+
+
+def _read_jsonl(path: Path) -> List[dict]:
+    items: List[dict] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                items.append(json.loads(line))
+            except Exception:
+                continue
+    return items
+
+
+def _release_lease(obj: dict) -> None:
+    obj["status"] = "pending"
+    obj.pop("lease_id", None)
+    obj.pop("lease_expires_at", None)
+
+
+class SQLiteQueue:
+    """Work queue entries stored in a SQLite database."""
+
+    def __init__(self, db_path: Path, seed_from: Optional[Path] = None):
+        """
+        Open (creating if needed) the queue database at db_path.
+
+        A new, empty database is seeded from the JSONL queue at seed_from,
+        if it exists, so switching backends keeps the current queue.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        with self._write() as conn:
+            # Under the write lock, so concurrent openers seed exactly once
+            # and never replace a queue another worker already uses
+            if conn.execute("SELECT 1 FROM queue_meta WHERE key = 'seeded'").fetchone() is None:
+                empty = conn.execute("SELECT 1 FROM queue LIMIT 1").fetchone() is None
+                if empty and seed_from is not None and Path(seed_from).exists():
+                    self._insert(conn, _read_jsonl(Path(seed_from)))
+                conn.execute("INSERT INTO queue_meta VALUES ('seeded', '1')")
+            if conn.execute("SELECT 1 FROM queue_meta WHERE key = 'counts'").fetchone() is None:
+                # Database created before queue_counts existed
+                conn.execute("DELETE FROM queue_counts")
+                conn.execute(
+                    "INSERT INTO queue_counts SELECT status, COALESCE(reason, ''), COUNT(*) "
+                    "FROM queue GROUP BY status, COALESCE(reason, '')"
+                )
+                conn.execute("INSERT INTO queue_meta VALUES ('counts', '1')")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Transaction holding the database write lock from the start."""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # -- row helpers --------------------------------------------------------
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, items: List[dict]) -> None:
+        conn.executemany(
+            "INSERT INTO queue (id, item_key, reason, status, lease_id, lease_expires_at, "
+            "completed_at, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [_columns(obj) for obj in items],
+        )
+
+    @staticmethod
+    def _update(conn: sqlite3.Connection, seq: int, obj: dict) -> None:
+        conn.execute(
+            "UPDATE queue SET id = ?, item_key = ?, reason = ?, status = ?, lease_id = ?, "
+            "lease_expires_at = ?, completed_at = ?, data = ? WHERE seq = ?",
+            (*_columns(obj), seq),
+        )
+
+    def _expire(self, conn: sqlite3.Connection, status: str, now: float) -> None:
+        """Return entries of status whose lease expired to pending."""
+        rows = conn.execute(
+            "SELECT seq, data FROM queue WHERE status = ? AND lease_expires_at < ?",
+            (status, now),
+        ).fetchall()
+        for seq, data in rows:
+            obj = json.loads(data)
+            _release_lease(obj)
+            self._update(conn, seq, obj)
+
+    # -- queue operations ---------------------------------------------------
+
+    def all_items(self) -> List[dict]:
+        rows = self._conn.execute("SELECT data FROM queue ORDER BY seq")
+        return [json.loads(data) for (data,) in rows]
+
+    def rewrite(self, update: Callable[[List[dict]], List[dict]]) -> List[dict]:
+        """Replace all entries with update(current entries) in one transaction."""
+        with self._write() as conn:
+            rows = conn.execute("SELECT data FROM queue ORDER BY seq")
+            items = update([json.loads(data) for (data,) in rows])
+            conn.execute("DELETE FROM queue")
+            self._insert(conn, items)
+        return items
+
+    def add_items(self, items: List[dict]) -> None:
+        with self._write() as conn:
+            self._insert(conn, items)
+
+    def pop(self) -> Optional[dict]:
+        with self._write() as conn:
+            row = conn.execute("SELECT seq, data FROM queue ORDER BY seq LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM queue WHERE seq = ?", (row[0],))
+        return json.loads(row[1])
+
+    def prune(self) -> int:
+        with self._write() as conn:
+            cursor = conn.execute("DELETE FROM queue WHERE reason IN ('resolved', 'superseded')")
+        return cursor.rowcount
+
+    def lease_next(self, agent: str, ttl: int = 900, priorities: Optional[List[str]] = None) -> Optional[dict]:
+        """
+        Lease a pending entry to agent, spreading agents as the JSONL queue does.
+
+        Pending entries are bucketed by priority (position of their reason
+        in priorities, other reasons last) and each agent's hash picks a
+        bucket with the JSONL queue's odds, read from queue_counts. Within
+        the bucket the pick is a seq seek at the same relative position
+        rather than the exact offset, which keeps leasing independent of
+        queue size; entries whose item is leased are skipped, moving on
+        to later entries and then later buckets.
+        """
+        now = time.time()
+        with self._write() as conn:
+            self._expire(conn, "leased", now)
+
+            pending = dict(
+                conn.execute("SELECT reason, n FROM queue_counts WHERE status = 'pending' AND n > 0")
+            )
+            if priorities:
+                rank = {p: i for i, p in enumerate(priorities)}
+                reasons = sorted(pending, key=lambda r: (rank.get(r, len(rank)), r))
+                buckets = [("reason IS ?", (reason or None,), pending[reason]) for reason in reasons]
+            else:
+                buckets = [("1", (), sum(pending.values()))]
+            total = sum(count for _, _, count in buckets)
+            if not total:
+                return None
+
+            # Hash-based entry point distributes agents across the queue
+            offset = int(hashlib.sha256(agent.encode()).hexdigest(), 16) % total
+            first = 0
+            while offset >= buckets[first][2]:
+                offset -= buckets[first][2]
+                first += 1
+
+            row = None
+            for i in range(len(buckets)):
+                cond, params, count = buckets[(first + i) % len(buckets)]
+                lo, hi = conn.execute(
+                    f"SELECT (SELECT MIN(seq) FROM queue WHERE status = 'pending' AND {cond}), "
+                    f"(SELECT MAX(seq) FROM queue WHERE status = 'pending' AND {cond})",
+                    params + params,
+                ).fetchone()
+                if lo is None:
+                    continue
+                starts = [lo]
+                if i == 0:
+                    starts.insert(0, lo + offset * (hi - lo + 1) // count)
+                for start in starts:
+                    row = conn.execute(
+                        f"SELECT seq, data FROM queue AS q WHERE q.status = 'pending' AND {cond} "
+                        f"AND q.seq >= ? AND {_NOT_BLOCKED} ORDER BY q.seq LIMIT 1",
+                        (*params, start),
+                    ).fetchone()
+                    if row is not None:
+                        break
+                if row is not None:
+                    break
+            if row is None:
+                return None
+
+            seq, data = row
+            target = json.loads(data)
+            target["status"] = "leased"
+            target["lease_id"] = agent
+            target["lease_expires_at"] = now + ttl
+            self._update(conn, seq, target)
+        return target
+
+    def _first_match(self, conn: sqlite3.Connection, id_value: str, allowed: Callable[[dict], bool]):
+        for seq, data in conn.execute(
+            "SELECT seq, data FROM queue WHERE id = ? ORDER BY seq", (id_value,)
+        ).fetchall():
+            obj = json.loads(data)
+            if allowed(obj):
+                return seq, obj
+        return None, None
+
+    def complete(self, id_value: str, agent: str) -> bool:
+        def allowed(obj: dict) -> bool:
+            return not (obj.get("status") in ("leased", "resolved") and obj.get("lease_id") != agent)
+
+        with self._write() as conn:
+            seq, obj = self._first_match(conn, id_value, allowed)
+            if obj is None:
+                return False
+            obj["status"] = "done"
+            obj["completed_at"] = time.time()
+            self._update(conn, seq, obj)
+        return True
+
+    def release(self, id_value: str, agent: str) -> bool:
+        def allowed(obj: dict) -> bool:
+            return not (obj.get("status") == "leased" and obj.get("lease_id") != agent)
+
+        with self._write() as conn:
+            seq, obj = self._first_match(conn, id_value, allowed)
+            if obj is None:
+                return False
+            _release_lease(obj)
+            self._update(conn, seq, obj)
+        return True
+
+    def gc(self, prune_done_older_than: Optional[int] = None) -> int:
+        now = time.time()
+        with self._write() as conn:
+            self._expire(conn, "leased", now)
+            # Resolved entries whose lease expired: agent failed to complete
+            self._expire(conn, "resolved", now)
+            if not prune_done_older_than:
+                return 0
+            cursor = conn.execute(
+                "DELETE FROM queue WHERE status = 'done' AND completed_at < ?",
+                (now - prune_done_older_than,),
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*) FROM queue GROUP BY status ORDER BY MIN(seq)"
+        )
+        return {status: count for status, count in rows}
+
+    def ids_present(self, ids: List[str]) -> Set[str]:
+        """Ids among ids with an entry that is still open."""
+        wanted = list(set(ids))
+        if not wanted:
+            return set()
+        marks = ", ".join("?" for _ in wanted)
+        closed = ", ".join("?" for _ in _CLOSED_STATUSES)
+        rows = self._conn.execute(
+            f"SELECT DISTINCT id FROM queue WHERE id IN ({marks}) AND status NOT IN ({closed})",
+            (*wanted, *_CLOSED_STATUSES),
+        )
+        return {id_value for (id_value,) in rows}
+
+    def id_exists(self, id_value: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM queue WHERE id = ? LIMIT 1", (id_value,)).fetchone()
+        return row is not None
+
+    # -- JSONL compatibility ------------------------------------------------
+
+    def import_jsonl(self, path: Path) -> int:
+        """Replace all entries with those in a JSONL queue file."""
+        items = _read_jsonl(Path(path))
+        self.rewrite(lambda _: items)
+        return len(items)
+
+    def export_jsonl(self, path: Path) -> int:
+        """Write all entries to a JSONL queue file (atomically replaced)."""
+        items = self.all_items()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for obj in items:
+                f.write(json.dumps(obj) + "\n")
+        os.replace(tmp_path, path)
+        return len(items)
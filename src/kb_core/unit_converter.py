@@ -10,10 +10,11 @@ Supports:
 4. Compound unit parsing (kg/hr, kWh/kg)
 5. Time unit normalization (min/s/day -> hr)
 6. Conversion validation (can_convert checks)
+7. Compiled conversion table (UnitRegistry: inverse + transitive factors)
 """
 from __future__ import annotations
 
-from typing import Optional, Protocol
+from typing import Dict, Iterable, List, Optional, Protocol, Tuple
 
 
 class KBLoaderProtocol(Protocol):
@@ -221,6 +222,120 @@ def normalize_rate_to_hours(rate: float, time_unit: str) -> float:
         raise ValueError(f"Unknown time unit: {time_unit}")
 
 
+class UnitRegistry:
+    """
+    Compiled unit conversion table.
+
+    Built once from the KB conversion list, it answers any from -> to
+    factor with a single dict lookup. The table holds:
+    - direct KB conversions (first entry wins, like a scan of the list)
+    - their inverses, where no direct entry exists
+    - transitive compositions (g -> kg -> tonne), only between units of the
+      same dimension (per get_unit_category; unknown units join any)
+
+    Direct and inverse entries keep the exact KB factor and divide for
+    inverses, so results match converting with the KB list directly.
+    """
+
+    # Spellings treated as the same unit (implicit 1.0 conversions)
+    ALIASES = {"liter": "L"}
+
+    def __init__(self, conversions: Iterable[Tuple[str, str, Optional[float]]] = ()):
+        # (from, to) -> factor as written in the KB (may be None)
+        self._direct: Dict[Tuple[str, str], Optional[float]] = {}
+        # (from, to) -> (factor, divide): result = qty / factor if divide else qty * factor
+        self._table: Dict[Tuple[str, str], Tuple[float, bool]] = {}
+
+        for from_unit, to_unit, factor in conversions:
+            self._direct.setdefault((from_unit, to_unit), factor)
+        for (from_unit, to_unit), factor in self._direct.items():
+            if factor is not None:
+                self._table.setdefault((from_unit, to_unit), (factor, False))
+        for (from_unit, to_unit), factor in self._direct.items():
+            if factor:
+                self._table.setdefault((to_unit, from_unit), (factor, True))
+        for alias, unit in self.ALIASES.items():
+            self._table.setdefault((alias, unit), (1.0, False))
+            self._table.setdefault((unit, alias), (1.0, False))
+        self._compose()
+
+    @classmethod
+    def from_conversions(cls, conversions: Iterable[dict]) -> "UnitRegistry":
+        """Build from KB conversion entries ({from, to, factor} dicts)."""
+        return cls(
+            (conv.get("from"), conv.get("to"), conv.get("factor"))
+            for conv in conversions or []
+            if isinstance(conv, dict)
+        )
+
+    def direct_factor(self, from_unit: str, to_unit: str) -> Optional[float]:
+        """KB factor for exactly from_unit -> to_unit, or None."""
+        return self._direct.get((from_unit, to_unit))
+
+    def lookup(self, from_unit: str, to_unit: str) -> Optional[Tuple[float, bool]]:
+        """Compiled (factor, divide) entry for from_unit -> to_unit, or None."""
+        return self._table.get((from_unit, to_unit))
+
+    def convert(self, quantity: float, from_unit: str, to_unit: str) -> Optional[float]:
+        """Convert by factor alone (no item context); None if not convertible."""
+        if from_unit == to_unit:
+            return quantity
+        entry = self._table.get((from_unit, to_unit))
+        if entry is None:
+            return None
+        factor, divide = entry
+        return quantity / factor if divide else quantity * factor
+
+    def can_convert(self, from_unit: str, to_unit: str) -> bool:
+        return from_unit == to_unit or (from_unit, to_unit) in self._table
+
+    def dimension(self, unit: str) -> Optional[str]:
+        """Unit category, inferred from convertible units for units not in the known sets."""
+        category = get_unit_category(self.ALIASES.get(unit, unit))
+        if category is not None:
+            return category
+        for (from_unit, to_unit) in self._table:
+            if from_unit == unit:
+                category = get_unit_category(to_unit)
+                if category is not None:
+                    return category
+        return None
+
+    def _compose(self) -> None:
+        """Add multi-step conversions between units of the same dimension."""
+        adjacency: Dict[str, List[Tuple[str, float]]] = {}
+        for (from_unit, to_unit), (factor, divide) in self._table.items():
+            if factor == 0:
+                continue
+            multiplier = 1.0 / factor if divide else factor
+            adjacency.setdefault(from_unit, []).append((to_unit, multiplier))
+
+        composed: Dict[Tuple[str, str], Tuple[float, bool]] = {}
+        for start in adjacency:
+            start_category = get_unit_category(start)
+            # Breadth-first: the shortest chain defines the composed factor
+            reached = {start: 1.0}
+            frontier = [start]
+            while frontier:
+                next_frontier = []
+                for unit in frontier:
+                    for neighbour, multiplier in adjacency.get(unit, ()):
+                        if neighbour in reached:
+                            continue
+                        category = get_unit_category(neighbour)
+                        if start_category and category and category != start_category:
+                            continue
+                        # An unknown start unit takes the dimension of the first known unit
+                        start_category = start_category or category
+                        reached[neighbour] = reached[unit] * multiplier
+                        next_frontier.append(neighbour)
+                frontier = next_frontier
+            for unit, factor in reached.items():
+                if unit != start and (start, unit) not in self._table:
+                    composed[(start, unit)] = (factor, False)
+        self._table.update(composed)
+
+
 class UnitConverter:
     """
     Handles unit conversions for the simulation.
@@ -234,10 +349,21 @@ class UnitConverter:
     - Compound unit parsing
     - Time normalization
     - Conversion validation
+
+    Factor lookups use the KB's compiled UnitRegistry when the loader
+    provides one (KBLoader.unit_registry), else memoized pairwise
+    get_unit_conversion probes. Item densities and masses are cached per
+    converter, so a converter should not outlive edits to the KB it reads.
     """
 
     def __init__(self, kb_loader: KBLoaderProtocol):
         self.kb = kb_loader
+        registry_fn = getattr(kb_loader, "unit_registry", None)
+        self._registry: Optional[UnitRegistry] = registry_fn() if callable(registry_fn) else None
+        # Memoized lookups: (from, to) -> (factor, divide) or None; item_id -> value
+        self._factors: Dict[Tuple[str, str], Optional[Tuple[float, bool]]] = {}
+        self._densities: Dict[str, Optional[float]] = {}
+        self._unit_masses: Dict[str, Tuple[bool, Optional[float]]] = {}
 
     def _safe_get(self, obj: any, *keys: str, default=None):
         """
@@ -297,9 +423,10 @@ class UnitConverter:
             return quantity
 
         # Try direct conversion via conversion factors
-        result = self._try_direct_conversion(quantity, from_unit, to_unit)
-        if result is not None:
-            return result
+        entry = self._factor(from_unit, to_unit)
+        if entry is not None:
+            factor, divide = entry
+            return quantity / factor if divide else quantity * factor
 
         # Try mass <-> volume conversion via material density
         if item_id:
@@ -365,14 +492,56 @@ class UnitConverter:
         return False
 
     def _has_conversion_factor(self, from_unit: str, to_unit: str) -> bool:
-        """Check if direct conversion factor exists."""
-        factor = self.kb.get_unit_conversion(from_unit, to_unit)
-        if factor is not None:
-            return True
+        """Check if a conversion factor (direct, reverse or composed) exists."""
+        return self._factor(from_unit, to_unit) is not None
 
-        # Try reverse
-        reverse_factor = self.kb.get_unit_conversion(to_unit, from_unit)
-        return reverse_factor is not None
+    def _factor(self, from_unit: str, to_unit: str) -> Optional[Tuple[float, bool]]:
+        """
+        (factor, divide) converting from_unit -> to_unit, or None.
+
+        The result is qty / factor when divide is set (a reverse KB
+        conversion), else qty * factor.
+        """
+        key = (from_unit, to_unit)
+        try:
+            return self._factors[key]
+        except KeyError:
+            pass
+        if self._registry is not None:
+            entry = self._registry.lookup(from_unit, to_unit)
+        else:
+            entry = None
+            factor = self.kb.get_unit_conversion(from_unit, to_unit)
+            if factor is not None:
+                entry = (factor, False)
+            else:
+                reverse_factor = self.kb.get_unit_conversion(to_unit, from_unit)
+                if reverse_factor is not None:
+                    entry = (reverse_factor, True)
+        self._factors[key] = entry
+        return entry
+
+    def _density(self, material_name: str) -> Optional[float]:
+        """Material density in kg/m³ (cached)."""
+        try:
+            return self._densities[material_name]
+        except KeyError:
+            density = self.kb.get_material_density(material_name)
+            self._densities[material_name] = density
+            return density
+
+    def _unit_mass(self, item_id: str) -> Tuple[bool, Optional[float]]:
+        """(item exists, mass per count unit) for an item (cached)."""
+        try:
+            return self._unit_masses[item_id]
+        except KeyError:
+            item = self.kb.get_item(item_id)
+            if not item:
+                result = (False, None)
+            else:
+                result = (True, self._safe_get(item, "mass_kg", "mass_per_unit", "mass"))
+            self._unit_masses[item_id] = result
+            return result
 
     def _is_mass_volume_pair(self, unit1: str, unit2: str) -> bool:
         """Check if units are mass/volume pair."""
@@ -392,33 +561,22 @@ class UnitConverter:
         """Check if material has density data."""
         # Try using item_id as material name
         # TODO: Look up item definition to get material_class field
-        density = self.kb.get_material_density(item_id)
-        return density is not None
+        return self._density(item_id) is not None
 
     def _has_item_mass_or_volume(self, item_id: str) -> bool:
         """Check if item has mass_kg or volume data."""
-        item = self.kb.get_item(item_id)
-        if not item:
-            return False
-
-        mass_per_unit = self._safe_get(item, "mass_kg", "mass_per_unit", "mass")
-        return mass_per_unit is not None
+        exists, mass_per_unit = self._unit_mass(item_id)
+        return exists and mass_per_unit is not None
 
     def _try_direct_conversion(
         self, quantity: float, from_unit: str, to_unit: str
     ) -> Optional[float]:
         """Try direct conversion using conversion factors from KB."""
-        # Try direct conversion
-        factor = self.kb.get_unit_conversion(from_unit, to_unit)
-        if factor is not None:
-            return quantity * factor
-
-        # Try reverse conversion (from -> to via to -> from)
-        reverse_factor = self.kb.get_unit_conversion(to_unit, from_unit)
-        if reverse_factor is not None:
-            return quantity / reverse_factor
-
-        return None
+        entry = self._factor(from_unit, to_unit)
+        if entry is None:
+            return None
+        factor, divide = entry
+        return quantity / factor if divide else quantity * factor
 
     def _try_mass_volume_conversion(
         self, quantity: float, from_unit: str, to_unit: str, item_id: str
@@ -429,7 +587,7 @@ class UnitConverter:
         # TODO: Look up item definition to get material_class field
         material_name = item_id
 
-        density = self.kb.get_material_density(material_name)
+        density = self._density(material_name)
         if density is None:
             return None
 
@@ -465,12 +623,10 @@ class UnitConverter:
         self, quantity: float, from_unit: str, to_unit: str, item_id: str
     ) -> Optional[float]:
         """Try count <-> mass/volume conversion using item definition."""
-        item = self.kb.get_item(item_id)
-        if not item:
-            return None
-
         # Check if item has mass_kg, mass_per_unit, or mass
-        mass_per_unit = self._safe_get(item, "mass_kg", "mass_per_unit", "mass")
+        exists, mass_per_unit = self._unit_mass(item_id)
+        if not exists:
+            return None
 
         # count <-> unit are synonyms (1:1 conversion)
         if from_unit in COUNT_UNITS and to_unit in COUNT_UNITS:
@@ -490,33 +646,11 @@ class UnitConverter:
 
     def _convert_to_standard_mass(self, quantity: float, unit: str) -> Optional[float]:
         """Convert any mass unit to kg."""
-        if unit == "kg":
-            return quantity
-        factor = self.kb.get_unit_conversion(unit, "kg")
-        if factor:
-            return quantity * factor
-
-        # Try reverse
-        reverse = self.kb.get_unit_conversion("kg", unit)
-        if reverse:
-            return quantity / reverse
-
-        return None
+        return self._try_direct_conversion(quantity, unit, "kg") if unit != "kg" else quantity
 
     def _convert_from_standard_mass(self, kg: float, unit: str) -> Optional[float]:
         """Convert kg to any mass unit."""
-        if unit == "kg":
-            return kg
-        factor = self.kb.get_unit_conversion("kg", unit)
-        if factor:
-            return kg * factor
-
-        # Try reverse
-        reverse = self.kb.get_unit_conversion(unit, "kg")
-        if reverse:
-            return kg / reverse
-
-        return None
+        return self._try_direct_conversion(kg, "kg", unit) if unit != "kg" else kg
 
     def _convert_to_standard_volume(
         self, quantity: float, unit: str
@@ -528,16 +662,7 @@ class UnitConverter:
 
         if unit == "m3":
             return quantity
-        factor = self.kb.get_unit_conversion(unit, "m3")
-        if factor:
-            return quantity * factor
-
-        # Try reverse
-        reverse = self.kb.get_unit_conversion("m3", unit)
-        if reverse:
-            return quantity / reverse
-
-        return None
+        return self._try_direct_conversion(quantity, unit, "m3")
 
     def _convert_from_standard_volume(
         self, m3: float, unit: str
@@ -549,16 +674,7 @@ class UnitConverter:
 
         if unit == "m3":
             return m3
-        factor = self.kb.get_unit_conversion("m3", unit)
-        if factor:
-            return m3 * factor
-
-        # Try reverse
-        reverse = self.kb.get_unit_conversion(unit, "m3")
-        if reverse:
-            return m3 / reverse
-
-        return None
+        return self._try_direct_conversion(m3, "m3", unit)
 
     def normalize_to_standard_unit(
         self, quantity: float, unit: str, item_id: Optional[str] = None
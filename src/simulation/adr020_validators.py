@@ -151,8 +151,7 @@ def validate_machine_id_is_machine_kind(process: Dict[str, Any], kb_items: Dict[
         if not item:
             continue
 
-        item_def = item.model_dump() if hasattr(item, "model_dump") else item
-        kind = item_def.get("kind")
+        kind = item.get("kind") if isinstance(item, dict) else getattr(item, "kind", None)
 
         if kind != "machine":
             issues.append(ValidationIssue(
@@ -26,12 +26,16 @@ try:
 except ImportError:  # pragma: no cover
     yaml = None
 
+from src.kb_core import kb_yaml
 from src.kb_core.kb_loader import KBLoader
+from src.kb_core.kb_graph import EdgeType, KBGraph
 from src.kb_core.calculations import calculate_duration, calculate_energy, CalculationError
 from src.kb_core.unit_converter import UnitConverter
 from src.kb_core.schema import Quantity
 from src.kb_core.override_resolver import resolve_recipe_step_with_kb
 from src.simulation.engine import SimulationEngine
+from src.simulation.runbook_session import RunbookSession
+from src.simulation.snapshot_journal import read_snapshot_data
 
 REPO_ROOT = Path(__file__).parent.parent.parent
 KB_ROOT = REPO_ROOT / "kb"
@@ -61,6 +65,8 @@ _RUNBOOK_OUTPUT_MODE = "raw"
 _SUPPRESSING_PROCESS_BLOCK = False
 _SUPPRESSING_STATUS_BLOCK = False
 _LAST_ADVANCE_RESULT: Optional[dict[str, Any]] = None
+# Live engines while a runbook runs with --defer-saves
+_RUNBOOK_SESSION: Optional[RunbookSession] = None
 _DISPLAY_WIDTH = 120
 _ART_DELIM = "<<<ART>>>"
 
@@ -194,6 +200,11 @@ def load_or_create_simulation(sim_id: str, kb_loader: KBLoader, create: bool = F
     Returns:
         SimulationEngine instance
     """
+    if _RUNBOOK_SESSION is not None and not create:
+        engine = _RUNBOOK_SESSION.get(sim_id)
+        if engine is not None:
+            return engine
+
     sim_dir = SIMULATIONS_DIR / sim_id
     snapshot_file = sim_dir / "snapshot.json"
     exists = snapshot_file.exists()
@@ -215,10 +226,27 @@ def load_or_create_simulation(sim_id: str, kb_loader: KBLoader, create: bool = F
         if not success:
             _emit(f"Error: Failed to load simulation '{sim_id}'", _COLOR_ERROR, is_error=True)
             sys.exit(1)
+        if _RUNBOOK_SESSION is not None:
+            _RUNBOOK_SESSION.add(engine)
 
     return engine
 
 
+def _peek_simulation(sim_id: str, kb_loader: KBLoader) -> SimulationEngine:
+    """Load a simulation for reading only; changes to it are never saved."""
+    if _RUNBOOK_SESSION is not None:
+        engine = _RUNBOOK_SESSION.peek(sim_id)
+        if engine is not None:
+            return engine
+    return load_or_create_simulation(sim_id, kb_loader)
+
+
+def _persist_runbook_session() -> None:
+    """Write deferred runbook saves to disk (no-op without --defer-saves)."""
+    if _RUNBOOK_SESSION is not None:
+        _RUNBOOK_SESSION.persist()
+
+
 # ============================================================================
 # Runbook helpers
 # ============================================================================
@@ -342,7 +370,7 @@ def _load_runbook_commands(path: Path) -> list[dict]:
     commands: list[dict] = []
 
     for heading, block in blocks:
-        data = yaml.safe_load(block)
+        data = kb_yaml.safe_load(block)
         if data is None:
             continue
         if isinstance(data, dict):
@@ -373,6 +401,8 @@ def _get_arg(args: dict, *names: str) -> Optional[Any]:
 
 def _reset_simulation(sim_id: str, kb_loader: KBLoader) -> int:
     sim_dir = SIMULATIONS_DIR / sim_id
+    if _RUNBOOK_SESSION is not None:
+        _RUNBOOK_SESSION.discard(sim_id)
     if sim_dir.exists():
         shutil.rmtree(sim_dir)
     return cmd_init(argparse.Namespace(sim_id=sim_id), kb_loader)
@@ -532,7 +562,7 @@ def _emit_story_phase_summary(phase: dict[str, Any], sim_id: Optional[str], kb_l
 
     complexity_map: dict[str, int] = {}
     if sim_id:
-        engine = load_or_create_simulation(sim_id, kb_loader)
+        engine = _peek_simulation(sim_id, kb_loader)
         complexity_map = dict(engine.state.complexity_scores or {})
 
     if outputs:
@@ -581,7 +611,7 @@ def _emit_story_phase_summary(phase: dict[str, Any], sim_id: Optional[str], kb_l
                 color = _COLOR_DIM
             _emit(f"{line}", color)
         if sim_id:
-            engine = load_or_create_simulation(sim_id, kb_loader)
+            engine = _peek_simulation(sim_id, kb_loader)
             for item_id, entry in outputs.items():
                 if not item_id.endswith("_v0"):
                     continue
@@ -677,7 +707,7 @@ def _get_sim_metrics(sim_id: str, kb_loader: KBLoader) -> Optional[dict[str, flo
     sim_dir = SIMULATIONS_DIR / sim_id
     if not (sim_dir / "snapshot.json").exists():
         return None
-    engine = load_or_create_simulation(sim_id, kb_loader)
+    engine = _peek_simulation(sim_id, kb_loader)
     import_mass, _unknown = _get_import_mass_kgs(engine, kb_loader)
     return {
         "time_hours": engine.state.current_time_hours,
@@ -690,7 +720,7 @@ def _emit_checkpoint(sim_id: str, kb_loader: KBLoader) -> None:
     sim_dir = SIMULATIONS_DIR / sim_id
     if not (sim_dir / "snapshot.json").exists():
         return
-    engine = load_or_create_simulation(sim_id, kb_loader)
+    engine = _peek_simulation(sim_id, kb_loader)
     time_days = engine.state.current_time_hours / 24.0
     import_mass, _unknown = _get_import_mass_kgs(engine, kb_loader)
     inventory_count = len(engine.state.inventory)
@@ -811,6 +841,7 @@ def _run_runbook(
                     continue_on_error=continue_on_error,
                     story_mode=story_mode,
                 )
+                _persist_runbook_session()
                 if result != 0 and not continue_on_error:
                     return result
                 continue
@@ -868,6 +899,7 @@ def _run_runbook(
                     "note": _COLOR_NOTE,
                 }
                 if story_mode and heading and heading != last_heading:
+                    _persist_runbook_session()
                     _emit_story_phase_summary(phase, default_sim_id, kb_loader, last_heading)
                     phase = {
                         "imports": {},
@@ -910,6 +942,9 @@ def _run_runbook(
                 _emit(f"[dry-run] {cmd_name} {cmd_args}", _COLOR_DIM)
                 continue
 
+            if cmd_name in _SIM_FILE_READERS:
+                _persist_runbook_session()
+
             if story_mode and cmd_name == "sim.import":
                 item = _get_arg(cmd_args, "item")
                 qty = _get_arg(cmd_args, "quantity") or 0.0
@@ -977,6 +1012,10 @@ def _run_runbook(
         stack.pop()
 
 
+# Runbook commands that read simulation files rather than a loaded engine
+_SIM_FILE_READERS = {"sim.list", "sim.visualize"}
+
+
 def cmd_runbook(args, kb_loader: KBLoader):
     """Execute a Markdown runbook with sim-runbook YAML blocks."""
     if hasattr(sys.stdout, "reconfigure"):
@@ -993,9 +1032,13 @@ def cmd_runbook(args, kb_loader: KBLoader):
     builtins.print = runbook_print
 
     runbook_path = Path(args.file)
-    global _RUNBOOK_OUTPUT_MODE
+    global _RUNBOOK_OUTPUT_MODE, _RUNBOOK_SESSION
     previous_mode = _RUNBOOK_OUTPUT_MODE
+    previous_session = _RUNBOOK_SESSION
     _RUNBOOK_OUTPUT_MODE = args.format
+    if getattr(args, "defer_saves", False):
+        # Keep engines live across steps; persist at checkpoints and on exit
+        _RUNBOOK_SESSION = RunbookSession()
     try:
         return _run_runbook(
             runbook_path,
@@ -1008,8 +1051,12 @@ def cmd_runbook(args, kb_loader: KBLoader):
             story_mode=args.format == "story",
         )
     finally:
-        _RUNBOOK_OUTPUT_MODE = previous_mode
-        builtins.print = original_print
+        try:
+            _persist_runbook_session()
+        finally:
+            _RUNBOOK_SESSION = previous_session
+            _RUNBOOK_OUTPUT_MODE = previous_mode
+            builtins.print = original_print
 
 # ============================================================================
 # Commands
@@ -1274,7 +1321,7 @@ def _calculate_readiness(process_model, converter: UnitConverter) -> Dict[str, s
     return readiness
 
 
-def _build_dependency_tree(item_id: str, kb_loader: KBLoader, depth: int = 0, max_depth: int = 10, visited: set = None) -> dict:
+def _build_dependency_tree(item_id: str, kb_loader: KBLoader, depth: int = 0, max_depth: int = 10, visited: set = None, graph: Optional[KBGraph] = None) -> dict:
     """
     Recursively build dependency tree for an item.
 
@@ -1290,9 +1337,15 @@ def _build_dependency_tree(item_id: str, kb_loader: KBLoader, depth: int = 0, ma
     - is_import: bool
     - is_boundary: bool (raw material)
     - warnings: list of strings
+
+    Recipe steps and process inputs are read from the KB graph, built from
+    kb_loader's own lookups when graph is not given (see
+    KBGraph.build_resolved) so it agrees with kb_loader.get_item.
     """
     if visited is None:
         visited = set()
+    if graph is None:
+        graph = KBGraph.build_resolved(kb_loader)
 
     if depth > max_depth:
         return {
@@ -1335,14 +1388,13 @@ def _build_dependency_tree(item_id: str, kb_loader: KBLoader, depth: int = 0, ma
         visited.remove(item_id)
         return result
 
-    recipe = kb_loader.get_recipe(recipe_id)
-    if not recipe:
+    recipe_node = graph.node("recipe", recipe_id)
+    if recipe_node is None or not graph.is_defined(recipe_node):
         result["warnings"].append(f"Recipe {recipe_id} not found")
         result["is_import"] = True
         visited.remove(item_id)
         return result
 
-    recipe_dict = recipe.model_dump() if hasattr(recipe, "model_dump") else recipe
     result["recipe_id"] = recipe_id
     result["processes"] = []
     result["inputs"] = []
@@ -1350,30 +1402,24 @@ def _build_dependency_tree(item_id: str, kb_loader: KBLoader, depth: int = 0, ma
     # Collect inputs from recipe steps
     all_inputs = {}
 
-    for step in recipe_dict.get("steps", []):
-        process_id = step.get("process_id")
-        if not process_id:
-            continue
-
+    for process_node in graph.successors(recipe_node, (EdgeType.RECIPE_PROCESS,)):
+        process_id = graph.entry_id(process_node)
         result["processes"].append(process_id)
 
-        process = kb_loader.get_process(process_id)
-        if not process:
+        if not graph.is_defined(process_node):
             result["warnings"].append(f"Process {process_id} not found")
             continue
 
-        process_dict = process.model_dump() if hasattr(process, "model_dump") else process
-
         # Check if boundary process
-        if process_dict.get("process_type") == "boundary":
+        if graph.subtype(process_node) == "boundary":
             result["is_boundary"] = True
 
         # Aggregate inputs from all processes
-        for inp in process_dict.get("inputs", []):
-            inp_dict = inp if isinstance(inp, dict) else inp.model_dump()
-            inp_id = inp_dict.get("item_id")
-            inp_qty = float(inp_dict.get("qty", 0))
-            inp_unit = inp_dict.get("unit", "kg")
+        for edge_id in graph.out_edges(process_node, (EdgeType.PROCESS_INPUT,)):
+            edge = graph.edge(edge_id)
+            inp_id = graph.entry_id(edge.target)
+            inp_qty = edge.qty or 0.0
+            inp_unit = edge.unit or "kg"
 
             if inp_id not in all_inputs:
                 all_inputs[inp_id] = {"qty": 0, "unit": inp_unit}
@@ -1381,7 +1427,7 @@ def _build_dependency_tree(item_id: str, kb_loader: KBLoader, depth: int = 0, ma
 
     # Recursively build dependency trees for inputs
     for inp_id, inp_info in all_inputs.items():
-        child_tree = _build_dependency_tree(inp_id, kb_loader, depth + 1, max_depth, visited.copy())
+        child_tree = _build_dependency_tree(inp_id, kb_loader, depth + 1, max_depth, visited.copy(), graph)
         child_tree["qty"] = inp_info["qty"]
         child_tree["unit"] = inp_info["unit"]
         result["inputs"].append(child_tree)
@@ -1571,7 +1617,8 @@ def cmd_plan(args, kb_loader: KBLoader):
         # Build dependency tree
         print("DEPENDENCY TREE:")
         print()
-        dep_tree = _build_dependency_tree(target_item_id, kb_loader, max_depth=8)
+        graph = KBGraph.build_resolved(kb_loader)
+        dep_tree = _build_dependency_tree(target_item_id, kb_loader, max_depth=8, graph=graph)
         _print_dependency_tree(dep_tree)
         print()
 
@@ -2073,7 +2120,7 @@ def cmd_list(args, kb_loader: KBLoader):
             if snapshot_file.exists():
                 sim_time = None
                 try:
-                    snapshot_data = json.loads(snapshot_file.read_text(encoding="utf-8"))
+                    snapshot_data = read_snapshot_data(sim_dir)
                     sim_time = snapshot_data.get("state", {}).get("current_time_hours")
                 except Exception:
                     sim_time = None
@@ -2238,6 +2285,11 @@ def add_sim_subcommands(subparsers):
     runbook_parser.add_argument('--dry-run', action='store_true', help='Print commands without executing')
     runbook_parser.add_argument('--continue-on-error', action='store_true', help='Continue after errors')
     runbook_parser.add_argument('--format', choices=['raw', 'story'], default='raw', help='Output format for runbook execution')
+    runbook_parser.add_argument(
+        '--defer-saves',
+        action='store_true',
+        help='Keep simulations in memory across steps; save at nested runbook/phase boundaries and on exit',
+    )
 
     return sim_parser
 
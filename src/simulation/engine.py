@@ -20,8 +20,9 @@ import os
 import sys
 import uuid
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from copy import deepcopy
+from dataclasses import asdict
 
 # Configure debug logger for recipe scheduling
 logger = logging.getLogger(__name__)
@@ -36,6 +37,7 @@ from src.simulation.models import (
     ProcessScheduledEvent,
     ProcessStartEvent,
     ProcessCompleteEvent,
+    ProcessArchivedEvent,
     RecipeStartEvent,
     RecipeCompleteEvent,
     BuildEvent,
@@ -45,18 +47,24 @@ from src.simulation.models import (
     ErrorEvent,
     KBGapEvent,
 )
-from src.simulation.scheduler import Scheduler, EventType
+from src.simulation.scheduler import Scheduler, SchedulerEvent, EventType
 from src.simulation.machine_reservations import MachineReservationManager
 from src.simulation.recipe_orchestrator import RecipeOrchestrator
+from src.simulation.recipe_plan import RecipePlan, RecipePlanCache, StepPlan
 from src.simulation.persistence import (
+    EngineCheckpoint,
     build_snapshot,
+    restore_checkpoint,
     restore_orchestrator,
     restore_reservation_manager,
     restore_scheduler,
-    SimulationSnapshot,
+    take_checkpoint,
 )
+from src.simulation.snapshot_journal import SNAPSHOT_MODES, SnapshotJournal
+from src.simulation.snapshot_sections import SectionedSnapshot, encode_sectioned, write_sectioned
 from src.simulation.adr020_validators import validate_process_adr020, validate_recipe_adr020
 from src.kb_core.kb_loader import KBLoader
+from src.kb_core.definition_views import DefinitionViews
 from src.kb_core.unit_converter import UnitConverter, COUNT_UNITS
 from src.kb_core.calculations import calculate_duration, calculate_energy, is_mass_tracked_unit
 from src.kb_core.schema import Quantity, RawProcess, RawEnergyModel
@@ -77,10 +85,20 @@ class SimulationEngine:
     - Override resolution per ADR-013
     """
 
-    def __init__(self, sim_id: str, kb_loader: KBLoader, sim_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        sim_id: str,
+        kb_loader: KBLoader,
+        sim_dir: Optional[Path] = None,
+        completed_retention: Optional[int] = None,
+        snapshot_mode: Optional[str] = None,
+    ):
         self.sim_id = sim_id
         self.kb = kb_loader
         self.converter = UnitConverter(kb_loader)
+        # Read-only definition dicts, shared across engines on the same loader
+        views_fn = getattr(kb_loader, "definition_views", None)
+        self.defs = views_fn() if callable(views_fn) else DefinitionViews(kb_loader)
 
         # Simulation state
         self.state = SimulationState(sim_id=sim_id)
@@ -97,25 +115,56 @@ class SimulationEngine:
         self.snapshot_file = self.sim_dir / "snapshot.json"
         self.event_log_file = self.sim_dir / "events.jsonl"
 
+        # "full" rewrites snapshot.json on every save; "incremental" appends
+        # deltas to a compact base (see snapshot_journal); "sectioned" writes
+        # an offset-indexed file whose history loads lazily (see snapshot_sections)
+        if snapshot_mode is None:
+            snapshot_mode = os.getenv("SIM_SNAPSHOT_MODE", "full")
+        if snapshot_mode not in SNAPSHOT_MODES:
+            raise ValueError(
+                f"Unknown snapshot mode {snapshot_mode!r}; expected one of {SNAPSHOT_MODES}"
+            )
+        self.snapshot_mode = snapshot_mode
+        self._journal = SnapshotJournal(self.sim_dir)
+        # Sectioned snapshot this engine was restored from (lazy history source)
+        self._sections: Optional[SectionedSnapshot] = None
+        # Deferred saves (see defer_saves): last saved state and its events
+        self.save_count = 0
+        self._checkpoint: Optional[EngineCheckpoint] = None
+        self._pending_events: List[str] = []
+        self._persisted_count = 0
+
         # Only log sim start for NEW simulations
         # (load() will skip this if loading existing)
         self._is_new_sim = not self.snapshot_file.exists()
 
         # ADR-020 components
+        # completed_retention bounds in-memory completed processes; older
+        # completions are spilled to the event log (see _archive_completed_process)
+        self.completed_retention = completed_retention
         self.scheduler = Scheduler()
+        self._configure_scheduler()
         self.orchestrator = RecipeOrchestrator(self.scheduler)
+        # Compiled recipe plans, shared across engines on the same KB
+        self.recipe_plans = RecipePlanCache.shared(self.defs)
 
         # Recipe event tracking (runtime only; not persisted)
         self._recipe_quantities: Dict[str, int] = {}
         self._recipe_outputs_accum: Dict[str, Dict[str, InventoryItem]] = {}
         self._recipe_energy_accum: Dict[str, float] = {}
         self._logged_recipe_completions: set[str] = set()
+        self._run_plans: Dict[str, RecipePlan] = {}
         # Reservation manager will be initialized when machines are available
+        # (or restored lazily from a sectioned snapshot, see load())
+        self._reservation_loader: Optional[Callable[[], MachineReservationManager]] = None
         self.reservation_manager = None
         # Enable ADR-020 mode (event-driven scheduling, machine reservations, recipe orchestration)
         self.adr020_mode = True
 
-        # Register event handlers (must happen during event processing)
+        self._register_handlers()
+
+    def _register_handlers(self) -> None:
+        """Register event handlers on the current scheduler (must happen during event processing)."""
         # Order matters: handlers are called in registration order
         self.scheduler.register_handler(
             EventType.PROCESS_START,
@@ -152,10 +201,7 @@ class SimulationEngine:
         if not process_model:
             return
 
-        if hasattr(process_model, 'model_dump'):
-            process_def = process_model.model_dump()
-        else:
-            process_def = process_model
+        process_def = self.defs.of(process_model)
 
         # Try to consume inputs from inventory
         inputs_available = True
@@ -200,13 +246,7 @@ class SimulationEngine:
         if not process_run_id:
             return
 
-        # Find process in completed list
-        process_run = None
-        for proc in self.scheduler.completed_processes:
-            if proc.process_run_id == process_run_id:
-                process_run = proc
-                break
-
+        process_run = self.scheduler.get_completed_process(process_run_id)
         if not process_run:
             return
 
@@ -217,10 +257,7 @@ class SimulationEngine:
             # Fallback to process definition units when units weren't captured
             process_model = self.kb.get_process(process_run.process_id)
             if process_model:
-                if hasattr(process_model, 'model_dump'):
-                    process_def = process_model.model_dump()
-                else:
-                    process_def = process_model
+                process_def = self.defs.of(process_model)
 
                 for outp in process_def.get("outputs", []):
                     output_units[outp.get("item_id")] = outp.get("unit", "kg")
@@ -228,7 +265,7 @@ class SimulationEngine:
         process_model = self.kb.get_process(process_run.process_id)
         process_def = None
         if process_model:
-            process_def = process_model.model_dump() if hasattr(process_model, "model_dump") else process_model
+            process_def = self.defs.of(process_model)
 
         input_complexities = []
         for item_id in process_run.inputs_consumed.keys():
@@ -323,9 +360,8 @@ class SimulationEngine:
         process_run = None
         if process_run_id in self.scheduler.active_processes:
             process_run = self.scheduler.active_processes[process_run_id]
-        elif any(p.process_run_id == process_run_id for p in self.scheduler.completed_processes):
-            process_run = next(p for p in self.scheduler.completed_processes
-                             if p.process_run_id == process_run_id)
+        else:
+            process_run = self.scheduler.get_completed_process(process_run_id)
 
         if not process_run or not process_run.recipe_run_id:
             return  # Not a recipe step
@@ -345,85 +381,48 @@ class SimulationEngine:
             return
 
         recipe_def = recipe_run.recipe_def
+        plan = self._recipe_run_plan(recipe_run)
 
         for step_idx in ready_steps:
             if step_idx >= len(recipe_def.get('steps', [])):
                 continue
 
             step = recipe_def['steps'][step_idx]
-
-            resolved_process = self.resolve_step(step)
-            process_id = resolved_process.get('id') or step.get('process_id')
-
-            if not process_id:
+            schedule = self._recipe_step_schedule(step, plan.steps[step_idx] if plan else None)
+            if not schedule["process_id"]:
                 continue
 
-            # Calculate scale and duration
-            scale = 1.0
-            duration_hours = None
-            output_quantity = None
-            output_unit = None
-            step_has_io_override = bool(step.get("inputs") or step.get("outputs") or step.get("byproducts"))
-
-            time_model = resolved_process.get('time_model', {})
-            if time_model.get('type') == 'batch':
-                duration_hours = time_model.get('hr_per_batch', 1.0)
-                step_scale = step.get("scale", 1.0)
-                if step_scale != 1.0:
-                    duration_hours *= step_scale
-            elif time_model.get('type') == 'linear_rate':
-                pass
-
-            outputs = resolved_process.get('outputs', [])
-            if outputs:
-                first_output = outputs[0]
-                output_quantity = first_output.get('qty', first_output.get('quantity', 1.0))
-                output_unit = first_output.get('unit', 'kg')
-
-                if not step_has_io_override:
-                    base_process = self.kb.get_process(process_id)
-                    if base_process:
-                        base_def = base_process.model_dump() if hasattr(base_process, 'model_dump') else base_process
-                        base_outputs = base_def.get('outputs', [])
-                        if base_outputs:
-                            base_output = base_outputs[0]
-                            base_qty = base_output.get('qty', base_output.get('quantity', 1.0))
-                            if base_qty:
-                                scale = output_quantity / base_qty
-
-                if time_model.get('type') == 'linear_rate' and duration_hours is None:
-                    rate = time_model.get('rate', 1.0)
-                    scaling_basis = time_model.get('scaling_basis')
-                    if scaling_basis and scaling_basis in [o.get('item_id') for o in outputs]:
-                        for outp in outputs:
-                            if outp.get('item_id') == scaling_basis:
-                                outp_qty = outp.get('qty', outp.get('quantity', 1.0))
-                                duration_hours = outp_qty / rate if rate > 0 else 1.0
-                                break
-
-            if duration_hours is None:
-                duration_hours = 1.0
-
             # Schedule at event.time (when dependency was satisfied)
             # Since we're in an event handler, scheduler.current_time = event.time,
             # so this won't cause "past" errors
-            schedule_time = event.time
-
             result = self.start_process(
-                process_id=process_id,
-                scale=scale,
-                start_time=schedule_time,
-                duration_hours=duration_hours,
-                output_quantity=output_quantity,
-                output_unit=output_unit,
+                **schedule,
+                start_time=event.time,
                 recipe_run_id=recipe_run_id,
                 step_index=step_idx,
-                process_def_override=resolved_process,
             )
 
             if result['success']:
                 self.orchestrator.schedule_step(recipe_run_id, step_idx, result['process_run_id'])
 
+    @property
+    def reservation_manager(self) -> Optional[MachineReservationManager]:
+        loader = self._reservation_loader
+        if loader is not None:
+            self._reservation_loader = None
+            self._reservation_manager = loader()
+        return self._reservation_manager
+
+    @reservation_manager.setter
+    def reservation_manager(self, manager: Optional[MachineReservationManager]) -> None:
+        self._reservation_loader = None
+        self._reservation_manager = manager
+
+    @property
+    def reservations_deferred(self) -> bool:
+        """True while a lazily restored reservation manager is unloaded."""
+        return self._reservation_loader is not None
+
     def _init_reservation_manager(self) -> None:
         """Initialize reservation manager with current machine inventory."""
         if self.reservation_manager is not None:
@@ -433,7 +432,7 @@ class SimulationEngine:
         for item_id, inv_item in self.state.inventory.items():
             item_model = self.kb.get_item(item_id)
             if item_model:
-                item_def = item_model.model_dump() if hasattr(item_model, 'model_dump') else item_model
+                item_def = self.defs.of(item_model)
                 if item_def.get('kind') == 'machine':
                     if inv_item.unit in COUNT_UNITS:
                         machine_capacities[item_id] = inv_item.quantity
@@ -454,7 +453,7 @@ class SimulationEngine:
         for item_id, inv_item in self.state.inventory.items():
             item_model = self.kb.get_item(item_id)
             if item_model:
-                item_def = item_model.model_dump() if hasattr(item_model, 'model_dump') else item_model
+                item_def = self.defs.of(item_model)
                 if item_def.get('kind') == 'machine':
                     if inv_item.unit in COUNT_UNITS:
                         machine_capacities[item_id] = inv_item.quantity
@@ -502,7 +501,7 @@ class SimulationEngine:
         converted = self.converter.convert(quantity, unit, "kg", item_id)
         if converted is None:
             item_model = self.kb.get_item(item_id)
-            item_def = item_model.model_dump() if hasattr(item_model, "model_dump") else item_model
+            item_def = self.defs.of(item_model)
             item_unit = item_def.get("unit") if isinstance(item_def, dict) else None
             raise ValueError(
                 f"Provenance conversion failed ({context}): "
@@ -772,7 +771,7 @@ class SimulationEngine:
                 "message": f"Process '{process_id}' not found in KB",
             }
 
-        process_def = process_model.model_dump() if hasattr(process_model, 'model_dump') else process_model
+        process_def = self.defs.of(process_model)
         if process_def_override:
             process_def = process_def_override
 
@@ -858,13 +857,13 @@ class SimulationEngine:
                 # Try material_class matching
                 requested_item_model = self.kb.get_item(requested_item_id)
                 if requested_item_model:
-                    requested_item_def = requested_item_model.model_dump() if hasattr(requested_item_model, 'model_dump') else requested_item_model
+                    requested_item_def = self.defs.of(requested_item_model)
                     requested_class = requested_item_def.get("material_class")
                     if requested_class:
                         for inv_item_id in self.state.inventory.keys():
                             inv_item_model = self.kb.get_item(inv_item_id)
                             if inv_item_model:
-                                inv_item_def = inv_item_model.model_dump() if hasattr(inv_item_model, 'model_dump') else inv_item_model
+                                inv_item_def = self.defs.of(inv_item_model)
                                 if inv_item_def.get("material_class") == requested_class:
                                     if self.has_item(inv_item_id, needed_quantity, unit):
                                         actual_item_id = inv_item_id
@@ -884,7 +883,7 @@ class SimulationEngine:
         # Calculate outputs
         outputs = process_def.get("outputs", [])
         if not outputs and process_def_override is not None:
-            base_process = process_model.model_dump() if hasattr(process_model, "model_dump") else process_model
+            base_process = self.defs.of(process_model)
             outputs = base_process.get("outputs", []) if isinstance(base_process, dict) else outputs
         outputs_pending = {}
 
@@ -1088,6 +1087,98 @@ class SimulationEngine:
         """
         return resolve_recipe_step_with_kb(step_def, self.kb)
 
+    def _recipe_run_plan(self, recipe_run) -> Optional[RecipePlan]:
+        """Compiled plan for a recipe run, if its steps match the current KB recipe."""
+        try:
+            plan = self.recipe_plans.get(recipe_run.recipe_id)
+        except ValueError:
+            return None
+        if plan is None:
+            return None
+        if self._run_plans.get(recipe_run.recipe_run_id) is not plan:
+            # Restored runs (or a KB change mid-run): check the steps still match
+            if not plan.matches(recipe_run.recipe_def):
+                return None
+            self._run_plans[recipe_run.recipe_run_id] = plan
+        return plan
+
+    def _recipe_step_schedule(
+        self,
+        step: Dict[str, Any],
+        step_plan: Optional[StepPlan] = None,
+    ) -> Dict[str, Any]:
+        """
+        Work out start_process arguments for a recipe step.
+
+        Uses the step's compiled plan when there is one (only the step scale
+        is applied per run), else resolves the step against the KB.
+
+        Returns:
+            Dict with process_id, scale, duration_hours, output_quantity,
+            output_unit and process_def_override (the resolved step)
+        """
+        step_scale = step.get("scale", 1.0)
+        if step_plan is not None and step_plan.resolved is not None:
+            resolved_process = step_plan.resolved_at(step_scale)
+            process_id = resolved_process.get('id') or step.get('process_id')
+            base_qty = step_plan.base_output_qty
+            step_has_io_override = step_plan.io_override
+        else:
+            # Resolve step to apply overrides (ADR-013)
+            resolved_process = self.resolve_step(step)
+            process_id = resolved_process.get('id') or step.get('process_id')
+            base_def = self.defs.process(process_id) if process_id else None
+            base_outputs = base_def.get('outputs', []) if base_def else []
+            base_qty = None
+            if base_outputs:
+                base_qty = base_outputs[0].get('qty', base_outputs[0].get('quantity', 1.0))
+            step_has_io_override = bool(step.get("inputs") or step.get("outputs") or step.get("byproducts"))
+
+        scale = 1.0
+        duration_hours = None
+        output_quantity = None
+        output_unit = None
+
+        # Always try to calculate duration_hours from time_model
+        time_model = resolved_process.get('time_model', {})
+        if time_model.get('type') == 'batch':
+            duration_hours = time_model.get('hr_per_batch', 1.0)
+            if step_scale != 1.0:
+                duration_hours *= step_scale
+
+        outputs = resolved_process.get('outputs', [])
+        if outputs:
+            first_output = outputs[0]
+            output_quantity = first_output.get('qty', first_output.get('quantity', 1.0))
+            output_unit = first_output.get('unit', 'kg')
+
+            if not step_has_io_override and base_qty:
+                scale = output_quantity / base_qty
+
+            # For linear_rate, calculate duration from outputs
+            if time_model.get('type') == 'linear_rate' and duration_hours is None:
+                rate = time_model.get('rate', 1.0)
+                scaling_basis = time_model.get('scaling_basis')
+                if scaling_basis and scaling_basis in [o.get('item_id') for o in outputs]:
+                    for outp in outputs:
+                        if outp.get('item_id') == scaling_basis:
+                            outp_qty = outp.get('qty', outp.get('quantity', 1.0))
+                            duration_hours = outp_qty / rate if rate > 0 else 1.0
+                            break
+
+        # Fallback if duration still not set
+        if duration_hours is None:
+            duration_hours = 1.0
+
+        return {
+            "process_id": process_id,
+            "scale": scale,
+            "duration_hours": duration_hours,
+            "output_quantity": output_quantity,
+            "output_unit": output_unit,
+            "process_def_override": resolved_process,
+        }
+
     def run_recipe(
         self,
         recipe_id: str,
@@ -1109,23 +1200,26 @@ class SimulationEngine:
             Dict with success, recipe_run_id, and orchestration info
         """
         # Validate recipe exists
-        recipe_model = self.kb.get_recipe(recipe_id)
-        if not recipe_model:
+        plan = self.recipe_plans.get(recipe_id)
+        if plan is None:
             return {
                 "success": False,
                 "error": "kb_gap",
                 "message": f"Recipe '{recipe_id}' not found in KB",
             }
 
-        recipe_def = recipe_model.model_dump() if hasattr(recipe_model, 'model_dump') else recipe_model
+        recipe_def = plan.recipe
         if quantity != 1:
-            for step in recipe_def.get("steps", []):
-                step["scale"] = step.get("scale", 1.0) * quantity
-
-        # ADR-020 validation
-        validation_issues = validate_recipe_adr020(recipe_def)
-        errors = [i for i in validation_issues if i.level == ValidationLevel.ERROR]
+            recipe_def = {
+                **recipe_def,
+                "steps": [
+                    {**step, "scale": step.get("scale", 1.0) * quantity}
+                    for step in recipe_def.get("steps", [])
+                ],
+            }
 
+        # ADR-020 validation (cached with the plan)
+        errors = plan.errors
         if errors:
             return {
                 "success": False,
@@ -1145,10 +1239,12 @@ class SimulationEngine:
             recipe_dict=recipe_def,
             target_item_id=recipe_def.get('target_item_id', 'unknown'),
             start_time=start_time,
+            dependency_graph=plan.dependency_graph,
         )
 
         # Track and log recipe start for traceability
         self._recipe_quantities[recipe_run_id] = quantity
+        self._run_plans[recipe_run_id] = plan
         self._log_event(
             RecipeStartEvent(
                 recipe_id=recipe_id,
@@ -1162,15 +1258,9 @@ class SimulationEngine:
 
         scheduled_count = 0
         for step_idx in ready_steps:
-            recipe_run = self.orchestrator.get_recipe_run(recipe_run_id)
-            step = dict(recipe_def['steps'][step_idx])
-
-            # Resolve step to apply overrides (ADR-013)
-            resolved_process = self.resolve_step(step)
-
-            # Get process_id from resolved process
-            process_id = resolved_process.get('id') or step.get('process_id')
-            if not process_id:
+            step = recipe_def['steps'][step_idx]
+            schedule = self._recipe_step_schedule(step, plan.steps[step_idx])
+            if not schedule["process_id"]:
                 return {
                     "success": False,
                     "error": "invalid_recipe",
@@ -1178,69 +1268,12 @@ class SimulationEngine:
                     "failed_step": step_idx,
                 }
 
-            # Calculate duration from resolved process (respects step overrides)
-            # Get default output quantity and unit from first output
-            outputs = resolved_process.get('outputs', [])
-            output_quantity = None
-            output_unit = None
-            duration_hours = None
-            scale = 1.0
-            step_has_io_override = bool(step.get("inputs") or step.get("outputs") or step.get("byproducts"))
-
-            # Always try to calculate duration_hours from time_model
-            time_model = resolved_process.get('time_model', {})
-            if time_model.get('type') == 'batch':
-                duration_hours = time_model.get('hr_per_batch', 1.0)
-                step_scale = step.get("scale", 1.0)
-                if step_scale != 1.0:
-                    duration_hours *= step_scale
-            elif time_model.get('type') == 'linear_rate':
-                # Need outputs to calculate from rate
-                pass
-
-            if outputs:
-                first_output = outputs[0]
-                output_quantity = first_output.get('qty', first_output.get('quantity', 1.0))
-                output_unit = first_output.get('unit', 'kg')
-
-                if not step_has_io_override:
-                    base_process = self.kb.get_process(process_id)
-                    if base_process:
-                        base_def = base_process.model_dump() if hasattr(base_process, 'model_dump') else base_process
-                        base_outputs = base_def.get('outputs', [])
-                        if base_outputs:
-                            base_output = base_outputs[0]
-                            base_qty = base_output.get('qty', base_output.get('quantity', 1.0))
-                            if base_qty:
-                                scale = output_quantity / base_qty
-
-                # For linear_rate, calculate duration from outputs
-                if time_model.get('type') == 'linear_rate' and duration_hours is None:
-                    rate = time_model.get('rate', 1.0)
-                    scaling_basis = time_model.get('scaling_basis')
-                    if scaling_basis and scaling_basis in [o.get('item_id') for o in outputs]:
-                        # Find output with this basis
-                        for outp in outputs:
-                            if outp.get('item_id') == scaling_basis:
-                                outp_qty = outp.get('qty', outp.get('quantity', 1.0))
-                                duration_hours = outp_qty / rate if rate > 0 else 1.0
-                                break
-
-            # Fallback if duration still not set
-            if duration_hours is None:
-                duration_hours = 1.0
-
             # Schedule step process with calculated duration
             result = self.start_process(
-                process_id=process_id,
-                scale=scale,
+                **schedule,
                 start_time=start_time,
-                duration_hours=duration_hours,
-                output_quantity=output_quantity,
-                output_unit=output_unit,
                 recipe_run_id=recipe_run_id,
                 step_index=step_idx,
-                process_def_override=resolved_process,
             )
 
             if result['success']:
@@ -1411,7 +1444,7 @@ class SimulationEngine:
         if not recipe_model:
             return 0.0
 
-        recipe_def = recipe_model.model_dump() if hasattr(recipe_model, "model_dump") else recipe_model
+        recipe_def = self.defs.of(recipe_model)
         total_energy = 0.0
         warn_zero = os.getenv("SIM_WARN_ZERO_RECIPE_ENERGY", "1") != "0"
 
@@ -1421,11 +1454,10 @@ class SimulationEngine:
             if not process_model:
                 continue
 
-            process_def = process_model.model_dump() if hasattr(process_model, "model_dump") else process_model
+            process_def = self.defs.of(process_model)
             merged_energy = self._merge_energy_model(process_def.get("energy_model"), step.get("energy_model"))
 
-            process_def["energy_model"] = merged_energy
-            step_process = RawProcess(**process_def)
+            step_process = RawProcess(**{**process_def, "energy_model": merged_energy})
 
             step_inputs = step.get("inputs") or process_def.get("inputs", [])
             step_outputs = step.get("outputs") or process_def.get("outputs", [])
@@ -1576,10 +1608,7 @@ class SimulationEngine:
                 outputs_dict = {}
 
                 if process_model:
-                    if hasattr(process_model, 'model_dump'):
-                        process_def = process_model.model_dump()
-                    else:
-                        process_def = process_model
+                    process_def = self.defs.of(process_model)
 
                     for outp in process_def.get("outputs", []):
                         item_id = outp.get("item_id")
@@ -1634,7 +1663,97 @@ class SimulationEngine:
         # Track what happened
         completed_processes = []
         started_processes = []
+        self._record_processed_events(processed_events, started_processes, completed_processes)
+
+        # Update engine state time
+        self.state.current_time_hours = target_time
+        self._log_state_snapshot(target_time)
+
+        return {
+            "new_time": target_time,
+            "events_processed": len(processed_events),
+            "processes_started": len(started_processes),
+            "processes_completed": len(completed_processes),
+            "completed_count": len(completed_processes),  # For backward compatibility
+            "completed": completed_processes,
+            "started": started_processes,
+            "total_energy_kwh": self.state.total_energy_kwh,
+        }
 
+    def run_until_idle(
+        self,
+        max_time: Optional[float] = None,
+        stop_on: Optional[Callable[[SchedulerEvent], bool]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process scheduled events until the event queue is empty.
+
+        Equivalent to calling advance_time() up to each next event time, but
+        results are aggregated and a single state snapshot is logged at the end.
+
+        Args:
+            max_time: Absolute time limit (hours); events after it stay queued
+                and the clock stops at max_time
+            stop_on: Predicate on processed events; stops after the event time
+                at which it first returns True
+
+        Returns:
+            Dict with aggregate results (same keys as advance_time, plus
+            "idle" = event queue drained and "stopped" = stop_on matched)
+        """
+        completed_processes: List[Dict[str, Any]] = []
+        started_processes: List[Dict[str, Any]] = []
+        events_processed = 0
+        stopped = False
+
+        scheduler = self.scheduler
+        while scheduler.event_queue:
+            next_event = scheduler.event_queue.peek()
+            if max_time is not None and next_event.time > max_time:
+                break
+            # Guard against events queued in the past
+            target_time = max(next_event.time, scheduler.current_time)
+            processed_events = scheduler.advance_to(target_time)
+            events_processed += len(processed_events)
+            self._record_processed_events(processed_events, started_processes, completed_processes)
+            if stop_on is not None and any(stop_on(event) for event in processed_events):
+                stopped = True
+                break
+
+        if (
+            not stopped
+            and max_time is not None
+            and scheduler.event_queue
+            and scheduler.current_time < max_time
+        ):
+            scheduler.advance_to(max_time)
+
+        self.state.current_time_hours = scheduler.current_time
+        self._log_state_snapshot(scheduler.current_time)
+
+        return {
+            "new_time": scheduler.current_time,
+            "events_processed": events_processed,
+            "processes_started": len(started_processes),
+            "processes_completed": len(completed_processes),
+            "completed_count": len(completed_processes),
+            "completed": completed_processes,
+            "started": started_processes,
+            "total_energy_kwh": self.state.total_energy_kwh,
+            "idle": not scheduler.event_queue,
+            "stopped": stopped,
+        }
+
+    def _record_processed_events(
+        self,
+        processed_events: List[SchedulerEvent],
+        started_processes: List[Dict[str, Any]],
+        completed_processes: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Book energy, release machines and log lifecycle events for events
+        processed by the scheduler, appending summaries to the given lists.
+        """
         for event in processed_events:
             if event.event_type == EventType.PROCESS_START:
                 # Process started - book energy
@@ -1645,9 +1764,9 @@ class SimulationEngine:
                 process_run = None
                 if process_run_id in self.scheduler.active_processes:
                     process_run = self.scheduler.active_processes[process_run_id]
-                elif any(p.process_run_id == process_run_id for p in self.scheduler.completed_processes):
+                else:
                     # Process completed in the same advance_to call
-                    process_run = next(p for p in self.scheduler.completed_processes if p.process_run_id == process_run_id)
+                    process_run = self.scheduler.get_completed_process(process_run_id)
 
                 if not process_run:
                     # Process was canceled (e.g., due to insufficient inputs)
@@ -1658,10 +1777,7 @@ class SimulationEngine:
                     # Backward compatibility: calculate if not persisted
                     process_model = self.kb.get_process(process_run.process_id)
                     if process_model:
-                        if hasattr(process_model, 'model_dump'):
-                            process_def = process_model.model_dump()
-                        else:
-                            process_def = process_model
+                        process_def = self.defs.of(process_model)
 
                         if process_def.get('energy_model'):
                             try:
@@ -1721,13 +1837,7 @@ class SimulationEngine:
                 # NOTE: Outputs are now added to inventory by _add_process_outputs event handler
                 process_run_id = event.data.get("process_run_id")
 
-                # Find process in completed list
-                process_run = None
-                for proc in self.scheduler.completed_processes:
-                    if proc.process_run_id == process_run_id:
-                        process_run = proc
-                        break
-
+                process_run = self.scheduler.get_completed_process(process_run_id)
                 if process_run:
                     # Release machine reservations
                     self.reservation_manager.remove_reservation(process_run_id)
@@ -1744,10 +1854,7 @@ class SimulationEngine:
                     else:
                         process_model = self.kb.get_process(process_run.process_id)
                         if process_model:
-                            if hasattr(process_model, 'model_dump'):
-                                process_def = process_model.model_dump()
-                            else:
-                                process_def = process_model
+                            process_def = self.defs.of(process_model)
 
                             for outp in process_def.get("outputs", []):
                                 item_id = outp.get("item_id")
@@ -1820,6 +1927,7 @@ class SimulationEngine:
                                 )
                             )
                             self._logged_recipe_completions.add(recipe_run_id)
+                            self._run_plans.pop(recipe_run_id, None)
 
                     completed_processes.append({
                         "process_run_id": process_run_id,
@@ -1833,13 +1941,11 @@ class SimulationEngine:
                     # _schedule_dependent_recipe_steps event handler, which is called
                     # during event processing when scheduler.current_time = event.time
 
-        # Update engine state time
-        self.state.current_time_hours = target_time
-
-        # Log state snapshot
+    def _log_state_snapshot(self, time_hours: float) -> None:
+        """Log a state snapshot event."""
         self._log_event(
             StateSnapshotEvent(
-                time_hours=target_time,
+                time_hours=time_hours,
                 inventory=self.state.inventory,
                 active_processes=self.state.active_processes,
                 machines_built=self.state.machines_built,
@@ -1849,34 +1955,134 @@ class SimulationEngine:
             )
         )
 
-        return {
-            "new_time": target_time,
-            "events_processed": len(processed_events),
-            "processes_started": len(started_processes),
-            "processes_completed": len(completed_processes),
-            "completed_count": len(completed_processes),  # For backward compatibility
-            "completed": completed_processes,
-            "started": started_processes,
-            "total_energy_kwh": self.state.total_energy_kwh,
-        }
     def _log_event(self, event: Any) -> None:
         """Add event to buffer."""
         self.event_buffer.append(event)
 
+    def _configure_scheduler(self) -> None:
+        """Apply completed-process retention to the current scheduler."""
+        self.scheduler.completed_retention = self.completed_retention
+        self.scheduler.on_completed_evicted = self._archive_completed_process
+
+    def _archive_completed_process(self, process_run) -> None:
+        """Spill a completed process evicted by the scheduler to the event log."""
+        self._log_event(
+            ProcessArchivedEvent(
+                process_run_id=process_run.process_run_id,
+                process_run=asdict(process_run),
+                time_hours=self.scheduler.current_time,
+            )
+        )
+
     def save(self) -> None:
         """Persist snapshot and flush event buffer to sidecar log."""
-        if self.event_buffer:
-            with self.event_log_file.open("a", encoding="utf-8") as f:
-                for event in self.event_buffer:
-                    if hasattr(event, "model_dump"):
-                        event_dict = event.model_dump()
-                    else:
-                        event_dict = event
-                    f.write(json.dumps(event_dict) + "\n")
-            self.event_buffer.clear()
+        self.save_count += 1
+        # Encode now: events may reference live state (e.g. inventory)
+        lines = self._encode_events(self.event_buffer)
+        self.event_buffer.clear()
+        if self._checkpoint is not None:
+            # Deferred: keep the saved state in memory until persist()
+            self._pending_events.extend(lines)
+            self._checkpoint = take_checkpoint(self)
+            return
+
+        self._write_events(lines)
+        self._write_snapshot()
+        self._persisted_count = self.save_count
+
+    @staticmethod
+    def _encode_events(events: List[Any]) -> List[str]:
+        lines = []
+        for event in events:
+            if hasattr(event, "model_dump"):
+                event_dict = event.model_dump()
+            else:
+                event_dict = event
+            lines.append(json.dumps(event_dict) + "\n")
+        return lines
+
+    def _write_events(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        with self.event_log_file.open("a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def _write_snapshot(self) -> None:
+        if self.snapshot_mode == "incremental":
+            self._journal.save(self)
+            return
+
+        if self.snapshot_mode == "sectioned":
+            write_sectioned(self.snapshot_file, encode_sectioned(self, self._sections))
+        else:
+            snapshot = build_snapshot(self)
+            self.snapshot_file.write_text(snapshot.model_dump_json(indent=2), encoding="utf-8")
+        if self._journal.delta_path.exists():
+            # Deltas from an earlier incremental save are folded into this snapshot
+            self._journal.delta_path.unlink()
+
+    # ------------------------------------------------------------------
+    # Deferred saves
+    # ------------------------------------------------------------------
+
+    def defer_saves(self) -> None:
+        """
+        Keep saves in memory until persist().
+
+        Each save() then only records an in-memory checkpoint of the saved
+        state and queues the event buffer, so a caller driving many commands
+        against one engine (cli runbook sessions) skips the per-command
+        snapshot write and reload. rollback() returns to the last checkpoint,
+        dropping unsaved changes the way a reload from disk would.
+        """
+        if self._checkpoint is None:
+            self._checkpoint = take_checkpoint(self)
+
+    @property
+    def has_unpersisted_saves(self) -> bool:
+        return self.save_count != self._persisted_count
+
+    def rollback(self) -> None:
+        """Discard changes made since the last save (deferred saves only)."""
+        if self._checkpoint is None:
+            raise RuntimeError("rollback() requires deferred saves (see defer_saves)")
+        self.event_buffer.clear()
+        self.state, self.scheduler, self.orchestrator, self.reservation_manager = (
+            restore_checkpoint(self._checkpoint)
+        )
+        self._configure_scheduler()
+        self._sections = None
+        self._register_handlers()
+        self.reset_transient_state()
+
+    def persist(self) -> None:
+        """
+        Write the events and snapshot of deferred saves to disk.
 
-        snapshot = build_snapshot(self)
-        self.snapshot_file.write_text(snapshot.model_dump_json(indent=2), encoding="utf-8")
+        Writes the engine's current state, so callers that may have changed
+        the engine since its last save() should rollback() first.
+        """
+        if not self.has_unpersisted_saves:
+            return
+        self._write_events(self._pending_events)
+        self._pending_events.clear()
+        self._write_snapshot()
+        self._persisted_count = self.save_count
+
+    def reset_transient_state(self) -> None:
+        """
+        Drop runtime-only recipe tracking, as a reload from disk would.
+
+        Recipe quantities, accumulated recipe outputs/energy and compiled run
+        plans are not persisted; a long-lived engine resets them between
+        commands so that it logs the same events as one reloaded per command.
+        """
+        self._recipe_quantities = {}
+        self._recipe_outputs_accum = {}
+        self._recipe_energy_accum = {}
+        self._logged_recipe_completions = set()
+        self._run_plans = {}
+        self.__dict__.pop("_process_energy", None)
 
     def load(self) -> bool:
         """
@@ -1890,29 +2096,30 @@ class SimulationEngine:
             self.save()
             return False
 
-        snapshot = SimulationSnapshot.model_validate_json(
-            self.snapshot_file.read_text(encoding="utf-8")
-        )
+        sections = None
+        if self.snapshot_mode != "incremental" and not self._journal.delta_path.exists():
+            sections = SectionedSnapshot.open(self.sim_dir)
 
-        self.state = snapshot.state
-        self.scheduler = restore_scheduler(snapshot.scheduler)
-        self.orchestrator = restore_orchestrator(snapshot.orchestrator, self.scheduler)
-        self.reservation_manager = restore_reservation_manager(snapshot.reservation_manager)
+        if sections is not None:
+            # History sections load on first access
+            self.state, self.scheduler, self.orchestrator, load_reservations = sections.restore()
+            self._configure_scheduler()
+            self.reservation_manager = None
+            self._reservation_loader = load_reservations
+        else:
+            snapshot = self._journal.load()
+            self.state = snapshot.state
+            self.scheduler = restore_scheduler(snapshot.scheduler)
+            self._configure_scheduler()
+            self.orchestrator = restore_orchestrator(snapshot.orchestrator, self.scheduler)
+            self.reservation_manager = restore_reservation_manager(snapshot.reservation_manager)
+        self._sections = sections
 
         # Register event handlers in same order as __init__
-        self.scheduler.register_handler(
-            EventType.PROCESS_START,
-            self._validate_process_inputs,
-        )
-        self.scheduler.register_handler(
-            EventType.PROCESS_COMPLETE,
-            self._add_process_outputs
-        )
-        self.scheduler.register_handler(
-            EventType.PROCESS_COMPLETE,
-            self._schedule_dependent_recipe_steps
-        )
+        self._register_handlers()
 
+        if self.snapshot_mode == "incremental":
+            self._journal.prime(self)
         return True
 
     def get_schedule_summary(self) -> Dict[str, Any]:
@@ -1922,14 +2129,16 @@ class SimulationEngine:
         Returns:
             Dict with scheduler state
         """
+        # Counts only, so deferred history (sectioned snapshots) stays unloaded
+        active_recipes, completed_recipes = self.orchestrator.count_recipe_runs()
         return {
             "current_time": self.scheduler.current_time,
             "queued_events": len(self.scheduler.event_queue),
             "active_processes": len(self.scheduler.active_processes),
-            "completed_processes": len(self.scheduler.completed_processes),
+            "completed_processes": self.scheduler.completed_count,
             "next_event_time": self.scheduler.get_next_event_time(),
-            "active_recipes": len(self.orchestrator.get_active_recipe_runs()),
-            "completed_recipes": len(self.orchestrator.get_completed_recipe_runs()),
+            "active_recipes": active_recipes,
+            "completed_recipes": completed_recipes,
         }
 
     def get_machine_utilization(
@@ -42,6 +42,7 @@ class SimulationEngineADR020(SimulationEngine):
 
         # ADR-020 components
         self.scheduler = Scheduler()
+        self._configure_scheduler()
         self.orchestrator = RecipeOrchestrator(self.scheduler)
 
         # Build machine capacities from inventory
@@ -64,7 +65,7 @@ class SimulationEngineADR020(SimulationEngine):
             # Check if item is a machine
             item_model = self.kb.get_item(item_id)
             if item_model:
-                item_def = item_model.model_dump() if hasattr(item_model, 'model_dump') else item_model
+                item_def = self.defs.of(item_model)
                 if item_def.get('kind') == 'machine':
                     # Get quantity in count units
                     if inv_item.unit == 'count' or inv_item.unit == 'unit':
@@ -131,7 +132,7 @@ class SimulationEngineADR020(SimulationEngine):
                 "message": f"Process '{process_id}' not found in KB",
             }
 
-        process_def = process_model.model_dump() if hasattr(process_model, 'model_dump') else process_model
+        process_def = self.defs.of(process_model)
 
         # Validate with ADR-020 rules
         validation_issues = validate_process_adr020(process_def, self.kb.items)
@@ -289,7 +290,7 @@ class SimulationEngineADR020(SimulationEngine):
                 "message": f"Recipe '{recipe_id}' not found in KB",
             }
 
-        recipe_def = recipe_model.model_dump() if hasattr(recipe_model, 'model_dump') else recipe_model
+        recipe_def = self.defs.of(recipe_model)
 
         # ADR-020 validation
         validation_issues = validate_recipe_adr020(recipe_def)
@@ -344,7 +345,7 @@ class SimulationEngineADR020(SimulationEngine):
                     "failed_step": step_idx,
                 }
 
-            process_dict = process_def.model_dump() if hasattr(process_def, 'model_dump') else process_def
+            process_dict = self.defs.of(process_def)
 
             # Get default output quantity and unit from first output
             outputs = process_dict.get('outputs', [])
@@ -431,12 +432,7 @@ class SimulationEngineADR020(SimulationEngine):
                 process_run_id = event.data.get("process_run_id")
 
                 # Process is now in completed_processes (moved by scheduler)
-                # Find it in the completed list
-                process_run = None
-                for proc in self.scheduler.completed_processes:
-                    if proc.process_run_id == process_run_id:
-                        process_run = proc
-                        break
+                process_run = self.scheduler.get_completed_process(process_run_id)
 
                 if process_run:
                     # Add outputs to inventory
@@ -462,7 +458,7 @@ class SimulationEngineADR020(SimulationEngine):
                         for step_idx in ready_steps:
                             recipe_run = self.orchestrator.get_recipe_run(recipe_run_id)
                             if recipe_run:
-                                recipe_def = self.kb.get_recipe(recipe_run.recipe_id).model_dump()
+                                recipe_def = self.defs.recipe(recipe_run.recipe_id)
                                 step = recipe_def['steps'][step_idx]
 
                                 # Get process_id directly from step
@@ -475,7 +471,7 @@ class SimulationEngineADR020(SimulationEngine):
                                 if not process_def_model:
                                     continue  # Skip if process not found
 
-                                process_dict = process_def_model.model_dump() if hasattr(process_def_model, 'model_dump') else process_def_model
+                                process_dict = self.defs.of(process_def_model)
 
                                 # Get default output quantity and unit from first output
                                 outputs = process_dict.get('outputs', [])
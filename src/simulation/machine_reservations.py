@@ -9,6 +9,8 @@ Manages time-based machine reservations with:
 """
 from __future__ import annotations
 
+import heapq
+from bisect import bisect_left, bisect_right
 from typing import List, Dict, Set, Tuple, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
@@ -123,6 +125,78 @@ class MachineAvailability:
         )
 
 
+class _ReservationTimeline:
+    """
+    Reserved quantity over time for one machine, as a step function.
+
+    times[i] is a breakpoint and levels[i] the quantity reserved on
+    [times[i], times[i+1]); nothing is reserved before times[0] or after
+    times[-1]. Point and range queries are a bisect plus a scan of the
+    breakpoints inside the range, instead of a pass over all reservations.
+    """
+
+    __slots__ = ("times", "levels")
+
+    # Float residue below which levels are treated as equal after removals
+    EPSILON = 1e-9
+
+    def __init__(self) -> None:
+        self.times: List[float] = []
+        self.levels: List[float] = []
+
+    def add(self, start: float, end: float, qty: float) -> None:
+        """Add qty on [start, end); a negative qty removes a reservation."""
+        if end <= start:
+            return
+        i = self._split(start)
+        j = self._split(end)
+        levels = self.levels
+        for k in range(i, j):
+            level = levels[k] + qty
+            levels[k] = 0.0 if abs(level) < self.EPSILON else level
+        if qty < 0:
+            # Compaction: drop breakpoints that no longer change the level
+            self._merge(j)
+            self._merge(i)
+
+    def level_at(self, time: float) -> float:
+        """Quantity reserved at time."""
+        i = bisect_right(self.times, time) - 1
+        return self.levels[i] if i >= 0 else 0.0
+
+    def peak(self, start: float, end: float, include_end: bool = False) -> float:
+        """Maximum quantity reserved on [start, end) (or [start, end])."""
+        times = self.times
+        i = bisect_right(times, start) - 1
+        j = bisect_right(times, end) if include_end else bisect_left(times, end)
+        peak = self.levels[i] if i >= 0 else 0.0
+        for k in range(max(i + 1, 0), j):
+            if self.levels[k] > peak:
+                peak = self.levels[k]
+        return peak
+
+    def _split(self, time: float) -> int:
+        """Make time a breakpoint and return its index."""
+        i = bisect_left(self.times, time)
+        if i < len(self.times) and self.times[i] == time:
+            return i
+        self.times.insert(i, time)
+        self.levels.insert(i, self.levels[i - 1] if i > 0 else 0.0)
+        return i
+
+    def _merge(self, i: int) -> None:
+        """Remove breakpoint i if the level does not change there."""
+        if i >= len(self.times):
+            return
+        previous = self.levels[i - 1] if i > 0 else 0.0
+        if abs(self.levels[i] - previous) < self.EPSILON:
+            del self.times[i]
+            del self.levels[i]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
 class MachineReservationManager:
     """
     Manages machine reservations across time.
@@ -132,6 +206,13 @@ class MachineReservationManager:
     - Conflict detection
     - Capacity queries
     - Automatic release of partial reservations
+
+    Reservations are indexed per machine (as a reserved-quantity step
+    function) and per process, so capacity checks and removals cost
+    O(log n) plus the reservations they actually touch. The flat
+    `reservations` list is kept for callers that iterate or append to it
+    directly; appended reservations are indexed on the next call.
+    compact() drops reservations released before a cutoff.
     """
 
     def __init__(self, machine_capacities: Dict[str, float]):
@@ -142,8 +223,90 @@ class MachineReservationManager:
             machine_capacities: Dict of machine_id -> total capacity (count)
         """
         self.machine_capacities = machine_capacities.copy()
-        self.reservations: List[Reservation] = []
         self.current_time: float = 0.0
+        self._reset_index()
+
+    # ------------------------------------------------------------------
+    # Reservation storage
+    # ------------------------------------------------------------------
+
+    @property
+    def reservations(self) -> List[Reservation]:
+        """All reservations in insertion order (appending is supported)."""
+        self._sync()
+        if self._view is None:
+            self._view = list(self._all.values())
+        return self._view
+
+    @reservations.setter
+    def reservations(self, reservations: List[Reservation]) -> None:
+        self._reset_index()
+        for reservation in reservations:
+            self._index(reservation)
+
+    def _reset_index(self) -> None:
+        # seq -> reservation, in insertion order
+        self._all: Dict[int, Reservation] = {}
+        self._next_seq = 0
+        # machine_id -> {seq: reservation} and reserved-quantity timeline
+        self._by_machine: Dict[str, Dict[int, Reservation]] = {}
+        self._timelines: Dict[str, _ReservationTimeline] = {}
+        # process_run_id -> [seq, ...]
+        self._by_process: Dict[str, List[int]] = {}
+        # (release_time, seq) min-heap for advance_time
+        self._releases: List[Tuple[float, int]] = []
+        # Materialized flat list (see reservations); None when stale
+        self._view: Optional[List[Reservation]] = []
+        self._view_len = 0
+
+    def _sync(self) -> None:
+        """Index reservations appended directly to the reservations list."""
+        view = self._view
+        if view is None or len(view) == self._view_len:
+            return
+        if len(view) > self._view_len:
+            appended = view[self._view_len:]
+            self._view_len = len(view)
+            for reservation in appended:
+                self._index(reservation, in_view=True)
+        else:
+            # Removed through the list itself: rebuild from it
+            self.reservations = list(view)
+
+    def _index(self, reservation: Reservation, in_view: bool = False) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._all[seq] = reservation
+        self._by_machine.setdefault(reservation.machine_id, {})[seq] = reservation
+        timeline = self._timelines.get(reservation.machine_id)
+        if timeline is None:
+            timeline = self._timelines[reservation.machine_id] = _ReservationTimeline()
+        timeline.add(reservation.start_time, reservation.release_time, reservation.qty_reserved)
+        self._by_process.setdefault(reservation.process_run_id, []).append(seq)
+        heapq.heappush(self._releases, (reservation.release_time, seq))
+        if not in_view and self._view is not None:
+            self._view.append(reservation)
+            self._view_len += 1
+
+    def _unindex(self, seq: int) -> Reservation:
+        reservation = self._all.pop(seq)
+        machine_reservations = self._by_machine[reservation.machine_id]
+        del machine_reservations[seq]
+        timeline = self._timelines[reservation.machine_id]
+        if machine_reservations:
+            timeline.add(reservation.start_time, reservation.release_time, -reservation.qty_reserved)
+        else:
+            del self._by_machine[reservation.machine_id]
+            del self._timelines[reservation.machine_id]
+        self._view = None
+        return reservation
+
+    def _timeline(self, machine_id: str) -> _ReservationTimeline:
+        return self._timelines.get(machine_id) or _ReservationTimeline()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
 
     def add_reservation(
         self,
@@ -205,49 +368,36 @@ class MachineReservationManager:
             return False
 
         # Add reservation
-        self.reservations.append(reservation)
+        self._index(reservation)
         return True
 
+    def insert_reservation(self, reservation: Reservation) -> None:
+        """Add an existing reservation without a capacity check (e.g. restoring a snapshot)."""
+        self._sync()
+        self._index(reservation)
+
     def _can_reserve(self, new_reservation: Reservation) -> bool:
         """
         Check if a reservation can be made without conflicts.
 
+        The peak reserved quantity over the new reservation's active window
+        plus its own quantity must not exceed the machine's capacity.
+
         Returns:
             True if reservation is possible
         """
+        self._sync()
         machine_id = new_reservation.machine_id
         total_capacity = self.machine_capacities[machine_id]
 
-        # Get all existing reservations for this machine
-        existing = [r for r in self.reservations if r.machine_id == machine_id]
-
-        # Check capacity at all relevant time points
-        # Time points: start of new reservation, start/release of existing reservations
-        time_points = {new_reservation.start_time}
-
-        for res in existing:
-            time_points.add(res.start_time)
-            time_points.add(res.release_time)
-
-        # Check capacity at each time point
-        for time in sorted(time_points):
-            # Count reserved capacity at this time
-            reserved = 0.0
-
-            # Add existing reservations active at this time
-            for res in existing:
-                if res.is_active_at(time):
-                    reserved += res.qty_reserved
-
-            # Add new reservation if active at this time
-            if new_reservation.is_active_at(time):
-                reserved += new_reservation.qty_reserved
+        start = new_reservation.start_time
+        release = new_reservation.release_time
+        if release <= start:
+            # Never active, so it cannot add to the load
+            return True
 
-            # Check capacity
-            if reserved > total_capacity:
-                return False
-
-        return True
+        reserved = self._timeline(machine_id).peak(start, release)
+        return reserved + new_reservation.qty_reserved <= total_capacity
 
     def remove_reservation(self, process_run_id: str) -> List[Reservation]:
         """
@@ -259,9 +409,9 @@ class MachineReservationManager:
         Returns:
             List of removed reservations
         """
-        removed = [r for r in self.reservations if r.process_run_id == process_run_id]
-        self.reservations = [r for r in self.reservations if r.process_run_id != process_run_id]
-        return removed
+        self._sync()
+        seqs = self._by_process.pop(process_run_id, [])
+        return [self._unindex(seq) for seq in seqs]
 
     def get_availability_at(self, machine_id: str, time: float) -> MachineAvailability:
         """
@@ -280,11 +430,8 @@ class MachineReservationManager:
         total = self.machine_capacities[machine_id]
 
         # Count reserved at this time
-        reserved = sum(
-            r.qty_reserved
-            for r in self.reservations
-            if r.machine_id == machine_id and r.is_active_at(time)
-        )
+        self._sync()
+        reserved = self._timeline(machine_id).level_at(time)
 
         return MachineAvailability(
             machine_id=machine_id,
@@ -312,29 +459,11 @@ class MachineReservationManager:
         if machine_id not in self.machine_capacities:
             raise ValueError(f"Machine '{machine_id}' not found in capacity registry")
 
-        reservations = [r for r in self.reservations if r.machine_id == machine_id]
-        if not reservations:
+        self._sync()
+        if end_time < start_time or machine_id not in self._timelines:
             return 0.0
 
-        time_points = {start_time, end_time}
-        for res in reservations:
-            if res.start_time <= end_time and res.release_time >= start_time:
-                time_points.add(res.start_time)
-                time_points.add(res.release_time)
-
-        max_reserved = 0.0
-        for time in sorted(time_points):
-            if time < start_time or time > end_time:
-                continue
-            reserved = sum(
-                r.qty_reserved
-                for r in reservations
-                if r.is_active_at(time)
-            )
-            if reserved > max_reserved:
-                max_reserved = reserved
-
-        return max_reserved
+        return self._timeline(machine_id).peak(start_time, end_time, include_end=True)
 
     def get_reservations_for_machine(
         self,
@@ -351,7 +480,8 @@ class MachineReservationManager:
         Returns:
             List of reservations
         """
-        reservations = [r for r in self.reservations if r.machine_id == machine_id]
+        self._sync()
+        reservations = list(self._by_machine.get(machine_id, {}).values())
 
         if time_range:
             start, end = time_range
@@ -364,7 +494,8 @@ class MachineReservationManager:
 
     def get_reservations_for_process(self, process_run_id: str) -> List[Reservation]:
         """Get all reservations for a process."""
-        return [r for r in self.reservations if r.process_run_id == process_run_id]
+        self._sync()
+        return [self._all[seq] for seq in self._by_process.get(process_run_id, [])]
 
     def advance_time(self, new_time: float) -> List[Reservation]:
         """
@@ -376,13 +507,49 @@ class MachineReservationManager:
         Returns:
             List of reservations that expired in this time window
         """
-        expired = [
-            r for r in self.reservations
-            if self.current_time <= r.release_time < new_time
-        ]
+        self._sync()
+        # Pop releases before new_time; entries for removed reservations are skipped
+        expired_seqs = []
+        releases = self._releases
+        while releases and releases[0][0] < new_time:
+            release_time, seq = heapq.heappop(releases)
+            if seq in self._all and release_time >= self.current_time:
+                expired_seqs.append(seq)
 
         self.current_time = new_time
-        return expired
+        return [self._all[seq] for seq in sorted(expired_seqs)]
+
+    def compact(self, before: Optional[float] = None) -> List[Reservation]:
+        """
+        Drop historic reservations released at or before `before`.
+
+        They no longer affect capacity at or after that time, so dropping
+        them keeps the per-machine timelines proportional to the live load.
+        The engines remove a process's reservations when it completes;
+        this is for managers driven without removals. Past-window queries
+        (e.g. get_utilization) no longer see compacted reservations.
+
+        Args:
+            before: Cutoff time (hours); defaults to current_time
+
+        Returns:
+            List of removed reservations
+        """
+        self._sync()
+        cutoff = self.current_time if before is None else before
+        historic = [
+            seq for seq, reservation in self._all.items()
+            if reservation.release_time <= cutoff
+        ]
+        removed = []
+        for seq in historic:
+            reservation = self._unindex(seq)
+            seqs = self._by_process[reservation.process_run_id]
+            seqs.remove(seq)
+            if not seqs:
+                del self._by_process[reservation.process_run_id]
+            removed.append(reservation)
+        return removed
 
     def find_conflicts(self) -> List[Tuple[Reservation, Reservation]]:
         """
@@ -391,25 +558,25 @@ class MachineReservationManager:
         Returns:
             List of (reservation1, reservation2) conflict pairs
         """
+        self._sync()
         conflicts = []
 
-        for i, res1 in enumerate(self.reservations):
-            for res2 in self.reservations[i + 1:]:
-                if res1.overlaps_with(res2):
-                    # Check if they exceed capacity
-                    machine_id = res1.machine_id
-                    capacity = self.machine_capacities[machine_id]
-
-                    # Find overlap time range
-                    overlap_start = max(res1.start_time, res2.start_time)
-                    overlap_end = min(res1.release_time, res2.release_time)
-
+        # Only reservations on the same machine can conflict
+        for machine_id, machine_reservations in self._by_machine.items():
+            ordered = list(machine_reservations.items())
+            for i, (seq1, res1) in enumerate(ordered):
+                for seq2, res2 in ordered[i + 1:]:
+                    if not res1.overlaps_with(res2):
+                        continue
                     # Check capacity during overlap
+                    capacity = self.machine_capacities[machine_id]
                     reserved = res1.qty_reserved + res2.qty_reserved
                     if reserved > capacity:
-                        conflicts.append((res1, res2))
+                        conflicts.append((seq1, seq2, res1, res2))
 
-        return conflicts
+        # Report pairs in insertion order across machines
+        conflicts.sort(key=lambda c: (c[0], c[1]))
+        return [(res1, res2) for _, _, res1, res2 in conflicts]
 
     def get_utilization(
         self,
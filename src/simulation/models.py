@@ -116,6 +116,14 @@ class ProcessCompleteEvent(Event):
     start_time: Optional[float] = None
 
 
+class ProcessArchivedEvent(Event):
+    """Completed process run evicted from the scheduler's in-memory history."""
+    type: Literal["process_archived"] = "process_archived"
+    process_run_id: str
+    process_run: Dict[str, Any]  # Full ProcessRun fields
+    time_hours: float
+
+
 class RecipeStartEvent(Event):
     """Recipe started."""
     type: Literal["recipe_start"] = "recipe_start"
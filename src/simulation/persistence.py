@@ -5,7 +5,8 @@ Canonical, snapshot-only storage for engine + scheduler + orchestrator state.
 """
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
 from pydantic import BaseModel, Field
 
 from src.simulation.models import SimulationState
@@ -134,79 +135,88 @@ def _snapshot_to_process_run(snapshot: ProcessRunSnapshot) -> ProcessRun:
     )
 
 
+def _event_to_snapshot(event: SchedulerEvent) -> SchedulerEventSnapshot:
+    return SchedulerEventSnapshot(
+        time=event.time,
+        event_type=event.event_type.value,
+        event_id=event.event_id,
+        priority=event.priority,
+        data=dict(event.data),
+    )
+
+
+def _recipe_run_to_snapshot(run: RecipeRun) -> RecipeRunSnapshot:
+    return RecipeRunSnapshot(
+        recipe_run_id=run.recipe_run_id,
+        recipe_id=run.recipe_id,
+        target_item_id=run.target_item_id,
+        recipe_def=run.recipe_def or {},
+        started_at=run.started_at,
+        completed_steps=sorted(run.completed_steps),
+        active_steps=dict(run.active_steps),
+        scheduled_steps=dict(run.scheduled_steps),
+        is_completed=run.is_completed,
+        completed_at=run.completed_at,
+    )
+
+
+def _reservation_to_snapshot(res: Reservation) -> ReservationSnapshot:
+    return ReservationSnapshot(
+        machine_id=res.machine_id,
+        process_run_id=res.process_run_id,
+        reservation_type=res.reservation_type.value,
+        start_time=res.start_time,
+        end_time=res.end_time,
+        qty_reserved=res.qty_reserved,
+        hr_reserved=res.hr_reserved,
+    )
+
+
+def _scheduler_snapshot(scheduler: Scheduler, completed: List[ProcessRunSnapshot]) -> SchedulerSnapshot:
+    return SchedulerSnapshot(
+        current_time=scheduler.current_time,
+        event_queue=[_event_to_snapshot(event) for event in scheduler.event_queue.to_list()],
+        active_processes={
+            proc_id: _process_run_to_snapshot(proc)
+            for proc_id, proc in scheduler.active_processes.items()
+        },
+        completed_processes=completed,
+        total_events_processed=scheduler.total_events_processed,
+    )
+
+
+def _reservation_manager_snapshot(
+    manager: Optional[MachineReservationManager],
+) -> ReservationManagerSnapshot:
+    if manager is None:
+        return ReservationManagerSnapshot()
+    return ReservationManagerSnapshot(
+        machine_capacities=dict(manager.machine_capacities),
+        reservations=[_reservation_to_snapshot(res) for res in manager.reservations],
+        current_time=manager.current_time,
+    )
+
+
 def build_snapshot(engine) -> SimulationSnapshot:
     scheduler = engine.scheduler
-    event_snapshots = [
-        SchedulerEventSnapshot(
-            time=event.time,
-            event_type=event.event_type.value,
-            event_id=event.event_id,
-            priority=event.priority,
-            data=dict(event.data),
-        )
-        for event in scheduler.event_queue.to_list()
-    ]
-    active = {
-        proc_id: _process_run_to_snapshot(proc)
-        for proc_id, proc in scheduler.active_processes.items()
-    }
     completed = [
         _process_run_to_snapshot(proc)
         for proc in scheduler.completed_processes
     ]
-    scheduler_snapshot = SchedulerSnapshot(
-        current_time=scheduler.current_time,
-        event_queue=event_snapshots,
-        active_processes=active,
-        completed_processes=completed,
-        total_events_processed=scheduler.total_events_processed,
-    )
+    scheduler_snapshot = _scheduler_snapshot(scheduler, completed)
 
-    recipe_runs: Dict[str, RecipeRunSnapshot] = {}
-    for run_id, run in engine.orchestrator.recipe_runs.items():
-        recipe_def = run.recipe_def or {}
-        recipe_runs[run_id] = RecipeRunSnapshot(
-            recipe_run_id=run.recipe_run_id,
-            recipe_id=run.recipe_id,
-            target_item_id=run.target_item_id,
-            recipe_def=recipe_def,
-            started_at=run.started_at,
-            completed_steps=sorted(run.completed_steps),
-            active_steps=dict(run.active_steps),
-            scheduled_steps=dict(run.scheduled_steps),
-            is_completed=run.is_completed,
-            completed_at=run.completed_at,
-        )
+    recipe_runs: Dict[str, RecipeRunSnapshot] = {
+        run_id: _recipe_run_to_snapshot(run)
+        for run_id, run in engine.orchestrator.recipe_runs.items()
+    }
     orchestrator_snapshot = OrchestratorSnapshot(recipe_runs=recipe_runs)
 
-    reservations = []
-    if engine.reservation_manager is not None:
-        for res in engine.reservation_manager.reservations:
-            reservations.append(
-                ReservationSnapshot(
-                    machine_id=res.machine_id,
-                    process_run_id=res.process_run_id,
-                    reservation_type=res.reservation_type.value,
-                    start_time=res.start_time,
-                    end_time=res.end_time,
-                    qty_reserved=res.qty_reserved,
-                    hr_reserved=res.hr_reserved,
-                )
-            )
-        reservation_snapshot = ReservationManagerSnapshot(
-            machine_capacities=dict(engine.reservation_manager.machine_capacities),
-            reservations=reservations,
-            current_time=engine.reservation_manager.current_time,
-        )
-    else:
-        reservation_snapshot = ReservationManagerSnapshot()
-
     return SimulationSnapshot(
         sim_id=engine.sim_id,
         state=engine.state,
         scheduler=scheduler_snapshot,
         orchestrator=orchestrator_snapshot,
-        reservation_manager=reservation_snapshot,
+        reservation_manager=_reservation_manager_snapshot(engine.reservation_manager),
     )
 
 
@@ -243,24 +253,26 @@ def restore_orchestrator(
 ) -> RecipeOrchestrator:
     orchestrator = RecipeOrchestrator(scheduler)
     for run_id, run in snapshot.recipe_runs.items():
-        dependency_graph = DependencyGraph(run.recipe_def or {"steps": []})
-        recipe_run = RecipeRun(
-            recipe_run_id=run.recipe_run_id,
-            recipe_id=run.recipe_id,
-            target_item_id=run.target_item_id,
-            recipe_def=run.recipe_def or {},
-            dependency_graph=dependency_graph,
-            started_at=run.started_at,
-            completed_steps=set(run.completed_steps),
-            active_steps=dict(run.active_steps),
-            scheduled_steps=dict(run.scheduled_steps),
-            is_completed=run.is_completed,
-            completed_at=run.completed_at,
-        )
-        orchestrator.recipe_runs[run_id] = recipe_run
+        orchestrator.recipe_runs[run_id] = _snapshot_to_recipe_run(run)
     return orchestrator
 
 
+def _snapshot_to_recipe_run(run: RecipeRunSnapshot) -> RecipeRun:
+    return RecipeRun(
+        recipe_run_id=run.recipe_run_id,
+        recipe_id=run.recipe_id,
+        target_item_id=run.target_item_id,
+        recipe_def=run.recipe_def or {},
+        dependency_graph=DependencyGraph(run.recipe_def or {"steps": []}),
+        started_at=run.started_at,
+        completed_steps=set(run.completed_steps),
+        active_steps=dict(run.active_steps),
+        scheduled_steps=dict(run.scheduled_steps),
+        is_completed=run.is_completed,
+        completed_at=run.completed_at,
+    )
+
+
 def restore_reservation_manager(
     snapshot: ReservationManagerSnapshot,
 ) -> MachineReservationManager:
@@ -276,5 +288,59 @@ def restore_reservation_manager(
             qty_reserved=res.qty_reserved,
             hr_reserved=res.hr_reserved,
         )
-        manager.reservations.append(reservation)
+        manager.insert_reservation(reservation)
     return manager
+
+
+# ---------------------------------------------------------------------------
+# In-memory checkpoints
+# ---------------------------------------------------------------------------
+
+@dataclass
+class EngineCheckpoint:
+    """
+    In-memory copy of an engine's saved state (SimulationEngine.defer_saves).
+
+    Completed processes and completed recipe runs are not changed once
+    completed, so they are shared with the engine instead of copied; only
+    the state, scheduler queue, active work and reservations are snapshotted.
+    """
+
+    state: str
+    scheduler: SchedulerSnapshot
+    completed_processes: List[ProcessRun]
+    # In run order: completed runs (shared) and snapshots of active runs
+    recipe_runs: Dict[str, Union[RecipeRun, RecipeRunSnapshot]]
+    reservation_manager: ReservationManagerSnapshot
+
+
+def take_checkpoint(engine) -> EngineCheckpoint:
+    scheduler = engine.scheduler
+    return EngineCheckpoint(
+        state=engine.state.model_dump_json(),
+        scheduler=_scheduler_snapshot(scheduler, []),
+        completed_processes=list(scheduler.completed_processes),
+        recipe_runs={
+            run_id: run if run.is_completed else _recipe_run_to_snapshot(run)
+            for run_id, run in engine.orchestrator.recipe_runs.items()
+        },
+        reservation_manager=_reservation_manager_snapshot(engine.reservation_manager),
+    )
+
+
+def restore_checkpoint(
+    checkpoint: EngineCheckpoint,
+) -> Tuple[SimulationState, Scheduler, RecipeOrchestrator, MachineReservationManager]:
+    scheduler = restore_scheduler(checkpoint.scheduler)
+    scheduler.completed_processes = list(checkpoint.completed_processes)
+    orchestrator = RecipeOrchestrator(scheduler)
+    orchestrator.recipe_runs = {
+        run_id: run if isinstance(run, RecipeRun) else _snapshot_to_recipe_run(run)
+        for run_id, run in checkpoint.recipe_runs.items()
+    }
+    return (
+        SimulationState.model_validate_json(checkpoint.state),
+        scheduler,
+        orchestrator,
+        restore_reservation_manager(checkpoint.reservation_manager),
+    )
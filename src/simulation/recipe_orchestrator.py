@@ -6,7 +6,7 @@ Integrates dependency graphs, machine reservations, and event-driven scheduling.
 """
 from __future__ import annotations
 
-from typing import Dict, Set, Optional, Any, List
+from typing import Dict, Set, Optional, Any, List, Callable, Tuple
 from dataclasses import dataclass, field
 import uuid
 
@@ -113,7 +113,10 @@ class RecipeOrchestrator:
             scheduler: Event-driven scheduler
         """
         self.scheduler = scheduler
-        self.recipe_runs: Dict[str, RecipeRun] = {}
+        self._runs: Dict[str, RecipeRun] = {}
+        # Deferred completed runs (see defer_completed_runs)
+        self._runs_loader: Optional[Callable[[Dict[str, RecipeRun]], Dict[str, RecipeRun]]] = None
+        self._deferred_count = 0
 
         # Register event handlers
         self.scheduler.register_handler(
@@ -125,12 +128,59 @@ class RecipeOrchestrator:
             self._on_process_complete
         )
 
+    @property
+    def recipe_runs(self) -> Dict[str, RecipeRun]:
+        """All recipe runs by recipe_run_id, in start order."""
+        loader = self._runs_loader
+        if loader is not None:
+            self._runs_loader = None
+            self._deferred_count = 0
+            self._runs = loader(self._runs)
+        return self._runs
+
+    @recipe_runs.setter
+    def recipe_runs(self, runs: Dict[str, RecipeRun]) -> None:
+        self._runs_loader = None
+        self._deferred_count = 0
+        self._runs = runs
+
+    @property
+    def runs_deferred(self) -> bool:
+        """True while completed runs restored by defer_completed_runs are unloaded."""
+        return self._runs_loader is not None
+
+    def defer_completed_runs(
+        self,
+        loader: Callable[[Dict[str, RecipeRun]], Dict[str, RecipeRun]],
+        count: int,
+    ) -> None:
+        """
+        Restore `count` completed recipe runs lazily.
+
+        Until recipe_runs is first accessed, only the runs added directly
+        (active runs) are held. loader receives those and returns the full
+        mapping in start order. Step handling only touches active runs, so
+        it never triggers the load.
+        """
+        self._runs_loader = loader
+        self._deferred_count = count
+
+    def loaded_recipe_runs(self) -> Dict[str, RecipeRun]:
+        """Recipe runs held in memory (all runs unless completed runs are deferred)."""
+        return self._runs
+
+    def count_recipe_runs(self) -> Tuple[int, int]:
+        """(active, completed) run counts without loading deferred runs."""
+        active = sum(1 for run in self._runs.values() if not run.is_completed)
+        return active, len(self._runs) - active + self._deferred_count
+
     def start_recipe(
         self,
         recipe_id: str,
         recipe_dict: Dict[str, Any],
         target_item_id: str,
         start_time: float,
+        dependency_graph: Optional[DependencyGraph] = None,
     ) -> str:
         """
         Start a recipe execution.
@@ -140,6 +190,8 @@ class RecipeOrchestrator:
             recipe_dict: Recipe dict with steps
             target_item_id: Target item being produced
             start_time: When recipe starts
+            dependency_graph: Prebuilt graph for recipe_dict's steps (e.g.
+                from a RecipePlan); built from recipe_dict if omitted
 
         Returns:
             recipe_run_id for this execution instance
@@ -148,7 +200,8 @@ class RecipeOrchestrator:
         recipe_run_id = str(uuid.uuid4())
 
         # Build dependency graph
-        dependency_graph = DependencyGraph(recipe_dict)
+        if dependency_graph is None:
+            dependency_graph = DependencyGraph(recipe_dict)
 
         # Create recipe run
         recipe_run = RecipeRun(
@@ -161,7 +214,7 @@ class RecipeOrchestrator:
         )
 
         # Track recipe run
-        self.recipe_runs[recipe_run_id] = recipe_run
+        self._runs[recipe_run_id] = recipe_run
 
         return recipe_run_id
 
@@ -175,10 +228,10 @@ class RecipeOrchestrator:
         Returns:
             List of step indices ready to schedule
         """
-        if recipe_run_id not in self.recipe_runs:
+        if recipe_run_id not in self._runs:
             return []
 
-        recipe_run = self.recipe_runs[recipe_run_id]
+        recipe_run = self._runs[recipe_run_id]
         return recipe_run.get_ready_steps()
 
     def schedule_step(
@@ -195,10 +248,10 @@ class RecipeOrchestrator:
             step_index: Step index
             process_run_id: Process run ID that was scheduled
         """
-        if recipe_run_id not in self.recipe_runs:
+        if recipe_run_id not in self._runs:
             raise ValueError(f"Recipe run {recipe_run_id} not found")
 
-        recipe_run = self.recipe_runs[recipe_run_id]
+        recipe_run = self._runs[recipe_run_id]
         recipe_run.mark_step_scheduled(step_index, process_run_id)
 
     def _on_process_start(self, event) -> None:
@@ -210,10 +263,10 @@ class RecipeOrchestrator:
         if not recipe_run_id or step_index is None:
             return  # Not a recipe step
 
-        if recipe_run_id not in self.recipe_runs:
+        if recipe_run_id not in self._runs:
             return
 
-        recipe_run = self.recipe_runs[recipe_run_id]
+        recipe_run = self._runs[recipe_run_id]
         recipe_run.mark_step_started(step_index, process_run_id)
 
     def _on_process_complete(self, event) -> None:
@@ -224,7 +277,7 @@ class RecipeOrchestrator:
         recipe_run_id = None
         step_index = None
 
-        for run_id, recipe_run in self.recipe_runs.items():
+        for run_id, recipe_run in self._runs.items():
             for idx, proc_id in recipe_run.active_steps.items():
                 if proc_id == process_run_id:
                     recipe_run_id = run_id
@@ -237,7 +290,7 @@ class RecipeOrchestrator:
             return  # Not a recipe step
 
         # Mark step as completed
-        recipe_run = self.recipe_runs[recipe_run_id]
+        recipe_run = self._runs[recipe_run_id]
         recipe_run.mark_step_completed(step_index)
 
         # Check if recipe is complete
@@ -246,18 +299,20 @@ class RecipeOrchestrator:
 
     def is_recipe_complete(self, recipe_run_id: str) -> bool:
         """Check if recipe has completed."""
-        if recipe_run_id not in self.recipe_runs:
-            return False
-        return self.recipe_runs[recipe_run_id].is_completed
+        recipe_run = self.get_recipe_run(recipe_run_id)
+        return recipe_run is not None and recipe_run.is_completed
 
     def get_recipe_run(self, recipe_run_id: str) -> Optional[RecipeRun]:
-        """Get recipe run by ID."""
-        return self.recipe_runs.get(recipe_run_id)
+        """Get recipe run by ID (loads deferred runs only on a miss)."""
+        recipe_run = self._runs.get(recipe_run_id)
+        if recipe_run is None and self.runs_deferred:
+            recipe_run = self.recipe_runs.get(recipe_run_id)
+        return recipe_run
 
     def get_active_recipe_runs(self) -> List[RecipeRun]:
         """Get all active (not completed) recipe runs."""
         return [
-            run for run in self.recipe_runs.values()
+            run for run in self._runs.values()
             if not run.is_completed
         ]
 
@@ -280,11 +335,10 @@ class RecipeOrchestrator:
         Returns:
             True if recipe was found and cancelled
         """
-        if recipe_run_id not in self.recipe_runs:
+        recipe_run = self.get_recipe_run(recipe_run_id)
+        if recipe_run is None:
             return False
 
-        recipe_run = self.recipe_runs[recipe_run_id]
-
         # Cancel all scheduled and active processes
         all_process_ids = (
             list(recipe_run.scheduled_steps.values()) +
@@ -295,7 +349,7 @@ class RecipeOrchestrator:
             self.scheduler.cancel_process(process_run_id)
 
         # Remove recipe run
-        del self.recipe_runs[recipe_run_id]
+        del self._runs[recipe_run_id]
         return True
 
     def get_step_status(
@@ -309,11 +363,10 @@ class RecipeOrchestrator:
         Returns:
             'pending', 'scheduled', 'active', 'completed', or None if not found
         """
-        if recipe_run_id not in self.recipe_runs:
+        recipe_run = self.get_recipe_run(recipe_run_id)
+        if recipe_run is None:
             return None
 
-        recipe_run = self.recipe_runs[recipe_run_id]
-
         if step_index in recipe_run.completed_steps:
             return 'completed'
         if step_index in recipe_run.active_steps:
@@ -334,10 +387,9 @@ class RecipeOrchestrator:
         Returns:
             Dict with progress information
         """
-        if recipe_run_id not in self.recipe_runs:
+        recipe_run = self.get_recipe_run(recipe_run_id)
+        if recipe_run is None:
             return {}
-
-        recipe_run = self.recipe_runs[recipe_run_id]
         total_steps = len(recipe_run.dependency_graph)
 
         return {
@@ -355,6 +407,5 @@ class RecipeOrchestrator:
         }
 
     def __repr__(self) -> str:
-        active = len([r for r in self.recipe_runs.values() if not r.is_completed])
-        completed = len([r for r in self.recipe_runs.values() if r.is_completed])
+        active, completed = self.count_recipe_runs()
         return f"RecipeOrchestrator(active={active}, completed={completed})"
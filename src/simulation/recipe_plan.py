@@ -0,0 +1,214 @@
+"""
+Compiled recipe execution plans (ADR-020).
+
+run_recipe used to re-resolve every step against its process (ADR-013),
+rebuild and validate the step DependencyGraph and re-run recipe validation
+on each call. A RecipePlan does that work once per recipe and KB version:
+it holds the resolved step definitions at unit scale, the dependency graph
+and its waves, and the per-step values scheduling needs (base output
+quantity for the scale ratio, required machines). Each run then only scales
+the step inputs/outputs.
+
+Plans are cached per DefinitionViews (i.e. per loaded KB) and shared by all
+engines on that KB. A cached plan is reused while the recipe and every step
+process still resolve to the same definition views.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from src.kb_core.definition_views import DefinitionViews, FrozenDict, freeze
+from src.kb_core.override_resolver import resolve_recipe_step_with_kb
+from src.kb_core.validators import ValidationLevel
+from src.simulation.adr020_validators import ValidationIssue, validate_recipe_adr020
+from src.simulation.dependency_graph import DependencyGraph
+
+SCALED_IO_KEYS = ("inputs", "outputs", "byproducts")
+
+
+def _scale_entry(entry: Any, scale: float) -> Any:
+    if "qty" in entry:
+        return {**entry, "qty": entry["qty"] * scale}
+    if "quantity" in entry:
+        return {**entry, "quantity": entry["quantity"] * scale}
+    return entry
+
+
+def _without_scale(step: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in step.items() if k != "scale"}
+
+
+@dataclass(frozen=True)
+class StepPlan:
+    """
+    One recipe step, resolved at unit scale.
+
+    resolved is None for steps that do not resolve against a KB process
+    (inline steps, missing processes); those are resolved per run.
+    """
+
+    index: int
+    step: FrozenDict
+    process: Optional[FrozenDict]
+    resolved: Optional[FrozenDict]
+    io_override: bool
+    base_output_qty: Optional[float]
+    machines: Tuple[str, ...]
+
+    def resolved_at(self, scale: float) -> Dict[str, Any]:
+        """Resolved process definition with inputs/outputs/byproducts scaled."""
+        if scale == 1.0:
+            return self.resolved
+        scaled = dict(self.resolved)
+        for key in SCALED_IO_KEYS:
+            entries = self.resolved.get(key)
+            if entries:
+                scaled[key] = [_scale_entry(entry, scale) for entry in entries]
+        return scaled
+
+
+@dataclass(frozen=True)
+class RecipePlan:
+    """Immutable compiled form of a recipe definition."""
+
+    recipe_id: str
+    recipe: FrozenDict
+    steps: Tuple[StepPlan, ...]
+    validation_issues: Tuple[ValidationIssue, ...]
+    dependency_graph: Optional[DependencyGraph]
+    waves: Tuple[Tuple[int, ...], ...]
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        return [i for i in self.validation_issues if i.level == ValidationLevel.ERROR]
+
+    @property
+    def machines(self) -> Tuple[str, ...]:
+        """Machines required by any step, in first-use order."""
+        seen: Dict[str, None] = {}
+        for step in self.steps:
+            for machine_id in step.machines:
+                seen.setdefault(machine_id, None)
+        return tuple(seen)
+
+    def matches(self, recipe_def: Dict[str, Any]) -> bool:
+        """
+        True if recipe_def has this plan's steps, ignoring per-run scale.
+
+        Used for recipe runs restored from a snapshot, whose recipe_def may
+        predate the current KB.
+        """
+        if recipe_def is self.recipe:
+            return True
+        steps = recipe_def.get("steps", [])
+        if len(steps) != len(self.steps):
+            return False
+        return all(
+            _without_scale(step) == _without_scale(plan.step)
+            for step, plan in zip(steps, self.steps)
+        )
+
+
+def _compile_step(index: int, step: FrozenDict, defs: DefinitionViews) -> StepPlan:
+    process_id = step.get("process_id")
+    process = defs.process(process_id) if process_id else None
+    resolved = None
+    base_output_qty = None
+    machines: Tuple[str, ...] = ()
+    if process is not None:
+        resolved = freeze(resolve_recipe_step_with_kb(_without_scale(step), defs.kb))
+        base = defs.process(resolved.get("id") or process_id)
+        base_outputs = base.get("outputs", []) if base else []
+        if base_outputs:
+            base_output = base_outputs[0]
+            base_output_qty = base_output.get("qty", base_output.get("quantity", 1.0))
+        machines = tuple(
+            req.get("machine_id")
+            for req in resolved.get("resource_requirements") or []
+            if req.get("machine_id")
+        )
+    return StepPlan(
+        index=index,
+        step=step,
+        process=process,
+        resolved=resolved,
+        io_override=bool(step.get("inputs") or step.get("outputs") or step.get("byproducts")),
+        base_output_qty=base_output_qty,
+        machines=machines,
+    )
+
+
+def compile_recipe_plan(recipe_id: str, defs: DefinitionViews) -> Optional[RecipePlan]:
+    """
+    Compile the plan for recipe_id, or None if the recipe is not in the KB.
+
+    Raises:
+        ValueError: If the recipe passes validation but its dependency
+            graph cannot be built (same as RecipeOrchestrator.start_recipe)
+    """
+    recipe = defs.recipe(recipe_id)
+    if recipe is None:
+        return None
+
+    steps = tuple(
+        _compile_step(idx, step, defs) for idx, step in enumerate(recipe.get("steps", []))
+    )
+    issues = tuple(validate_recipe_adr020(recipe))
+    graph = None
+    waves: Tuple[Tuple[int, ...], ...] = ()
+    if not any(i.level == ValidationLevel.ERROR for i in issues):
+        graph = DependencyGraph(recipe)
+        waves = tuple(tuple(wave) for wave in graph.execution_waves())
+    return RecipePlan(
+        recipe_id=recipe_id,
+        recipe=recipe,
+        steps=steps,
+        validation_issues=issues,
+        dependency_graph=graph,
+        waves=waves,
+    )
+
+
+class RecipePlanCache:
+    """
+    Compiled plans for one KB, keyed by recipe_id.
+
+    A plan is recompiled when the recipe or any step process resolves to a
+    different definition view than it was compiled from (KB reload or edit).
+    """
+
+    _shared: "WeakKeyDictionary[DefinitionViews, RecipePlanCache]" = WeakKeyDictionary()
+
+    def __init__(self, defs: DefinitionViews):
+        self.defs = defs
+        self._plans: Dict[str, RecipePlan] = {}
+
+    @classmethod
+    def shared(cls, defs: DefinitionViews) -> "RecipePlanCache":
+        """Plan cache shared by every engine using these definition views."""
+        cache = cls._shared.get(defs)
+        if cache is None:
+            cache = cls._shared[defs] = cls(defs)
+        return cache
+
+    def _is_current(self, plan: RecipePlan) -> bool:
+        if self.defs.recipe(plan.recipe_id) is not plan.recipe:
+            return False
+        for step in plan.steps:
+            process_id = step.step.get("process_id")
+            if process_id and self.defs.process(process_id) is not step.process:
+                return False
+        return True
+
+    def get(self, recipe_id: str) -> Optional[RecipePlan]:
+        """Current plan for recipe_id (compiled on first use), or None if missing."""
+        plan = self._plans.get(recipe_id)
+        if plan is not None and self._is_current(plan):
+            return plan
+        self._plans.pop(recipe_id, None)
+        plan = compile_recipe_plan(recipe_id, self.defs)
+        if plan is not None:
+            self._plans[recipe_id] = plan
+        return plan
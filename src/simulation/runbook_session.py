@@ -0,0 +1,74 @@
+"""
+Live simulation engines for one runbook run.
+
+Runbook steps are dispatched through the cli command handlers, each of
+which loads its simulation from disk and saves it back. A RunbookSession
+keeps one SimulationEngine per sim_id in memory instead: saves become
+in-memory checkpoints (SimulationEngine.defer_saves) that the session
+writes to disk at checkpoints and when the run ends.
+
+A step that does not save leaves its simulation as it was: the engine is
+rolled back to its last save before it is used again or persisted, so a
+session produces the same snapshots and events as the per-step
+load/save cycle.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from src.simulation.engine import SimulationEngine
+
+
+class RunbookSession:
+    """Engines kept in memory across the steps of a runbook run."""
+
+    def __init__(self):
+        self._engines: Dict[str, SimulationEngine] = {}
+        # sim_id -> engine.save_count when last handed to a command
+        self._checked_out: Dict[str, int] = {}
+
+    def __contains__(self, sim_id: str) -> bool:
+        return sim_id in self._engines
+
+    def add(self, engine: SimulationEngine) -> None:
+        """Track a freshly loaded engine and hand it to the current command."""
+        engine.defer_saves()
+        self._engines[engine.sim_id] = engine
+        self._checked_out[engine.sim_id] = engine.save_count
+
+    def get(self, sim_id: str) -> Optional[SimulationEngine]:
+        """Live engine for a command that may change it, or None if not loaded."""
+        engine = self._engines.get(sim_id)
+        if engine is None:
+            return None
+        if not self._settle(sim_id):
+            engine.reset_transient_state()
+        self._checked_out[sim_id] = engine.save_count
+        return engine
+
+    def peek(self, sim_id: str) -> Optional[SimulationEngine]:
+        """Live engine as of its last save, for read-only use."""
+        engine = self._engines.get(sim_id)
+        if engine is not None:
+            self._settle(sim_id)
+        return engine
+
+    def discard(self, sim_id: str) -> None:
+        """Forget sim_id, dropping any saves not yet persisted."""
+        self._engines.pop(sim_id, None)
+        self._checked_out.pop(sim_id, None)
+
+    def persist(self) -> None:
+        """Write every engine's unpersisted saves to disk."""
+        for sim_id, engine in self._engines.items():
+            self._settle(sim_id)
+            engine.persist()
+
+    def _settle(self, sim_id: str) -> bool:
+        """Roll back changes from a command that did not save; True if rolled back."""
+        saves = self._checked_out.pop(sim_id, None)
+        engine = self._engines[sim_id]
+        if saves is None or engine.save_count != saves:
+            return False
+        engine.rollback()
+        return True
@@ -50,28 +50,52 @@ class EventQueue:
     Events are processed in order of:
     1. Time (earliest first)
     2. Priority (lower number = higher priority)
-    3. Event ID (for stable ordering)
+    3. Insertion order (for stable ordering)
+
+    Heap entries are indexed by event_id and by process_run_id. Removal
+    tombstones the entry instead of re-heapifying; tombstones are skipped
+    when they reach the top and purged once they make up half the heap.
     """
 
+    # Heap entry layout: [time, priority, seq, event]; event is None once removed
+    _EVENT = 3
+
     def __init__(self):
         """Initialize empty event queue."""
-        self._heap: List[SchedulerEvent] = []
+        self._entries: List[list] = []
         self._event_counter = 0
+        self._live = 0
+        # event_id -> live entries (oldest first); process_run_id -> {seq: entry}
+        self._by_id: Dict[str, List[list]] = {}
+        self._by_process: Dict[str, Dict[int, list]] = {}
+
+    @property
+    def _heap(self) -> List[SchedulerEvent]:
+        """Queued events in heap order (read-only view)."""
+        return [e[self._EVENT] for e in self._entries if e[self._EVENT] is not None]
 
     def push(self, event: SchedulerEvent) -> None:
         """Add event to queue."""
-        heapq.heappush(self._heap, event)
+        entry = [event.time, event.priority, self._event_counter, event]
+        self._event_counter += 1
+        heapq.heappush(self._entries, entry)
+        self._index(entry)
 
     def pop(self) -> Optional[SchedulerEvent]:
         """Remove and return next event."""
-        if self._heap:
-            return heapq.heappop(self._heap)
+        self._drop_removed_top()
+        if self._entries:
+            entry = heapq.heappop(self._entries)
+            event = entry[self._EVENT]
+            self._unindex(entry)
+            return event
         return None
 
     def peek(self) -> Optional[SchedulerEvent]:
         """View next event without removing."""
-        if self._heap:
-            return self._heap[0]
+        self._drop_removed_top()
+        if self._entries:
+            return self._entries[0][self._EVENT]
         return None
 
     def remove(self, event_id: str) -> bool:
@@ -81,44 +105,103 @@ class EventQueue:
         Returns:
             True if event was found and removed
         """
-        for i, event in enumerate(self._heap):
-            if event.event_id == event_id:
-                self._heap.pop(i)
-                heapq.heapify(self._heap)
-                return True
-        return False
+        entries = self._by_id.get(event_id)
+        if not entries:
+            return False
+        entry = entries[0]
+        self._unindex(entry)
+        entry[self._EVENT] = None
+        if len(self._entries) > 2 * self._live + 64:
+            self._purge()
+        return True
 
     def get_events_before(self, time: float) -> List[SchedulerEvent]:
         """Get all events scheduled before given time (without removing)."""
-        return [e for e in self._heap if e.time < time]
+        # Heap-ordered walk: a subtree is skipped once its root is too late
+        heap = self._entries
+        found = []
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            entry = heap[i]
+            if entry[0] >= time:
+                continue
+            if entry[self._EVENT] is not None:
+                found.append(entry)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+        found.sort(key=lambda e: (e[0], e[1], e[2]))
+        return [entry[self._EVENT] for entry in found]
 
     def get_events_for_process(self, process_run_id: str) -> List[SchedulerEvent]:
         """Get all events for a process run."""
-        return [
-            e for e in self._heap
-            if e.data.get('process_run_id') == process_run_id
-        ]
+        entries = self._by_process.get(process_run_id)
+        if not entries:
+            return []
+        return [entry[self._EVENT] for entry in entries.values()]
 
     def __len__(self) -> int:
         """Return number of events in queue."""
-        return len(self._heap)
+        return self._live
 
     def __bool__(self) -> bool:
         """Return True if queue has events."""
-        return len(self._heap) > 0
+        return self._live > 0
 
     def clear(self) -> None:
         """Remove all events."""
-        self._heap.clear()
+        self._entries.clear()
+        self._by_id.clear()
+        self._by_process.clear()
+        self._live = 0
 
     def to_list(self) -> List[SchedulerEvent]:
-        """Return a shallow copy of queued events."""
-        return list(self._heap)
+        """Return queued events in processing order."""
+        entries = sorted(e for e in self._entries if e[self._EVENT] is not None)
+        return [entry[self._EVENT] for entry in entries]
 
     def load_from_list(self, events: List[SchedulerEvent]) -> None:
         """Replace queue with provided events and restore heap order."""
-        self._heap = list(events)
-        heapq.heapify(self._heap)
+        self.clear()
+        for event in events:
+            entry = [event.time, event.priority, self._event_counter, event]
+            self._event_counter += 1
+            self._entries.append(entry)
+            self._index(entry)
+        heapq.heapify(self._entries)
+
+    def _index(self, entry: list) -> None:
+        event = entry[self._EVENT]
+        self._live += 1
+        self._by_id.setdefault(event.event_id, []).append(entry)
+        process_run_id = event.data.get('process_run_id')
+        if process_run_id is not None:
+            self._by_process.setdefault(process_run_id, {})[entry[2]] = entry
+
+    def _unindex(self, entry: list) -> None:
+        event = entry[self._EVENT]
+        self._live -= 1
+        entries = self._by_id[event.event_id]
+        entries.remove(entry)
+        if not entries:
+            del self._by_id[event.event_id]
+        process_run_id = event.data.get('process_run_id')
+        if process_run_id is not None:
+            process_entries = self._by_process[process_run_id]
+            del process_entries[entry[2]]
+            if not process_entries:
+                del self._by_process[process_run_id]
+
+    def _drop_removed_top(self) -> None:
+        heap = self._entries
+        while heap and heap[0][self._EVENT] is None:
+            heapq.heappop(heap)
+
+    def _purge(self) -> None:
+        """Rebuild the heap without tombstones."""
+        self._entries = [e for e in self._entries if e[self._EVENT] is not None]
+        heapq.heapify(self._entries)
 
 
 @dataclass
@@ -156,16 +239,36 @@ class Scheduler:
     Manages:
     - Event queue (chronological processing)
     - Active processes (currently running)
-    - Completed processes (finished)
+    - Completed processes (finished, indexed by process_run_id)
     - Event handlers (callbacks)
+
+    With completed_retention set, only the most recent completions are kept
+    in memory. Older ones are handed to on_completed_evicted (the engine
+    spills them to its event log) at the start of the next advance, so runs
+    completed during an advance stay resolvable until it returns.
     """
 
-    def __init__(self):
-        """Initialize scheduler."""
+    def __init__(self, completed_retention: Optional[int] = None):
+        """
+        Initialize scheduler.
+
+        Args:
+            completed_retention: Max completed processes kept in memory
+                (None = keep all)
+        """
+        if completed_retention is not None and completed_retention < 0:
+            raise ValueError(f"completed_retention must be >= 0, got {completed_retention}")
         self.current_time: float = 0.0
         self.event_queue = EventQueue()
         self.active_processes: Dict[str, ProcessRun] = {}
-        self.completed_processes: List[ProcessRun] = []
+        self._completed: List[ProcessRun] = []
+        self._completed_by_id: Dict[str, ProcessRun] = {}
+        # Deferred history (see defer_completed): loader for the completions
+        # that precede _completed, and how many it will return
+        self._completed_loader: Optional[Callable[[], List[ProcessRun]]] = None
+        self._deferred_count = 0
+        self.completed_retention = completed_retention
+        self.on_completed_evicted: Optional[Callable[[ProcessRun], None]] = None
 
         # Event handlers
         self._handlers: Dict[EventType, List[Callable]] = {
@@ -178,6 +281,54 @@ class Scheduler:
         # Statistics
         self.total_events_processed = 0
 
+    @property
+    def completed_processes(self) -> List[ProcessRun]:
+        """Completed processes in completion order."""
+        self._load_completed()
+        return self._completed
+
+    @completed_processes.setter
+    def completed_processes(self, processes: List[ProcessRun]) -> None:
+        self._completed_loader = None
+        self._deferred_count = 0
+        self._completed = list(processes)
+        self._completed_by_id = {}
+        for process_run in self._completed:
+            self._completed_by_id.setdefault(process_run.process_run_id, process_run)
+
+    @property
+    def completed_count(self) -> int:
+        """Number of retained completed processes (does not load deferred history)."""
+        return self._deferred_count + len(self._completed)
+
+    @property
+    def completed_deferred(self) -> bool:
+        """True while completed history restored by defer_completed is unloaded."""
+        return self._completed_loader is not None
+
+    def defer_completed(self, loader: Callable[[], List[ProcessRun]], count: int) -> None:
+        """
+        Restore `count` completed processes lazily.
+
+        loader is called on first access to completed_processes (or a lookup
+        that misses the completions recorded since); new completions are
+        appended after the deferred ones meanwhile.
+        """
+        self.completed_processes = []
+        self._completed_loader = loader
+        self._deferred_count = count
+
+    def completed_since_deferred(self) -> List[ProcessRun]:
+        """Completions recorded after defer_completed while history is unloaded."""
+        return list(self._completed) if self.completed_deferred else []
+
+    def _load_completed(self) -> None:
+        loader = self._completed_loader
+        if loader is None:
+            return
+        recent = self._completed
+        self.completed_processes = loader() + recent
+
     def register_handler(
         self,
         event_type: EventType,
@@ -386,6 +537,7 @@ class Scheduler:
                 f"target={target_time}, current={self.current_time}"
             )
 
+        self.trim_completed()
         processed_events = []
 
         while self.event_queue:
@@ -480,7 +632,8 @@ class Scheduler:
         # Move from active to completed
         if process_run_id in self.active_processes:
             process_run = self.active_processes.pop(process_run_id)
-            self.completed_processes.append(process_run)
+            self._completed.append(process_run)
+            self._completed_by_id.setdefault(process_run_id, process_run)
 
     def _handle_machine_release(self, event: SchedulerEvent) -> None:
         """Handle machine release event (for partial reservations)."""
@@ -498,6 +651,36 @@ class Scheduler:
         """Get active process by ID."""
         return self.active_processes.get(process_run_id)
 
+    def get_completed_process(self, process_run_id: str) -> Optional[ProcessRun]:
+        """Get retained completed process by ID."""
+        process_run = self._completed_by_id.get(process_run_id)
+        if process_run is None and self.completed_deferred:
+            self._load_completed()
+            process_run = self._completed_by_id.get(process_run_id)
+        return process_run
+
+    def trim_completed(self) -> int:
+        """
+        Evict completed processes beyond completed_retention (oldest first).
+
+        Returns:
+            Number of processes evicted
+        """
+        if self.completed_retention is None:
+            return 0
+        excess = self.completed_count - self.completed_retention
+        if excess <= 0:
+            return 0
+        self._load_completed()
+        evicted = self._completed[:excess]
+        del self._completed[:excess]
+        for process_run in evicted:
+            if self._completed_by_id.get(process_run.process_run_id) is process_run:
+                del self._completed_by_id[process_run.process_run_id]
+            if self.on_completed_evicted is not None:
+                self.on_completed_evicted(process_run)
+        return excess
+
     def get_active_processes_for_recipe(self, recipe_run_id: str) -> List[ProcessRun]:
         """Get all active processes for a recipe run."""
         return [
@@ -515,7 +698,7 @@ class Scheduler:
         self.current_time = 0.0
         self.event_queue.clear()
         self.active_processes.clear()
-        self.completed_processes.clear()
+        self.completed_processes = []
         self.total_events_processed = 0
 
     def __repr__(self) -> str:
@@ -523,5 +706,5 @@ class Scheduler:
             f"Scheduler(time={self.current_time:.2f}h, "
             f"queued={len(self.event_queue)}, "
             f"active={len(self.active_processes)}, "
-            f"completed={len(self.completed_processes)})"
+            f"completed={self.completed_count})"
         )
@@ -0,0 +1,444 @@
+"""
+Append-only incremental snapshot persistence.
+
+In "full" mode SimulationEngine.save() rewrites the whole snapshot.json on
+every call, so save cost grows with run history (completed process runs,
+reservations, recipe runs and their recipe_defs). In "incremental" mode a
+SnapshotJournal writes:
+
+- snapshot.json: a compact base snapshot (SimulationSnapshot plus a
+  top-level "generation" counter, which the model ignores)
+- snapshot.delta.jsonl: one JSON line per save, holding only what changed
+  since the previous save (changed inventory/state keys, new and changed
+  process runs, new reservations, started/progressed recipe runs)
+
+Every delta line carries the base generation it applies to. Compaction
+writes a new base with the next generation (atomically, via os.replace)
+and then removes the delta file, so a crash in between leaves only stale
+lines, which readers skip. A trailing partial line from an interrupted
+append is ignored as well.
+
+Readers that only need the data use read_snapshot_data(); engine.load()
+uses load_snapshot(). Both also handle full-mode and sectioned snapshots
+(see snapshot_sections).
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.simulation.snapshot_sections import SectionedSnapshot, is_sectioned
+from src.simulation.persistence import (
+    SimulationSnapshot,
+    _event_to_snapshot,
+    _process_run_to_snapshot,
+    _recipe_run_to_snapshot,
+    _reservation_to_snapshot,
+    build_snapshot,
+)
+
+SNAPSHOT_FILE = "snapshot.json"
+DELTA_FILE = "snapshot.delta.jsonl"
+SNAPSHOT_MODES = ("full", "incremental", "sectioned")
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def _read_deltas(delta_path: Path, generation: int) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Delta records for `generation`, plus (total lines, stale lines).
+
+    Raises:
+        ValueError: If a line other than the last is not valid JSON
+    """
+    if not delta_path.exists():
+        return [], 0, 0
+    lines = delta_path.read_text(encoding="utf-8").splitlines()
+    deltas: List[Dict[str, Any]] = []
+    stale = 0
+    for lineno, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            if lineno == len(lines):
+                # Interrupted append; the save it belonged to never completed
+                stale += 1
+                break
+            raise ValueError(f"Corrupt snapshot delta at {delta_path}:{lineno}")
+        if record.get("generation") != generation:
+            stale += 1
+            continue
+        deltas.append(record)
+    return deltas, len(lines), stale
+
+
+def _apply_dict_diff(target: Dict[str, Any], diff: Dict[str, Any]) -> None:
+    for key in diff.get("del", ()):
+        target.pop(key, None)
+    target.update(diff.get("set", {}))
+
+
+def _apply_list_diff(items: List[Any], diff: Dict[str, Any]) -> List[Any]:
+    if "all" in diff:
+        return list(diff["all"])
+    dropped = set(diff.get("drop", ()))
+    kept = [item for idx, item in enumerate(items) if idx not in dropped] if dropped else items
+    return kept + list(diff.get("add", ()))
+
+
+def apply_delta(data: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    """Apply one delta record to raw snapshot data in place."""
+    state_delta = delta.get("state")
+    if state_delta:
+        state = data["state"]
+        state.update(state_delta.get("set", {}))
+        for field, diff in state_delta.get("dicts", {}).items():
+            _apply_dict_diff(state.setdefault(field, {}), diff)
+
+    sched_delta = delta.get("scheduler")
+    if sched_delta:
+        sched = data["scheduler"]
+        for key in ("current_time", "total_events_processed", "event_queue"):
+            if key in sched_delta:
+                sched[key] = sched_delta[key]
+        if "active_processes" in sched_delta:
+            _apply_dict_diff(sched.setdefault("active_processes", {}), sched_delta["active_processes"])
+        if "completed_processes" in sched_delta:
+            sched["completed_processes"] = _apply_list_diff(
+                sched.get("completed_processes", []), sched_delta["completed_processes"]
+            )
+
+    runs_delta = delta.get("recipe_runs")
+    if runs_delta:
+        runs = data["orchestrator"].setdefault("recipe_runs", {})
+        for run_id in runs_delta.get("del", ()):
+            runs.pop(run_id, None)
+        runs.update(runs_delta.get("set", {}))
+        for run_id, fields in runs_delta.get("update", {}).items():
+            runs[run_id].update(fields)
+
+    res_delta = delta.get("reservation_manager")
+    if res_delta:
+        manager = data["reservation_manager"]
+        for key in ("machine_capacities", "current_time"):
+            if key in res_delta:
+                manager[key] = res_delta[key]
+        if "reservations" in res_delta:
+            manager["reservations"] = _apply_list_diff(
+                manager.get("reservations", []), res_delta["reservations"]
+            )
+
+
+def read_snapshot_data(sim_dir: Path) -> Dict[str, Any]:
+    """Raw snapshot dict for sim_dir with any incremental deltas applied."""
+    return SnapshotJournal(sim_dir).read()[0]
+
+
+def load_snapshot(sim_dir: Path) -> SimulationSnapshot:
+    """Validated SimulationSnapshot for sim_dir (full or incremental)."""
+    return SnapshotJournal(sim_dir).load()
+
+
+# ---------------------------------------------------------------------------
+# Diffing
+# ---------------------------------------------------------------------------
+
+def _dict_diff(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    removed = [k for k in old if k not in new]
+    if not changed and not removed:
+        return None
+    diff: Dict[str, Any] = {}
+    if changed:
+        diff["set"] = changed
+    if removed:
+        diff["del"] = removed
+    return diff
+
+
+def _list_diff(old: Sequence[Any], new: Sequence[Any], encode) -> Optional[Dict[str, Any]]:
+    """
+    Identity-based diff of an append/remove-only object list.
+
+    Only new objects are encoded. Falls back to the full list if `new` is
+    not `old` minus some entries followed by appended entries.
+    """
+    new_ids = {id(obj) for obj in new}
+    drop = [idx for idx, obj in enumerate(old) if id(obj) not in new_ids]
+    kept = len(old) - len(drop)
+    if drop:
+        dropped = set(drop)
+        survivors = [obj for idx, obj in enumerate(old) if idx not in dropped]
+    else:
+        survivors = old
+    if any(a is not b for a, b in zip(survivors, new[:kept])):
+        return {"all": [encode(obj) for obj in new]}
+    added = new[kept:]
+    if not drop and not added:
+        return None
+    diff: Dict[str, Any] = {}
+    if drop:
+        diff["drop"] = drop
+    if added:
+        diff["add"] = [encode(obj) for obj in added]
+    return diff
+
+
+def _dump_process_run(proc) -> Dict[str, Any]:
+    return _process_run_to_snapshot(proc).model_dump(mode="json")
+
+
+def _dump_reservation(res) -> Dict[str, Any]:
+    return _reservation_to_snapshot(res).model_dump(mode="json")
+
+
+def _dump_run_progress(run) -> Dict[str, Any]:
+    return _recipe_run_to_snapshot(run).model_dump(mode="json", exclude={"recipe_def"})
+
+
+class _Persisted:
+    """What the current base + deltas on disk hold, kept as engine objects and dumps."""
+
+    def __init__(self, engine) -> None:
+        scheduler = engine.scheduler
+        manager = engine.reservation_manager
+        self.state: Dict[str, Any] = engine.state.model_dump(mode="json")
+        self.event_queue: List[Dict[str, Any]] = [
+            _event_to_snapshot(event).model_dump(mode="json")
+            for event in scheduler.event_queue.to_list()
+        ]
+        self.clock: Tuple[float, int] = (scheduler.current_time, scheduler.total_events_processed)
+        self.active: Dict[str, Dict[str, Any]] = {
+            proc_id: _dump_process_run(proc)
+            for proc_id, proc in scheduler.active_processes.items()
+        }
+        self.completed: List[Any] = list(scheduler.completed_processes)
+        # run_id -> (run, progress dump or None once completed)
+        self.runs: Dict[str, Tuple[Any, Optional[Dict[str, Any]]]] = {
+            run_id: (run, None if run.is_completed else _dump_run_progress(run))
+            for run_id, run in engine.orchestrator.recipe_runs.items()
+        }
+        self.reservations: List[Any] = list(manager.reservations) if manager else []
+        self.capacities: Dict[str, float] = dict(manager.machine_capacities) if manager else {}
+        self.res_time: float = manager.current_time if manager else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Journal
+# ---------------------------------------------------------------------------
+
+class SnapshotJournal:
+    """
+    Base snapshot + append-only delta log for one simulation directory.
+
+    Args:
+        sim_dir: Simulation directory
+        max_deltas: Compact after this many delta records
+    """
+
+    def __init__(self, sim_dir: Path, max_deltas: int = 50):
+        self.sim_dir = Path(sim_dir)
+        self.snapshot_path = self.sim_dir / SNAPSHOT_FILE
+        self.delta_path = self.sim_dir / DELTA_FILE
+        self.max_deltas = max_deltas
+        self.generation = 0
+        self._delta_count = 0
+        self._delta_bytes = 0
+        self._base_bytes = 0
+        self._needs_compaction = False
+        self._persisted: Optional[_Persisted] = None
+
+    # -- reading -----------------------------------------------------------
+
+    def read(self) -> Tuple[Dict[str, Any], bool]:
+        """
+        Raw snapshot data with deltas applied, and whether any were applied.
+
+        Raises:
+            FileNotFoundError: If there is no snapshot.json
+        """
+        blob = self.snapshot_path.read_bytes()
+        self._base_bytes = len(blob)
+        if is_sectioned(blob):
+            sections = SectionedSnapshot(blob)
+            data = sections.to_data()
+            self.generation = sections.generation
+        else:
+            data = json.loads(blob)
+            self.generation = data.pop("generation", 0)
+        deltas, lines, stale = _read_deltas(self.delta_path, self.generation)
+        for delta in deltas:
+            apply_delta(data, delta)
+        self._delta_count = len(deltas)
+        self._delta_bytes = self.delta_path.stat().st_size if lines else 0
+        self._needs_compaction = stale > 0
+        return data, bool(deltas)
+
+    def load(self) -> SimulationSnapshot:
+        """Validated snapshot with deltas applied."""
+        if not self.delta_path.exists():
+            blob = self.snapshot_path.read_bytes()
+            if not is_sectioned(blob):
+                # Plain base: let pydantic parse the JSON directly
+                snapshot = SimulationSnapshot.model_validate_json(blob)
+                self._base_bytes = len(blob)
+                self.generation = self._read_generation(blob)
+                self._delta_count = self._delta_bytes = 0
+                self._needs_compaction = False
+                return snapshot
+        data, _ = self.read()
+        return SimulationSnapshot.model_validate(data)
+
+    @staticmethod
+    def _read_generation(blob: bytes) -> int:
+        if blob.startswith(b'{"generation":'):
+            return int(blob[len(b'{"generation":'):blob.index(b",")])
+        return 0
+
+    # -- writing -----------------------------------------------------------
+
+    def prime(self, engine) -> None:
+        """Record that the engine's current state is what is on disk (after load)."""
+        self._persisted = _Persisted(engine)
+
+    def save(self, engine) -> None:
+        """Append a delta for what changed since the last save, compacting when due."""
+        if (
+            self._persisted is None
+            or self._needs_compaction
+            or self._delta_count >= self.max_deltas
+            or self._delta_bytes > self._base_bytes
+        ):
+            self.compact(engine)
+            return
+
+        delta = self._diff(engine)
+        if delta is None:
+            return
+        line = json.dumps({"generation": self.generation, **delta}, separators=(",", ":")) + "\n"
+        with self.delta_path.open("a", encoding="utf-8") as f:
+            f.write(line)
+        self._delta_count += 1
+        self._delta_bytes += len(line)
+
+    def compact(self, engine) -> None:
+        """Write a fresh base snapshot (next generation) and drop the delta log."""
+        generation = self.generation + 1
+        body = build_snapshot(engine).model_dump_json()
+        text = f'{{"generation":{generation},{body[1:]}'
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, self.snapshot_path)
+        if self.delta_path.exists():
+            self.delta_path.unlink()
+        self.generation = generation
+        self._base_bytes = len(text)
+        self._delta_count = self._delta_bytes = 0
+        self._needs_compaction = False
+        self.prime(engine)
+
+    def _diff(self, engine) -> Optional[Dict[str, Any]]:
+        prev = self._persisted
+        delta: Dict[str, Any] = {}
+
+        # Simulation state: per-key diffs for dict fields, replace the rest
+        state = engine.state.model_dump(mode="json")
+        state_set: Dict[str, Any] = {}
+        state_dicts: Dict[str, Any] = {}
+        for field, value in state.items():
+            old = prev.state.get(field)
+            if isinstance(value, dict) and isinstance(old, dict):
+                diff = _dict_diff(old, value)
+                if diff:
+                    state_dicts[field] = diff
+            elif old != value or field not in prev.state:
+                state_set[field] = value
+        if state_set or state_dicts:
+            delta["state"] = {}
+            if state_set:
+                delta["state"]["set"] = state_set
+            if state_dicts:
+                delta["state"]["dicts"] = state_dicts
+        prev.state = state
+
+        # Scheduler: clock and queue when changed, process runs by diff
+        scheduler = engine.scheduler
+        sched: Dict[str, Any] = {}
+        clock = (scheduler.current_time, scheduler.total_events_processed)
+        if clock != prev.clock:
+            sched["current_time"], sched["total_events_processed"] = clock
+            prev.clock = clock
+        event_queue = [
+            _event_to_snapshot(event).model_dump(mode="json")
+            for event in scheduler.event_queue.to_list()
+        ]
+        if event_queue != prev.event_queue:
+            sched["event_queue"] = event_queue
+            prev.event_queue = event_queue
+        active = {
+            proc_id: _dump_process_run(proc)
+            for proc_id, proc in scheduler.active_processes.items()
+        }
+        active_diff = _dict_diff(prev.active, active)
+        if active_diff:
+            sched["active_processes"] = active_diff
+        prev.active = active
+        completed = list(scheduler.completed_processes)
+        completed_diff = _list_diff(prev.completed, completed, _dump_process_run)
+        if completed_diff:
+            sched["completed_processes"] = completed_diff
+        prev.completed = completed
+        if sched:
+            delta["scheduler"] = sched
+
+        # Recipe runs: new runs in full, progress-only updates after that
+        runs_set: Dict[str, Any] = {}
+        runs_update: Dict[str, Any] = {}
+        runs = engine.orchestrator.recipe_runs
+        for run_id, run in runs.items():
+            entry = prev.runs.get(run_id)
+            if entry is not None and entry[0] is run and entry[1] is None:
+                continue  # Completed when last persisted; immutable since
+            progress = _dump_run_progress(run)
+            if entry is None or entry[0] is not run:
+                runs_set[run_id] = _recipe_run_to_snapshot(run).model_dump(mode="json")
+            elif progress != entry[1]:
+                runs_update[run_id] = {
+                    k: v for k, v in progress.items() if entry[1].get(k) != v
+                }
+            prev.runs[run_id] = (run, None if run.is_completed else progress)
+        runs_del = [run_id for run_id in prev.runs if run_id not in runs]
+        for run_id in runs_del:
+            del prev.runs[run_id]
+        if runs_set or runs_update or runs_del:
+            delta["recipe_runs"] = {
+                key: value
+                for key, value in (("set", runs_set), ("update", runs_update), ("del", runs_del))
+                if value
+            }
+
+        # Reservations: new/removed entries only
+        manager = engine.reservation_manager
+        if manager is not None:
+            res: Dict[str, Any] = {}
+            if manager.machine_capacities != prev.capacities:
+                res["machine_capacities"] = dict(manager.machine_capacities)
+                prev.capacities = dict(manager.machine_capacities)
+            if manager.current_time != prev.res_time:
+                res["current_time"] = manager.current_time
+                prev.res_time = manager.current_time
+            reservations = list(manager.reservations)
+            res_diff = _list_diff(prev.reservations, reservations, _dump_reservation)
+            if res_diff:
+                res["reservations"] = res_diff
+            prev.reservations = reservations
+            if res:
+                delta["reservation_manager"] = res
+
+        return delta or None
@@ -0,0 +1,311 @@
+"""
+Sectioned snapshot encoding with lazily loaded history.
+
+A full-mode snapshot.json is one JSON document, so every load parses and
+validates the whole run history even when a command only reads inventory
+and time. The sectioned layout (SimulationEngine snapshot_mode
+"sectioned") splits the snapshot into independently parseable sections:
+
+    {"format":"sectioned","version":1,"sections":{name:[offset,length],...},...}\\n
+    <section bytes>...
+
+The first line is a JSON header with each section's byte range (relative
+to the end of the header line) and the counts needed for summaries.
+Sections are compact JSON:
+
+- state, scheduler (without completed processes), recipe_runs (active
+  runs): parsed on load
+- completed_processes, completed_recipe_runs (with their recipe_defs),
+  reservation_manager: parsed on first access (Scheduler.defer_completed,
+  RecipeOrchestrator.defer_completed_runs, the engine's lazy
+  reservation_manager)
+
+Saving while history is still deferred copies the unloaded sections'
+bytes from the file they were restored from and appends only new entries,
+so neither reads nor saves pay for history the command never touched.
+
+Recipe runs carry their position ("seq") in the orchestrator's run order
+so that active and completed runs merge back in start order.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from src.simulation.machine_reservations import MachineReservationManager
+from src.simulation.models import SimulationState
+from src.simulation.persistence import (
+    OrchestratorSnapshot,
+    ProcessRunSnapshot,
+    ReservationManagerSnapshot,
+    SchedulerSnapshot,
+    _event_to_snapshot,
+    _process_run_to_snapshot,
+    _recipe_run_to_snapshot,
+    _reservation_to_snapshot,
+    _snapshot_to_process_run,
+    restore_orchestrator,
+    restore_reservation_manager,
+    restore_scheduler,
+)
+from src.simulation.recipe_orchestrator import RecipeOrchestrator, RecipeRun
+from src.simulation.scheduler import Scheduler
+
+FORMAT = "sectioned"
+VERSION = 1
+_HEADER_PREFIX = b'{"format":"sectioned"'
+
+_process_runs = TypeAdapter(List[ProcessRunSnapshot])
+
+
+def is_sectioned(blob: bytes) -> bool:
+    """True if blob is a sectioned snapshot (as opposed to plain JSON)."""
+    return blob.startswith(_HEADER_PREFIX)
+
+
+def _join_array(items: List[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
+
+
+def _extend_array(raw: bytes, items: List[bytes]) -> bytes:
+    """Append already-encoded items to an encoded JSON array."""
+    if not items:
+        return raw
+    if raw == b"[]":
+        return _join_array(items)
+    return raw[:-1] + b"," + b",".join(items) + b"]"
+
+
+def _encode_run(seq: int, run: RecipeRun) -> bytes:
+    body = _recipe_run_to_snapshot(run).model_dump_json().encode("utf-8")
+    return b'{"seq":%d,"run":%s}' % (seq, body)
+
+
+class SectionedSnapshot:
+    """A parsed header plus the raw bytes of a sectioned snapshot file."""
+
+    def __init__(self, blob: bytes):
+        end = blob.index(b"\n")
+        self.header: Dict[str, Any] = json.loads(blob[:end])
+        if self.header.get("version") != VERSION:
+            raise ValueError(f"Unsupported sectioned snapshot version: {self.header.get('version')}")
+        self._body = memoryview(blob)[end + 1:]
+        # run_id -> seq for runs restored eagerly; next seq for new runs
+        self.positions: Dict[str, int] = {}
+        self.next_seq: int = self.header.get("next_seq", 0)
+
+    @classmethod
+    def open(cls, sim_dir: Path) -> Optional["SectionedSnapshot"]:
+        """Sectioned snapshot in sim_dir, or None if snapshot.json is plain JSON."""
+        path = Path(sim_dir) / "snapshot.json"
+        # Sniff the header first: plain snapshots are read again by their loader
+        with path.open("rb") as f:
+            if not is_sectioned(f.read(len(_HEADER_PREFIX))):
+                return None
+        return cls(path.read_bytes())
+
+    @property
+    def generation(self) -> int:
+        return self.header.get("generation", 0)
+
+    def count(self, name: str) -> int:
+        return self.header.get("counts", {}).get(name, 0)
+
+    def raw(self, name: str) -> bytes:
+        offset, length = self.header["sections"][name]
+        return bytes(self._body[offset:offset + length])
+
+    def section(self, name: str) -> Any:
+        return json.loads(self.raw(name))
+
+    # -- decoding -----------------------------------------------------------
+
+    def to_data(self) -> Dict[str, Any]:
+        """All sections as a plain (full-mode shaped) snapshot dict."""
+        scheduler = self.section("scheduler")
+        scheduler["completed_processes"] = self.section("completed_processes")
+        runs = self.section("recipe_runs") + self.section("completed_recipe_runs")
+        runs.sort(key=lambda entry: entry["seq"])
+        return {
+            "sim_id": self.header["sim_id"],
+            "state": self.section("state"),
+            "scheduler": scheduler,
+            "orchestrator": {
+                "recipe_runs": {entry["run"]["recipe_run_id"]: entry["run"] for entry in runs}
+            },
+            "reservation_manager": self.section("reservation_manager"),
+        }
+
+    def restore(
+        self,
+    ) -> Tuple[SimulationState, Scheduler, RecipeOrchestrator, Callable[[], MachineReservationManager]]:
+        """
+        Restore state, scheduler and active recipe runs; defer the rest.
+
+        Returns the reservation manager as a loader for the engine to call
+        on first access.
+        """
+        state = SimulationState.model_validate_json(self.raw("state"))
+        scheduler = restore_scheduler(SchedulerSnapshot.model_validate_json(self.raw("scheduler")))
+        completed = self.count("completed_processes")
+        if completed:
+            scheduler.defer_completed(self._load_completed_processes, completed)
+
+        active_entries = self.section("recipe_runs")
+        self.positions = {entry["run"]["recipe_run_id"]: entry["seq"] for entry in active_entries}
+        orchestrator = restore_orchestrator(
+            OrchestratorSnapshot(
+                recipe_runs={entry["run"]["recipe_run_id"]: entry["run"] for entry in active_entries}
+            ),
+            scheduler,
+        )
+        archived = self.count("completed_recipe_runs")
+        if archived:
+            orchestrator.defer_completed_runs(self._merge_completed_runs, archived)
+
+        return state, scheduler, orchestrator, self._load_reservation_manager
+
+    def _load_completed_processes(self):
+        return [
+            _snapshot_to_process_run(proc)
+            for proc in _process_runs.validate_json(self.raw("completed_processes"))
+        ]
+
+    def _merge_completed_runs(self, current: Dict[str, RecipeRun]) -> Dict[str, RecipeRun]:
+        entries = self.section("completed_recipe_runs")
+        archived = restore_orchestrator(
+            OrchestratorSnapshot(
+                recipe_runs={entry["run"]["recipe_run_id"]: entry["run"] for entry in entries}
+            ),
+            Scheduler(),
+        ).recipe_runs
+        ordered = [(entry["seq"], archived[entry["run"]["recipe_run_id"]]) for entry in entries]
+        ordered += [
+            (self.positions[run_id], run) for run_id, run in current.items() if run_id in self.positions
+        ]
+        ordered.sort(key=lambda pair: pair[0])
+        merged = {run.recipe_run_id: run for _, run in ordered}
+        # Runs started since the restore keep their order after the rest
+        for run_id, run in current.items():
+            merged.setdefault(run_id, run)
+        return merged
+
+    def _load_reservation_manager(self) -> MachineReservationManager:
+        return restore_reservation_manager(
+            ReservationManagerSnapshot.model_validate_json(self.raw("reservation_manager"))
+        )
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _dump(model, **kwargs) -> bytes:
+    return model.model_dump_json(**kwargs).encode("utf-8")
+
+
+def encode_sectioned(engine, restored: Optional[SectionedSnapshot] = None) -> bytes:
+    """
+    Encode the engine's snapshot in the sectioned layout.
+
+    Sections whose history is still deferred are copied from `restored`
+    (the snapshot the engine was loaded from) with new entries appended.
+    """
+    scheduler = engine.scheduler
+    orchestrator = engine.orchestrator
+    sections: List[Tuple[str, bytes]] = []
+    counts: Dict[str, int] = {}
+
+    sections.append(("state", _dump(engine.state)))
+    scheduler_snapshot = SchedulerSnapshot(
+        current_time=scheduler.current_time,
+        event_queue=[_event_to_snapshot(event) for event in scheduler.event_queue.to_list()],
+        active_processes={
+            proc_id: _process_run_to_snapshot(proc)
+            for proc_id, proc in scheduler.active_processes.items()
+        },
+        total_events_processed=scheduler.total_events_processed,
+    )
+    sections.append(("scheduler", _dump(scheduler_snapshot, exclude={"completed_processes"})))
+
+    # Completed processes
+    if restored is not None and scheduler.completed_deferred:
+        recent = scheduler.completed_since_deferred()
+        completed_raw = _extend_array(
+            restored.raw("completed_processes"),
+            [_dump(_process_run_to_snapshot(proc)) for proc in recent],
+        )
+        counts["completed_processes"] = restored.count("completed_processes") + len(recent)
+    else:
+        completed = scheduler.completed_processes
+        completed_raw = _join_array([_dump(_process_run_to_snapshot(proc)) for proc in completed])
+        counts["completed_processes"] = len(completed)
+    sections.append(("completed_processes", completed_raw))
+
+    # Recipe runs: active runs load eagerly, completed runs are deferred
+    active_runs: List[bytes] = []
+    completed_runs: List[bytes] = []
+    if restored is not None and orchestrator.runs_deferred:
+        positions, next_seq = restored.positions, restored.next_seq
+        for run_id, run in orchestrator.loaded_recipe_runs().items():
+            if run_id not in positions:
+                positions[run_id] = next_seq
+                next_seq += 1
+            target = completed_runs if run.is_completed else active_runs
+            target.append(_encode_run(positions[run_id], run))
+        restored.next_seq = next_seq
+        archive_raw = _extend_array(restored.raw("completed_recipe_runs"), completed_runs)
+        counts["completed_recipe_runs"] = restored.count("completed_recipe_runs") + len(completed_runs)
+    else:
+        runs = orchestrator.recipe_runs
+        next_seq = len(runs)
+        for seq, run in enumerate(runs.values()):
+            target = completed_runs if run.is_completed else active_runs
+            target.append(_encode_run(seq, run))
+        archive_raw = _join_array(completed_runs)
+        counts["completed_recipe_runs"] = len(completed_runs)
+    sections.append(("recipe_runs", _join_array(active_runs)))
+    sections.append(("completed_recipe_runs", archive_raw))
+
+    # Reservations
+    if restored is not None and engine.reservations_deferred:
+        reservations_raw = restored.raw("reservation_manager")
+    else:
+        manager = engine.reservation_manager
+        if manager is None:
+            manager_snapshot = ReservationManagerSnapshot()
+        else:
+            manager_snapshot = ReservationManagerSnapshot(
+                machine_capacities=dict(manager.machine_capacities),
+                reservations=[_reservation_to_snapshot(res) for res in manager.reservations],
+                current_time=manager.current_time,
+            )
+        reservations_raw = _dump(manager_snapshot)
+    sections.append(("reservation_manager", reservations_raw))
+
+    offsets: Dict[str, List[int]] = {}
+    position = 0
+    for name, raw in sections:
+        offsets[name] = [position, len(raw)]
+        position += len(raw)
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "sim_id": engine.sim_id,
+        "sections": offsets,
+        "counts": counts,
+        "next_seq": next_seq,
+    }
+    header_line = json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n"
+    return header_line + b"".join(raw for _, raw in sections)
+
+
+def write_sectioned(path: Path, blob: bytes) -> None:
+    """Atomically replace path with blob."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(blob)
+    os.replace(tmp_path, path)
@@ -21,6 +21,8 @@ from matplotlib.patches import Rectangle
 import matplotlib.colors as mcolors
 import numpy as np
 
+from src.simulation.snapshot_journal import read_snapshot_data
+
 
 class SimulationVisualizer:
     """
@@ -73,7 +75,7 @@ class SimulationVisualizer:
             snapshot_file = self.sim_dir / "snapshot.json"
             if snapshot_file.exists():
                 try:
-                    snapshot_data = json.loads(snapshot_file.read_text(encoding="utf-8"))
+                    snapshot_data = read_snapshot_data(self.sim_dir)
                     state = snapshot_data.get("state", {})
                     self.state_snapshots.append({
                         "type": "state_snapshot",
@@ -85,7 +87,7 @@ class SimulationVisualizer:
                         "total_imports": state.get("total_imports", {}),
                         "total_energy_kwh": state.get("total_energy_kwh", 0.0),
                     })
-                except json.JSONDecodeError:
+                except ValueError:
                     pass
 
     # ========================================================================
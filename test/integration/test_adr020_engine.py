@@ -682,6 +682,85 @@ class TestRecipeOrchestration:
         assert progress["progress_percent"] == pytest.approx(100.0)
         assert progress["is_completed"]
 
+    def _start_recipe(self, recipe_kb, sim_dir, quantity=1):
+        kb = KBLoader(recipe_kb, use_validated_models=False)
+        kb.load_all()
+        engine = SimulationEngine("test_sim", kb, sim_dir)
+        engine.import_item("ore", 10.0, "kg")
+        engine.import_item("furnace", 1.0, "count")
+        engine.import_item("forge", 1.0, "count")
+        result = engine.run_recipe(recipe_id="recipe_part_v0", quantity=quantity)
+        assert result["success"]
+        return engine, result["recipe_run_id"]
+
+    def test_recipe_plan_shared_across_runs(self, recipe_kb, tmp_path):
+        """Repeated runs and restored engines reuse the compiled recipe plan."""
+        engine, first_run = self._start_recipe(recipe_kb, tmp_path / "plan", quantity=2)
+        plan = engine.recipe_plans.get("recipe_part_v0")
+        second = engine.run_recipe(recipe_id="recipe_part_v0", quantity=2)
+        assert second["success"]
+        assert engine.recipe_plans.get("recipe_part_v0") is plan
+
+        # Quantity scales the step, not the compiled plan
+        recipe_run = engine.orchestrator.get_recipe_run(first_run)
+        assert recipe_run.recipe_def["steps"][0]["scale"] == 2.0
+        assert recipe_run.dependency_graph is plan.dependency_graph
+        assert "scale" not in plan.recipe["steps"][0]
+
+        engine.save()
+        restored = SimulationEngine("test_sim", engine.kb, tmp_path / "plan")
+        restored.load()
+        assert restored.recipe_plans is engine.recipe_plans
+        restored_run = restored.orchestrator.get_recipe_run(first_run)
+        assert restored._recipe_run_plan(restored_run) is plan
+
+        restored.run_until_idle()
+        assert restored.orchestrator.is_recipe_complete(first_run)
+
+    def test_run_until_idle_matches_stepwise_advance(self, recipe_kb, tmp_path):
+        """run_until_idle ends in the same state as advancing event by event."""
+        stepped, _ = self._start_recipe(recipe_kb, tmp_path / "stepped", quantity=3)
+        while stepped.scheduler.event_queue:
+            next_time = stepped.scheduler.event_queue.peek().time
+            stepped.advance_time(max(0.0, next_time - stepped.scheduler.current_time))
+
+        engine, recipe_run_id = self._start_recipe(recipe_kb, tmp_path / "idle", quantity=3)
+        logged_before = len(engine.event_buffer)
+        result = engine.run_until_idle()
+
+        assert result["idle"]
+        assert not result["stopped"]
+        assert result["processes_completed"] == 2
+        assert engine.orchestrator.is_recipe_complete(recipe_run_id)
+        assert result["new_time"] == stepped.scheduler.current_time
+        assert engine.state.inventory["part"].quantity == stepped.state.inventory["part"].quantity
+        assert engine.state.total_energy_kwh == stepped.state.total_energy_kwh
+
+        # One state snapshot for the whole run
+        snapshots = [
+            e for e in engine.event_buffer[logged_before:] if e.type == "state_snapshot"
+        ]
+        assert len(snapshots) == 1
+
+    def test_run_until_idle_max_time_and_stop_on(self, recipe_kb, tmp_path):
+        """max_time bounds the clock; stop_on halts after the matching event."""
+        engine, recipe_run_id = self._start_recipe(recipe_kb, tmp_path / "bounded")
+        result = engine.run_until_idle(max_time=0.5)
+        assert result["new_time"] == 0.5
+        assert not result["idle"]
+        assert result["processes_completed"] == 0
+
+        result = engine.run_until_idle(
+            stop_on=lambda event: event.event_type == EventType.PROCESS_COMPLETE
+        )
+        assert result["stopped"]
+        assert result["new_time"] == 1.0
+        assert result["processes_completed"] == 1
+        assert not engine.orchestrator.is_recipe_complete(recipe_run_id)
+
+        assert engine.run_until_idle()["idle"]
+        assert engine.orchestrator.is_recipe_complete(recipe_run_id)
+
 
 class TestUtilityMethods:
     """Test utility and query methods."""
@@ -288,3 +288,152 @@ steps:
         output = f"TARGET: {target_item_id} (1 unit, {mass_str})"
         assert "50.00 kg" in output, "Should show '50.00 kg'"
         assert "mass unknown" not in output, "Should not show 'mass unknown'"
+
+    def test_runbook_defer_saves_matches_per_step_saves(self, temp_kb, tmp_path, monkeypatch):
+        """Runbooks with --defer-saves persist the same snapshot and events."""
+        import argparse
+        import re
+
+        from src.simulation import cli
+
+        (temp_kb / "items" / "materials" / "test_press.yaml").write_text("""id: test_press
+kind: machine
+name: Test Press
+mass: 10.0
+unit: unit
+""")
+        (temp_kb / "items" / "materials" / "test_bracket.yaml").write_text("""id: test_bracket
+kind: material
+name: Test Bracket
+mass: 50.0
+unit: unit
+""")
+        (temp_kb / "processes" / "test_press_v0.yaml").write_text("""id: test_press_v0
+kind: process
+name: Test Press Process
+inputs:
+  - item_id: test_item_with_mass
+    qty: 1
+    unit: unit
+outputs:
+  - item_id: test_bracket
+    qty: 1
+    unit: unit
+resource_requirements:
+  - machine_id: test_press
+    qty: 1
+    unit: count
+time_model:
+  type: batch
+  hr_per_batch: 1.0
+""")
+        (temp_kb / "recipes" / "recipe_test_press.yaml").write_text("""id: recipe_test_press
+kind: recipe
+target_item_id: test_bracket
+steps:
+  - process_id: test_press_v0
+""")
+        kb = KBLoader(temp_kb, use_validated_models=False)
+        kb.load_all()
+
+        runbook = tmp_path / "runbook.md"
+        runbook.write_text("""# Deferred saves
+
+```sim-runbook
+- cmd: sim.use
+  args:
+    sim-id: deferred
+- cmd: sim.reset
+  args:
+    sim-id: deferred
+- cmd: sim.import
+  args:
+    item: test_item_with_mass
+    quantity: 2
+    unit: unit
+- cmd: sim.import
+  args:
+    item: missing_item
+    quantity: 1
+    unit: unit
+- cmd: sim.import
+  args:
+    item: test_press
+    quantity: 1
+    unit: unit
+- cmd: sim.run-recipe
+  args:
+    recipe: recipe_test_item_no_mass
+    quantity: 1
+- cmd: sim.run-recipe
+  args:
+    recipe: recipe_test_press
+    quantity: 1
+- cmd: sim.preview
+  args:
+    hours: 1
+- cmd: sim.advance-time
+  args:
+    hours: 2
+```
+""")
+
+        def run(defer_saves):
+            sims_dir = tmp_path / ("deferred" if defer_saves else "per_step")
+            monkeypatch.setattr(cli, "SIMULATIONS_DIR", sims_dir)
+            args = argparse.Namespace(
+                file=str(runbook),
+                dry_run=False,
+                continue_on_error=True,
+                format="raw",
+                defer_saves=defer_saves,
+            )
+            assert cli.cmd_runbook(args, kb) == 0
+            sim_dir = sims_dir / "deferred"
+            snapshot = json.loads((sim_dir / "snapshot.json").read_text())
+            events = [json.loads(line) for line in (sim_dir / "events.jsonl").read_text().splitlines()]
+            return snapshot, events
+
+        snapshot, events = run(False)
+        deferred_snapshot, deferred_events = run(True)
+        assert cli._RUNBOOK_SESSION is None
+
+        def strip(value):
+            text = json.dumps(value, sort_keys=True)
+            text = re.sub(r'"timestamp": "[^"]*"', '"timestamp": ""', text)
+            return re.sub(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "<id>", text)
+
+        assert [e["type"] for e in deferred_events] == [e["type"] for e in events]
+        assert "preview" not in [e["type"] for e in events]
+        assert strip(deferred_events) == strip(events)
+        assert strip(deferred_snapshot) == strip(snapshot)
+        assert deferred_snapshot["state"]["inventory"]["test_bracket"]["quantity"] == 1.0
+
+    def test_runbook_session_rolls_back_unsaved_changes(self, temp_kb, temp_sim_dir):
+        """A command that does not save leaves the live engine unchanged."""
+        from src.simulation.runbook_session import RunbookSession
+
+        kb = KBLoader(temp_kb, use_validated_models=False)
+        kb.load_all()
+        engine = SimulationEngine("session", kb, temp_sim_dir / "session")
+        engine.load()
+
+        session = RunbookSession()
+        session.add(engine)
+        engine.import_item("test_item_with_mass", 2, "unit")
+        engine.save()
+        assert engine.has_unpersisted_saves
+
+        # Unsaved import: dropped before the engine is used again
+        live = session.get("session")
+        live.import_item("test_item_with_mass", 5, "unit")
+        assert session.peek("session").state.inventory["test_item_with_mass"].quantity == 2
+        assert session.peek("session").event_buffer == []
+
+        session.persist()
+        assert not engine.has_unpersisted_saves
+        reloaded = SimulationEngine("session", kb, temp_sim_dir / "session")
+        reloaded.load()
+        assert reloaded.state.inventory["test_item_with_mass"].quantity == 2
+        events = (temp_sim_dir / "session" / "events.jsonl").read_text().splitlines()
+        assert [json.loads(line)["type"] for line in events].count("import") == 1
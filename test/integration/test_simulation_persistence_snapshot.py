@@ -3,6 +3,8 @@ from pathlib import Path
 
 from src.kb_core.kb_loader import KBLoader
 from src.simulation.engine import SimulationEngine
+from src.simulation.persistence import build_snapshot
+from src.simulation.snapshot_journal import read_snapshot_data
 
 
 def _write_file(path: Path, content: str) -> None:
@@ -123,6 +125,33 @@ def test_snapshot_roundtrip_preserves_imports(tmp_path: Path) -> None:
     assert engine2.state.total_imports["ore"].quantity == 2.0
 
 
+def test_full_snapshot_read_once_on_load(tmp_path: Path, monkeypatch) -> None:
+    kb_dir = tmp_path / "kb"
+    _build_minimal_kb(kb_dir)
+
+    kb = KBLoader(kb_dir, use_validated_models=False)
+    kb.load_all()
+
+    sim_dir = tmp_path / "simulations" / "snapshot_full"
+    engine = SimulationEngine("snapshot_full", kb, sim_dir)
+    engine.load()
+    engine.import_item("ore", 2.0, "kg")
+    engine.save()
+
+    reads = []
+    read_bytes = Path.read_bytes
+
+    def counting_read_bytes(path):
+        reads.append(path.name)
+        return read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_read_bytes)
+    restored = SimulationEngine("snapshot_full", kb, sim_dir)
+    assert restored.load()
+    assert reads.count("snapshot.json") == 1
+    assert restored.state.total_imports["ore"].quantity == 2.0
+
+
 def test_recipe_resume_from_snapshot(tmp_path: Path) -> None:
     kb_dir = tmp_path / "kb"
     _build_minimal_kb(kb_dir)
@@ -165,3 +194,174 @@ def test_recipe_resume_from_snapshot(tmp_path: Path) -> None:
 
     assert "item_b" in engine2.state.inventory
     assert engine2.state.inventory["item_b"].quantity == 1.0
+
+
+def test_completed_retention_spills_to_event_log(tmp_path: Path) -> None:
+    kb_dir = tmp_path / "kb"
+    _build_minimal_kb(kb_dir)
+
+    kb = KBLoader(kb_dir, use_validated_models=False)
+    kb.load_all()
+
+    sim_dir = tmp_path / "simulations"
+    sim_id = "snapshot_retention"
+    engine = SimulationEngine(sim_id, kb, sim_dir / sim_id, completed_retention=1)
+    engine.load()
+
+    engine.import_item("test_machine", 1.0, "count")
+    assert engine.run_recipe("recipe_two_step_v0", 1)["success"]
+    engine.advance_time(1.0)
+    engine.advance_time(1.0)
+    engine.advance_time(1.0)
+
+    # Recipe still completes with only the latest completion retained
+    assert engine.state.inventory["item_b"].quantity == 1.0
+    assert len(engine.scheduler.completed_processes) == 1
+    engine.save()
+
+    events = [
+        json.loads(line)
+        for line in (sim_dir / sim_id / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    archived = [e for e in events if e["type"] == "process_archived"]
+    assert len(archived) == 1
+    assert archived[0]["process_run"]["process_id"] == "step_a_v0"
+
+    # Retention is reapplied to the restored scheduler
+    engine2 = SimulationEngine(sim_id, kb, sim_dir / sim_id, completed_retention=1)
+    assert engine2.load()
+    assert engine2.scheduler.completed_retention == 1
+
+
+def _snapshot_data(engine: SimulationEngine) -> dict:
+    return json.loads(build_snapshot(engine).model_dump_json())
+
+
+def test_incremental_snapshot_restores_identically(tmp_path: Path) -> None:
+    kb_dir = tmp_path / "kb"
+    _build_minimal_kb(kb_dir)
+
+    kb = KBLoader(kb_dir, use_validated_models=False)
+    kb.load_all()
+
+    sim_dir = tmp_path / "simulations" / "snapshot_incremental"
+    engine = SimulationEngine("snapshot_incremental", kb, sim_dir, snapshot_mode="incremental")
+    engine.load()
+    engine.import_item("test_machine", 1.0, "count")
+    engine.save()
+    # Each command reloads the simulation, as the CLI does
+    for step in range(4):
+        engine = SimulationEngine("snapshot_incremental", kb, sim_dir, snapshot_mode="incremental")
+        assert engine.load()
+        if step < 2:
+            assert engine.run_recipe("recipe_two_step_v0", 1)["success"]
+        engine.advance_time(1.5)
+        engine.save()
+
+    base = (sim_dir / "snapshot.json").read_text(encoding="utf-8")
+    deltas = (sim_dir / "snapshot.delta.jsonl").read_text(encoding="utf-8").splitlines()
+    assert deltas and json.loads(base)["generation"] >= 1
+    # The last save only advanced time: no recipe_def, runs or reservations
+    last = json.loads(deltas[-1])
+    assert "recipe_runs" not in last and "reservation_manager" not in last
+    assert len(deltas[-1]) < len(base) // 4
+
+    expected = _snapshot_data(engine)
+    restored = SimulationEngine("snapshot_incremental", kb, sim_dir, snapshot_mode="incremental")
+    assert restored.load()
+    assert _snapshot_data(restored) == expected
+    assert read_snapshot_data(sim_dir)["state"] == expected["state"]
+
+    # Full mode reads the incremental files and folds the deltas back in
+    full = SimulationEngine("snapshot_incremental", kb, sim_dir, snapshot_mode="full")
+    assert full.load()
+    full.save()
+    assert not (sim_dir / "snapshot.delta.jsonl").exists()
+    assert json.loads((sim_dir / "snapshot.json").read_text(encoding="utf-8")) == expected
+
+
+def test_incremental_snapshot_compaction_and_stale_deltas(tmp_path: Path) -> None:
+    kb_dir = tmp_path / "kb"
+    _build_minimal_kb(kb_dir)
+
+    kb = KBLoader(kb_dir, use_validated_models=False)
+    kb.load_all()
+
+    sim_dir = tmp_path / "simulations" / "snapshot_compaction"
+    engine = SimulationEngine("snapshot_compaction", kb, sim_dir, snapshot_mode="incremental")
+    engine.load()
+    engine._journal.max_deltas = 2
+    for qty in (1.0, 2.0, 3.0):
+        engine.import_item("ore", qty, "kg")
+        engine.save()
+    # Base written by load(), two deltas, then compaction into generation 2
+    assert engine._journal.generation == 2
+    assert not (sim_dir / "snapshot.delta.jsonl").exists()
+
+    engine.import_item("ore", 4.0, "kg")
+    engine.save()
+    delta_path = sim_dir / "snapshot.delta.jsonl"
+    # A line left from an older generation and a torn trailing append are skipped
+    with delta_path.open("a", encoding="utf-8") as f:
+        f.write('{"generation": 1, "state": {"set": {"total_energy_kwh": 99.0}}}\n')
+        f.write('{"generation": 2, "state": {"se')
+
+    restored = SimulationEngine("snapshot_compaction", kb, sim_dir, snapshot_mode="incremental")
+    assert restored.load()
+    assert restored.state.inventory["ore"].quantity == 10.0
+    assert restored.state.total_energy_kwh == 0.0
+
+    # Stale lines force a compaction on the next save
+    restored.save()
+    assert not delta_path.exists()
+    assert restored._journal.generation == 3
+
+
+def test_sectioned_snapshot_defers_history(tmp_path: Path) -> None:
+    kb_dir = tmp_path / "kb"
+    _build_minimal_kb(kb_dir)
+
+    kb = KBLoader(kb_dir, use_validated_models=False)
+    kb.load_all()
+
+    sim_dir = tmp_path / "simulations" / "snapshot_sectioned"
+    engine = SimulationEngine("snapshot_sectioned", kb, sim_dir, snapshot_mode="sectioned")
+    engine.load()
+    engine.import_item("test_machine", 1.0, "count")
+    assert engine.run_recipe("recipe_two_step_v0", 1)["success"]
+    engine.advance_time(2.5)
+    assert engine.run_recipe("recipe_two_step_v0", 1)["success"]
+    engine.advance_time(0.5)
+    engine.save()
+    expected = _snapshot_data(engine)
+    assert (sim_dir / "snapshot.json").read_bytes().startswith(b'{"format":"sectioned"')
+    assert read_snapshot_data(sim_dir) == expected
+
+    # Read-only use: state and counts without loading history
+    reader = SimulationEngine("snapshot_sectioned", kb, sim_dir, snapshot_mode="sectioned")
+    assert reader.load()
+    summary = reader.get_schedule_summary()
+    assert summary["completed_processes"] == 2
+    assert summary["active_recipes"] == 1 and summary["completed_recipes"] == 1
+    assert reader.state.inventory["item_b"].quantity == 1.0
+    assert reader.scheduler.completed_deferred
+    assert reader.orchestrator.runs_deferred
+    assert reader.reservations_deferred
+
+    # Advancing and saving keeps history deferred; new entries are appended
+    reader.advance_time(1.0)
+    reader.save()
+    assert reader.scheduler.completed_deferred and reader.orchestrator.runs_deferred
+    writer_expected = _snapshot_data(reader)
+    assert len(writer_expected["scheduler"]["completed_processes"]) == 3
+    assert not reader.scheduler.completed_deferred
+
+    restored = SimulationEngine("snapshot_sectioned", kb, sim_dir, snapshot_mode="sectioned")
+    assert restored.load()
+    assert _snapshot_data(restored) == writer_expected
+    assert read_snapshot_data(sim_dir) == writer_expected
+
+    # Other modes read the sectioned layout
+    full = SimulationEngine("snapshot_sectioned", kb, sim_dir)
+    assert full.load()
+    assert _snapshot_data(full) == writer_expected
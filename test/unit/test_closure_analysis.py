@@ -33,6 +33,33 @@ def write_yaml(path: Path, data: dict):
         yaml.dump(data, f, default_flow_style=False, sort_keys=False)
 
 
+def _cyclic_kb(temp_kb):
+    """Two machines whose parts are made from each other."""
+    for part_id, input_id in (('part_a', 'part_b'), ('part_b', 'part_a')):
+        write_yaml(temp_kb / "items" / "parts" / f"{part_id}.yaml", {
+            'id': part_id, 'kind': 'part', 'mass': 10.0, 'unit': 'kg',
+            'recipe': f'recipe_{part_id}'
+        })
+        write_yaml(temp_kb / "recipes" / f"recipe_{part_id}.yaml", {
+            'id': f'recipe_{part_id}', 'kind': 'recipe', 'target_item_id': part_id,
+            'inputs': [{'item_id': input_id, 'qty': 1.0, 'unit': 'kg'}],
+            'outputs': [{'item_id': part_id, 'qty': 1.0, 'unit': 'kg'}],
+            'steps': []
+        })
+    for machine_id, part_id in (('machine_a', 'part_a'), ('machine_b', 'part_b')):
+        write_yaml(temp_kb / "items" / "machines" / f"{machine_id}.yaml", {
+            'id': machine_id, 'kind': 'machine', 'mass': 100.0, 'unit': 'kg',
+            'bom': machine_id
+        })
+        write_yaml(temp_kb / "boms" / f"{machine_id}.yaml", {
+            'machine_id': machine_id,
+            'components': [{'item_id': part_id, 'qty': 1.0, 'unit': 'kg'}]
+        })
+    kb = KBLoader(temp_kb, use_validated_models=False)
+    kb.load_all()
+    return kb
+
+
 class TestBasicMachineAnalysis:
     """Test basic machine closure analysis."""
 
@@ -544,3 +571,121 @@ class TestCaching:
 
         # Should have cache entries
         assert len(analyzer.expansion_cache) > 0
+
+    def _write_frame_kb(self, temp_kb):
+        """Machines sharing a 'frame' subassembly built from bolts and metal."""
+        write_yaml(temp_kb / "items" / "materials" / "metal.yaml", {
+            'id': 'metal', 'kind': 'material', 'mass': 1.0, 'unit': 'kg',
+            'is_raw_material': True
+        })
+        for part_id, inputs in (
+            ('bolt', [{'item_id': 'metal', 'qty': 0.1, 'unit': 'kg'}]),
+            ('frame', [{'item_id': 'bolt', 'qty': 4.0, 'unit': 'count'},
+                       {'item_id': 'metal', 'qty': 2.0, 'unit': 'kg'}]),
+        ):
+            write_yaml(temp_kb / "items" / "parts" / f"{part_id}.yaml", {
+                'id': part_id, 'kind': 'part', 'mass': 1.0, 'unit': 'count',
+                'recipe': f'recipe_{part_id}'
+            })
+            write_yaml(temp_kb / "recipes" / f"recipe_{part_id}.yaml", {
+                'id': f'recipe_{part_id}', 'kind': 'recipe', 'target_item_id': part_id,
+                'inputs': inputs,
+                'outputs': [{'item_id': part_id, 'qty': 1.0, 'unit': 'count'}],
+                'steps': []
+            })
+        for machine_id, components in (
+            ('machine_one', [{'item_id': 'frame', 'qty': 1.0, 'unit': 'count'},
+                             {'item_id': 'frame', 'qty': 1.0, 'unit': 'count'}]),
+            ('machine_two', [{'item_id': 'frame', 'qty': 3.0, 'unit': 'count'}]),
+        ):
+            write_yaml(temp_kb / "items" / "machines" / f"{machine_id}.yaml", {
+                'id': machine_id, 'kind': 'machine', 'mass': 100.0, 'unit': 'kg',
+                'bom': machine_id
+            })
+            write_yaml(temp_kb / "boms" / f"{machine_id}.yaml", {
+                'machine_id': machine_id, 'components': components
+            })
+        kb = KBLoader(temp_kb, use_validated_models=False)
+        kb.load_all()
+        return kb
+
+    def test_cache_shared_across_machines_and_quantities(self, temp_kb):
+        """Per-unit expansions are reused across machines and rescaled."""
+        kb = self._write_frame_kb(temp_kb)
+        analyzer = ClosureAnalyzer(kb)
+
+        # Repeated subassemblies are counted every time they appear
+        one = analyzer.analyze_machine('machine_one')
+        assert one['raw_materials']['metal']['qty'] == pytest.approx(2 * 2.4)
+        cached = dict(analyzer.expansion_cache)
+        assert ('frame', 'count') in cached
+
+        two = analyzer.analyze_machine('machine_two')
+        assert two['raw_materials']['metal']['qty'] == pytest.approx(3 * 2.4)
+        assert analyzer.expansion_cache == cached
+
+        # Same results as a fresh analyzer
+        fresh = ClosureAnalyzer(kb).analyze_machine('machine_two')
+        assert fresh['raw_materials'] == two['raw_materials']
+
+    def test_cyclic_expansions_not_cached(self, temp_kb):
+        """Expansions that hit a circular dependency depend on the path and are not cached."""
+        kb = _cyclic_kb(temp_kb)
+
+        analyzer = ClosureAnalyzer(kb)
+        analyzer.analyze_machine('machine_a')
+        result = analyzer.analyze_machine('machine_b')
+
+        assert analyzer.expansion_cache == {}
+        # The bootstrap import is the machine's own part, as with a fresh analyzer
+        assert list(result['imported_items']) == ['part_b']
+
+
+class TestBulkAnalysis:
+    """Test analyze_all against per-machine analysis."""
+
+    def test_analyze_all_matches_analyze_machine(self, kb_root):
+        """Bulk results for every KB machine match a fresh per-machine analysis."""
+        kb = KBLoader(kb_root, use_validated_models=False)
+        kb.load_all()
+
+        bulk = ClosureAnalyzer(kb).analyze_all()
+        assert bulk
+
+        mismatches = []
+        for machine_id, result in bulk.items():
+            expected = ClosureAnalyzer(kb).analyze_machine(machine_id)
+            for key in ('raw_materials', 'imported_items', 'unresolved_items'):
+                if result[key].keys() != expected[key].keys() or any(
+                    result[key][i]['unit'] != data['unit']
+                    or result[key][i]['qty'] != pytest.approx(data['qty'])
+                    or result[key][i]['mass_kg'] != pytest.approx(data['mass_kg'])
+                    for i, data in expected[key].items()
+                ):
+                    mismatches.append((machine_id, key))
+            if result['errors'] != expected['errors']:
+                mismatches.append((machine_id, 'errors'))
+
+        assert not mismatches, mismatches[:10]
+
+    def test_analyze_all_matches_analyze_machine_with_cycles(self, temp_kb):
+        """Circular dependencies are reported exactly as per-machine analysis does."""
+        kb = _cyclic_kb(temp_kb)
+
+        bulk = ClosureAnalyzer(kb).analyze_all()
+        assert set(bulk) == {'machine_a', 'machine_b'}
+        for machine_id, result in bulk.items():
+            expected = ClosureAnalyzer(kb).analyze_machine(machine_id)
+            assert any('circular' in e.lower() for e in expected['errors'])
+            assert result['errors'] == expected['errors']
+            assert result['imported_items'] == expected['imported_items']
+            assert result['raw_materials'] == expected['raw_materials']
+
+    def test_analyze_all_selected_machines(self, temp_kb):
+        """analyze_all accepts an explicit machine list, including unknown IDs."""
+        kb = KBLoader(temp_kb, use_validated_models=False)
+        kb.load_all()
+
+        results = ClosureAnalyzer(kb).analyze_all(['missing_machine'])
+        assert list(results) == ['missing_machine']
+        assert results['missing_machine']['errors'] == ["Machine 'missing_machine' not found in KB"]
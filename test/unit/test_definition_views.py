@@ -0,0 +1,98 @@
+"""
+Tests for kb_core.definition_views
+
+Covers frozen containers, per-model view caching and the shared views on
+KBLoader.
+"""
+import copy
+import pickle
+
+import pytest
+import yaml
+
+from src.kb_core.definition_views import DefinitionViews, FrozenDict, FrozenList, freeze
+from src.kb_core.kb_loader import KBLoader
+from src.kb_core.override_resolver import resolve_recipe_step_with_kb
+
+
+class TestFrozen:
+    """FrozenDict/FrozenList behave as read-only dicts/lists."""
+
+    def test_rejects_mutation(self):
+        view = freeze({'inputs': [{'item_id': 'a', 'qty': 1.0}]})
+        assert isinstance(view, dict) and isinstance(view['inputs'], list)
+        with pytest.raises(TypeError):
+            view['id'] = 'x'
+        with pytest.raises(TypeError):
+            view.update(id='x')
+        with pytest.raises(TypeError):
+            view['inputs'].append({})
+        with pytest.raises(TypeError):
+            view['inputs'][0]['qty'] = 2.0
+
+    def test_deepcopy_is_mutable(self):
+        view = freeze({'inputs': [{'item_id': 'a', 'qty': 1.0}]})
+        working = copy.deepcopy(view)
+        assert type(working) is dict and type(working['inputs'][0]) is dict
+        working['inputs'][0]['qty'] = 2.0
+        assert view['inputs'][0]['qty'] == 1.0
+
+    def test_pickle_round_trip(self):
+        view = freeze({'steps': [{'process_id': 'p'}]})
+        restored = pickle.loads(pickle.dumps(view))
+        assert restored == view
+        assert isinstance(restored, FrozenDict) and isinstance(restored['steps'], FrozenList)
+
+
+@pytest.fixture
+def kb(tmp_path):
+    root = tmp_path / "kb"
+    files = {
+        "processes/weld.yaml": {
+            'id': 'weld', 'kind': 'process', 'process_type': 'batch',
+            'inputs': [{'item_id': 'plate', 'qty': 2.0, 'unit': 'kg'}],
+            'outputs': [{'item_id': 'frame', 'qty': 1.0, 'unit': 'kg'}],
+        },
+        "items/parts/frame.yaml": {'id': 'frame', 'kind': 'part'},
+    }
+    for rel, data in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(data))
+    loader = KBLoader(root, use_validated_models=False)
+    loader.load_all()
+    return loader
+
+
+class TestDefinitionViews:
+    """Views are dumped once per model."""
+
+    def test_cached_per_model(self, kb):
+        views = kb.definition_views()
+        assert views is kb.definition_views()
+        view = views.process('weld')
+        assert view == kb.get_process('weld').model_dump()
+        assert views.process('weld') is view
+        assert views.item('frame')['kind'] == 'part'
+        assert views.recipe('missing') is None
+
+    def test_replaced_model_gets_new_view(self, kb):
+        views = kb.definition_views()
+        old = views.process('weld')
+        kb.processes['weld'] = kb.processes['weld'].model_copy(update={'process_type': 'continuous'})
+        assert views.process('weld') is not old
+        assert views.process('weld')['process_type'] == 'continuous'
+
+    def test_plain_dicts_not_cached(self):
+        views = DefinitionViews(kb_loader=None)
+        defn = {'id': 'p', 'inputs': []}
+        view = views.of(defn)
+        assert view == defn and isinstance(view, FrozenDict)
+        assert views.of(view) is view
+
+    def test_resolved_step_is_mutable(self, kb):
+        step = freeze({'process_id': 'weld', 'scale': 2.0, 'time_model': {'rate': 1.0}})
+        resolved = resolve_recipe_step_with_kb(step, kb)
+        assert resolved['inputs'][0]['qty'] == 4.0
+        resolved['time_model']['rate'] = 2.0
+        assert kb.definition_views().process('weld')['inputs'][0]['qty'] == 2.0
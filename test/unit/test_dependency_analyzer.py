@@ -0,0 +1,130 @@
+"""
+Tests for kb_core.dependency_analyzer
+
+Covers dependency graph construction, SCC detection and representative
+cycle reporting.
+"""
+import yaml
+
+from src.kb_core.dependency_analyzer import CircularDependencyAnalyzer
+from src.kb_core.kb_loader import KBLoader
+
+
+class _StubKB:
+    """Dict-backed stand-in for KBLoader: item -> recipe whose one step consumes inputs."""
+
+    def __init__(self, deps):
+        self.items = {}
+        self.recipes = {}
+        self.processes = {}
+        for item_id, inputs in deps.items():
+            self.items[item_id] = {'id': item_id, 'recipe': f'recipe_{item_id}'}
+            self.recipes[f'recipe_{item_id}'] = {
+                'id': f'recipe_{item_id}',
+                'steps': [{'inputs': [{'item_id': i, 'qty': 1.0} for i in inputs]}],
+            }
+
+    def get_item(self, item_id):
+        return self.items.get(item_id)
+
+    def get_recipe(self, recipe_id):
+        return self.recipes.get(recipe_id)
+
+    def get_process(self, process_id):
+        return None
+
+
+def _loops(deps, **kwargs):
+    analyzer = CircularDependencyAnalyzer(_StubKB(deps))
+    return analyzer, analyzer.find_all_circular_dependencies(**kwargs)
+
+
+class TestStronglyConnectedComponents:
+    """SCC detection."""
+
+    def test_acyclic(self):
+        analyzer, loops = _loops({'a': ['b'], 'b': ['c'], 'c': []})
+        assert loops == []
+        assert analyzer.find_strongly_connected_components() == []
+
+    def test_self_reference(self):
+        _, loops = _loops({'a': ['a', 'b'], 'b': []})
+        assert loops == [['a']]
+
+    def test_two_cycle_reported_once(self):
+        _, loops = _loops({'a': ['b'], 'b': ['a']})
+        assert loops == [['a', 'b']]
+
+    def test_components_separated(self):
+        analyzer, _ = _loops({
+            'a': ['b'], 'b': ['a', 'c'], 'c': ['d'], 'd': ['c'], 'e': ['a'],
+        })
+        components = sorted(sorted(c) for c in analyzer.find_strongly_connected_components())
+        assert components == [['a', 'b'], ['c', 'd']]
+
+    def test_representative_cycles_cover_component(self):
+        """Each item of an SCC lies on a reported cycle."""
+        _, loops = _loops({'a': ['b', 'c'], 'b': ['a'], 'c': ['a']})
+        assert sorted(CircularDependencyAnalyzer._normalize_loop(l) for l in loops) == [
+            ('a', 'b'), ('a', 'c'),
+        ]
+
+    def test_cycles_per_component_bounded(self):
+        # Star: hub depends on every spoke and every spoke on the hub
+        deps = {'hub': [f's{i}' for i in range(10)]}
+        deps.update({f's{i}': ['hub'] for i in range(10)})
+        _, loops = _loops(deps, max_cycles_per_scc=3)
+        assert len(loops) == 3
+
+    def test_deep_chain_is_iterative(self):
+        """Chains longer than the recursion limit are handled."""
+        n = 5000
+        deps = {f'i{k}': [f'i{k + 1}'] for k in range(n)}
+        deps[f'i{n}'] = ['i0']
+        analyzer, loops = _loops(deps)
+        assert len(loops) == 1
+        assert len(loops[0]) == n + 1
+        assert len(analyzer.find_strongly_connected_components()[0]) == n + 1
+
+
+class TestKBDependencies:
+    """Dependencies come from recipe steps and their processes."""
+
+    def test_loaded_kb(self, tmp_path):
+        kb_root = tmp_path / "kb"
+        for sub in ("items/parts", "recipes", "processes"):
+            (kb_root / sub).mkdir(parents=True)
+        files = {
+            "items/parts/part_a.yaml": {'id': 'part_a', 'kind': 'part', 'recipe': 'recipe_part_a'},
+            "items/parts/part_b.yaml": {'id': 'part_b', 'kind': 'part', 'recipe': 'recipe_part_b'},
+            "recipes/recipe_part_a.yaml": {
+                'id': 'recipe_part_a', 'kind': 'recipe', 'target_item_id': 'part_a',
+                'steps': [{'process_id': 'make_a_v0'}],
+            },
+            "recipes/recipe_part_b.yaml": {
+                'id': 'recipe_part_b', 'kind': 'recipe', 'target_item_id': 'part_b',
+                'steps': [{'process_id': 'make_b_v0',
+                           'inputs': [{'item_id': 'part_a', 'qty': 1.0, 'unit': 'kg'}]}],
+            },
+            "processes/make_a_v0.yaml": {
+                'id': 'make_a_v0', 'kind': 'process', 'process_type': 'batch',
+                'inputs': [{'item_id': 'part_b', 'qty': 1.0, 'unit': 'kg'}],
+                'outputs': [{'item_id': 'part_a', 'qty': 1.0, 'unit': 'kg'}],
+            },
+            "processes/make_b_v0.yaml": {
+                'id': 'make_b_v0', 'kind': 'process', 'process_type': 'batch',
+                'inputs': [{'item_id': 'ore', 'qty': 1.0, 'unit': 'kg'}],
+                'outputs': [{'item_id': 'part_b', 'qty': 1.0, 'unit': 'kg'}],
+            },
+        }
+        for rel, data in files.items():
+            (kb_root / rel).write_text(yaml.safe_dump(data))
+        kb = KBLoader(kb_root, use_validated_models=False)
+        kb.load_all()
+
+        analyzer = CircularDependencyAnalyzer(kb)
+        assert analyzer._get_dependencies('part_b') == {'part_a', 'ore'}
+        items = analyzer.get_work_queue_items({})
+        assert len(items) == 1
+        assert sorted(items[0]['context']['loop']) == ['part_a', 'part_b']
+        assert items[0]['id'] == CircularDependencyAnalyzer._get_loop_id(['part_a', 'part_b'])
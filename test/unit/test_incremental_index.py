@@ -0,0 +1,207 @@
+"""
+Tests for indexer.incremental
+
+Tests dependency recording, result reuse and invalidation, and that
+incremental and resident index runs write the same outputs as a full run.
+"""
+import shutil
+
+import pytest
+
+from src.indexer import indexer
+from src.indexer.incremental import IndexState, RecordingKB, ResidentIndex
+from src.kb_core.dependency_analyzer import CircularDependencyAnalyzer
+from src.kb_core.kb_loader import KBLoader
+
+
+@pytest.fixture
+def kb_copy(tmp_path, test_fixtures_dir):
+    """Copy fixture KB to a temp dir so files can be modified."""
+    kb_root = tmp_path / "kb"
+    shutil.copytree(test_fixtures_dir / "kb", kb_root)
+    return kb_root
+
+
+def _loaded(kb_root):
+    loader = KBLoader(kb_root)
+    loader.load_all()
+    return loader
+
+
+def _machine_lookup(kb):
+    item = kb.get_item("test_machine_v0")
+    return item.name if item else None
+
+
+class TestRecordingKB:
+    """Tests for lookup recording."""
+
+    def test_records_lookups(self, kb_copy):
+        """get_* calls and dict key lookups are recorded per namespace."""
+        recorder = RecordingKB(_loaded(kb_copy))
+        recorder.get_process("test_process_v0")
+        recorder.get_item("missing_item")
+        assert "test_part_v0" in recorder.items
+        recorder.recipes.get("test_recipe_v0")
+
+        assert recorder.lookups == {
+            ("process", "test_process_v0"),
+            ("item", "missing_item"),
+            ("item", "test_part_v0"),
+            ("recipe", "test_recipe_v0"),
+        }
+        assert recorder.cacheable
+
+    def test_scan_is_not_cacheable(self, kb_copy):
+        """Iterating a whole table marks the computation as not cacheable."""
+        recorder = RecordingKB(_loaded(kb_copy))
+        list(recorder.items.values())
+        assert not recorder.cacheable
+
+    def test_delegates_other_attributes(self, kb_copy):
+        """Non-recorded loader methods pass through."""
+        loader = _loaded(kb_copy)
+        recorder = RecordingKB(loader)
+        assert recorder.kb_root == loader.kb_root
+
+
+class TestIndexState:
+    """Tests for result memoization."""
+
+    def test_reuses_result_across_runs(self, kb_copy, tmp_path):
+        """An unchanged KB reuses stored results."""
+        state_path = tmp_path / "state.pickle"
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        first = state.memoize("name", "test_machine_v0", _machine_lookup)
+        state.save()
+
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        calls = []
+        second = state.memoize(
+            "name", "test_machine_v0", lambda kb: calls.append(1) or _machine_lookup(kb)
+        )
+        assert second == first
+        assert calls == []
+        assert state.hits == 1
+
+    def test_dependency_change_recomputes(self, kb_copy, tmp_path):
+        """Editing a looked-up file invalidates results that depend on it."""
+        state_path = tmp_path / "state.pickle"
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        state.memoize("name", "test_machine_v0", _machine_lookup)
+        state.memoize("const", "k", lambda kb: 42)
+        state.save()
+
+        machine_file = kb_copy / "items" / "machines" / "test_machine_v0.yaml"
+        machine_file.write_text(machine_file.read_text() + "name: Renamed Machine\n")
+
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        assert state.memoize("name", "test_machine_v0", _machine_lookup) == "Renamed Machine"
+        assert state.memoize("const", "k", lambda kb: 0) == 42
+        assert (state.hits, state.misses) == (1, 1)
+
+    def test_missing_entry_becoming_defined_recomputes(self, kb_copy, tmp_path):
+        """Results that saw an entry as absent are invalidated when it appears."""
+        state_path = tmp_path / "state.pickle"
+        lookup = lambda kb: kb.get_item("new_part_v0") is not None
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        assert state.memoize("exists", "new_part_v0", lookup) is False
+        state.save()
+
+        (kb_copy / "items" / "parts" / "new_part_v0.yaml").write_text(
+            "id: new_part_v0\nkind: part\nmass: 1.0\n"
+        )
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        assert state.memoize("exists", "new_part_v0", lookup) is True
+
+    def test_unused_results_pruned(self, kb_copy, tmp_path):
+        """Results not requested during a run are dropped on save."""
+        state_path = tmp_path / "state.pickle"
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        state.memoize("const", "a", lambda kb: 1)
+        state.memoize("const", "b", lambda kb: 2)
+        state.save()
+
+        state = IndexState(kb_copy, _loaded(kb_copy), path=state_path)
+        state.memoize("const", "a", lambda kb: 1)
+        state.save()
+        assert len(IndexState(kb_copy, _loaded(kb_copy), path=state_path)) == 1
+
+
+class TestIncrementalBuildIndex:
+    """Incremental runs must write the same outputs as full runs."""
+
+    OUTPUTS = (
+        "index.json",
+        "validation_issues.jsonl",
+        "closure_errors.jsonl",
+        "null_values.jsonl",
+        "missing_fields.jsonl",
+        "validation_report.md",
+    )
+
+    def _outputs(self, out_dir):
+        return {name: (out_dir / name).read_text() for name in self.OUTPUTS}
+
+    def test_incremental_matches_full(self, kb_copy, tmp_path, monkeypatch):
+        """Cold, warm and post-edit incremental runs match a full index."""
+        monkeypatch.chdir(tmp_path)
+        out_dir = tmp_path / "out"
+
+        indexer.build_index()
+        full = self._outputs(out_dir)
+        indexer.build_index(incremental=True)
+        assert self._outputs(out_dir) == full
+        indexer.build_index(incremental=True)
+        assert self._outputs(out_dir) == full
+
+        machine_file = kb_copy / "items" / "machines" / "test_machine_v0.yaml"
+        lines = [l for l in machine_file.read_text().splitlines() if not l.startswith("mass:")]
+        machine_file.write_text("\n".join(lines) + "\n")
+
+        indexer.build_index(incremental=True)
+        incremental = self._outputs(out_dir)
+        indexer.build_index()
+        assert incremental == self._outputs(out_dir)
+        assert incremental != full
+
+    def test_resident_matches_full(self, kb_copy, tmp_path, monkeypatch):
+        """Resident passes match a full index and redo only work affected by edits."""
+        monkeypatch.chdir(tmp_path)
+        out_dir = tmp_path / "out"
+        names = self.OUTPUTS + ("circular_dependencies.jsonl", "work_queue.jsonl")
+        cycle_searches = []
+        find_loops = CircularDependencyAnalyzer.find_all_circular_dependencies
+        monkeypatch.setattr(
+            CircularDependencyAnalyzer, "find_all_circular_dependencies",
+            lambda self: cycle_searches.append(1) or find_loops(self),
+        )
+        resident = ResidentIndex(indexer.KB_ROOT)
+
+        def check():
+            indexer._build_index(resident=resident)
+            passed = {name: (out_dir / name).read_text() for name in names}
+            indexer.build_index()
+            assert passed == {name: (out_dir / name).read_text() for name in names}
+            cycle_searches.clear()
+            return passed
+
+        check()
+        machine_file = kb_copy / "items" / "machines" / "test_machine_v0.yaml"
+        machine_file.write_text(machine_file.read_text().replace("mass:", "# mass:"))
+        indexer._build_index(resident=resident)
+        assert resident.state.misses and resident.state.hits
+        assert cycle_searches == []  # no dependency changed
+        check()
+
+        (kb_copy / "items" / "parts" / "loop_part_v0.yaml").write_text(
+            "id: loop_part_v0\nkind: part\nmass: 1.0\nrecipe: recipe_loop_part_v0\n"
+        )
+        (kb_copy / "recipes" / "recipe_loop_part_v0.yaml").write_text(
+            "id: recipe_loop_part_v0\ntarget_item_id: loop_part_v0\nsteps:\n"
+            "  - process_id: test_process_v0\n"
+            "    inputs:\n      - item_id: loop_part_v0\n        qty: 1.0\n        unit: count\n"
+        )
+        passed = check()
+        assert "loop_part_v0" in passed["circular_dependencies.jsonl"]
+
@@ -0,0 +1,138 @@
+"""
+Tests for indexer.index_service
+
+Tests that the resident service writes the same index and work queue as
+the indexer, skips re-indexing an unchanged KB, answers gap queries from
+the current queue, and serves requests over its Unix socket.
+"""
+import json
+import shutil
+import socket
+import threading
+import time
+
+import pytest
+
+from src.indexer import index_service, indexer
+from src.indexer.index_service import IndexService
+from src.kb_core import queue_manager
+
+
+@pytest.fixture
+def workspace(tmp_path, test_fixtures_dir, monkeypatch):
+    """Fixture KB copied to a temp dir that is also the working directory."""
+    shutil.copytree(test_fixtures_dir / "kb", tmp_path / "kb")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("WORK_QUEUE_BACKEND", raising=False)
+    return tmp_path
+
+
+def _queue_text(workspace):
+    return (workspace / "out" / "work_queue.jsonl").read_text()
+
+
+class TestIndexService:
+    """Tests for in-process indexing and gap queries."""
+
+    def test_matches_indexer(self, workspace):
+        """Service passes write the same outputs as build_index."""
+        service = IndexService()
+        result = service.index()
+        assert result["returncode"] == 0
+        assert result["reindexed"]
+        assert "Indexed" in result["stdout"]
+        queue, index = _queue_text(workspace), (workspace / "out" / "index.json").read_text()
+
+        indexer.build_index()
+        assert _queue_text(workspace) == queue
+        assert (workspace / "out" / "index.json").read_text() == index
+
+    def test_unchanged_kb_skips_reindex(self, workspace):
+        """Without KB changes only the queue merge runs, with the last output."""
+        service = IndexService()
+        first = service.index()
+        second = service.index()
+        assert not second["reindexed"]
+        assert second["stdout"] == first["stdout"]
+
+        machine_file = workspace / "kb" / "items" / "machines" / "test_machine_v0.yaml"
+        machine_file.write_text(machine_file.read_text() + "\n# edited\n")
+        assert service.index()["reindexed"]
+
+    def test_unchanged_kb_merges_queue_state(self, workspace):
+        """Done gaps still present go back to pending, as in a full run."""
+        service = IndexService()
+        service.index()
+        gap = queue_manager.lease_next("agent")
+        assert queue_manager.complete(gap["id"], "agent")
+
+        assert not service.index()["reindexed"]
+        served = _queue_text(workspace)
+        indexer.build_index()
+        assert _queue_text(workspace) == served
+        statuses = {obj["id"]: obj.get("status") for obj in map(json.loads, served.splitlines())}
+        assert statuses[gap["id"]] == "pending"
+
+    def test_gap_resolved(self, workspace):
+        """Gap queries follow the queue file, including outside rewrites."""
+        service = IndexService()
+        assert not service.gap_resolved("no_recipe:anything")  # no queue yet
+        service.index()
+        gap_id = json.loads(_queue_text(workspace).splitlines()[0])["id"]
+        assert not service.gap_resolved(gap_id)
+        assert service.gap_resolved("no_recipe:not_a_gap")
+
+        queue_manager.rewrite_queue(lambda items: [obj for obj in items if obj["id"] != gap_id])
+        assert service.gap_resolved(gap_id)
+
+    def test_index_refreshes_gap_ids(self, workspace, monkeypatch):
+        """Gap ids come from the queue index() wrote, without re-reading the file."""
+        service = IndexService()
+        for _ in range(2):  # re-index, then merge only
+            service.index()
+            ids = {json.loads(line)["id"] for line in _queue_text(workspace).splitlines()}
+            assert service._queue_ids == ids
+            with monkeypatch.context() as patched:
+                patched.setattr(json, "loads", None)  # a reload would fail
+                assert not service.gap_resolved(next(iter(ids)))
+
+
+class TestServe:
+    """Tests for the socket server and client."""
+
+    def test_request_without_service(self, tmp_path):
+        assert index_service.request("ping", socket_path=tmp_path / "none.sock") is None
+
+    def test_request_times_out(self, tmp_path):
+        """A service that never answers counts as no service."""
+        socket_path = tmp_path / "stuck.sock"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(str(socket_path))
+            listener.listen(1)
+            started = time.monotonic()
+            assert index_service.request("index", socket_path=socket_path, timeout=0.2) is None
+            assert time.monotonic() - started < 5
+
+    def test_round_trip(self, workspace):
+        socket_path = workspace / "out" / "indexer.sock"
+        server = threading.Thread(
+            target=index_service.serve, args=(socket_path,), kwargs={"poll_sec": 0}
+        )
+        server.start()
+        try:
+            for _ in range(200):
+                if index_service.request("ping", socket_path=socket_path, timeout=5):
+                    break
+                server.join(0.05)
+            result = index_service.request("index", socket_path=socket_path)
+            assert result["returncode"] == 0
+            assert not result["reindexed"]  # indexed on startup
+            assert index_service.request(
+                "gap_resolved", socket_path=socket_path, id="no_recipe:not_a_gap"
+            ) == {"resolved": True}
+            assert index_service.request("bogus", socket_path=socket_path) is None
+        finally:
+            index_service.request("shutdown", socket_path=socket_path)
+            server.join(10)
+        assert not server.is_alive()
+        assert not socket_path.exists()
@@ -0,0 +1,205 @@
+"""
+Tests for kb_core.kb_graph
+
+Covers graph construction from a loaded KB, edge attributes, dependency
+and reachability queries, and the on-disk graph cache.
+"""
+import os
+
+import pytest
+import yaml
+
+from src.kb_core.kb_graph import EdgeType, KBGraph
+from src.kb_core.kb_loader import KBLoader
+
+
+FILES = {
+    "items/parts/frame.yaml": {'id': 'frame', 'kind': 'part', 'recipe': 'recipe_frame'},
+    "items/parts/plate.yaml": {'id': 'plate', 'kind': 'part', 'recipe': 'recipe_plate'},
+    "items/materials/steel.yaml": {'id': 'steel', 'kind': 'material'},
+    "items/machines/press.yaml": {'id': 'press', 'kind': 'machine'},
+    "recipes/recipe_frame.yaml": {
+        'id': 'recipe_frame', 'kind': 'recipe', 'target_item_id': 'frame',
+        'inputs': [{'item_id': 'plate', 'qty': 4.0, 'unit': 'unit'}],
+        'outputs': [{'item_id': 'frame', 'qty': 2.0, 'unit': 'unit'}],
+        'steps': [
+            {'process_id': 'weld', 'inputs': [{'item_id': 'bolt', 'qty': 8.0, 'unit': 'unit'}]},
+            {'process_id': 'paint'},
+        ],
+    },
+    "recipes/recipe_plate.yaml": {
+        'id': 'recipe_plate', 'kind': 'recipe', 'target_item_id': 'plate',
+        'steps': [{'process_id': 'press_plate'}],
+    },
+    "processes/weld.yaml": {
+        'id': 'weld', 'kind': 'process', 'process_type': 'batch',
+        'inputs': [{'item_id': 'plate', 'qty': 2.0, 'unit': 'unit'}],
+        'outputs': [{'item_id': 'frame', 'qty': 1.0, 'unit': 'unit'}],
+    },
+    "processes/press_plate.yaml": {
+        'id': 'press_plate', 'kind': 'process', 'process_type': 'batch',
+        'inputs': [{'item_id': 'steel', 'qty': 1.5, 'unit': 'kg'}],
+        'outputs': [{'item_id': 'plate', 'qty': 1.0, 'unit': 'unit'}],
+        'resource_requirements': [{'machine_id': 'press', 'qty': 1.0, 'unit': 'hr'}],
+    },
+}
+
+
+@pytest.fixture
+def kb_root(tmp_path):
+    root = tmp_path / "kb"
+    for rel, data in FILES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(data))
+    return root
+
+
+@pytest.fixture
+def graph(kb_root):
+    kb = KBLoader(kb_root, use_validated_models=False)
+    kb.load_all()
+    return KBGraph.build(kb)
+
+
+def _edges(graph, kind, entry_id, types=None):
+    node = graph.node(kind, entry_id)
+    return [graph.edge(e) for e in graph.out_edges(node, types)]
+
+
+class TestBuild:
+    """Nodes and edges."""
+
+    def test_nodes(self, graph):
+        frame = graph.node("item", "frame")
+        assert graph.kind(frame) == "item"
+        assert graph.entry_id(frame) == "frame"
+        assert graph.subtype(frame) == "part"
+        assert graph.subtype(graph.node("process", "weld")) == "batch"
+        assert graph.is_defined(frame)
+
+        # Referenced but undefined entries get nodes too
+        assert not graph.is_defined(graph.node("process", "paint"))
+        assert not graph.is_defined(graph.node("item", "bolt"))
+        assert graph.node("item", "nothing") is None
+
+    def test_recipe_edges_in_kb_order(self, graph):
+        edges = _edges(graph, "recipe", "recipe_frame")
+        assert [(e.type, graph.entry_id(e.target)) for e in edges] == [
+            (EdgeType.RECIPE_INPUT, "plate"),
+            (EdgeType.RECIPE_OUTPUT, "frame"),
+            (EdgeType.STEP_INPUT, "bolt"),
+            (EdgeType.RECIPE_PROCESS, "weld"),
+            (EdgeType.RECIPE_PROCESS, "paint"),
+        ]
+
+    def test_edge_attributes(self, graph):
+        recipe_input = _edges(graph, "recipe", "recipe_frame", (EdgeType.RECIPE_INPUT,))[0]
+        assert (recipe_input.qty, recipe_input.unit) == (4.0, "unit")
+        # Recipe inputs are scaled per unit of the target output (4 plates / 2 frames)
+        assert recipe_input.scale == 2.0
+
+        machine = _edges(graph, "process", "press_plate", (EdgeType.PROCESS_MACHINE,))[0]
+        assert graph.entry_id(machine.target) == "press"
+        assert (machine.qty, machine.unit, machine.scale) == (1.0, "hr", 1.0)
+
+        item_recipe = _edges(graph, "item", "frame")[0]
+        assert item_recipe.type == EdgeType.ITEM_RECIPE
+        assert (item_recipe.qty, item_recipe.unit) == (None, None)
+
+    def test_reverse_edges(self, graph):
+        plate = graph.node("item", "plate")
+        users = {(graph.entry_id(graph.edge(e).source), graph.edge(e).type)
+                 for e in graph.in_edges(plate)}
+        assert users == {
+            ("recipe_frame", EdgeType.RECIPE_INPUT),
+            ("weld", EdgeType.PROCESS_INPUT),
+            ("press_plate", EdgeType.PROCESS_OUTPUT),
+        }
+        assert graph.predecessors(plate, (EdgeType.PROCESS_INPUT,)) == [graph.node("process", "weld")]
+
+
+class TestQueries:
+    """Dependency and reachability queries."""
+
+    def test_item_dependencies(self, graph):
+        # Default: step-level inputs then each step's process inputs
+        assert graph.item_dependencies("frame") == ["bolt", "plate"]
+        assert graph.item_dependencies("frame", (EdgeType.RECIPE_INPUT,)) == ["plate"]
+        assert graph.item_dependencies("plate", (EdgeType.PROCESS_MACHINE,)) == ["press"]
+        assert graph.item_dependencies("steel") == []
+        assert graph.item_dependencies("unknown") == []
+
+    def test_dependency_map_matches_per_item(self, graph):
+        dependency_map = graph.item_dependency_map()
+        assert set(dependency_map) == {"frame", "plate", "steel", "press"}
+        for item_id, deps in dependency_map.items():
+            assert deps == graph.item_dependencies(item_id)
+
+    def test_dependents(self, graph):
+        assert graph.dependents("plate") == ["frame"]
+        assert graph.dependents("steel") == ["plate"]
+        assert graph.dependents("press") == []
+        assert graph.dependents("press", (EdgeType.PROCESS_MACHINE,)) == ["plate"]
+
+    def test_transitive(self, graph):
+        assert graph.transitive_dependencies("frame") == {"bolt", "plate", "steel"}
+        assert graph.transitive_dependents("steel") == {"plate", "frame"}
+
+    def test_reachable(self, graph):
+        frame = graph.node("item", "frame")
+        reached = graph.reachable([frame], (EdgeType.ITEM_RECIPE, EdgeType.RECIPE_PROCESS))
+        assert {graph.entry_id(n) for n in reached} == {"frame", "recipe_frame", "weld", "paint"}
+
+        steel = graph.node("item", "steel")
+        upstream = graph.reachable([steel], reverse=True)
+        assert graph.node("recipe", "recipe_frame") in upstream
+
+
+class TestBuildResolved:
+    """build_resolved follows the loader's on-demand lookups."""
+
+    def test_duplicate_id_resolves_like_get_recipe(self, kb_root):
+        # load_all() keys recipes by declared id; get_recipe() prefers the filename
+        legacy = dict(FILES["recipes/recipe_plate.yaml"], id='recipe_plate_legacy')
+        (kb_root / "recipes" / "recipe_plate.yaml").write_text(yaml.safe_dump(legacy))
+        (kb_root / "recipes" / "recipe_plate_v2.yaml").write_text(yaml.safe_dump({
+            'id': 'recipe_plate', 'kind': 'recipe', 'target_item_id': 'plate',
+            'steps': [{'process_id': 'stamp_plate'}],
+        }))
+        kb = KBLoader(kb_root, use_validated_models=False)
+
+        graph = KBGraph.build_resolved(kb)
+        steps = [step.process_id for step in kb.get_recipe('recipe_plate').steps]
+        recipe = graph.node("recipe", "recipe_plate")
+        processes = graph.successors(recipe, (EdgeType.RECIPE_PROCESS,))
+        assert [graph.entry_id(n) for n in processes] == steps == ['press_plate']
+
+        eager = KBLoader(kb_root, use_validated_models=False)
+        eager.load_all()
+        assert [step.process_id for step in eager.get_recipe('recipe_plate').steps] == ['stamp_plate']
+
+
+class TestDiskCache:
+    """load_or_build reuses the cached graph until a KB file changes."""
+
+    def test_reuse_and_invalidate(self, kb_root, tmp_path):
+        cache_path = tmp_path / "graph.pickle"
+        first = KBGraph.load_or_build(kb_root, cache_path=cache_path)
+        assert cache_path.exists()
+        # The loader's parse cache stays next to the graph cache, not in out/
+        assert (tmp_path / "graph_kb_raw.pickle").exists()
+        assert first.item_dependencies("plate") == ["steel"]
+
+        cached = KBGraph.load_or_build(kb_root, cache_path=cache_path, kb_loader=object())
+        assert cached.item_dependencies("plate") == ["steel"]
+
+        process_file = kb_root / "processes" / "press_plate.yaml"
+        data = yaml.safe_load(process_file.read_text())
+        data['inputs'] = [{'item_id': 'aluminum', 'qty': 1.0, 'unit': 'kg'}]
+        process_file.write_text(yaml.safe_dump(data))
+        stat = process_file.stat()
+        os.utime(process_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        rebuilt = KBGraph.load_or_build(kb_root, cache_path=cache_path)
+        assert rebuilt.item_dependencies("plate") == ["aluminum"]
@@ -130,6 +130,18 @@ class TestEagerLoading:
         assert kg_to_g is not None
         assert kg_to_g["factor"] == 1000.0
 
+    def test_unit_registry(self, test_kb_root):
+        """Conversions compile once and recompile when units are replaced."""
+        loader = KBLoader(test_kb_root)
+        registry = loader.unit_registry()
+        assert loader.unit_registry() is registry
+        assert loader.get_unit_conversion("kg", "g") == 1000.0
+        assert loader.get_unit_conversion("g", "kg") is None
+        assert registry.convert(1.0, "g", "kg") == 0.001
+
+        loader.units = {"conversions": [{"from": "kg", "to": "g", "factor": 1001.0}]}
+        assert loader.get_unit_conversion("kg", "g") == 1001.0
+
     def test_load_material_properties(self, test_kb_root):
         """Load material properties."""
         loader = KBLoader(test_kb_root)
@@ -420,6 +432,68 @@ class TestEagerLazyIntegration:
         assert process2 is loader.processes["test_process_v0"]
 
 
+class TestPreparsedDocuments:
+    """Test serving loads from pre-parsed documents (use_documents)."""
+
+    def test_documents_replace_file_reads(self, test_kb_root):
+        """Loader builds models from supplied documents instead of the files."""
+        import yaml
+        process_file = test_kb_root / "processes" / "test_process_v0.yaml"
+        data = yaml.safe_load(process_file.read_text())
+        data["name"] = "from documents"
+
+        loader = KBLoader(test_kb_root)
+        loader.use_documents({process_file: data})
+        loader.load_processes()
+
+        process = loader.processes["test_process_v0"]
+        assert process.name == "from documents"
+        assert process.defined_in is not None
+        # Shared document is not mutated by the loader
+        assert "defined_in" not in data
+
+    def test_missing_documents_fall_back_to_disk(self, test_kb_root):
+        """Files absent from the table are still read from disk."""
+        loader = KBLoader(test_kb_root)
+        loader.use_documents({})
+        loader.load_all()
+
+        assert "test_process_v0" in loader.processes
+        assert "test_material_v0" in loader.items
+
+
+class TestParallelLoading:
+    """Test process-pool loading (workers > 1)."""
+
+    def test_parallel_matches_sequential(self, cached_kb, monkeypatch):
+        """Parallel load returns the same models and errors in the same order."""
+        monkeypatch.setattr("src.kb_core.kb_loader.PARALLEL_MIN_FILES", 1)
+        (cached_kb / "processes" / "broken.yaml").write_text("{ invalid yaml [")
+        (cached_kb / "items" / "parts" / "no_kind.yaml").write_text("id: no_kind\n")
+
+        sequential = KBLoader(cached_kb)
+        sequential.load_all()
+        parallel = KBLoader(cached_kb, workers=2)
+        parallel.load_all()
+
+        assert list(parallel.processes) == list(sequential.processes)
+        assert list(parallel.recipes) == list(sequential.recipes)
+        assert list(parallel.items) == list(sequential.items)
+        assert parallel.items["test_part_v0"] == sequential.items["test_part_v0"]
+        assert parallel.load_errors == sequential.load_errors
+        assert len(parallel.load_errors) == 2
+
+    def test_parallel_populates_disk_cache(self, cached_kb, tmp_path, monkeypatch):
+        """Results parsed by pool workers are stored in the disk cache."""
+        monkeypatch.setattr("src.kb_core.kb_loader.PARALLEL_MIN_FILES", 1)
+        cache_path = tmp_path / "kb.pickle"
+        KBLoader(cached_kb, cache_path=cache_path, workers=2).load_all()
+
+        loader = KBLoader(cached_kb, cache_path=cache_path)
+        loader.load_all()
+        assert loader._disk_cache.misses == 0
+
+
 # =============================================================================
 # Error Handling Tests
 # =============================================================================
@@ -467,3 +541,170 @@ class TestErrorHandling:
 
         # Errors should accumulate
         assert errors_after_recipes > errors_after_processes
+
+
+# =============================================================================
+# Disk Cache Tests
+# =============================================================================
+
+@pytest.fixture
+def cached_kb(tmp_path, test_kb_root):
+    """Copy fixture KB to a temp dir so files can be modified."""
+    import shutil
+    kb_root = tmp_path / "kb"
+    shutil.copytree(test_kb_root, kb_root)
+    return kb_root
+
+
+class TestDiskCache:
+    """Test the persistent on-disk parse cache."""
+
+    def test_second_load_served_from_cache(self, cached_kb, tmp_path):
+        """Unchanged KB is loaded entirely from the cache on the next run."""
+        cache_path = tmp_path / "cache" / "kb.pickle"
+        first = KBLoader(cached_kb, cache_path=cache_path)
+        first.load_all()
+        assert cache_path.exists()
+
+        second = KBLoader(cached_kb, cache_path=cache_path)
+        second.load_all()
+
+        assert second._disk_cache.misses == 0
+        assert second._disk_cache.hits > 0
+        assert set(second.processes) == set(first.processes)
+        assert set(second.items) == set(first.items)
+        assert second.processes["test_process_v0"] == first.processes["test_process_v0"]
+        assert second.units == first.units
+
+    def test_changed_file_is_reparsed(self, cached_kb, tmp_path):
+        """Only files whose content changed are re-parsed."""
+        cache_path = tmp_path / "kb.pickle"
+        KBLoader(cached_kb, cache_path=cache_path).load_all()
+
+        recipe_file = cached_kb / "recipes" / "test_recipe_v0.yaml"
+        recipe_file.write_text(
+            recipe_file.read_text().replace("final_product", "other_product")
+        )
+
+        loader = KBLoader(cached_kb, cache_path=cache_path)
+        loader.load_all()
+
+        assert loader._disk_cache.misses == 1
+        assert loader.recipes["test_recipe_v0"].target_item_id == "other_product"
+
+    def test_touched_file_uses_content_hash(self, cached_kb, tmp_path):
+        """A new mtime with identical content is still a cache hit."""
+        import os
+        cache_path = tmp_path / "kb.pickle"
+        KBLoader(cached_kb, cache_path=cache_path).load_all()
+
+        process_file = cached_kb / "processes" / "test_process_v0.yaml"
+        st = process_file.stat()
+        os.utime(process_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        loader = KBLoader(cached_kb, cache_path=cache_path)
+        loader.load_all()
+        assert loader._disk_cache.misses == 0
+
+    def test_cached_models_respect_model_mode(self, cached_kb, tmp_path):
+        """Raw and validated loaders do not share cache files by default."""
+        cache_path = tmp_path / "kb.pickle"
+        KBLoader(cached_kb, cache_path=cache_path).load_all()
+
+        # Same cache file, different mode: header mismatch forces re-parse
+        loader = KBLoader(cached_kb, use_validated_models=True, cache_path=cache_path)
+        loader.load_all()
+        assert isinstance(loader.processes["test_process_v0"], Process)
+
+    def test_lazy_lookups_use_cache(self, cached_kb, tmp_path):
+        """Lazy get_* calls populate and read the cache too."""
+        cache_path = tmp_path / "kb.pickle"
+        first = KBLoader(cached_kb, cache_path=cache_path)
+        assert first.get_item("test_part_v0") is not None
+        first.save_disk_cache()
+
+        second = KBLoader(cached_kb, cache_path=cache_path)
+        item = second.get_item("test_part_v0")
+        assert isinstance(item, RawItem)
+        assert second._disk_cache.hits == 1
+
+
+class TestLookupIndex:
+    """Tests for the id -> path index behind lazy get_* lookups."""
+
+    def test_item_id_filename_mismatch(self, cached_kb):
+        """Items are found by declared id when the filename differs."""
+        (cached_kb / "items" / "parts" / "renamed_file.yaml").write_text(
+            "id: declared_part_v0\nkind: part\nmass: 1.0\n"
+        )
+        loader = KBLoader(cached_kb)
+        item = loader.get_item("declared_part_v0")
+        assert item is not None
+        assert item.id == "declared_part_v0"
+
+    def test_process_id_filename_mismatch(self, cached_kb):
+        """Processes are found by declared id when the filename differs."""
+        source = (cached_kb / "processes" / "test_process_v0.yaml").read_text()
+        (cached_kb / "processes" / "other_name.yaml").write_text(
+            source.replace("test_process_v0", "declared_process_v0")
+        )
+        loader = KBLoader(cached_kb)
+        assert loader.get_process("declared_process_v0") is not None
+
+    def test_import_item_lookup(self, cached_kb):
+        """Items under kb/imports/** are found."""
+        nested = cached_kb / "imports" / "vendor"
+        nested.mkdir(parents=True)
+        (nested / "imported_widget.yaml").write_text(
+            "id: imported_widget\nkind: part\nis_import: true\n"
+        )
+        loader = KBLoader(cached_kb)
+        assert loader.get_item("imported_widget") is not None
+
+    def test_items_dir_takes_priority_over_imports(self, cached_kb):
+        """A filename match under kb/items wins over kb/imports."""
+        (cached_kb / "imports").mkdir()
+        (cached_kb / "imports" / "test_part_v0.yaml").write_text(
+            "id: test_part_v0\nkind: material\n"
+        )
+        loader = KBLoader(cached_kb)
+        assert loader.get_item("test_part_v0").kind == "part"
+
+    def test_missing_ids_are_negatively_cached(self, cached_kb):
+        """A miss is remembered instead of re-probing the filesystem."""
+        loader = KBLoader(cached_kb)
+        assert loader.get_item("late_part_v0") is None
+
+        (cached_kb / "items" / "parts" / "late_part_v0.yaml").write_text(
+            "id: late_part_v0\nkind: part\n"
+        )
+        assert loader.get_item("late_part_v0") is None
+        assert KBLoader(cached_kb).get_item("late_part_v0") is not None
+
+
+class TestPreload:
+    """Tests for preload(), which warms the lazy lookups."""
+
+    def test_preload_populates_lazy_caches(self, cached_kb):
+        """Every definition is parsed without switching to eager indexes."""
+        loader = KBLoader(cached_kb)
+        loader.preload()
+
+        assert "test_process_v0" in loader._processes
+        assert "test_recipe_v0" in loader._recipes
+        assert "test_part_v0" in loader._items
+        assert loader.processes == {}
+        assert loader.units
+
+    def test_preload_keeps_lazy_resolution(self, cached_kb):
+        """A filename match still wins over a duplicate declared id."""
+        source = (cached_kb / "recipes" / "test_recipe_v0.yaml").read_text()
+        (cached_kb / "recipes" / "aaa_duplicate.yaml").write_text(
+            source.replace("final_product", "other_product")
+        )
+        lazy = KBLoader(cached_kb).get_recipe("test_recipe_v0")
+
+        loader = KBLoader(cached_kb)
+        loader.preload()
+        assert loader.get_recipe("test_recipe_v0") == lazy
+        assert loader.get_recipe("test_recipe_v0").target_item_id == "final_product"
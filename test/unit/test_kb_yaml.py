@@ -0,0 +1,60 @@
+"""
+Tests for kb_core.kb_yaml
+
+Checks the shared YAML reader and that the libyaml fast path parses every
+KB file identically to the pure-Python SafeLoader.
+"""
+import pytest
+import yaml
+
+from src.kb_core import kb_yaml
+
+
+def test_safe_load_string():
+    """safe_load parses YAML text like yaml.safe_load."""
+    text = "id: test_v0\nqty: 1.5\nsteps:\n  - process_id: p1\n"
+    assert kb_yaml.safe_load(text) == yaml.safe_load(text)
+
+
+def test_safe_load_rejects_unsafe_tags():
+    """The fast loader is still a safe loader."""
+    with pytest.raises(yaml.YAMLError):
+        kb_yaml.safe_load("!!python/object/apply:os.system ['true']")
+
+
+def test_load_file(tmp_path):
+    """load_file reads and parses a file."""
+    path = tmp_path / "item.yaml"
+    path.write_text("id: widget\nkind: part\nmass: 2\n", encoding="utf-8")
+    assert kb_yaml.load_file(path) == {"id": "widget", "kind": "part", "mass": 2}
+
+
+def test_load_file_parse_error(tmp_path):
+    """Parse errors propagate to the caller."""
+    path = tmp_path / "broken.yaml"
+    path.write_text("{ invalid yaml [", encoding="utf-8")
+    with pytest.raises(yaml.YAMLError):
+        kb_yaml.load_file(path)
+
+
+@pytest.mark.skipif(not kb_yaml.HAS_LIBYAML, reason="PyYAML built without libyaml")
+def test_fast_loader_parity_with_pure_loader(kb_root):
+    """Every KB file parses identically with CSafeLoader and SafeLoader."""
+    mismatches = []
+    kb_files = sorted(kb_root.rglob("*.yaml"))
+    assert kb_files
+
+    for path in kb_files:
+        text = path.read_text(encoding="utf-8")
+        try:
+            expected = yaml.load(text, Loader=kb_yaml.PureSafeLoader)
+        except yaml.YAMLError:
+            # Both loaders must reject the same files
+            with pytest.raises(yaml.YAMLError):
+                yaml.load(text, Loader=kb_yaml.FastSafeLoader)
+            continue
+        actual = yaml.load(text, Loader=kb_yaml.FastSafeLoader)
+        if actual != expected or type(actual) is not type(expected):
+            mismatches.append(str(path))
+
+    assert not mismatches, f"{len(mismatches)} files differ: {mismatches[:10]}"
@@ -477,3 +477,122 @@ class TestReservationManager:
         expired = manager.advance_time(11.0)
         assert len(expired) == 1
         assert expired[0].process_run_id == 'proc_2'
+
+
+def _brute_force_load(reservations, machine_id, time):
+    return sum(
+        r.qty_reserved for r in reservations
+        if r.machine_id == machine_id and r.is_active_at(time)
+    )
+
+
+class TestReservationIndex:
+    """The indexed manager must agree with a scan over all reservations."""
+
+    def test_randomized_parity_with_scan(self):
+        """Capacity checks and queries match brute force under adds/removes."""
+        import random
+
+        rng = random.Random(20)
+        capacities = {'lathe': 2.0, 'mill': 1.0, 'press': 3.0}
+        manager = MachineReservationManager(capacities)
+        live = []
+
+        for step in range(600):
+            if live and rng.random() < 0.3:
+                process_run_id = rng.choice(live)
+                manager.remove_reservation(process_run_id)
+                live.remove(process_run_id)
+                continue
+
+            machine_id = rng.choice(list(capacities))
+            start = float(rng.randint(0, 40))
+            end = start + rng.randint(1, 10)
+            unit = rng.choice(['count', 'hr'])
+            qty = float(rng.randint(1, 2)) if unit == 'count' else float(rng.randint(1, 8))
+            candidate = Reservation(
+                machine_id=machine_id,
+                process_run_id=f'p{step}',
+                reservation_type=(
+                    ReservationType.FULL_DURATION if unit == 'count' else ReservationType.PARTIAL
+                ),
+                start_time=start,
+                end_time=end,
+                qty_reserved=qty if unit == 'count' else 1.0,
+                hr_reserved=None if unit == 'count' else qty,
+            )
+            points = [t / 2 for t in range(0, 120)]
+            expected = all(
+                _brute_force_load(manager.reservations, machine_id, t)
+                + (candidate.qty_reserved if candidate.is_active_at(t) else 0.0)
+                <= capacities[machine_id]
+                for t in points
+            )
+
+            added = manager.add_reservation(machine_id, f'p{step}', start, end, qty, unit)
+            assert added == expected
+            if added:
+                live.append(f'p{step}')
+
+            probe = rng.uniform(0, 50)
+            assert manager.get_availability_at(machine_id, probe).reserved == pytest.approx(
+                _brute_force_load(manager.reservations, machine_id, probe)
+            )
+            lo, hi = sorted((rng.uniform(0, 50), rng.uniform(0, 50)))
+            expected_peak = max(
+                [0.0] + [
+                    _brute_force_load(manager.reservations, machine_id, t)
+                    for t in [lo, hi] + [
+                        x for r in manager.reservations if r.machine_id == machine_id
+                        for x in (r.start_time, r.release_time)
+                    ]
+                    if lo <= t <= hi
+                ]
+            )
+            assert manager.get_reserved_qty(machine_id, lo, hi) == pytest.approx(expected_peak)
+
+    def test_removed_reservations_are_compacted(self):
+        """Removing reservations drops their breakpoints from the timeline."""
+        manager = MachineReservationManager({'lathe': 5.0})
+        manager.add_reservation('lathe', 'keep', 0.0, 100.0, 1.0, 'count')
+        for i in range(50):
+            manager.add_reservation('lathe', f'p{i}', float(i), float(i) + 0.5, 1.0, 'count')
+            manager.remove_reservation(f'p{i}')
+
+        assert len(manager._timelines['lathe']) == 2
+        assert manager.get_availability_at('lathe', 10.2).reserved == 1.0
+
+    def test_compact_drops_historic_reservations(self):
+        """compact() removes reservations released before current_time."""
+        manager = MachineReservationManager({'lathe': 1.0, 'mill': 1.0})
+        for i in range(20):
+            manager.add_reservation('lathe', f'p{i}', float(i), float(i) + 1.0, 1.0, 'count')
+        manager.add_reservation('mill', 'p3', 0.0, 50.0, 1.0, 'count')
+        manager.advance_time(10.5)
+
+        removed = manager.compact()
+        assert [r.process_run_id for r in removed] == [f'p{i}' for i in range(10)]
+        assert len(manager._timelines['lathe']) == 11  # p10..p19, back to zero
+        assert [r.machine_id for r in manager.get_reservations_for_process('p3')] == ['mill']
+        assert manager.get_reservations_for_process('p2') == []
+        assert not manager.add_reservation('lathe', 'late', 10.0, 11.0, 1.0, 'count')
+        assert manager.add_reservation('lathe', 'late', 30.0, 31.0, 1.0, 'count')
+        assert len(manager.reservations) == 12
+
+    def test_appended_reservations_are_indexed(self):
+        """Reservations appended to the list directly count toward capacity."""
+        manager = MachineReservationManager({'lathe': 1.0})
+        manager.reservations.append(Reservation(
+            machine_id='lathe',
+            process_run_id='forced',
+            reservation_type=ReservationType.FULL_DURATION,
+            start_time=0.0,
+            end_time=5.0,
+            qty_reserved=1.0,
+        ))
+
+        assert not manager.add_reservation('lathe', 'p1', 2.0, 4.0, 1.0, 'count')
+        assert manager.get_reservations_for_process('forced')[0].end_time == 5.0
+        assert len(manager.remove_reservation('forced')) == 1
+        assert manager.add_reservation('lathe', 'p1', 2.0, 4.0, 1.0, 'count')
+        assert [r.process_run_id for r in manager.reservations] == ['p1']
@@ -0,0 +1,217 @@
+"""
+Tests for kb_core.queue_manager
+
+Runs the same queue operations against the JSONL and SQLite backends and
+checks that they agree, plus SQLite-specific seeding and import/export.
+"""
+import json
+import threading
+
+import pytest
+
+from src.kb_core import queue_manager
+
+
+def _gap(gap_id, reason, item_id=None, **extra):
+    return {
+        "id": gap_id,
+        "kind": "gap",
+        "reason": reason,
+        "item_id": item_id or gap_id.split(":", 1)[1],
+        "status": "pending",
+        **extra,
+    }
+
+
+SEED = [
+    _gap("no_recipe:a", "no_recipe"),
+    _gap("missing_field:b", "missing_field"),
+    _gap("no_recipe:c", "no_recipe"),
+    _gap("missing_field:a", "missing_field"),  # same item as no_recipe:a
+    _gap("import_stub:d", "import_stub"),
+    _gap("no_recipe:e", "no_recipe", status="done", completed_at=1.0),
+    _gap("missing_field:f", "missing_field", status="leased", lease_id="gone", lease_expires_at=1.0),
+    _gap("import_stub:h", "import_stub", status="leased", lease_id="agent-1", lease_expires_at=4e9),
+]
+
+_VOLATILE = ("lease_expires_at", "completed_at", "added_at")
+
+
+def _stable(items):
+    def clean(obj):
+        obj = {k: v for k, v in obj.items() if k not in _VOLATILE}
+        if "context" in obj:
+            obj["context"] = {k: v for k, v in obj["context"].items() if k not in _VOLATILE}
+        return obj
+    return [clean(obj) for obj in items]
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("WORK_QUEUE_BACKEND", request.param)
+    monkeypatch.setattr(queue_manager, "_stores", {})
+    queue_manager.WORK_QUEUE.parent.mkdir(parents=True, exist_ok=True)
+    queue_manager.WORK_QUEUE.write_text("".join(json.dumps(obj) + "\n" for obj in SEED))
+    return request.param
+
+
+def _items(backend):
+    if backend == "sqlite":
+        queue_manager.export_queue()
+    return queue_manager._load_queue()
+
+
+def _script():
+    """A sequence of queue operations and their results."""
+    results = []
+    results.append(queue_manager.complete("import_stub:h", "agent-2"))
+    results.append(queue_manager.release("import_stub:h", "agent-2"))
+    results.append(queue_manager.release("import_stub:h", "agent-1"))
+    results.append(queue_manager.complete("missing_field:b", "agent-2"))
+    results.append(queue_manager.release("no_recipe:e", "agent-3"))
+    results.append(sorted(queue_manager.gap_ids_present(["no_recipe:a", "no_recipe:e", "missing_field:b"])))
+    results.append(queue_manager.gap_id_exists("no_recipe:e"))
+    results.append(queue_manager.list_queue())
+    results.append(queue_manager.add_gap("quality_concern", "g", description="check"))
+    results.append(queue_manager.gc(prune_done_older_than=60))
+    return results
+
+
+class TestBackendParity:
+    """Both backends give the same results and leave the same queue."""
+
+    def test_script(self, backend):
+        results = _script()
+        items = _items(backend)
+        if backend == "jsonl":
+            TestBackendParity.expected = (results, _stable(items))
+        else:
+            expected_results, expected_items = TestBackendParity.expected
+            assert results == expected_results
+            assert _stable(items) == expected_items
+
+    def test_lease_order(self, backend):
+        # Expired lease on item f is reverted; item a is blocked while leased
+        first = queue_manager.lease_next("x", priorities=["missing_field"])
+        assert first["status"] == "leased" and first["lease_id"] == "x"
+        leased = [first["id"]]
+        while True:
+            item = queue_manager.lease_next("x")
+            if item is None:
+                break
+            leased.append(item["id"])
+        keys = [gap_id.split(":", 1)[1] for gap_id in leased]
+        assert len(keys) == len(set(keys))
+        assert "missing_field:f" in leased
+        assert "no_recipe:e" not in leased
+        assert "import_stub:h" not in leased  # lease still valid
+
+    def test_lease_buckets(self, backend):
+        # Agents land in the same priority buckets; the entry within one may differ
+        reasons = []
+        for n in range(20):
+            item = queue_manager.lease_next(f"agent-{n}", priorities=["import_stub", "missing_field"])
+            reasons.append(item["reason"])
+            assert queue_manager.release(item["id"], f"agent-{n}")
+        if backend == "jsonl":
+            TestBackendParity.expected_reasons = reasons
+        else:
+            assert reasons == TestBackendParity.expected_reasons
+        assert len(set(reasons)) == 3
+
+    def test_pop_and_prune(self, backend):
+        assert queue_manager.pop_queue()["id"] == "no_recipe:a"
+        queue_manager.add_gap("resolved", "z")
+        assert queue_manager.prune_queue() == 1
+        assert [obj["id"] for obj in _items(backend)] == [obj["id"] for obj in SEED[1:]]
+
+    def test_rewrite_queue(self, backend):
+        queue_manager.rewrite_queue(lambda items: [obj for obj in items if obj["reason"] == "no_recipe"])
+        on_disk = [json.loads(line) for line in queue_manager.WORK_QUEUE.read_text().splitlines()]
+        assert [obj["id"] for obj in on_disk] == ["no_recipe:a", "no_recipe:c", "no_recipe:e"]
+
+
+class TestSQLiteQueue:
+    """SQLite-specific behavior."""
+
+    @pytest.fixture
+    def sqlite(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("WORK_QUEUE_BACKEND", "sqlite")
+        monkeypatch.setattr(queue_manager, "_stores", {})
+        queue_manager.WORK_QUEUE.parent.mkdir(parents=True, exist_ok=True)
+        queue_manager.WORK_QUEUE.write_text("".join(json.dumps(obj) + "\n" for obj in SEED))
+
+    def test_seeded_from_jsonl(self, sqlite):
+        assert queue_manager.list_queue() == {"pending": 5, "done": 1, "leased": 2}
+        assert queue_manager.WORK_QUEUE_DB.exists()
+
+    def test_import_export_round_trip(self, sqlite, tmp_path):
+        queue_manager.lease_next("agent")
+        out = tmp_path / "export.jsonl"
+        assert queue_manager.export_queue(out) == len(SEED)
+
+        other = tmp_path / "other.jsonl"
+        other.write_text(json.dumps(SEED[0]) + "\n")
+        assert queue_manager.import_queue(other) == 1
+        assert queue_manager.list_queue() == {"pending": 1}
+
+        assert queue_manager.import_queue(out) == len(SEED)
+        assert queue_manager.list_queue()["leased"] == 2
+
+    def test_lease_expiry(self, sqlite):
+        item = queue_manager.lease_next("agent", ttl=-1)
+        assert item is not None
+        # Expired immediately, so the next lease may take the same item again
+        assert queue_manager.gc() == 0
+        assert queue_manager.list_queue()["leased"] == 1  # import_stub:h
+
+    def test_jsonl_backend_rejects_import(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("WORK_QUEUE_BACKEND", "jsonl")
+        with pytest.raises(ValueError):
+            queue_manager.export_queue()
+
+    def test_counts_follow_writes(self, sqlite):
+        store = queue_manager._sqlite_store()
+        queue_manager.lease_next("agent")
+        queue_manager.complete("missing_field:b", "agent")
+        queue_manager.add_gap("quality_concern", "g", description="check")
+        queue_manager.pop_queue()
+        queue_manager.gc(prune_done_older_than=-1)
+        kept = dict(
+            store._conn.execute("SELECT status || '/' || reason, n FROM queue_counts WHERE n > 0")
+        )
+        expected = dict(
+            store._conn.execute(
+                "SELECT status || '/' || reason, COUNT(*) FROM queue GROUP BY status, reason"
+            )
+        )
+        assert kept == expected
+
+    def test_reopen_keeps_queue(self, sqlite):
+        item = queue_manager.lease_next("agent")
+        queue_manager._sqlite_store().rewrite(lambda items: [obj for obj in items if obj["id"] == item["id"]])
+        # Another worker opening the database neither re-seeds nor drops leases
+        from src.kb_core.queue_store import SQLiteQueue
+        other = SQLiteQueue(queue_manager.WORK_QUEUE_DB, seed_from=queue_manager.WORK_QUEUE)
+        assert [obj["lease_id"] for obj in other.all_items()] == ["agent"]
+        queue_manager._sqlite_store().rewrite(lambda items: [])
+        assert SQLiteQueue(queue_manager.WORK_QUEUE_DB, seed_from=queue_manager.WORK_QUEUE).counts() == {}
+
+    def test_other_threads(self, sqlite):
+        queue_manager.list_queue()  # main thread opens its connection first
+        results = []
+
+        def work():
+            item = queue_manager.lease_next("agent")
+            results.append(queue_manager.complete(item["id"], "agent"))
+            results.append(len(queue_manager.rewrite_queue(lambda items: items[1:])))
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        assert results == [True, len(SEED) - 1]
+        assert sum(queue_manager.list_queue().values()) == len(SEED) - 1
+
@@ -0,0 +1,116 @@
+"""
+Tests for simulation.recipe_plan
+
+Covers plan compilation, per-run scaling, restored-run matching and plan
+cache invalidation.
+"""
+import pytest
+import yaml
+
+from src.kb_core.kb_loader import KBLoader
+from src.kb_core.override_resolver import resolve_recipe_step_with_kb
+from src.simulation.recipe_plan import RecipePlanCache, compile_recipe_plan
+
+
+FILES = {
+    "processes/cut_v0.yaml": {
+        'id': 'cut_v0', 'kind': 'process', 'process_type': 'batch',
+        'inputs': [{'item_id': 'plate', 'qty': 2.0, 'unit': 'kg'}],
+        'outputs': [{'item_id': 'blank', 'qty': 4.0, 'unit': 'kg'}],
+        'time_model': {'type': 'batch', 'hr_per_batch': 0.5},
+        'resource_requirements': [{'machine_id': 'saw', 'qty': 1.0, 'unit': 'count'}],
+    },
+    "processes/press_v0.yaml": {
+        'id': 'press_v0', 'kind': 'process', 'process_type': 'batch',
+        'inputs': [{'item_id': 'blank', 'qty': 1.0, 'unit': 'kg'}],
+        'outputs': [{'item_id': 'bracket', 'qty': 1.0, 'unit': 'kg'}],
+        'time_model': {'type': 'batch', 'hr_per_batch': 1.0},
+        'resource_requirements': [{'machine_id': 'press', 'qty': 1.0, 'unit': 'count'}],
+    },
+    "recipes/recipe_bracket_v0.yaml": {
+        'id': 'recipe_bracket_v0', 'target_item_id': 'bracket',
+        'steps': [
+            {'process_id': 'cut_v0', 'scale': 2.0},
+            {'process_id': 'press_v0',
+             'inputs': [{'item_id': 'blank', 'qty': 3.0, 'unit': 'kg'}],
+             'dependencies': [0]},
+            {'process_id': 'paint_v0', 'dependencies': [0]},
+        ],
+    },
+}
+
+
+@pytest.fixture
+def kb(tmp_path):
+    root = tmp_path / "kb"
+    for rel, data in FILES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(data))
+    loader = KBLoader(root, use_validated_models=False)
+    loader.load_all()
+    return loader
+
+
+class TestCompile:
+    """Compiled plan contents."""
+
+    def test_plan(self, kb):
+        plan = compile_recipe_plan('recipe_bracket_v0', kb.definition_views())
+        assert plan.errors == []
+        assert plan.waves == ((0,), (1, 2))
+        assert len(plan.dependency_graph) == 3
+        assert plan.machines == ('saw', 'press')
+
+        cut, press, paint = plan.steps
+        # Resolved at unit scale; the recipe's step scale is applied per run
+        assert cut.resolved['inputs'][0]['qty'] == 2.0
+        assert cut.base_output_qty == 4.0 and not cut.io_override
+        assert press.io_override
+        assert press.resolved['inputs'][0]['qty'] == 3.0
+        # Missing process: resolved per run
+        assert paint.resolved is None
+
+    def test_missing_recipe(self, kb):
+        assert compile_recipe_plan('recipe_missing', kb.definition_views()) is None
+
+    def test_resolved_at_matches_resolver(self, kb):
+        plan = compile_recipe_plan('recipe_bracket_v0', kb.definition_views())
+        for scale in (1.0, 2.0, 6.0):
+            step = dict(plan.steps[0].step, scale=scale)
+            expected = resolve_recipe_step_with_kb(step, kb)
+            assert plan.steps[0].resolved_at(scale) == expected
+        assert plan.steps[0].resolved_at(1.0) is plan.steps[0].resolved
+
+    def test_matches_ignores_scale(self, kb):
+        plan = compile_recipe_plan('recipe_bracket_v0', kb.definition_views())
+        recipe = kb.get_recipe('recipe_bracket_v0').model_dump()
+        assert plan.matches(recipe)
+        for step in recipe['steps']:
+            step['scale'] = step.get('scale', 1.0) * 3
+        assert plan.matches(recipe)
+        recipe['steps'][1]['inputs'][0]['qty'] = 5.0
+        assert not plan.matches(recipe)
+        assert not plan.matches({'steps': recipe['steps'][:2]})
+
+
+class TestCache:
+    """Plans are shared per KB and recompiled when definitions change."""
+
+    def test_shared_and_reused(self, kb):
+        cache = RecipePlanCache.shared(kb.definition_views())
+        assert RecipePlanCache.shared(kb.definition_views()) is cache
+        plan = cache.get('recipe_bracket_v0')
+        assert cache.get('recipe_bracket_v0') is plan
+        assert cache.get('recipe_missing') is None
+
+    def test_recompiled_when_process_changes(self, kb):
+        cache = RecipePlanCache.shared(kb.definition_views())
+        plan = cache.get('recipe_bracket_v0')
+        cut = kb.processes['cut_v0']
+        kb.processes['cut_v0'] = type(cut).model_validate(
+            {**cut.model_dump(), 'outputs': [{'item_id': 'blank', 'qty': 8.0, 'unit': 'kg'}]}
+        )
+        rebuilt = cache.get('recipe_bracket_v0')
+        assert rebuilt is not plan
+        assert rebuilt.steps[0].base_output_qty == 8.0
@@ -131,6 +131,51 @@ class TestEventQueue:
         assert len(queue) == 0
         assert queue.pop() is None
 
+    def test_equal_time_and_priority_pop_in_insertion_order(self):
+        """Ties on (time, priority) are broken by insertion order."""
+        queue = EventQueue()
+        for i in range(20):
+            queue.push(SchedulerEvent(time=1.0, event_type=EventType.PROCESS_START, event_id=f'e{i}'))
+        queue.remove('e3')
+
+        assert [queue.pop().event_id for _ in range(19)] == [
+            f'e{i}' for i in range(20) if i != 3
+        ]
+
+    def test_removed_events_are_skipped_and_unindexed(self):
+        """Tombstoned events never surface through peek, pop or lookups."""
+        queue = EventQueue()
+        for i in range(200):
+            queue.push(SchedulerEvent(
+                time=float(i),
+                event_type=EventType.PROCESS_START,
+                event_id=f'start_p{i}',
+                data={'process_run_id': f'p{i}'},
+            ))
+        for i in range(0, 200, 2):
+            assert queue.remove(f'start_p{i}')
+        assert not queue.remove('start_p0')
+
+        assert len(queue) == 100
+        assert queue.peek().event_id == 'start_p1'
+        assert queue.get_events_for_process('p2') == []
+        assert [e.event_id for e in queue.get_events_before(6.0)] == [
+            'start_p1', 'start_p3', 'start_p5'
+        ]
+        assert [e.event_id for e in queue.to_list()][:3] == ['start_p1', 'start_p3', 'start_p5']
+        assert [queue.pop().event_id for _ in range(100)] == [f'start_p{i}' for i in range(1, 200, 2)]
+        assert queue.pop() is None
+
+    def test_duplicate_event_ids_remove_oldest_first(self):
+        """With repeated event IDs, remove() drops one event at a time."""
+        queue = EventQueue()
+        queue.push(SchedulerEvent(time=2.0, event_type=EventType.PROCESS_START, event_id='dup'))
+        queue.push(SchedulerEvent(time=1.0, event_type=EventType.PROCESS_START, event_id='dup'))
+
+        assert queue.remove('dup')
+        assert len(queue) == 1
+        assert queue.pop().time == 1.0
+
 
 class TestSchedulerBasics:
     """Test basic scheduler operations."""
@@ -281,6 +326,59 @@ class TestProcessLifecycle:
         assert len(scheduler.active_processes) == 0
         assert len(scheduler.completed_processes) == 2
 
+    def _schedule_runs(self, scheduler, count, duration=1.0):
+        for i in range(count):
+            scheduler.schedule_process_start(
+                process_run_id=f'proc_{i}',
+                process_id='test_process',
+                start_time=float(i),
+                duration_hours=duration,
+                scale=1.0,
+                inputs_consumed={},
+                outputs_pending={},
+                machines_reserved={},
+            )
+
+    def test_get_completed_process(self):
+        """Completed processes are looked up by process_run_id."""
+        scheduler = Scheduler()
+        self._schedule_runs(scheduler, 3)
+        scheduler.advance_to(10.0)
+
+        assert scheduler.get_completed_process('proc_1').process_run_id == 'proc_1'
+        assert scheduler.get_completed_process('missing') is None
+
+        # Assigning the list (snapshot restore) rebuilds the index
+        scheduler.completed_processes = scheduler.completed_processes[:1]
+        assert scheduler.get_completed_process('proc_0') is not None
+        assert scheduler.get_completed_process('proc_1') is None
+
+        scheduler.reset()
+        assert scheduler.get_completed_process('proc_0') is None
+
+    def test_completed_retention_evicts_oldest(self):
+        """Bounded retention spills the oldest completions on the next advance."""
+        scheduler = Scheduler(completed_retention=2)
+        evicted = []
+        scheduler.on_completed_evicted = evicted.append
+        self._schedule_runs(scheduler, 5)
+
+        # Completions from the current advance stay resolvable until it returns
+        scheduler.advance_to(10.0)
+        assert len(scheduler.completed_processes) == 5
+        assert scheduler.get_completed_process('proc_0') is not None
+
+        scheduler.advance_to(11.0)
+        assert [p.process_run_id for p in evicted] == ['proc_0', 'proc_1', 'proc_2']
+        assert [p.process_run_id for p in scheduler.completed_processes] == ['proc_3', 'proc_4']
+        assert scheduler.get_completed_process('proc_0') is None
+        assert scheduler.get_completed_process('proc_4') is not None
+
+    def test_completed_retention_rejects_negative(self):
+        """Retention must be non-negative."""
+        with pytest.raises(ValueError):
+            Scheduler(completed_retention=-1)
+
     def test_cancel_scheduled_process(self):
         """Cancel a scheduled process before it starts."""
         scheduler = Scheduler()
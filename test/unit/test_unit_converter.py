@@ -8,6 +8,7 @@ import pytest
 
 from src.kb_core.unit_converter import (
     UnitConverter,
+    UnitRegistry,
     is_valid_unit,
     get_unit_category,
     parse_compound_unit,
@@ -530,3 +531,81 @@ class TestEdgeCases:
     def test_normalize_zero_time(self):
         """Zero time normalizes to zero."""
         assert normalize_time_to_hours(0.0, "min") == 0.0
+
+
+# =============================================================================
+# Compiled Registry Tests
+# =============================================================================
+
+class RegistryKBLoader(MockKBLoader):
+    """Mock KB loader exposing a compiled registry and counting lookups."""
+
+    def __init__(self):
+        super().__init__()
+        self.item_lookups = 0
+        self.density_lookups = 0
+
+    def unit_registry(self):
+        return UnitRegistry((a, b, f) for (a, b), f in self.conversions.items())
+
+    def get_item(self, item_id: str):
+        self.item_lookups += 1
+        return super().get_item(item_id)
+
+    def get_material_density(self, material_name: str):
+        self.density_lookups += 1
+        return super().get_material_density(material_name)
+
+
+class TestUnitRegistry:
+    """Test the compiled conversion table."""
+
+    def test_direct_and_inverse_are_exact(self):
+        """Direct factors multiply, inverses divide by the KB factor."""
+        registry = UnitRegistry([("g", "kg", 0.001), ("minute", "hour", 0.016666667)])
+        assert registry.convert(1234.0, "g", "kg") == 1234.0 * 0.001
+        assert registry.convert(2.0, "kg", "g") == 2.0 / 0.001
+        assert registry.convert(90.0, "hour", "minute") == 90.0 / 0.016666667
+
+    def test_first_direct_entry_wins(self):
+        """Duplicate KB entries resolve like a scan of the list."""
+        registry = UnitRegistry([("kg", "g", 1000.0), ("kg", "g", 999.0)])
+        assert registry.direct_factor("kg", "g") == 1000.0
+        assert registry.direct_factor("g", "kg") is None
+
+    def test_transitive_within_dimension(self):
+        """Chains compose within a dimension only."""
+        registry = UnitRegistry([
+            ("g", "kg", 0.001),
+            ("tonne", "kg", 1000.0),
+            ("kg", "hr", 1.0),  # nonsense cross-dimension entry
+            ("hr", "min", 60.0),
+        ])
+        assert registry.convert(2.0, "tonne", "g") == pytest.approx(2000000.0)
+        assert registry.convert(1.0, "kg", "hr") == 1.0  # direct entries are kept
+        assert not registry.can_convert("g", "min")
+        assert registry.dimension("tonne") == "mass"
+
+    def test_liter_alias(self):
+        """liter and L are the same unit."""
+        registry = UnitRegistry([("liter", "m3", 0.001)])
+        assert registry.convert(5.0, "L", "liter") == 5.0
+        assert registry.convert(1000.0, "L", "m3") == pytest.approx(1.0)
+
+    def test_converter_uses_registry(self):
+        """A loader with a registry enables composed conversions."""
+        converter = UnitConverter(RegistryKBLoader())
+        assert converter.convert(1.0, "mL", "m3") == pytest.approx(1e-6)
+        assert converter.can_convert("g", "tonne")
+        assert converter.convert(1.0, "kg", "g") == 1000.0
+
+    def test_item_lookups_cached(self):
+        """Densities and item masses are looked up once per converter."""
+        kb = RegistryKBLoader()
+        converter = UnitConverter(kb)
+        for _ in range(3):
+            assert converter.convert(2.0, "unit", "kg", item_id="battery_pack") == 90.0
+            assert converter.convert(1.0, "L", "kg", item_id="water") == pytest.approx(1.0)
+            assert converter.convert(1.0, "unit", "kg", item_id="unknown") is None
+        assert kb.item_lookups == 2
+        assert kb.density_lookups == 3